@@ -0,0 +1,132 @@
+"""
+Measure the throughput of source coverage.
+
+Usage:
+
+    python benchmarks/coverage.py [--steps N] [--transactions T] [--instructions I]
+
+A synthetic trace is recorded into a temporary file: execution loops over the
+code of a few contracts, calling into another contract every few hundred
+steps. The time to mark the executed program counters of the trace file is
+reported in steps per second, together with the time of streaming a part of
+the trace state by state. Then the coverage of `--transactions` such traces
+(with different program counters) is merged, and projected through the tables
+of synthetic programs of `--instructions` instructions (see
+`ethdebug.synthetic`) into source coverage and LCOV.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from eth_hash.auto import keccak  # noqa: E402
+
+from ethdebug.coverage import Coverage, CoverageTable, to_lcov  # noqa: E402
+from ethdebug.replay.machine import ReplayMachine  # noqa: E402
+from ethdebug.replay.trace_file import TraceWriter  # noqa: E402
+from ethdebug.synthetic import Generator  # noqa: E402
+
+CONTRACTS = 4
+CODE_SIZE = 24_576
+CALL_INTERVAL = 300
+
+def codes() -> list:
+    rng = random.Random(0)
+    return [rng.randbytes(CODE_SIZE) for _ in range(CONTRACTS)]
+
+def record(path: Path, steps: int) -> None:
+    rng = random.Random(0)
+    contracts = codes()
+    with TraceWriter(path) as writer:
+        pc = 0
+        for step in range(steps):
+            code = None
+            opcode = "ADD"
+            if step % CALL_INTERVAL == CALL_INTERVAL - 1:
+                opcode = "CALL"
+            elif step % CALL_INTERVAL == 0:
+                code = contracts[(step // CALL_INTERVAL) % CONTRACTS]
+                pc = rng.randrange(CODE_SIZE // 2)
+            writer.append(pc, opcode, code=code)
+            # Mostly straight-line code with a jump back now and then, like a loop
+            pc = pc + rng.randint(1, 3) if rng.random() < 0.95 else max(0, pc - rng.randrange(200))
+            pc %= CODE_SIZE
+
+async def streamed(path: Path, steps: int) -> float:
+    class Prefix:
+        def __init__(self, trace):
+            self.trace = trace
+
+        async def __aiter__(self):
+            count = 0
+            async for state in self.trace:
+                if count == steps:
+                    return
+                count += 1
+                yield state
+
+    with ReplayMachine(path) as machine:
+        start = time.perf_counter()
+        await Coverage().add_trace(Prefix(await machine.trace()))
+        return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=1_000_000, help="number of steps of the trace (default: 1000000)")
+    parser.add_argument("--streamed-steps", type=int, default=20_000, help="number of steps to stream (default: 20000)")
+    parser.add_argument("--transactions", type=int, default=2_000, help="number of coverages to merge (default: 2000)")
+    parser.add_argument("--instructions", type=int, default=10_000, help="instructions of each program (default: 10000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "trace.bin"
+        start = time.perf_counter()
+        record(path, args.steps)
+        print(f"{'record trace':<24} {time.perf_counter() - start:>10.2f} s")
+
+        with ReplayMachine(path) as machine:
+            coverage = Coverage()
+            start = time.perf_counter()
+            asyncio.run(coverage.add_trace(asyncio.run(machine.trace())))
+            elapsed = time.perf_counter() - start
+        print(f"{'mark trace file':<24} {elapsed:>10.3f} s {args.steps / elapsed / 1e6:>8.2f} M steps/s")
+        elapsed = asyncio.run(streamed(path, args.streamed_steps))
+        print(f"{'mark streamed trace':<24} {elapsed:>10.3f} s {args.streamed_steps / elapsed / 1e6:>8.2f} M steps/s")
+
+    rng = random.Random(1)
+    hashes = [keccak(code) for code in codes()]
+    transactions = []
+    for _ in range(args.transactions):
+        transaction = Coverage()
+        for code_hash in hashes:
+            transaction.mark(code_hash, "call", (rng.randrange(CODE_SIZE) for _ in range(200)))
+        transactions.append(transaction)
+    merged = Coverage()
+    start = time.perf_counter()
+    for transaction in transactions:
+        merged.merge(transaction)
+    elapsed = time.perf_counter() - start
+    print(f"{'merge transactions':<24} {elapsed:>10.3f} s {elapsed / args.transactions * 1e6:>8.1f} µs/transaction")
+
+    start = time.perf_counter()
+    tables = {
+        (code_hash, "call"): CoverageTable.build(Generator(seed=index).program(args.instructions, sources=2).program)
+        for index, code_hash in enumerate(hashes)
+    }
+    print(f"{'build tables':<24} {time.perf_counter() - start:>10.3f} s")
+    start = time.perf_counter()
+    sources = merged.project(tables)
+    print(f"{'project':<24} {time.perf_counter() - start:>10.3f} s")
+    contents = {source: (f"source{source}.sol", "\n".join("x" * 40 for _ in range(300))) for source in sources}
+    start = time.perf_counter()
+    lcov = to_lcov(sources, contents)
+    print(f"{'lcov':<24} {time.perf_counter() - start:>10.3f} s {len(lcov.splitlines()):>8} lines")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Measure evaluating expressions and dereferencing pointers on an in-memory machine state.
+
+Usage:
+
+    python benchmarks/engine.py [--repeat N] [--min-time S] [--filter TEXT] [--json FILE]
+    python benchmarks/engine.py --compare BASELINE RESULTS [--tolerance T]
+
+The workloads are:
+
+- `evaluate` on nested arithmetic and keccak256 expressions of several depths,
+- `dereference` and `Cursor.view` (reading every region) on the example pointers
+  of the schema: a packed struct with templates, a storage mapping, a long
+  storage string, and memory arrays of 10 to 100,000 elements,
+- `dereference` and `Cursor.view` on the variables generated by `ethdebug.synthetic`,
+- `Program.model_validate` on the programs of the solc fixtures in `src/tests`,
+  and on a synthetic program of 10,000 instructions.
+
+For each workload, the best time per run of `--repeat` runs is reported. The
+results can be saved with `--json`, and two saved results can be compared with
+`--compare`: workloads that became slower by more than `--tolerance` (a
+fraction, default 0.2) are flagged, and the script exits with status 1.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from eth_hash.auto import keccak  # noqa: E402
+
+from ethdebug.data import Data  # noqa: E402
+from ethdebug.dereference.__main__ import DereferenceOptions, dereference  # noqa: E402
+from ethdebug.evaluate import EvaluateOptions, evaluate  # noqa: E402
+from ethdebug.format.pointer.expression_schema import PointerExpression  # noqa: E402
+from ethdebug.format.pointer_schema import Pointer  # noqa: E402
+from ethdebug.format.program_schema import Program  # noqa: E402
+from ethdebug.in_memory import InMemoryState  # noqa: E402
+from ethdebug.synthetic import Generator  # noqa: E402
+
+from validation import solc_programs  # noqa: E402
+
+DEPTHS = [8, 64]
+LIST_SIZES = [10, 100, 1_000, 10_000, 100_000]
+
+Workload = Tuple[str, Callable[[], Awaitable[Any]]]
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+def nested(operator: str, depth: int) -> Any:
+    """
+    An expression nesting `depth` operations, each of a variable and the next operation.
+    """
+    expression: Any = {".offset": "array-count"}
+    for _ in range(depth):
+        expression = {operator: ["index", expression]}
+    return expression
+
+def memory_array_pointer() -> Dict[str, Any]:
+    return {
+        "group": [
+            {"name": "array-start", "location": "stack", "slot": 0},
+            {"name": "array-count", "location": "memory", "offset": {"$read": "array-start"}, "length": "$wordsize"},
+            {"list": {
+                "count": {"$read": "array-count"},
+                "each": "item-index",
+                "is": {
+                    "name": "array-item",
+                    "location": "memory",
+                    "offset": {"$sum": [
+                        {".offset": "array-count"},
+                        {".length": "array-count"},
+                        {"$product": ["item-index", {".length": "$this"}]},
+                    ]},
+                    "length": "$wordsize",
+                },
+            }},
+        ],
+    }
+
+def packed_struct_pointer() -> Dict[str, Any]:
+    return {
+        "templates": {"packed-field": {
+            "expect": ["struct-storage-contract-variable-slot", "previous", "size"],
+            "for": {
+                "name": "field",
+                "location": "storage",
+                "slot": "struct-storage-contract-variable-slot",
+                "offset": {"$difference": ["previous", "size"]},
+                "length": "size",
+            },
+        }},
+        "in": {
+            "define": {"struct-storage-contract-variable-slot": 0},
+            "in": {"group": [
+                {"name": "packing-begin", "location": "storage", "slot": "struct-storage-contract-variable-slot", "offset": "$wordsize", "length": 0},
+                {"define": {"previous": {".offset": "packing-begin"}, "size": 1}, "in": {"template": "packed-field", "yields": {"field": "x"}}},
+                {"define": {"previous": {".offset": "x"}, "size": 1}, "in": {"template": "packed-field", "yields": {"field": "y"}}},
+                {"define": {"previous": {".offset": "y"}, "size": 4}, "in": {"template": "packed-field", "yields": {"field": "salt"}}},
+            ]},
+        },
+    }
+
+def mapping_pointer() -> Dict[str, Any]:
+    return {
+        "define": {"key": "0x" + word(5).hex()},
+        "in": {"name": "value", "location": "storage", "slot": {"$keccak256": ["key", {"$wordsized": 3}]}},
+    }
+
+def string_pointer() -> Dict[str, Any]:
+    return {
+        "define": {"string-storage-contract-variable-slot": "0x" + word(1).hex()},
+        "in": {"group": [
+            {"name": "length-flag", "location": "storage", "slot": "string-storage-contract-variable-slot",
+             "offset": {"$difference": ["$wordsize", 1]}, "length": 1},
+            {
+                "if": {"$remainder": [{"$sum": [{"$read": "length-flag"}, 1]}, 2]},
+                "then": {
+                    "define": {"string-length": {"$quotient": [{"$read": "length-flag"}, 2]}},
+                    "in": {"name": "string", "location": "storage", "slot": "string-storage-contract-variable-slot", "offset": 0, "length": "string-length"},
+                },
+                "else": {"group": [
+                    {"name": "long-string-length-data", "location": "storage", "slot": "string-storage-contract-variable-slot", "offset": 0, "length": "$wordsize"},
+                    {
+                        "define": {
+                            "string-length": {"$quotient": [{"$difference": [{"$read": "long-string-length-data"}, 1]}, 2]},
+                            "start-slot": {"$keccak256": ["string-storage-contract-variable-slot"]},
+                            "total-slots": {"$quotient": [{"$sum": ["string-length", {"$difference": ["$wordsize", 1]}]}, "$wordsize"]},
+                        },
+                        "in": {"list": {
+                            "count": "total-slots",
+                            "each": "i",
+                            "is": {
+                                "define": {
+                                    "current-slot": {"$sum": ["start-slot", "i"]},
+                                    "previous-length": {"$product": ["i", "$wordsize"]},
+                                },
+                                "in": {
+                                    "if": {"$difference": ["string-length", {"$sum": ["previous-length", "$wordsize"]}]},
+                                    "then": {"name": "string", "location": "storage", "slot": "current-slot"},
+                                    "else": {"name": "string", "location": "storage", "slot": "current-slot", "offset": 0,
+                                             "length": {"$difference": ["string-length", "previous-length"]}},
+                                },
+                            },
+                        }},
+                    },
+                ]},
+            },
+        ]},
+    }
+
+def memory_array_state(size: int) -> InMemoryState:
+    return InMemoryState(stack=[word(0x80)], memory=bytes(0x80) + word(size) + b"".join(word(i) for i in range(size)))
+
+def storage_state() -> InMemoryState:
+    # A struct packed in slot 0, a mapping at slot 3 and a string of 1,000 bytes at slot 1
+    string_slot = int.from_bytes(keccak(word(1)), "big")
+    storage = {
+        0: bytes.fromhex("deadbeef0201"),
+        1: word(1000 * 2 + 1),
+        int.from_bytes(keccak(word(5) + word(3)), "big"): word(42),
+    }
+    storage.update((string_slot + i, bytes([i]) * 32) for i in range(32))
+    return InMemoryState(storage=storage)
+
+def view_workload(pointer: Dict[str, Any], state: InMemoryState) -> Callable[[], Awaitable[Any]]:
+    validated = Pointer.model_validate(pointer)
+    options = DereferenceOptions(state=state, templates={})
+
+    async def run() -> None:
+        cursor = await dereference(validated, options)
+        view = await cursor.view(state)
+        for region in view.regions().all():
+            await view.read(region)
+    return run
+
+def evaluate_workload(expression: Any) -> Callable[[], Awaitable[Any]]:
+    validated = PointerExpression.model_validate(expression).root
+    state = memory_array_state(1)
+
+    async def prepare() -> EvaluateOptions:
+        # The regions of a memory array, for the lookups in the expressions
+        cursor = await dereference(Pointer.model_validate(memory_array_pointer()), DereferenceOptions(state=state, templates={}))
+        regions = (await cursor.view(state)).regions()
+        return EvaluateOptions(state=state, regions=regions, variables={"index": Data.from_int(7)})
+    options = asyncio.run(prepare())
+
+    async def run() -> None:
+        await evaluate(validated, options)
+    return run
+
+def synthetic_workload(variables: int, depth: int, fan_out: int) -> Callable[[], Awaitable[Any]]:
+    generated, state = Generator(seed=0, depth=depth, fan_out=fan_out).variables(variables)
+    pointers = [Pointer.model_validate(variable.pointer) for variable in generated]
+    options = DereferenceOptions(state=state, templates={})
+
+    async def run() -> None:
+        for pointer in pointers:
+            view = await (await dereference(pointer, options)).view(state)
+            for region in view.regions().all():
+                await view.read(region)
+    return run
+
+def validate_workload(programs: List[Any]) -> Callable[[], Awaitable[Any]]:
+    async def run() -> None:
+        for program in programs:
+            Program.model_validate(program)
+    return run
+
+def workloads() -> List[Workload]:
+    result: List[Workload] = []
+    for depth in DEPTHS:
+        result.append((f"evaluate $sum depth {depth}", evaluate_workload(nested("$sum", depth))))
+        result.append((f"evaluate $keccak256 depth {depth}", evaluate_workload(nested("$keccak256", depth))))
+    state = storage_state()
+    result.append(("view packed struct", view_workload(packed_struct_pointer(), state)))
+    result.append(("view storage mapping", view_workload(mapping_pointer(), state)))
+    result.append(("view storage string", view_workload(string_pointer(), state)))
+    for size in LIST_SIZES:
+        result.append((f"view memory array {size}", view_workload(memory_array_pointer(), memory_array_state(size))))
+    result.append(("view synthetic variables", synthetic_workload(16, 4, 6)))
+    result.append(("validate solc programs", validate_workload(solc_programs())))
+    result.append(("validate synthetic program", validate_workload([Generator(seed=0).program(10_000).program])))
+    return result
+
+async def measure(run: Callable[[], Awaitable[Any]], repeat: int, min_time: float) -> float:
+    """
+    Run a workload in a loop and return the best time per run in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        while True:
+            await run()
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / count)
+    return best
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:>9.2f} {unit}"
+    return f"{seconds / 1e-9:>9.2f} ns"
+
+def compare(baseline: Dict[str, float], results: Dict[str, float], tolerance: float) -> bool:
+    """
+    Print the change of every workload relative to the baseline and return whether one became slower than tolerated.
+    """
+    failed = False
+    for name, seconds in results.items():
+        line = f"{name:<36} {format_time(seconds)}"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f" {change:>+8.1%}"
+            if change > tolerance:
+                line += "  slower than baseline"
+                failed = True
+        else:
+            line += "      new"
+        print(line)
+    for name in baseline.keys() - results.keys():
+        print(f"{name:<36} {'missing':>12}")
+    return failed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per workload (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum duration of a run in seconds (default: 0.2)")
+    parser.add_argument("--filter", default="", help="only run the workloads whose name contains this text")
+    parser.add_argument("--json", type=Path, help="write the results to a file")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASELINE", "RESULTS"), help="compare two result files instead of running the workloads")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown relative to the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, results = (json.loads(path.read_text()) for path in args.compare)
+        sys.exit(1 if compare(baseline, results, args.tolerance) else 0)
+
+    results: Dict[str, float] = {}
+    for name, run in workloads():
+        if args.filter not in name:
+            continue
+        results[name] = asyncio.run(measure(run, args.repeat, args.min_time))
+        print(f"{name:<36} {format_time(results[name])}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+if __name__ == "__main__":
+    main()
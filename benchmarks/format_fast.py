@@ -0,0 +1,123 @@
+"""
+Compare decoding info documents with the msgspec models of
+`ethdebug.format_fast` against `Info.model_validate_json`.
+
+Usage:
+
+    python benchmarks/format_fast.py [--repeat N]
+
+Info documents are built from the solc fixtures in `src/tests`: the
+compilation is completed with the sources of the compiler input, and the
+programs that are valid according to the format are included. For each
+decoder, the best of `--repeat` runs is reported as megabytes per second,
+together with the memory allocated while decoding a document.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import msgspec  # noqa: E402
+from pydantic import ValidationError  # noqa: E402
+
+from ethdebug.format.info_schema import Info  # noqa: E402
+from ethdebug.format.program_schema import Program  # noqa: E402
+from ethdebug.format_fast import info_schema as fast_info  # noqa: E402
+
+SOLC_FIXTURES = [
+    ROOT / "src/tests/abstract_and_interface",
+    ROOT / "src/tests/mega_playground",
+    ROOT / "src/tests/standard_yul_debug_info_ethdebug_compatible_output",
+]
+
+def solc_info(fixture: Path) -> Dict[str, Any]:
+    """
+    The info document of a solc fixture.
+    """
+    with open(fixture / "input.json", "r") as f:
+        standard_json_input = json.load(f)
+    with open(fixture / "output.json", "r") as f:
+        output = json.load(f)
+    compilation = dict(output["ethdebug"]["compilation"], id=fixture.name)
+    compilation["sources"] = [
+        dict(
+            source,
+            contents=standard_json_input["sources"].get(source["path"], {}).get("content", ""),
+            language=standard_json_input["language"],
+        )
+        for source in compilation["sources"]
+    ]
+    programs = []
+    for contracts in output.get("contracts", {}).values():
+        for contract in contracts.values():
+            for bytecode in ("bytecode", "deployedBytecode"):
+                program = contract.get("evm", {}).get(bytecode, {}).get("ethdebug")
+                if program is None:
+                    continue
+                try:
+                    Program.model_validate(program)
+                except ValidationError:
+                    continue
+                programs.append(program)
+    return {"compilation": compilation, "programs": programs}
+
+def measure(decode: Callable[[bytes], Any], documents: List[bytes], repeat: int, min_time: float = 0.5) -> float:
+    """
+    Decode all documents in a loop and return the best throughput in bytes per second.
+    """
+    size = sum(len(document) for document in documents)
+    best = 0.0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        while True:
+            for document in documents:
+                decode(document)
+            count += size
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, count / elapsed)
+    return best
+
+def allocated(decode: Callable[[bytes], Any], document: bytes) -> int:
+    """
+    The peak memory allocated while decoding a document.
+    """
+    decode(document)
+    tracemalloc.start()
+    try:
+        decode(document)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def decoders() -> List[Tuple[str, Callable[[bytes], Any]]]:
+    decoder = msgspec.json.Decoder(fast_info.Info)
+    return [
+        ("Info.model_validate_json", Info.model_validate_json),
+        ("format_fast (msgspec)", decoder.decode),
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per decoder (default: 5)")
+    args = parser.parse_args()
+    documents = [json.dumps(solc_info(fixture)).encode() for fixture in SOLC_FIXTURES]
+    largest = max(documents, key=len)
+    print(f"{len(documents)} documents, {sum(map(len, documents)) / 1e6:.2f} MB")
+    baseline = None
+    for name, decode in decoders():
+        throughput = measure(decode, documents, args.repeat)
+        baseline = baseline or throughput
+        memory = allocated(decode, largest)
+        print(f"{name:<26} {throughput / 1e6:>8.1f} MB/s {throughput / baseline:>6.1f}x {memory / 1e6:>8.2f} MB allocated")
+
+if __name__ == "__main__":
+    main()
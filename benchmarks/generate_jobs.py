@@ -0,0 +1,88 @@
+"""
+Measure model generation with the modules formatted in several processes.
+
+Usage:
+
+    python benchmarks/generate_jobs.py [--schemas DIR] [--jobs N ...] [--repeat N]
+
+Two inputs are generated with each number of jobs: the modular OpenAPI
+fixture of `datamodel-code-generator`, and the ethdebug schemas in
+`--schemas` with the options of `generate_model.py`. The best time of
+`--repeat` runs is reported, and the output of every run is checked to be
+identical to the output with one job.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "datamodel-code-generator/src"))
+
+from datamodel_code_generator import InputFileType, generate  # noqa: E402
+from datamodel_code_generator.format import CodeFormatter  # noqa: E402
+
+from generate_model import SCHEMA_DIR, generate_models  # noqa: E402
+
+MODULAR_OPENAPI = ROOT / "datamodel-code-generator/tests/data/openapi/modular.yaml"
+
+def generate_modular(output: Path, jobs: int) -> None:
+    generate(
+        input_=MODULAR_OPENAPI,
+        input_file_type=InputFileType.OpenAPI,
+        output=output,
+        disable_timestamp=True,
+        jobs=jobs,
+    )
+
+def generate_ethdebug(schema_dir: Path) -> Callable[[Path, int], None]:
+    def run(output: Path, jobs: int) -> None:
+        generate_models(schema_dir, output, "pydantic_v2.BaseModel", defer_build=True, jobs=jobs)
+    return run
+
+def read_tree(directory: Path) -> Dict[str, bytes]:
+    return {path.relative_to(directory).as_posix(): path.read_bytes() for path in sorted(directory.rglob("*.py"))}
+
+def measure(run: Callable[[Path, int], None], jobs: int, repeat: int) -> Tuple[float, Dict[str, bytes]]:
+    """
+    The best time of `repeat` runs in seconds, and the generated modules.
+    """
+    best = float("inf")
+    tree: Dict[str, bytes] = {}
+    for _ in range(repeat):
+        # Formatted modules are cached within the process, which would make all but the first run trivial
+        CodeFormatter._format_cache.clear()
+        with TemporaryDirectory() as tmp_dir:
+            output = Path(tmp_dir) / "model"
+            output.mkdir()
+            start = time.perf_counter()
+            run(output, jobs)
+            best = min(best, time.perf_counter() - start)
+            tree = read_tree(output)
+    return best, tree
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schemas", type=Path, default=ROOT / SCHEMA_DIR, help="ethdebug schema directory (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4], help="numbers of jobs to compare (default: 1 2 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per measurement (default: 3)")
+    args = parser.parse_args()
+
+    inputs: List[Tuple[str, Callable[[Path, int], None]]] = [("modular.yaml", generate_modular)]
+    if any(args.schemas.rglob("*.schema.yaml")):
+        inputs.append(("ethdebug schemas", generate_ethdebug(args.schemas)))
+    else:
+        print(f"no schemas in {args.schemas}, skipping the ethdebug schemas")
+    for name, run in inputs:
+        baseline_time, baseline_tree = measure(run, 1, args.repeat)
+        print(f"{name}: {len(baseline_tree)} modules")
+        for jobs in args.jobs:
+            seconds, tree = (baseline_time, baseline_tree) if jobs == 1 else measure(run, jobs, args.repeat)
+            status = "identical" if tree == baseline_tree else "DIFFERENT OUTPUT"
+            print(f"  jobs={jobs:<3} {seconds:>7.2f} s {baseline_time / seconds:>6.2f}x  {status}")
+
+if __name__ == "__main__":
+    main()
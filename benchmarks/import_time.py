@@ -0,0 +1,84 @@
+"""
+Measure the import time of the library.
+
+Usage:
+
+    python benchmarks/import_time.py [--repeat N] [--json FILE] [--baseline FILE] [--tolerance T]
+                                     [--max MODULE=MS ...] [MODULE ...]
+
+Each module is imported in a fresh interpreter with `-X importtime`, and the
+median cumulative import time over `--repeat` runs is reported. Results can be
+saved with `--json` and compared against a saved run with `--baseline`: the
+script exits with status 1 if a module became slower by more than `--tolerance`
+(a fraction, default 0.2), or if it exceeds a limit given with `--max`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "ethdebug",
+    "ethdebug.evaluate",
+    # `ethdebug.dereference` is a namespace package, its entry point is `__main__`
+    "ethdebug.dereference.__main__",
+    "ethdebug.format.pointer_schema",
+    "ethdebug.format.info_schema",
+]
+
+def import_time(module: str) -> float:
+    """
+    Import a module in a fresh interpreter and return its cumulative import time in milliseconds.
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise ValueError(f"No import time reported for {module}")
+
+def measure(modules: List[str], repeat: int) -> Dict[str, float]:
+    return {module: statistics.median(import_time(module) for _ in range(repeat)) for module in modules}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=MODULES, help="modules to import (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=7, help="number of runs per module (default: 7)")
+    parser.add_argument("--json", type=Path, help="write the results to a file")
+    parser.add_argument("--baseline", type=Path, help="compare against the results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown relative to the baseline (default: 0.2)")
+    parser.add_argument("--max", action="append", default=[], metavar="MODULE=MS", help="maximum import time of a module")
+    args = parser.parse_args()
+
+    limits = {module: float(ms) for module, ms in (limit.split("=") for limit in args.max)}
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    results = measure(args.modules, args.repeat)
+    failed = False
+    for module, ms in results.items():
+        line = f"{module:<36} {ms:>9.1f} ms"
+        if module in baseline:
+            change = ms / baseline[module] - 1
+            line += f" {change:>+8.1%}"
+            if change > args.tolerance:
+                line += "  slower than baseline"
+                failed = True
+        if module in limits and ms > limits[module]:
+            line += f"  over limit of {limits[module]:g} ms"
+            failed = True
+        print(line)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
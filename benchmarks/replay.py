@@ -0,0 +1,83 @@
+"""
+Measure the size and random access latency of trace files.
+
+Usage:
+
+    python benchmarks/replay.py [--steps N] [--checkpoint-interval K]
+
+A synthetic trace is recorded into a temporary file: a loop that pushes and
+pops words, writes a word to memory every few steps (growing memory to a few
+hundred KB), and writes storage now and then, much like a long-running
+contract. The file size and recording throughput are reported, followed by the
+average latency of reconstructing the stack, a memory word and a storage slot
+at random steps, and of finding the writes to a memory region in a range of
+10,000 steps.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ethdebug.replay.trace_file import DEFAULT_CHECKPOINT_INTERVAL, TraceFile, TraceWriter  # noqa: E402
+
+MEMORY_LIMIT = 1 << 18
+
+def record(path: Path, steps: int, checkpoint_interval: int) -> None:
+    rng = random.Random(0)
+    depth = 0
+    with TraceWriter(path, checkpoint_interval=checkpoint_interval) as writer:
+        for step in range(steps):
+            pop = rng.randint(0, min(depth, 2))
+            push = [rng.getrandbits(rng.choice((8, 64, 256))) for _ in range(rng.randint(0, 2) if depth < 16 else 0)]
+            depth += len(push) - pop
+            memory = []
+            if step % 4 == 0:
+                memory.append(((step * 32) % MEMORY_LIMIT, rng.randbytes(32)))
+            storage = [(rng.randrange(64), step)] if step % 100 == 0 else []
+            writer.append(step % 4096, "MSTORE", pop=pop, push=push, memory=memory, storage=storage)
+
+def measure(name: str, function, steps: int, samples: int) -> None:
+    rng = random.Random(1)
+    indices = [rng.randrange(steps) for _ in range(samples)]
+    start = time.perf_counter()
+    for index in indices:
+        function(index)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed / samples * 1e6:>10.1f} µs")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=1_000_000, help="number of steps to record (default: 1000000)")
+    parser.add_argument("--checkpoint-interval", type=int, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help=f"steps between checkpoints (default: {DEFAULT_CHECKPOINT_INTERVAL})")
+    parser.add_argument("--samples", type=int, default=10_000, help="number of random reads (default: 10000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "trace.bin"
+        start = time.perf_counter()
+        record(path, args.steps, args.checkpoint_interval)
+        elapsed = time.perf_counter() - start
+        size = path.stat().st_size
+        print(f"{'record':<24} {args.steps / elapsed:>10,.0f} steps/s")
+        print(f"{'file size':<24} {size / 2**20:>10.1f} MiB ({size / args.steps:.0f} bytes/step)")
+
+        with TraceFile(path) as trace:
+            measure("stack", trace.stack, args.steps, args.samples)
+            measure("memory word", lambda step: trace.memory(step, 0x1000, 32), args.steps, args.samples)
+            measure("storage slot", lambda step: trace.storage(step, 7), args.steps, args.samples)
+
+            start = time.perf_counter()
+            index = trace.memory_index()
+            print(f"{'memory index':<24} {time.perf_counter() - start:>10.2f} s ({len(index):,} writes)")
+            rng = random.Random(2)
+            measure("memory changes", lambda step: index.writes(rng.randrange(MEMORY_LIMIT), 64, step, step + 10_000),
+                    args.steps, args.samples)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Measure the seek latency of `SeekableTrace` for different checkpoint intervals.
+
+Usage:
+
+    python benchmarks/seek.py [--steps N] [--intervals K [K ...]] [--memory-limit MIB]
+
+A synthetic forward-only trace (a dozen stack words, one memory write every
+few steps, memory growing to 16 KiB) yields an independent in-memory state at
+every step, like a debugger stepping through a transaction. For each
+checkpoint interval, the whole trace is recorded into a `SeekableTrace`, and
+the average latency of seeking to random steps, of stepping backwards and of
+stepping forwards (each including a stack and a memory read) is reported,
+along with the memory used.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ethdebug.data import Data  # noqa: E402
+from ethdebug.replay.seekable import SeekableTrace  # noqa: E402
+
+MEMORY_LIMIT = 1 << 14
+
+class Section:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def length(self) -> int:
+        return len(self.data)
+
+    async def read(self, offset: int, length: int = 32) -> Data:
+        return Data(self.data[offset:offset + length].ljust(length, b"\x00"))
+
+class Stack:
+    def __init__(self, words):
+        self.words = words
+
+    async def length(self) -> int:
+        return len(self.words)
+
+    async def read(self, slot: int, offset: int = 0, length: int = 32) -> Data:
+        return Data(self.words[-1 - slot][offset:offset + length])
+
+class Storage:
+    async def read(self, slot: int, offset: int = 0, length: int = 32) -> Data:
+        return Data(bytes(length))
+
+class State:
+    def __init__(self, index: int, stack, memory: bytes):
+        self.index = index
+        self.stack = Stack(stack)
+        self.memory = Section(memory)
+        self.storage = self.transient = Storage()
+        self.calldata = self.returndata = self.code = Section(b"")
+
+    async def trace_index(self) -> int:
+        return self.index
+
+    async def program_counter(self) -> int:
+        return self.index % 4096
+
+    async def opcode(self) -> str:
+        return "MSTORE"
+
+class ForwardOnlyTrace:
+    def __init__(self, steps: int):
+        self.steps = steps
+
+    async def __aiter__(self):
+        rng = random.Random(0)
+        stack, memory = [], bytearray()
+        for step in range(self.steps):
+            del stack[len(stack) - rng.randint(0, min(len(stack), 2)):]
+            stack.extend(rng.getrandbits(64).to_bytes(32, "big") for _ in range(rng.randint(0, 2) if len(stack) < 12 else 0))
+            if step % 4 == 0:
+                offset = (step * 32) % MEMORY_LIMIT
+                memory.extend(bytes(max(0, offset + 32 - len(memory))))
+                memory[offset:offset + 32] = rng.randbytes(32)
+            yield State(step, list(stack), bytes(memory))
+
+async def touch(trace: SeekableTrace, index: int) -> None:
+    state = await trace.state_at(index)
+    if await state.stack.length():
+        await state.stack.read(0)
+    await state.memory.read(0x100)
+
+async def measure(name: str, trace: SeekableTrace, indices) -> None:
+    start = time.perf_counter()
+    for index in indices:
+        await touch(trace, index)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<22} {elapsed / len(indices) * 1e6:>10.1f} µs")
+
+async def benchmark(steps: int, interval: int, memory_limit: int, samples: int) -> None:
+    trace = SeekableTrace(ForwardOnlyTrace(steps), checkpoint_interval=interval, memory_limit=memory_limit)
+    start = time.perf_counter()
+    await trace.state_at(steps - 1)
+    elapsed = time.perf_counter() - start
+    print(f"checkpoint interval {interval}")
+    print(f"  {'record':<22} {steps / elapsed:>10,.0f} steps/s")
+    print(f"  {'memory':<22} {trace.memory_usage() / 2**20:>10.1f} MiB ({trace.checkpoints} checkpoints)")
+    rng = random.Random(1)
+    await measure("random seek", trace, [rng.randrange(steps) for _ in range(samples)])
+    await measure("step backwards", trace, range(steps - 1, steps - 1 - samples, -1))
+    await measure("step forwards", trace, range(steps // 2, steps // 2 + samples))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=100_000, help="number of steps (default: 100000)")
+    parser.add_argument("--intervals", type=int, nargs="+", default=[16, 64, 256],
+                        help="checkpoint intervals to compare (default: 16 64 256)")
+    parser.add_argument("--memory-limit", type=int, default=256, help="memory limit in MiB (default: 256)")
+    parser.add_argument("--samples", type=int, default=2_000, help="number of seeks per measurement (default: 2000)")
+    args = parser.parse_args()
+
+    for interval in args.intervals:
+        asyncio.run(benchmark(args.steps, interval, args.memory_limit << 20, args.samples))
+
+if __name__ == "__main__":
+    main()
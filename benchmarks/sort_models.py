@@ -0,0 +1,83 @@
+"""
+Measure how `sort_data_models` of `datamodel-code-generator` scales with the number of models.
+
+Usage:
+
+    python benchmarks/sort_models.py [--sizes N ...] [--seed S] [--repeat N]
+
+For each size, a JSON schema with that many definitions is generated: the
+definitions are ordered randomly, reference definitions of lower levels,
+inherit from others with `allOf`, and a few of them reference each other.
+The schema is parsed once, and the best time of `--repeat` runs of
+`sort_data_models` on the parsed models is reported, per model as well, which
+stays about constant when sorting is linear.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "datamodel-code-generator/src"))
+
+from datamodel_code_generator.model.base import DataModel  # noqa: E402
+from datamodel_code_generator.parser.base import sort_data_models  # noqa: E402
+from datamodel_code_generator.parser.jsonschema import JsonSchemaParser  # noqa: E402
+
+LEVELS = 20
+
+def synthetic_schema(size: int, seed: int) -> Dict[str, Any]:
+    """
+    A schema with `size` definitions, see the module docstring.
+    """
+    rng = random.Random(seed)
+    names = [f"Model{index}" for index in range(size)]
+    level = {name: index * LEVELS // size for index, name in enumerate(names)}
+    by_level: List[List[str]] = [[] for _ in range(LEVELS)]
+    for name in names:
+        by_level[level[name]].append(name)
+    definitions: Dict[str, Any] = {}
+    for name in names:
+        lower = [candidate for candidate_level in by_level[: level[name]] for candidate in candidate_level[-50:]]
+        properties: Dict[str, Any] = {"id": {"type": "integer"}}
+        for index, target in enumerate(rng.sample(lower, min(3, len(lower)))):
+            properties[f"field{index}"] = {"$ref": f"#/definitions/{target}"}
+        definition: Dict[str, Any] = {"type": "object", "properties": properties}
+        if lower and rng.random() < 0.2:
+            definition = {"allOf": [{"$ref": f"#/definitions/{rng.choice(lower)}"}, definition]}
+        definitions[name] = definition
+    # pairs of definitions that reference each other
+    for _ in range(size // 100):
+        first, second = rng.sample(by_level[-1], 2)
+        definitions[first].setdefault("properties", {})["partner"] = {"$ref": f"#/definitions/{second}"}
+        definitions[second].setdefault("properties", {})["partner"] = {"$ref": f"#/definitions/{first}"}
+    order = list(definitions)
+    rng.shuffle(order)
+    return {"definitions": {name: definitions[name] for name in order}}
+
+def parse_models(schema: Dict[str, Any]) -> List[DataModel]:
+    parser = JsonSchemaParser(source=json.dumps(schema))
+    parser.parse_raw()
+    return parser.results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000, 20000], help="numbers of models (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic schemas (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per size (default: 3)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        models = parse_models(synthetic_schema(size, args.seed))
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            sort_data_models(models)
+            best = min(best, time.perf_counter() - start)
+        print(f"{len(models):>7} models {best * 1000:>10.1f} ms {best / len(models) * 1e6:>8.1f} us/model")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure the throughput of importing struct logs into the trace file format.
+
+Usage:
+
+    python benchmarks/struct_logs.py [--size GIB] [--memory-words N]
+
+A synthetic `debug_traceTransaction` result of about `--size` GiB is written to
+a temporary file: a loop that keeps a dozen words on the stack, writes one
+memory word per step until memory holds `--memory-words` words, and stores to
+one of a few storage slots every 50 steps. Like real struct logs, every step
+repeats the full stack, memory and storage. The log is then converted and the
+throughput, the size of the trace file and the peak memory use are reported.
+"""
+import argparse
+import json
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ethdebug.replay.struct_log import convert_struct_logs  # noqa: E402
+
+def generate(path: Path, size: int, memory_words: int) -> int:
+    """
+    Write a synthetic struct log of at least `size` bytes and return the number of steps.
+    """
+    rng = random.Random(0)
+    stack = [hex(rng.getrandbits(64)) for _ in range(12)]
+    memory = []
+    storage = {}
+    steps = 0
+    with open(path, "w") as f:
+        f.write('{"jsonrpc":"2.0","id":1,"result":{"gas":0,"failed":false,"returnValue":"","structLogs":[')
+        while f.tell() < size:
+            if steps:
+                f.write(",")
+            stack[-1 - steps % 4] = hex(rng.getrandbits(64))
+            if len(memory) < memory_words:
+                memory.append(rng.randbytes(32).hex())
+            else:
+                memory[rng.randrange(memory_words)] = rng.randbytes(32).hex()
+            if steps % 50 == 0:
+                storage[(steps // 50 % 8).to_bytes(32, "big").hex()] = steps.to_bytes(32, "big").hex()
+            f.write(json.dumps({
+                "pc": steps % 1000, "op": "MSTORE", "gas": 10_000_000 - steps, "gasCost": 3, "depth": 1,
+                "stack": stack, "memory": memory, "storage": storage,
+            }, separators=(",", ":")))
+            steps += 1
+        f.write("]}}")
+    return steps
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=float, default=2.0, help="size of the struct log in GiB (default: 2)")
+    parser.add_argument("--memory-words", type=int, default=256, help="maximum memory size in words (default: 256)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "trace.json"
+        destination = Path(directory) / "trace.bin"
+        steps = generate(source, int(args.size * 2**30), args.memory_words)
+        size = source.stat().st_size
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        start = time.perf_counter()
+        convert_struct_logs(source, destination)
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(f"{'struct log':<24} {size / 2**20:>10,.0f} MiB, {steps:,} steps")
+        print(f"{'trace file':<24} {destination.stat().st_size / 2**20:>10,.1f} MiB")
+        print(f"{'throughput':<24} {size / 2**20 / elapsed:>10,.1f} MiB/s ({steps / elapsed:,.0f} steps/s)")
+        print(f"{'peak memory':<24} {peak / 2**10:>10,.1f} MiB (before conversion: {baseline / 2**10:,.1f} MiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Measure the validation throughput of the generated format models.
+
+Usage:
+
+    python benchmarks/validation.py [--repeat N]
+
+Programs are taken from the solc fixtures in `src/tests`; pointer expressions,
+regions and types are small representative documents that exercise the union
+types of the format. For each workload, the best of `--repeat` runs is reported
+as documents per second.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from pydantic import ValidationError  # noqa: E402
+
+from ethdebug.format.pointer.expression_schema import PointerExpression  # noqa: E402
+from ethdebug.format.pointer.region_schema import PointerRegion  # noqa: E402
+from ethdebug.format.program_schema import Program  # noqa: E402
+from ethdebug.format.type.base_schema import TypeBase  # noqa: E402
+
+SOLC_FIXTURES = [
+    ROOT / "src/tests/abstract_and_interface/output.json",
+    ROOT / "src/tests/mega_playground/output.json",
+    ROOT / "src/tests/standard_yul_debug_info_ethdebug_compatible_output/output.json",
+]
+
+EXPRESSIONS = [
+    0,
+    "0x20",
+    "$wordsize",
+    "array-start",
+    {".offset": "array-start"},
+    {"$read": "array-count"},
+    {"$sum": [{".offset": "array-start"}, {".length": "array-start"}, 1]},
+    {"$difference": [{"$read": "array-count"}, 1]},
+    {"$product": ["index", "$wordsize"]},
+    {"$keccak256": [5, {".offset": "array-start"}]},
+    {"$concat": ["0x00", {"$read": "key"}]},
+    {"$sized32": {"$read": "value"}},
+]
+
+REGIONS = [
+    {"location": "stack", "slot": 0},
+    {"location": "memory", "offset": "0x40", "length": "$wordsize"},
+    {"location": "storage", "slot": {"$keccak256": [{".slot": "array-count"}]}},
+    {"location": "calldata", "offset": 4, "length": 32},
+    {"location": "returndata", "offset": 0, "length": 32},
+    {"location": "transient", "slot": 1},
+    {"location": "code", "offset": 0, "length": 32},
+]
+
+TYPES = [
+    {"kind": "uint", "bits": 256},
+    {"class": "elementary", "kind": "bool"},
+    {"class": "complex", "kind": "array", "contains": {"type": {"kind": "uint", "bits": 8}}},
+    {"class": "complex", "kind": "struct", "contains": [
+        {"type": {"kind": "address"}},
+        {"type": {"class": "complex", "kind": "array", "contains": {"type": {"kind": "bytes"}}}},
+    ]},
+]
+
+def solc_programs() -> List[Any]:
+    """
+    All programs of the solc fixtures that are valid according to the format.
+    """
+    programs = []
+    for path in SOLC_FIXTURES:
+        with open(path, "r") as f:
+            output = json.load(f)
+        for contracts in output.get("contracts", {}).values():
+            for contract in contracts.values():
+                for bytecode in ("bytecode", "deployedBytecode"):
+                    program = contract.get("evm", {}).get(bytecode, {}).get("ethdebug")
+                    if program is None:
+                        continue
+                    try:
+                        Program.model_validate(program)
+                    except ValidationError:
+                        continue
+                    programs.append(program)
+    return programs
+
+def measure(validate: Callable[[Any], Any], documents: List[Any], repeat: int, min_time: float = 0.2) -> float:
+    """
+    Validate all documents in a loop and return the best throughput in documents per second.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        while True:
+            for document in documents:
+                validate(document)
+            count += len(documents)
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, count / elapsed)
+    return best
+
+def workloads() -> List[Tuple[str, Callable[[Any], Any], List[Any]]]:
+    return [
+        ("solc programs", Program.model_validate, solc_programs()),
+        ("pointer expressions", PointerExpression.model_validate, EXPRESSIONS),
+        ("pointer regions", PointerRegion.model_validate, REGIONS),
+        ("types", TypeBase.model_validate, TYPES),
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per workload (default: 5)")
+    args = parser.parse_args()
+    for name, validate, documents in workloads():
+        throughput = measure(validate, documents, args.repeat)
+        print(f"{name:<24} {len(documents):>4} documents {throughput:>14,.0f} documents/s")
+
+if __name__ == "__main__":
+    main()
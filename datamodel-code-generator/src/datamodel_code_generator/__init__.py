@@ -286,7 +286,10 @@ def generate(  # noqa: PLR0912, PLR0913, PLR0914, PLR0915
     output_datetime_class: DatetimeClassType | None = None,
     keyword_only: bool = False,
     no_alias: bool = False,
+    infer_discriminators: bool = False,
+    defer_build: bool = False,
     formatters: list[Formatter] = DEFAULT_FORMATTERS,
+    jobs: int = 1,
 ) -> None:
     remote_text_cache: DefaultPutDict[str, str] = DefaultPutDict()
     if isinstance(input_, str):
@@ -481,12 +484,14 @@ def generate(  # noqa: PLR0912, PLR0913, PLR0914, PLR0915
         target_datetime_class=output_datetime_class,
         keyword_only=keyword_only,
         no_alias=no_alias,
+        infer_discriminators=infer_discriminators,
+        defer_build=defer_build,
         formatters=formatters,
         **kwargs,
     )
 
     with chdir(output):
-        results = parser.parse()
+        results = parser.parse(jobs=jobs)
     if not input_filename:  # pragma: no cover
         if isinstance(input_, str):
             input_filename = "<stdin>"
@@ -150,6 +150,14 @@ class Config(BaseModel):
             raise Error(msg)  # pragma: no cover
         return values
 
+    @model_validator()
+    def validate_jobs(cls, values: dict[str, Any]) -> dict[str, Any]:  # noqa: N805
+        jobs = values.get("jobs")
+        if jobs is not None and jobs < 0:
+            msg = "`--jobs` must not be negative."
+            raise Error(msg)
+        return values
+
     @model_validator()
     def validate_keyword_only(cls, values: dict[str, Any]) -> dict[str, Any]:  # noqa: N805
         output_model_type: DataModelType = values.get("output_model_type")  # pyright: ignore[reportAssignmentType]
@@ -313,7 +321,10 @@ class Config(BaseModel):
     output_datetime_class: Optional[DatetimeClassType] = None  # noqa: UP045
     keyword_only: bool = False
     no_alias: bool = False
+    infer_discriminators: bool = False
+    defer_build: bool = False
     formatters: list[Formatter] = DEFAULT_FORMATTERS
+    jobs: int = 1
 
     def merge_args(self, args: Namespace) -> None:
         set_args = {f: getattr(args, f) for f in self.get_fields() if getattr(args, f) is not None}
@@ -522,7 +533,10 @@ def main(args: Sequence[str] | None = None) -> Exit:  # noqa: PLR0911, PLR0912,
             output_datetime_class=config.output_datetime_class,
             keyword_only=config.keyword_only,
             no_alias=config.no_alias,
+            infer_discriminators=config.infer_discriminators,
+            defer_build=config.defer_build,
             formatters=config.formatters,
+            jobs=config.jobs,
         )
     except InvalidClassNameError as e:
         print(f"{e} You have to set `--class-name` option", file=sys.stderr)  # noqa: T201
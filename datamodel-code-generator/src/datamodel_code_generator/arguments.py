@@ -117,6 +117,13 @@ model_options.add_argument(
     default=None,
     help="Models generated with a root-type field will be merged into the models using that root-type model",
 )
+model_options.add_argument(
+    "--defer-build",
+    help="Build model schemas on first use instead of at import time, and import modules that depend on each other "
+    "after their models (only pydantic v2)",
+    action="store_true",
+    default=None,
+)
 model_options.add_argument(
     "--disable-appending-item-suffix",
     help="Disable appending `Item` suffix to model name in an array",
@@ -378,6 +385,13 @@ field_options.add_argument(
     choices=[u.value for u in UnionMode],
     default=None,
 )
+field_options.add_argument(
+    "--infer-discriminators",
+    help="Use discriminated unions for union fields whose members can be told apart by a literal property or by "
+    "the keys they declare (pydantic v2; msgspec supports literal properties only)",
+    action="store_true",
+    default=None,
+)
 field_options.add_argument(
     "--no-alias",
     help="""Do not add a field alias. E.g., if --snake-case-field is used along with a base class, which has an
@@ -447,6 +461,12 @@ base_options.add_argument(
     nargs="+",
     default=None,
 )
+base_options.add_argument(
+    "--jobs",
+    help="Number of processes formatting the output modules, 0 for one per CPU (default: 1)",
+    type=int,
+    default=None,
+)
 base_options.add_argument(
     "--custom-formatters",
     help="List of modules with custom formatter (delimited list input).",
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import os
 import subprocess  # noqa: S404
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from functools import cached_property
 from importlib import import_module
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Any, ClassVar
 from warnings import warn
 
 import black
@@ -90,6 +95,18 @@ def black_find_project_root(sources: Sequence[Path]) -> Path:
     return project_root
 
 
+def ruff_find_settings(directory: Path) -> Path | None:
+    # The configuration file ruff uses for code read from stdin in `directory`
+    for parent in (directory, *directory.parents):
+        for name in (".ruff.toml", "ruff.toml"):
+            if (parent / name).is_file():
+                return parent / name
+        pyproject = parent / "pyproject.toml"
+        if pyproject.is_file() and "ruff" in load_toml(pyproject).get("tool", {}):
+            return pyproject
+    return None
+
+
 class Formatter(Enum):
     BLACK = "black"
     ISORT = "isort"
@@ -99,8 +116,13 @@ class Formatter(Enum):
 
 DEFAULT_FORMATTERS = [Formatter.BLACK, Formatter.ISORT]
 
+FORMAT_CACHE_SIZE = 4096
+
 
 class CodeFormatter:
+    # Formatted code by formatter settings and content hash, shared by all formatters of the process
+    _format_cache: ClassVar[OrderedDict[tuple[str, str], str]] = OrderedDict()
+
     def __init__(  # noqa: PLR0912, PLR0913, PLR0917
         self,
         python_version: PythonVersion,
@@ -173,6 +195,14 @@ class CodeFormatter:
         self.custom_formatters = self._check_custom_formatters(custom_formatters)
         self.encoding = encoding
         self.formatters = formatters
+        self._cache_key = repr((
+            [formatter.value for formatter in formatters],
+            self.black_mode,
+            self.settings_path,
+            sorted(self.isort_config_kwargs.items()),
+            encoding,
+            str(Path.cwd()),
+        ))
 
     def _load_custom_formatter(self, custom_formatter_import: str) -> CustomCodeFormatter:
         import_ = import_module(custom_formatter_import)
@@ -215,6 +245,61 @@ class CodeFormatter:
 
         return code
 
+    def format_codes(self, codes: Sequence[str], jobs: int = 1) -> list[str]:
+        """Format several modules, with the same result as `format_code` for each of them.
+
+        Modules that were formatted before with the same settings are taken from a cache, and ruff is run
+        once for all other modules instead of once per module. With `jobs` other than 1, the modules are
+        split between that many processes (0 for one per CPU).
+        """
+        if jobs < 0:
+            msg = f"The number of jobs must not be negative, got {jobs}"
+            raise ValueError(msg)
+        keys = [(self._cache_key, hashlib.sha256(code.encode(self.encoding)).hexdigest()) for code in codes]
+        pending: dict[tuple[str, str], str] = {}
+        for key, code in zip(keys, codes):
+            if key not in self._format_cache:
+                pending.setdefault(key, code)
+        formatted = dict(zip(pending, self._format_parallel([*pending.values()], jobs)))
+        for key in keys:
+            if key in self._format_cache:
+                self._format_cache.move_to_end(key)
+                formatted.setdefault(key, self._format_cache[key])
+        self._format_cache.update(formatted)
+        while len(self._format_cache) > FORMAT_CACHE_SIZE:
+            self._format_cache.popitem(last=False)
+
+        results = [formatted[key] for key in keys]
+        for formatter in self.custom_formatters:
+            results = [formatter.apply(code) for code in results]
+        return results
+
+    def _format_parallel(self, codes: list[str], jobs: int) -> list[str]:
+        jobs = min(jobs or os.cpu_count() or 1, len(codes))
+        if jobs <= 1:
+            return self._format_uncached(codes)
+        # contiguous chunks, so that the results can be joined in order
+        size = -(-len(codes) // jobs)
+        chunks = [codes[start : start + size] for start in range(0, len(codes), size)]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            return [code for chunk in executor.map(self._format_uncached, chunks) for code in chunk]
+
+    def _format_uncached(self, codes: list[str]) -> list[str]:
+        if not codes:
+            return []
+        if Formatter.ISORT in self.formatters:
+            codes = [self.apply_isort(code) for code in codes]
+        if Formatter.BLACK in self.formatters:
+            codes = [self.apply_black(code) for code in codes]
+
+        if Formatter.RUFF_CHECK in self.formatters:
+            codes = self.apply_ruff_lint_batch(codes)
+
+        if Formatter.RUFF_FORMAT in self.formatters:
+            codes = self.apply_ruff_formatter_batch(codes)
+
+        return codes
+
     def apply_black(self, code: str) -> str:
         return black.format_str(
             code,
@@ -239,6 +324,31 @@ class CodeFormatter:
         )
         return result.stdout.decode(self.encoding)
 
+    def apply_ruff_lint_batch(self, codes: list[str]) -> list[str]:
+        return self._apply_ruff_batch(("check", "--fix"), codes)[0]
+
+    def apply_ruff_formatter_batch(self, codes: list[str]) -> list[str]:
+        formatted, returncode = self._apply_ruff_batch(("format",), codes)
+        if returncode:
+            # ruff leaves files it can't format unchanged, but prints nothing for such code on stdin
+            return [self.apply_ruff_formatter(code) for code in codes]
+        return formatted
+
+    def _apply_ruff_batch(self, command: tuple[str, ...], codes: list[str]) -> tuple[list[str], int]:
+        # Files outside of the project would not be checked with its configuration, which ruff uses for stdin
+        settings = ruff_find_settings(Path.cwd())
+        config = ("--config", str(settings)) if settings else ()
+        with TemporaryDirectory() as directory:
+            paths = [Path(directory, str(index)) for index in range(len(codes))]
+            for path, code in zip(paths, codes):
+                path.write_bytes(code.encode(self.encoding))
+            result = subprocess.run(  # noqa: S603
+                ("ruff", *command, "--no-cache", *config, *map(str, paths)),  # noqa: S607
+                capture_output=True,
+                check=False,
+            )
+            return [path.read_bytes().decode(self.encoding) for path in paths], result.returncode
+
     if TYPE_CHECKING:
 
         def apply_isort(self, code: str) -> str: ...
@@ -220,6 +220,12 @@ class DataModelField(DataModelFieldBase):
         kwargs = [f"{k}={v if k == 'default_factory' else repr(v)}" for k, v in data.items()]
         return f"field({', '.join(kwargs)})"
 
+    @property
+    def type_hint(self) -> str:
+        if self.extras.get("is_classvar"):
+            return f"ClassVar[{self.data_type.type_hint}]"
+        return super().type_hint
+
     @property
     def annotated(self) -> str | None:
         if not self.use_annotated:  # pragma: no cover
@@ -247,11 +253,9 @@ class DataModelField(DataModelFieldBase):
             annotated_type = f"Annotated[{type_hint}, {meta}]"
             return get_optional_type(annotated_type, self.data_type.use_union_operator)
 
-        annotated_type = f"Annotated[{self.type_hint}, {meta}]"
         if self.extras.get("is_classvar"):
-            annotated_type = f"ClassVar[{annotated_type}]"
-
-        return annotated_type
+            return f"ClassVar[Annotated[{self.data_type.type_hint}, {meta}]]"
+        return f"Annotated[{self.type_hint}, {meta}]"
 
     def _get_default_as_struct_model(self) -> str | None:
         for data_type in self.data_type.data_types or (self.data_type,):
@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, Optional
 
 from pydantic import BaseModel as _BaseModel
 
-from .base_model import BaseModel, DataModelField, UnionMode
+from .base_model import BaseModel, DataModelField, TaggedUnion, UnionMode
 from .root_model import RootModel
 from .types import DataTypeManager
 
@@ -27,6 +27,7 @@ class ConfigDict(_BaseModel):
     protected_namespaces: Optional[tuple[str, ...]] = None  # noqa: UP045
     regex_engine: Optional[str] = None  # noqa: UP045
     use_enum_values: Optional[bool] = None  # noqa: UP045
+    defer_build: Optional[bool] = None  # noqa: UP045
 
 
 __all__ = [
@@ -34,6 +35,7 @@ __all__ = [
     "DataModelField",
     "DataTypeManager",
     "RootModel",
+    "TaggedUnion",
     "UnionMode",
     "dump_resolve_reference_action",
 ]
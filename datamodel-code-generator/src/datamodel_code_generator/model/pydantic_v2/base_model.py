@@ -4,9 +4,11 @@ import re
 from enum import Enum
 from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple, Optional
 
+from pydantic import BaseModel as _BaseModel
 from pydantic import Field
 from typing_extensions import Literal
 
+from datamodel_code_generator.imports import IMPORT_ANNOTATED, IMPORT_ANY, IMPORT_OPTIONAL, Import
 from datamodel_code_generator.model.base import UNDEFINED, DataModelFieldBase
 from datamodel_code_generator.model.pydantic.base_model import (
     BaseModelBase,
@@ -17,7 +19,13 @@ from datamodel_code_generator.model.pydantic.base_model import (
 from datamodel_code_generator.model.pydantic.base_model import (
     DataModelField as DataModelFieldV1,
 )
-from datamodel_code_generator.model.pydantic_v2.imports import IMPORT_CONFIG_DICT
+from datamodel_code_generator.model.pydantic_v2.imports import (
+    IMPORT_CONFIG_DICT,
+    IMPORT_DISCRIMINATOR,
+    IMPORT_TAG,
+)
+from datamodel_code_generator.reference import camel_to_snake
+from datamodel_code_generator.types import UNION_DELIMITER, UNION_OPERATOR_DELIMITER, UNION_PREFIX, chain_as_tuple
 from datamodel_code_generator.util import field_validator, model_validator
 
 if TYPE_CHECKING:
@@ -50,6 +58,34 @@ class Constraints(_Constraints):
         return values
 
 
+class TaggedUnion(_BaseModel):
+    """
+    Selects the member of a union field with a callable discriminator.
+
+    Dict inputs are tagged by the literal value of their ``key`` property (``default`` if absent) or, without
+    ``key``, by the first of their keys found in ``tags``. ``tags`` maps literal values or keys to the index of
+    the member in the field's union. Members without a tag are validated as a plain union under ``FALLBACK_TAG``.
+    """
+
+    FALLBACK_TAG: ClassVar[str] = "other"
+
+    key: Optional[str] = None  # noqa: UP045
+    default: Optional[Any] = None  # noqa: UP045
+    tags: dict[Any, int]
+
+
+class _Code(str):  # noqa: FURB189
+    """A string that is rendered as is in field arguments.
+
+    It has to be a ``str``, as ``DataModelFieldV1.__str__`` only keeps a ``discriminator`` that is a string or a dict.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
 class DataModelField(DataModelFieldV1):
     _EXCLUDE_FIELD_KEYS: ClassVar[set[str]] = {
         "alias",
@@ -96,6 +132,7 @@ class DataModelField(DataModelFieldV1):
         "union_mode",
     }
     constraints: Optional[Constraints] = None  # pyright: ignore[reportIncompatibleVariableOverride]  # noqa: UP045
+    tagged_union: Optional[TaggedUnion] = None  # noqa: UP045
     _PARSE_METHOD: ClassVar[str] = "model_validate"
     can_have_extra_keys: ClassVar[bool] = False
 
@@ -134,6 +171,9 @@ class DataModelField(DataModelFieldV1):
             else:
                 data.pop("union_mode")
 
+        if self.tagged_union is not None:
+            data["discriminator"] = _Code(f"Discriminator({self._tag_function_name})")
+
         # **extra is not supported in pydantic 2.0
         json_schema_extra = {k: v for k, v in data.items() if k not in self._DEFAULT_FIELD_KEYS}
         if json_schema_extra:
@@ -147,6 +187,84 @@ class DataModelField(DataModelFieldV1):
     ) -> list[str]:
         return field_arguments
 
+    @property
+    def type_hint(self) -> str:
+        type_hint = super().type_hint
+        if self.tagged_union is None:
+            return type_hint
+        return type_hint.replace(self.data_type.type_hint, self._tagged_union_type_hint(), 1)
+
+    @property
+    def imports(self) -> tuple[Import, ...]:
+        if self.tagged_union is None:
+            return super().imports
+        return chain_as_tuple(
+            super().imports, (IMPORT_ANNOTATED, IMPORT_ANY, IMPORT_OPTIONAL, IMPORT_DISCRIMINATOR, IMPORT_TAG)
+        )
+
+    def _join_union(self, type_hints: list[str]) -> str:
+        if len(type_hints) == 1:
+            return type_hints[0]
+        if self.data_type.use_union_operator:
+            return UNION_OPERATOR_DELIMITER.join(type_hints)
+        return f"{UNION_PREFIX}{UNION_DELIMITER.join(type_hints)}]"
+
+    def _member_tags(self) -> dict[int, str]:
+        assert self.tagged_union is not None
+        data_types = self.data_type.data_types
+        return {
+            index: data_types[index].reference.short_name  # pyright: ignore[reportOptionalMemberAccess]
+            for index in sorted(set(self.tagged_union.tags.values()))
+        }
+
+    def _tagged_union_type_hint(self) -> str:
+        member_tags = self._member_tags()
+        members = [
+            f"Annotated[{self.data_type.data_types[index].type_hint}, Tag({tag!r})]"
+            for index, tag in member_tags.items()
+        ]
+        fallback = [
+            data_type.type_hint for index, data_type in enumerate(self.data_type.data_types) if index not in member_tags
+        ]
+        if fallback:
+            members.append(f"Annotated[{self._join_union(fallback)}, Tag({TaggedUnion.FALLBACK_TAG!r})]")
+        return self._join_union(members)
+
+    @property
+    def _tag_function_name(self) -> str:
+        from datamodel_code_generator.model.pydantic_v2.root_model import RootModel  # noqa: PLC0415
+
+        prefix = camel_to_snake(self.parent.class_name) if self.parent is not None else ""
+        if self.name and not isinstance(self.parent, RootModel):
+            prefix = f"{prefix}_{self.name}"
+        return f"_{prefix.strip('_')}_tag"
+
+    @property
+    def tag_function(self) -> str | None:
+        """Module level code of the callable discriminator of a tagged union field."""
+        if self.tagged_union is None:
+            return None
+        function_name = self._tag_function_name
+        tags_name = function_name[: -len("_tag")].upper() + "_TAGS"
+        member_tags = self._member_tags()
+        tags = {value: member_tags[index] for value, index in self.tagged_union.tags.items()}
+        has_fallback = len(member_tags) < len(self.data_type.data_types)
+        fallback = repr(TaggedUnion.FALLBACK_TAG) if has_fallback else "None"
+        if self.tagged_union.key is None:
+            dict_tag = f"next(({tags_name}[key] for key in value if key in {tags_name}), {fallback})"
+        else:
+            dict_tag = f"{tags_name}.get(value.get({self.tagged_union.key!r}, {self.tagged_union.default!r}))"
+        return "\n".join([
+            f"{tags_name} = {tags!r}",
+            "",
+            "",
+            f"def {function_name}(value: Any) -> Optional[str]:",
+            "    if isinstance(value, dict):",
+            f"        return {dict_tag}",
+            "    name = type(value).__name__",
+            f"    return name if name in {tags_name}.values() else {fallback}",
+        ])
+
 
 class ConfigAttribute(NamedTuple):
     from_: str
@@ -5,3 +5,5 @@ from datamodel_code_generator.imports import Import
 IMPORT_CONFIG_DICT = Import.from_full_path("pydantic.ConfigDict")
 IMPORT_AWARE_DATETIME = Import.from_full_path("pydantic.AwareDatetime")
 IMPORT_NAIVE_DATETIME = Import.from_full_path("pydantic.NaiveDatetime")
+IMPORT_DISCRIMINATOR = Import.from_full_path("pydantic.Discriminator")
+IMPORT_TAG = Import.from_full_path("pydantic.Tag")
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import operator
 import re
 import sys
 from abc import ABC, abstractmethod
@@ -39,6 +38,7 @@ from datamodel_code_generator.model.base import (
     DataModelFieldBase,
 )
 from datamodel_code_generator.model.enum import Enum, Member
+from datamodel_code_generator.model.pydantic_v2.imports import IMPORT_CONFIG_DICT
 from datamodel_code_generator.parser import DefaultPutDict, LiteralType
 from datamodel_code_generator.reference import ModelResolver, Reference
 from datamodel_code_generator.types import DataType, DataTypeManager, StrictTypes
@@ -101,84 +101,100 @@ SortedDataModels = dict[str, DataModel]
 MAX_RECURSION_COUNT: int = sys.getrecursionlimit()
 
 
-def sort_data_models(  # noqa: PLR0912
+def sort_data_models(  # noqa: PLR0912, PLR0914, PLR0915
     unsorted_data_models: list[DataModel],
     sorted_data_models: SortedDataModels | None = None,
     require_update_action_models: list[str] | None = None,
     recursion_count: int = MAX_RECURSION_COUNT,
 ) -> tuple[list[DataModel], SortedDataModels, list[str]]:
+    """Sort models so that every model comes after the models it references.
+
+    Models are resolved in passes over `unsorted_data_models`, and each pass adds the models whose references
+    were added before, in the order of the list. Rather than repeating the passes, the pass that adds a model is
+    computed once along the reference graph. Models that reference one another, or that are not resolved after
+    `recursion_count` passes, are added afterwards as circular references.
+    """
     if sorted_data_models is None:
         sorted_data_models = OrderedDict()
     if require_update_action_models is None:
         require_update_action_models = []
-    sorted_model_count: int = len(sorted_data_models)
-
-    unresolved_references: list[DataModel] = []
-    for model in unsorted_data_models:
-        if not model.reference_classes:
-            sorted_data_models[model.path] = model
-        elif model.path in model.reference_classes and len(model.reference_classes) == 1:  # only self-referencing
-            sorted_data_models[model.path] = model
+
+    positions = {model.path: index for index, model in enumerate(unsorted_data_models)}
+    references = {model.path: model.reference_classes - {model.path} for model in unsorted_data_models}
+    circular = _strongly_connected_components(references)
+    # the pass that adds each model, None if it's never added by a pass
+    passes: dict[str, int | None] = {}
+    for root in references:
+        stack = [root]
+        while stack:
+            path = stack[-1]
+            if path in passes:
+                stack.pop()
+                continue
+            pending = [r for r in references[path] if r in references and r not in passes and r not in circular]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            pass_: int | None = None if path in circular else 0
+            for reference in references[path]:
+                if pass_ is None:
+                    break
+                if reference in sorted_data_models:
+                    continue
+                reference_pass = passes.get(reference)
+                if reference_pass is None:
+                    pass_ = None
+                else:
+                    # a reference added later in the same pass is only resolved by the next pass
+                    pass_ = max(pass_, reference_pass + (positions[reference] > positions[path]))
+            passes[path] = pass_
+
+    resolved_passes = {path: pass_ for path, pass_ in passes.items() if pass_ is not None and pass_ <= recursion_count}
+    for model in sorted(
+        (model for model in unsorted_data_models if model.path in resolved_passes),
+        key=lambda model: (resolved_passes[model.path], positions[model.path]),
+    ):
+        sorted_data_models[model.path] = model
+        if model.path in model.reference_classes:
             require_update_action_models.append(model.path)
-        elif (
-            not model.reference_classes - {model.path} - set(sorted_data_models)
-        ):  # reference classes have been resolved
-            sorted_data_models[model.path] = model
-            if model.path in model.reference_classes:
-                require_update_action_models.append(model.path)
-        else:
-            unresolved_references.append(model)
-    if unresolved_references:
-        if sorted_model_count != len(sorted_data_models) and recursion_count:
-            try:
-                return sort_data_models(
-                    unresolved_references,
-                    sorted_data_models,
-                    require_update_action_models,
-                    recursion_count - 1,
-                )
-            except RecursionError:  # pragma: no cover
-                pass
 
+    unresolved_references = [model for model in unsorted_data_models if model.path not in sorted_data_models]
+    if unresolved_references:
         # sort on base_class dependency
         while True:
-            ordered_models: list[tuple[int, DataModel]] = []
-            unresolved_reference_model_names = [m.path for m in unresolved_references]
-            for model in unresolved_references:
-                indexes = [
-                    unresolved_reference_model_names.index(b.reference.path)
-                    for b in model.base_classes
-                    if b.reference and b.reference.path in unresolved_reference_model_names
-                ]
-                if indexes:
-                    ordered_models.append((
-                        max(indexes),
-                        model,
-                    ))
-                else:
-                    ordered_models.append((
-                        -1,
-                        model,
-                    ))
-            sorted_unresolved_models = [m[1] for m in sorted(ordered_models, key=operator.itemgetter(0))]
-            if sorted_unresolved_models == unresolved_references:
+            unresolved_reference_model_names = {m.path: index for index, m in enumerate(unresolved_references)}
+            sorted_unresolved_models = sorted(
+                unresolved_references,
+                key=lambda model: max(
+                    (
+                        unresolved_reference_model_names[b.reference.path]
+                        for b in model.base_classes
+                        if b.reference and b.reference.path in unresolved_reference_model_names
+                    ),
+                    default=-1,
+                ),
+            )
+            if all(s is u for s, u in zip(sorted_unresolved_models, unresolved_references)):
                 break
             unresolved_references = sorted_unresolved_models
 
         # circular reference
-        unsorted_data_model_names = set(unresolved_reference_model_names)
+        update_action_models = set(require_update_action_models)
         for model in unresolved_references:
-            unresolved_model = model.reference_classes - {model.path} - set(sorted_data_models)
+            unresolved_model = {path for path in references[model.path] if path not in sorted_data_models}
             base_models = [getattr(s.reference, "path", None) for s in model.base_classes]
-            update_action_parent = set(require_update_action_models).intersection(base_models)
+            update_action_parent = update_action_models.intersection(base_models)
             if not unresolved_model:
                 sorted_data_models[model.path] = model
                 if update_action_parent:
                     require_update_action_models.append(model.path)
+                    update_action_models.add(model.path)
                 continue
-            if not unresolved_model - unsorted_data_model_names:
+            if unresolved_model.issubset(unresolved_reference_model_names):
                 sorted_data_models[model.path] = model
                 require_update_action_models.append(model.path)
+                update_action_models.add(model.path)
                 continue
             # unresolved
             unresolved_classes = ", ".join(
@@ -243,6 +259,52 @@ def get_most_of_parent(value: Any, type_: type[T] | None = None) -> T | None:
     return value
 
 
+def _strongly_connected_components(graph: dict[T, set[T]]) -> dict[T, int]:  # noqa: PLR0912
+    """Map the nodes of the strongly connected components with more than one node to the index of their component."""
+    index: dict[T, int] = {}
+    low: dict[T, int] = {}
+    stack: list[T] = []
+    on_stack: set[T] = set()
+    components: dict[T, int] = {}
+    count = 0
+    for root, root_successors in graph.items():  # noqa: PLR1702
+        if root in index:
+            continue
+        work = [(root, iter(sorted(root_successors)))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in graph:
+                    continue
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(sorted(graph[successor]))))
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        components.update(dict.fromkeys(component, count))
+                        count += 1
+    return components
+
+
 def title_to_class_name(title: str) -> str:
     classname = re.sub(r"[^A-Za-z0-9]+", " ", title)
     return "".join(x for x in classname.title() if not x.isspace())
@@ -376,6 +438,8 @@ class Parser(ABC):
         target_datetime_class: DatetimeClassType | None = DatetimeClassType.Datetime,
         keyword_only: bool = False,
         no_alias: bool = False,
+        infer_discriminators: bool = False,
+        defer_build: bool = False,
         formatters: list[Formatter] = DEFAULT_FORMATTERS,
     ) -> None:
         self.keyword_only = keyword_only
@@ -486,6 +550,8 @@ class Parser(ABC):
         self.treat_dot_as_module = treat_dot_as_module
         self.default_field_extras: dict[str, Any] | None = default_field_extras
         self.formatters: list[Formatter] = formatters
+        self.infer_discriminators: bool = infer_discriminators
+        self.defer_build: bool = defer_build
 
     @property
     def iter_source(self) -> Iterator[Source]:
@@ -828,6 +894,228 @@ class Parser(ABC):
                     if has_imported_literal:  # pragma: no cover
                         imports.append(IMPORT_LITERAL)
 
+    def __apply_inferred_discriminators(self, models: list[DataModel]) -> None:
+        """
+        Turn union fields into discriminated unions when the members can be told apart without trying them all.
+
+        Members are selected either by a property holding a distinct literal in every member (e.g. ``kind``), or by
+        the keys of the input: a key declared by exactly one member, which forbids extra keys, identifies it.
+        """
+        if not self.infer_discriminators:
+            return
+        if self.data_model_type == msgspec_model.Struct:
+            self.__apply_inferred_tags(models)
+            return
+        if self.data_model_type != pydantic_model_v2.BaseModel:
+            return
+        for model in models:
+            for field in model.fields:
+                if not isinstance(field, pydantic_model_v2.DataModelField) or field.extras.get("discriminator"):
+                    continue
+                data_type = field.data_type
+                if len(data_type.data_types) < 2 or data_type.is_list or data_type.is_dict or data_type.is_set:  # noqa: PLR2004
+                    continue
+                members = [
+                    data_type_.reference.source
+                    if data_type_.reference
+                    and isinstance(data_type_.reference.source, pydantic_model_v2.BaseModel)
+                    and not isinstance(data_type_.reference.source, pydantic_model_v2.RootModel)
+                    else None
+                    for data_type_ in data_type.data_types
+                ]
+                if not self.__apply_literal_discriminator(field, members):
+                    self.__apply_key_discriminator(field, members)
+
+    def __apply_inferred_tags(self, models: list[DataModel]) -> None:
+        """
+        Turn unions of structs into tagged unions when every struct has a property holding a distinct literal.
+
+        msgspec only decodes unions of several structs when they are tagged, and tags are class-level: the property
+        becomes the ``tag_field`` of each struct, so a struct can only be tagged by one property.
+        """
+        for model in models:
+            for field in model.fields:
+                data_type = field.data_type
+                if len(data_type.data_types) < 2 or data_type.is_list or data_type.is_dict or data_type.is_set:  # noqa: PLR2004
+                    continue
+                members = [
+                    data_type_.reference.source
+                    for data_type_ in data_type.data_types
+                    if data_type_.reference and isinstance(data_type_.reference.source, msgspec_model.Struct)
+                ]
+                if len(members) < 2 or not self.__has_unique_tags(  # noqa: PLR2004
+                    field,
+                    {index for index, data_type_ in enumerate(data_type.data_types) if data_type_.reference},
+                ):
+                    continue
+                for name in dict.fromkeys(f.alias or f.name for f in members[0].fields):
+                    literal_fields = [
+                        next(
+                            (
+                                f
+                                for f in member.fields
+                                if (f.alias or f.name) == name and f.required and len(f.data_type.literals) == 1
+                            ),
+                            None,
+                        )
+                        for member in members
+                    ]
+                    if None in literal_fields:
+                        continue
+                    literals = [f.data_type.literals[0] for f in literal_fields]  # pyright: ignore[reportOptionalMemberAccess]
+                    if len(set(literals)) != len(literals) or any(
+                        member.extra_template_data["base_class_kwargs"].get("tag_field") not in {None, repr(name)}
+                        or any(
+                            (f.alias or f.name) == name
+                            for owner, f in self.__iter_fields(member)
+                            if owner is not member
+                        )
+                        for member in members
+                    ):
+                        continue
+                    for member, literal_field, literal in zip(members, literal_fields, literals):
+                        member.add_base_class_kwarg("tag_field", repr(name))
+                        member.add_base_class_kwarg("tag", repr(literal))
+                        literal_field.extras["is_classvar"] = True  # pyright: ignore[reportOptionalMemberAccess]
+                        literal_field.required = False  # pyright: ignore[reportOptionalMemberAccess]
+                        literal_field.default = literal  # pyright: ignore[reportOptionalMemberAccess]
+                    break
+
+    @classmethod
+    def __iter_fields(cls, model: DataModel) -> Iterator[tuple[DataModel, DataModelFieldBase]]:
+        yield from ((model, field) for field in model.fields)
+        for base_class in model.base_classes:
+            if isinstance(base_class.reference, Reference) and isinstance(base_class.reference.source, DataModel):
+                yield from cls.__iter_fields(base_class.reference.source)
+
+    @staticmethod
+    def __has_unique_tags(field: DataModelFieldBase, indexes: set[int]) -> bool:
+        names = {field.data_type.data_types[index].reference.short_name for index in indexes}  # pyright: ignore[reportOptionalMemberAccess]
+        return len(names) == len(indexes) >= 2  # noqa: PLR2004
+
+    def __apply_literal_discriminator(
+        self, field: pydantic_model_v2.DataModelField, members: list[DataModel | None]
+    ) -> bool:
+        if None in members or not self.__has_unique_tags(field, set(range(len(members)))):
+            return False
+        first = cast("DataModel", members[0])
+        for name in dict.fromkeys(f.name for _, f in self.__iter_fields(first)):
+            literal_fields: list[DataModelFieldBase] = []
+            overrides: list[tuple[DataModel, DataModelFieldBase]] = []
+            for member in cast("list[DataModel]", members):
+                fields = [(owner, f) for owner, f in self.__iter_fields(member) if f.name == name]
+                literal_field = next((f for _, f in fields if len(f.data_type.literals) == 1), None)
+                if literal_field is None:
+                    break
+                literal_fields.append(literal_field)
+                # allOf members may shadow the literal of a base class with a broader type
+                overrides.extend((owner, f) for owner, f in fields if f is not literal_field and owner is member)
+            else:
+                literals = [f.data_type.literals[0] for f in literal_fields]
+                optional = [f for f in literal_fields if not f.required]
+                if len(set(literals)) != len(literals):
+                    continue
+                for owner, override in overrides:
+                    owner.fields.remove(override)
+                if not optional:
+                    field.extras["discriminator"] = name
+                else:
+                    # inputs without the property are tagged like a plain union would pick them: first member first
+                    field.tagged_union = pydantic_model_v2.TaggedUnion(
+                        key=optional[0].alias or optional[0].name,
+                        default=optional[0].data_type.literals[0],
+                        tags={literal: index for index, literal in enumerate(literals)},
+                    )
+                return True
+        return False
+
+    def __apply_key_discriminator(
+        self, field: pydantic_model_v2.DataModelField, members: list[DataModel | None]
+    ) -> None:
+        declared: defaultdict[str, set[int]] = defaultdict(set)
+        for index, member in enumerate(members):
+            if member is not None:
+                for _, member_field in self.__iter_fields(member):
+                    declared[member_field.alias or cast("str", member_field.name)].add(index)
+        tags = {
+            key: index
+            for key, (index,) in ((key, indexes) for key, indexes in declared.items() if len(indexes) == 1)
+            if getattr(members[index].extra_template_data.get("config"), "extra", None) == "'forbid'"  # pyright: ignore[reportOptionalMemberAccess]
+        }
+        if self.__has_unique_tags(field, set(tags.values())):
+            field.tagged_union = pydantic_model_v2.TaggedUnion(tags=tags)
+
+    def __apply_defer_build(self, models: list[DataModel]) -> None:
+        """
+        Let pydantic build the schemas of models on first use instead of when their module is imported.
+
+        Models inherit the setting from their generated base classes. Root models are rendered without a type
+        parameter, since parametrizing ``RootModel`` builds the schema of the parametrized class right away.
+        """
+        if not self.defer_build or self.data_model_type != pydantic_model_v2.BaseModel:
+            return
+        for model in models:
+            if not isinstance(model, pydantic_model_v2.BaseModel):
+                continue
+            model.extra_template_data["defer_build"] = True
+            if any(base_class.reference for base_class in model.base_classes):
+                continue
+            config = model.extra_template_data.get("config")
+            if config is None:
+                model.extra_template_data["config"] = pydantic_model_v2.ConfigDict(defer_build=True)
+                model._additional_imports.append(IMPORT_CONFIG_DICT)  # noqa: SLF001
+            else:
+                config.defer_build = True
+
+    def __defer_cyclic_imports(self, processed_models: list[Any]) -> dict[tuple[str, ...], Imports]:
+        """
+        Move the imports between modules that import each other to the end of these modules.
+
+        With deferred schema building, models only need the models they refer to in annotations once they are
+        first used, so a cycle of imports is broken by importing them after the module's own models. Base classes
+        and enums (which may be used in default values) are still needed when the module is executed and keep
+        their place.
+        """
+        module_of = {model.path: processed.module for processed in processed_models for model in processed.models}
+        graph = {
+            processed.module: {
+                module_of[path]
+                for path, import_ in processed.imports.reference_paths.items()
+                if path in module_of and import_.import_ in processed.imports.get(import_.from_, ())
+            }
+            - {processed.module}
+            for processed in processed_models
+        }
+        components = _strongly_connected_components(graph)
+        models = {model.path: model for processed in processed_models for model in processed.models}
+        deferred_imports: dict[tuple[str, ...], Imports] = {}
+        for processed in processed_models:
+            component = components.get(processed.module)
+            if component is None:
+                continue
+            eager = {
+                base_class.reference.path
+                for model in processed.models
+                for base_class in model.base_classes
+                if base_class.reference
+            }
+            deferred = Imports(self.use_exact_imports)
+            for path, import_ in list(processed.imports.reference_paths.items()):
+                if (
+                    components.get(module_of.get(path)) != component  # pyright: ignore[reportArgumentType]
+                    or module_of[path] == processed.module
+                    or path in eager
+                    or isinstance(models[path], Enum)
+                    or import_.import_ not in processed.imports.get(import_.from_, ())
+                ):
+                    continue
+                while import_.import_ in processed.imports.get(import_.from_, ()):
+                    processed.imports.remove(import_)
+                deferred.append(import_)
+            if deferred:
+                deferred_imports[processed.module] = deferred
+        return deferred_imports
+
     @classmethod
     def _create_set_from_list(cls, data_type: DataType) -> DataType | None:
         if data_type.is_list:
@@ -1204,6 +1492,7 @@ class Parser(ABC):
         with_import: bool | None = True,  # noqa: FBT001, FBT002
         format_: bool | None = True,  # noqa: FBT001, FBT002
         settings_path: Path | None = None,
+        jobs: int = 1,
     ) -> str | dict[tuple[str, ...], Result]:
         self.parse_raw()
 
@@ -1304,6 +1593,8 @@ class Parser(ABC):
             self.__sort_models(models, imports)
             self.__change_field_name(models)
             self.__apply_discriminator_type(models, imports)
+            self.__apply_inferred_discriminators(models)
+            self.__apply_defer_build(models)
             self.__set_one_literal_on_default(models)
 
             processed_models.append(Processed(module, models, init, imports, scoped_model_resolver))
@@ -1335,6 +1626,9 @@ class Parser(ABC):
             # process after removing unused models
             self.__change_imported_model_name(models, imports, scoped_model_resolver)
 
+        deferred_imports = self.__defer_cyclic_imports(processed_models) if self.defer_build else {}
+
+        bodies: dict[tuple[str, ...], Result] = {}
         for module, models, init, imports, scoped_model_resolver in processed_models:  # noqa: B007
             result: list[str] = []
             if models:
@@ -1344,7 +1638,11 @@ class Parser(ABC):
                 code = dump_templates(models)
                 result += [code]
 
-                if self.dump_resolve_reference_action is not None:
+                if module in deferred_imports:
+                    result += ["\n", str(deferred_imports[module])]
+                elif self.dump_resolve_reference_action is not None and not (
+                    self.defer_build and self.data_model_type == pydantic_model_v2.BaseModel
+                ):
                     result += [
                         "\n",
                         self.dump_resolve_reference_action(
@@ -1354,10 +1652,16 @@ class Parser(ABC):
             if not result and not init:
                 continue
             body = "\n".join(result)
-            if code_formatter:
-                body = code_formatter.format_code(body)
-
-            results[module] = Result(body=body, source=models[0].file_path if models else None)
+            bodies[module] = Result(body=body, source=models[0].file_path if models else None)
+
+        if code_formatter:
+            # all modules are formatted at once, which saves starting a formatter per module
+            formatted = code_formatter.format_codes([result.body for result in bodies.values()], jobs)
+            bodies = {
+                module: Result(body=body, source=result.source)
+                for (module, result), body in zip(bodies.items(), formatted)
+            }
+        results.update(bodies)
 
         # retain existing behaviour
         if [*results] == [("__init__.py",)]:
@@ -153,6 +153,8 @@ class GraphQLParser(Parser):
         target_datetime_class: DatetimeClassType = DatetimeClassType.Datetime,
         keyword_only: bool = False,
         no_alias: bool = False,
+        infer_discriminators: bool = False,
+        defer_build: bool = False,
         formatters: list[Formatter] = DEFAULT_FORMATTERS,
     ) -> None:
         super().__init__(
@@ -227,6 +229,8 @@ class GraphQLParser(Parser):
             target_datetime_class=target_datetime_class,
             keyword_only=keyword_only,
             no_alias=no_alias,
+            infer_discriminators=infer_discriminators,
+            defer_build=defer_build,
             formatters=formatters,
         )
 
@@ -16,7 +16,6 @@ from pydantic import (
 from datamodel_code_generator import (
     InvalidClassNameError,
     load_yaml,
-    load_yaml_from_path,
     snooper_to_methods,
 )
 from datamodel_code_generator.format import DEFAULT_FORMATTERS, Formatter, PythonVersion, PythonVersionMin
@@ -422,6 +421,8 @@ class JsonSchemaParser(Parser):
         target_datetime_class: DatetimeClassType = DatetimeClassType.Datetime,
         keyword_only: bool = False,
         no_alias: bool = False,
+        infer_discriminators: bool = False,
+        defer_build: bool = False,
         formatters: list[Formatter] = DEFAULT_FORMATTERS,
     ) -> None:
         super().__init__(
@@ -496,10 +497,14 @@ class JsonSchemaParser(Parser):
             target_datetime_class=target_datetime_class,
             keyword_only=keyword_only,
             no_alias=no_alias,
+            infer_discriminators=infer_discriminators,
+            defer_build=defer_build,
             formatters=formatters,
         )
 
         self.remote_object_cache: DefaultPutDict[str, dict[str, Any]] = DefaultPutDict()
+        # parsed documents by their text, shared by the sources and the documents of references
+        self.document_cache: DefaultPutDict[str, Any] = DefaultPutDict()
         self.raw_obj: dict[Any, Any] = {}
         self._root_id: Optional[str] = None  # noqa: UP045
         self._root_id_base_path: Optional[str] = None  # noqa: UP045
@@ -1411,7 +1416,7 @@ class JsonSchemaParser(Parser):
     def _get_ref_body_from_url(self, ref: str) -> dict[Any, Any]:
         # URL Reference: $ref: 'http://path/to/your/resource' Uses the whole document located on the different server.
         return self.remote_object_cache.get_or_put(
-            ref, default_factory=lambda key: load_yaml(self._get_text_from_url(key))
+            ref, default_factory=lambda key: self._load_document(self._get_text_from_url(key))
         )
 
     def _get_ref_body_from_remote(self, resolved_ref: str) -> dict[Any, Any]:
@@ -1421,9 +1426,12 @@ class JsonSchemaParser(Parser):
 
         return self.remote_object_cache.get_or_put(
             str(full_path),
-            default_factory=lambda _: load_yaml_from_path(full_path, self.encoding),
+            default_factory=lambda _: self._load_document(full_path.read_text(encoding=self.encoding)),
         )
 
+    def _load_document(self, text: str) -> Any:
+        return self.document_cache.get_or_put(text, default_factory=load_yaml)
+
     def resolve_ref(self, object_ref: str) -> Reference:
         reference = self.model_resolver.add_ref(object_ref)
         if reference.loaded:
@@ -1575,7 +1583,7 @@ class JsonSchemaParser(Parser):
 
     def parse_raw(self) -> None:
         for source, path_parts in self._get_context_source_path_parts():
-            self.raw_obj = load_yaml(source.text)
+            self.raw_obj = self._load_document(source.text)
             if self.raw_obj is None:  # pragma: no cover
                 warn(f"{source.path} is empty. Skipping this file", stacklevel=2)
                 continue
@@ -1613,7 +1621,7 @@ class JsonSchemaParser(Parser):
                     if self.model_resolver.add_ref(reserved_ref, resolved=True).loaded:
                         continue
                     # for root model
-                    self.raw_obj = load_yaml(source.text)
+                    self.raw_obj = self._load_document(source.text)
                     self.parse_json_pointer(self.raw_obj, reserved_ref, path_parts)
 
         if model_count != len(self.results):
@@ -15,7 +15,6 @@ from datamodel_code_generator import (
     OpenAPIScope,
     PythonVersion,
     PythonVersionMin,
-    load_yaml,
     snooper_to_methods,
 )
 from datamodel_code_generator.format import DEFAULT_FORMATTERS, DatetimeClassType, Formatter
@@ -215,6 +214,8 @@ class OpenAPIParser(JsonSchemaParser):
         target_datetime_class: DatetimeClassType = DatetimeClassType.Datetime,
         keyword_only: bool = False,
         no_alias: bool = False,
+        infer_discriminators: bool = False,
+        defer_build: bool = False,
         formatters: list[Formatter] = DEFAULT_FORMATTERS,
     ) -> None:
         super().__init__(
@@ -289,6 +290,8 @@ class OpenAPIParser(JsonSchemaParser):
             target_datetime_class=target_datetime_class,
             keyword_only=keyword_only,
             no_alias=no_alias,
+            infer_discriminators=infer_discriminators,
+            defer_build=defer_build,
             formatters=formatters,
         )
         self.open_api_scopes: list[OpenAPIScope] = openapi_scopes or [OpenAPIScope.Schemas]
@@ -562,7 +565,7 @@ class OpenAPIParser(JsonSchemaParser):
                         stacklevel=2,
                     )
 
-            specification: dict[str, Any] = load_yaml(source.text)
+            specification: dict[str, Any] = self._load_document(source.text)
             self.raw_obj = specification
             schemas: dict[Any, Any] = specification.get("components", {}).get("schemas", {})
             security: list[dict[str, list[str]]] | None = specification.get("security")
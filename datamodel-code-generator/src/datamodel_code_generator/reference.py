@@ -324,6 +324,7 @@ class ModelResolver:  # noqa: PLR0904
         self._root_id: str | None = None
         self._root_id_base_path: str | None = None
         self.ids: defaultdict[str, dict[str, str]] = defaultdict(dict)
+        self._resolved_refs: dict[tuple[Any, ...], str] = {}
         self.after_load_files: set[str] = set()
         self.exclude_names: set[str] = exclude_names or set()
         self.duplicate_name_suffix: str | None = duplicate_name_suffix
@@ -414,7 +415,24 @@ class ModelResolver:  # noqa: PLR0904
     def add_id(self, id_: str, path: Sequence[str]) -> None:
         self.ids["/".join(self.current_root)][id_] = self.resolve_ref(path)
 
-    def resolve_ref(self, path: Sequence[str] | str) -> str:  # noqa: PLR0911, PLR0912
+    def resolve_ref(self, path: Sequence[str] | str) -> str:
+        if ID_PATTERN.match(path if isinstance(path, str) else self.join_path(path)):
+            # ids can be added later on
+            return self._resolve_ref(path)
+        # the same references are resolved many times from the same file, which involves resolving file paths
+        key = (
+            tuple(self.current_root),
+            path if isinstance(path, str) else tuple(path),
+            self.current_base_path,
+            self.base_url,
+            self.root_id,
+        )
+        resolved = self._resolved_refs.get(key)
+        if resolved is None:
+            resolved = self._resolved_refs[key] = self._resolve_ref(path)
+        return resolved
+
+    def _resolve_ref(self, path: Sequence[str] | str) -> str:  # noqa: PLR0911, PLR0912
         joined_path = path if isinstance(path, str) else self.join_path(path)
         if joined_path == "#":
             return f"{'/'.join(self.current_root)}#"
@@ -467,7 +485,7 @@ class ModelResolver:  # noqa: PLR0904
             # Special case for EthDebug schema
             if target_url.scheme == "schema":
                 target_url_path = Path(target_url.path)
-                schema_base_path = Path('/home/raoul/rv/ethdebug.py/format/schemas/')
+                schema_base_path = self._base_path
                 if isinstance(path, str):
                     schema_file_path = Path(path.removeprefix('schema:ethdebug/format/') + '.schema.yaml')
                 else:
@@ -0,0 +1,3 @@
+# generated by datamodel-codegen:
+#   filename:  defer_build
+#   timestamp: 2019-07-26T00:00:00+00:00
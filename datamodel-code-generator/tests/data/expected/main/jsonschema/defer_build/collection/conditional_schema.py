@@ -0,0 +1,22 @@
+# generated by datamodel-codegen:
+#   filename:  collection/conditional.schema.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Conditional(BaseModel):
+    model_config = ConfigDict(
+        extra='forbid',
+        defer_build=True,
+    )
+    if_: Annotated[str, Field(alias='if')]
+    then: Pointer
+    else_: Annotated[Optional[Pointer], Field(alias='else')] = None
+
+
+from ..pointer_schema import Pointer
@@ -0,0 +1,20 @@
+# generated by datamodel-codegen:
+#   filename:  collection/group.schema.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from typing import Annotated, List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Group(BaseModel):
+    model_config = ConfigDict(
+        extra='forbid',
+        defer_build=True,
+    )
+    group: Annotated[List[Pointer], Field(min_length=1)]
+
+
+from ..pointer_schema import Pointer
@@ -0,0 +1,20 @@
+# generated by datamodel-codegen:
+#   filename:  collection.schema.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from typing import Annotated, Union
+
+from pydantic import ConfigDict, Field, RootModel
+
+
+class Collection(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
+    root: Annotated[Union[Group, Conditional], Field(title='Collection')]
+
+
+from .collection.conditional_schema import Conditional
+from .collection.group_schema import Group
@@ -0,0 +1,21 @@
+# generated by datamodel-codegen:
+#   filename:  pointer.schema.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from typing import Annotated, Union
+
+from pydantic import ConfigDict, Field, RootModel
+
+from .region_schema import Region
+
+
+class Pointer(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
+    root: Annotated[Union[Region, Collection], Field(title='Pointer')]
+
+
+from .collection_schema import Collection
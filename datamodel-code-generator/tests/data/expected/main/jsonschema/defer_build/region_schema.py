@@ -0,0 +1,24 @@
+# generated by datamodel-codegen:
+#   filename:  region.schema.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class Location(Enum):
+    stack = 'stack'
+    memory = 'memory'
+
+
+class Region(BaseModel):
+    model_config = ConfigDict(
+        extra='forbid',
+        defer_build=True,
+    )
+    location: Location
+    slot: Optional[int] = None
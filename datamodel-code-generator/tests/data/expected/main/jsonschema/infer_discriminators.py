@@ -0,0 +1,142 @@
+# generated by datamodel-codegen:
+#   filename:  infer_discriminators.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, RootModel, Tag
+
+
+class Sum(BaseModel):
+    model_config = ConfigDict(
+        extra='forbid',
+    )
+    field_sum: Annotated[List[int], Field(alias='$sum')]
+
+
+class Read(BaseModel):
+    model_config = ConfigDict(
+        extra='forbid',
+    )
+    field_read: Annotated[str, Field(alias='$read')]
+
+
+class Lookup(RootModel[Optional[Dict[str, str]]]):
+    root: Optional[Dict[str, str]] = None
+
+
+_EXPRESSION_TAGS = {'$sum': 'Sum', '$read': 'Read'}
+
+
+def _expression_tag(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        return next(
+            (_EXPRESSION_TAGS[key] for key in value if key in _EXPRESSION_TAGS), 'other'
+        )
+    name = type(value).__name__
+    return name if name in _EXPRESSION_TAGS.values() else 'other'
+
+
+class Expression(
+    RootModel[
+        Union[
+            Annotated[Sum, Tag('Sum')],
+            Annotated[Read, Tag('Read')],
+            Annotated[Union[int, Lookup], Tag('other')],
+        ]
+    ]
+):
+    root: Annotated[
+        Union[
+            Annotated[Sum, Tag('Sum')],
+            Annotated[Read, Tag('Read')],
+            Annotated[Union[int, Lookup], Tag('other')],
+        ],
+        Field(discriminator=Discriminator(_expression_tag)),
+    ]
+
+
+class Circle(BaseModel):
+    kind: Literal['circle']
+    radius: Optional[float] = None
+
+
+class Square(BaseModel):
+    kind: Literal['square']
+    side: Optional[float] = None
+
+
+class Shape(RootModel[Union[Circle, Square]]):
+    root: Annotated[Union[Circle, Square], Field(discriminator='kind')]
+
+
+class Elementary(BaseModel):
+    class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
+    kind: str
+
+
+class Complex(BaseModel):
+    class_: Annotated[Literal['complex'], Field(alias='class')]
+    kind: str
+
+
+_TYPE_TAGS = {'elementary': 'Elementary', 'complex': 'Complex'}
+
+
+def _type_tag(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        return _TYPE_TAGS.get(value.get('class', 'elementary'))
+    name = type(value).__name__
+    return name if name in _TYPE_TAGS.values() else None
+
+
+class Type(
+    RootModel[
+        Union[
+            Annotated[Elementary, Tag('Elementary')], Annotated[Complex, Tag('Complex')]
+        ]
+    ]
+):
+    root: Annotated[
+        Union[
+            Annotated[Elementary, Tag('Elementary')], Annotated[Complex, Tag('Complex')]
+        ],
+        Field(discriminator=Discriminator(_type_tag)),
+    ]
+
+
+class Stack(BaseModel):
+    location: Literal['stack']
+    slot: int
+
+
+class Memory(BaseModel):
+    location: Literal['memory']
+    offset: int
+
+
+class Location(Enum):
+    stack = 'stack'
+    memory = 'memory'
+
+
+class Region1(Stack):
+    pass
+
+
+class Region2(Memory):
+    pass
+
+
+class Region(RootModel[Union[Region1, Region2]]):
+    root: Annotated[Union[Region1, Region2], Field(discriminator='location')]
+
+
+class Model(BaseModel):
+    expression: Optional[Expression] = None
+    shape: Optional[Shape] = None
+    type: Optional[Type] = None
+    region: Optional[Region] = None
@@ -0,0 +1,27 @@
+# generated by datamodel-codegen:
+#   filename:  infer_discriminators_msgspec.json
+#   timestamp: 2019-07-26T00:00:00+00:00
+
+from __future__ import annotations
+
+from typing import ClassVar, List, Literal, Optional, Union
+
+from msgspec import Struct
+
+
+class Circle(Struct, tag_field='kind', tag='circle'):
+    kind: ClassVar[Literal['circle']] = 'circle'
+    radius: Optional[float] = None
+
+
+class Square(Struct, tag_field='kind', tag='square'):
+    kind: ClassVar[Literal['square']] = 'square'
+    side: Optional[float] = None
+
+
+Shape = Union[Circle, Square]
+
+
+class Model(Struct):
+    shape: Optional[Shape] = None
+    shapes: Optional[List[Union[int, Circle, Square]]] = None
@@ -3114,3 +3114,73 @@ def test_main_jsonschema_field_has_same_name(output_model: str, expected_output:
         ])
         assert return_code == Exit.OK
         assert output_file.read_text() == (EXPECTED_JSON_SCHEMA_PATH / expected_output).read_text()
+
+
+@freeze_time("2019-07-26")
+@pytest.mark.skipif(
+    int(black.__version__.split(".")[0]) < 24,
+    reason="Installed black doesn't support the new style",
+)
+def test_main_jsonschema_infer_discriminators() -> None:
+    with TemporaryDirectory() as output_dir:
+        output_file: Path = Path(output_dir) / "output.py"
+        return_code: Exit = main([
+            "--input",
+            str(JSON_SCHEMA_DATA_PATH / "infer_discriminators.json"),
+            "--output",
+            str(output_file),
+            "--input-file-type",
+            "jsonschema",
+            "--output-model-type",
+            "pydantic_v2.BaseModel",
+            "--use-annotated",
+            "--field-constraints",
+            "--infer-discriminators",
+        ])
+        assert return_code == Exit.OK
+        assert output_file.read_text() == (EXPECTED_JSON_SCHEMA_PATH / "infer_discriminators.py").read_text()
+
+
+@freeze_time("2019-07-26")
+def test_main_jsonschema_defer_build() -> None:
+    with TemporaryDirectory() as output_dir:
+        output_path: Path = Path(output_dir)
+        return_code: Exit = main([
+            "--input",
+            str(JSON_SCHEMA_DATA_PATH / "defer_build"),
+            "--output",
+            str(output_path),
+            "--input-file-type",
+            "jsonschema",
+            "--output-model-type",
+            "pydantic_v2.BaseModel",
+            "--use-annotated",
+            "--use-exact-imports",
+            "--defer-build",
+        ])
+        assert return_code == Exit.OK
+        expected_dir = EXPECTED_JSON_SCHEMA_PATH / "defer_build"
+        for path in expected_dir.rglob("*.py"):
+            result = output_path.joinpath(path.relative_to(expected_dir)).read_text()
+            assert result == path.read_text()
+
+
+@freeze_time("2019-07-26")
+def test_main_jsonschema_infer_discriminators_msgspec() -> None:
+    with TemporaryDirectory() as output_dir:
+        output_file: Path = Path(output_dir) / "output.py"
+        return_code: Exit = main([
+            "--input",
+            str(JSON_SCHEMA_DATA_PATH / "infer_discriminators_msgspec.json"),
+            "--output",
+            str(output_file),
+            "--input-file-type",
+            "jsonschema",
+            "--output-model-type",
+            "msgspec.Struct",
+            "--use-annotated",
+            "--field-constraints",
+            "--infer-discriminators",
+        ])
+        assert return_code == Exit.OK
+        assert output_file.read_text() == (EXPECTED_JSON_SCHEMA_PATH / "infer_discriminators_msgspec.py").read_text()
@@ -195,6 +195,23 @@ def test_main_modular(tmpdir_factory: pytest.TempdirFactory) -> None:
         assert result == path.read_text()
 
 
+def test_main_modular_jobs(tmpdir_factory: pytest.TempdirFactory) -> None:
+    """Test main function on modular file with modules formatted in several processes."""
+
+    output_directory = Path(tmpdir_factory.mktemp("output"))
+
+    input_filename = OPEN_API_DATA_PATH / "modular.yaml"
+    output_path = output_directory / "model"
+
+    with freeze_time(TIMESTAMP):
+        return_code: Exit = main(["--input", str(input_filename), "--output", str(output_path), "--jobs", "3"])
+    assert return_code == Exit.OK
+    main_modular_dir = EXPECTED_OPENAPI_PATH / "modular"
+    for path in main_modular_dir.rglob("*.py"):
+        result = output_path.joinpath(path.relative_to(main_modular_dir)).read_text()
+        assert result == path.read_text()
+
+
 def test_main_modular_reuse_model(tmpdir_factory: pytest.TempdirFactory) -> None:
     """Test main function on modular file."""
 
@@ -84,6 +84,26 @@ def test_sort_data_models() -> None:
     assert require_update_action_models == ["B", "A"]
 
 
+def test_sort_data_models_order_of_passes() -> None:
+    reference_a = Reference(path="A", original_name="A", name="A")
+    reference_b = Reference(path="B", original_name="B", name="B")
+    reference_c = Reference(path="C", original_name="C", name="C")
+    reference_d = Reference(path="D", original_name="D", name="D")
+    reference = [
+        BaseModel(fields=[DataModelField(data_type=DataType(reference=reference_b))], reference=reference_a),
+        BaseModel(fields=[DataModelField(data_type=DataType(reference=reference_d))], reference=reference_c),
+        BaseModel(fields=[], reference=reference_b),
+        BaseModel(fields=[DataModelField(data_type=DataType(reference=reference_a))], reference=reference_d),
+    ]
+
+    unresolved, resolved, require_update_action_models = sort_data_models(reference)
+
+    # the first pass adds B, the second one A and then D, which references A, and the third one C
+    assert [*resolved] == ["B", "A", "D", "C"]
+    assert unresolved == []
+    assert require_update_action_models == []
+
+
 def test_sort_data_models_unresolved() -> None:
     reference_a = Reference(path="A", original_name="A", name="A")
     reference_b = Reference(path="B", original_name="B", name="B")
@@ -140,6 +140,26 @@ class User(BaseModel):
     )
 
 
+def test_json_schema_documents_loaded_once(mocker: MockerFixture, tmp_path: Path) -> None:
+    (tmp_path / "a.json").write_text(
+        json.dumps({
+            "title": "A",
+            "type": "object",
+            "properties": {"b": {"$ref": "b.json#/definitions/B"}},
+            "definitions": {"C": {"type": "string"}},
+        })
+    )
+    (tmp_path / "b.json").write_text(
+        json.dumps({"definitions": {"B": {"type": "object", "properties": {"c": {"$ref": "a.json#/definitions/C"}}}}})
+    )
+    load = mocker.patch.object(yaml, "load", wraps=yaml.load)
+    parser = JsonSchemaParser(tmp_path / "a.json", base_path=tmp_path)
+    parser.parse_raw()
+
+    # a.json is parsed once, both as the source and as the document of the reference from b.json
+    assert load.call_count == 2
+
+
 def test_json_schema_ref_url_json(mocker: MockerFixture) -> None:
     parser = JsonSchemaParser("")
     obj = {
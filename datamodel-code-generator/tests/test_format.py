@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import shutil
+import subprocess
 import sys
 from pathlib import Path
 from unittest import mock
@@ -152,3 +154,39 @@ def test_format_code_ruff_check_formatter() -> None:
 
     assert formatted_code == "output"
     mock_run.assert_called_once_with(("ruff", "check", "--fix", "-"), input=b"input", capture_output=True, check=False)
+
+
+@pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff is not installed")
+def test_format_codes_ruff_matches_format_code() -> None:
+    formatter = CodeFormatter(
+        PythonVersionMin,
+        formatters=[Formatter.RUFF_CHECK, Formatter.RUFF_FORMAT],
+    )
+    codes = ["import os\nx=[1,\n2]\n", "from typing import List\ny:List[int]=[]\n", "import os\nx=[1,\n2]\n"]
+    with mock.patch("subprocess.run", wraps=subprocess.run) as mock_run:
+        formatted_codes = formatter.format_codes(codes)
+
+    assert formatted_codes == [formatter.format_code(code) for code in codes]
+    # one ruff process per command for all modules
+    assert mock_run.call_count == 2
+
+
+def test_format_codes_cache() -> None:
+    formatter = CodeFormatter(PythonVersionMin)
+    code = "x   =  'test_format_codes_cache'\n"
+    with mock.patch.object(CodeFormatter, "apply_black", wraps=formatter.apply_black) as mock_black:
+        assert formatter.format_codes([code, code]) == [formatter.format_code(code)] * 2
+        assert CodeFormatter(PythonVersionMin).format_codes([code]) == [formatter.format_code(code)]
+
+    # formatted once by `format_codes`, and by each `format_code`
+    assert mock_black.call_count == 3
+
+
+def test_format_codes_jobs() -> None:
+    formatter = CodeFormatter(PythonVersionMin)
+    codes = [f"x   =  'test_format_codes_jobs_{index}'\n" for index in range(5)]
+    expected = [formatter.format_code(code) for code in codes]
+
+    assert formatter.format_codes(codes, jobs=2) == expected
+    with pytest.raises(ValueError, match="must not be negative"):
+        formatter.format_codes(["x = 'test_format_codes_jobs_negative'\n"], jobs=-1)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 from pathlib import PurePosixPath, PureWindowsPath
+from typing import TYPE_CHECKING
 
 import pytest
 
 from datamodel_code_generator.reference import ModelResolver, get_relative_path
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_mock import MockerFixture
+
 
 @pytest.mark.parametrize(
     ("base_path", "target_path", "expected"),
@@ -63,3 +69,25 @@ def test_model_resolver_add_ref_unevaluated() -> None:
     model_resolver = ModelResolver()
     reference = model_resolver.add_ref("meta/unevaluated")
     assert reference.original_name == "unevaluated"
+
+
+def test_model_resolver_resolve_ref_cached(mocker: MockerFixture, tmp_path: Path) -> None:
+    model_resolver = ModelResolver(base_path=tmp_path)
+    resolve_ref = mocker.spy(model_resolver, "_resolve_ref")
+    with model_resolver.current_root_context(["a.json"]):
+        assert model_resolver.resolve_ref("b.json#/definitions/B") == "b.json#/definitions/B"
+        assert model_resolver.resolve_ref("b.json#/definitions/B") == "b.json#/definitions/B"
+        assert model_resolver.resolve_ref("#/definitions/A") == "a.json#/definitions/A"
+    assert resolve_ref.call_count == 2
+    with model_resolver.current_root_context(["c.json"]):
+        assert model_resolver.resolve_ref("#/definitions/A") == "c.json#/definitions/A"
+    assert resolve_ref.call_count == 3
+
+
+def test_model_resolver_resolve_ref_id_not_cached(tmp_path: Path) -> None:
+    model_resolver = ModelResolver(base_path=tmp_path)
+    with model_resolver.current_root_context(["a.json"]):
+        model_resolver.add_id("#item", ["a.json", "#/definitions/Item"])
+        assert model_resolver.resolve_ref("#item") == "a.json#/definitions/Item"
+        model_resolver.add_id("#item", ["a.json", "#/definitions/Other"])
+        assert model_resolver.resolve_ref("#item") == "a.json#/definitions/Other"
@@ -1,39 +1,240 @@
-from glob import glob
-from pathlib import Path
-from tempfile import NamedTemporaryFile
+"""
+Generate the models of `ethdebug.format` and `ethdebug.format_fast` from the schemas in `format/schemas`.
 
-from datamodel_code_generator import InputFileType, generate, DataModelType
-from datamodel_code_generator.model import PythonVersion
+Usage:
+
+    python generate_model.py [--incremental] [--jobs N]
+
+With `--incremental`, only the modules whose schema or referenced schemas
+changed since the last run are regenerated, and unchanged files are not
+written. The content hashes of the schemas are kept in a manifest; a full
+run is done when there is no manifest, or when the generator or this script
+changed.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import shutil
+from pathlib import Path, PurePosixPath
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import Dict, Iterable, Optional, Set
+
+import yaml
 
 SCHEMA_DIR = Path("format/schemas")
 OUTPUT_DIR = Path("src/ethdebug/format")
+FAST_OUTPUT_DIR = Path("src/ethdebug/format_fast")
+MANIFEST = Path(".generate_model.json")
+SCHEMA_URL = "schema:ethdebug/format/"
+SCHEMA_SUFFIX = ".schema.yaml"
+
+# The msgspec models only cover the schemas of compiler output (ethdebug/format/info and the schemas it references).
+# Unions that can only be told apart by their keys (pointers, expressions, types) can not be decoded by msgspec.
+FAST_MODULES = [
+    "__init__.py",
+    "data/__init__.py",
+    "data/hex_schema.py",
+    "data/unsigned_schema.py",
+    "data/value_schema.py",
+    "info_schema.py",
+    "materials/__init__.py",
+    "materials/compilation_schema.py",
+    "materials/id_schema.py",
+    "materials/reference_schema.py",
+    "materials/source_range_schema.py",
+    "materials/source_schema.py",
+    "program/__init__.py",
+    "program/context_schema.py",
+    "program/instruction_schema.py",
+    "program_schema.py",
+]
+
+def generate_models(schema_dir: Path, output: Path, output_model_type: str, **kwargs) -> None:
+    # Imported here, so that runs without changes don't pay for importing the generator
+    from datamodel_code_generator import InputFileType, generate, DataModelType
+    from datamodel_code_generator.model import PythonVersion
+
+    generate(
+        input_=schema_dir,
+        input_file_type=InputFileType.JsonSchema,
+        output=output,
+        output_model_type=DataModelType(output_model_type),
+        target_python_version=PythonVersion.PY_312,
+        allow_extra_fields=False,
+        disable_timestamp=True,
+        reuse_model=True,
+        use_annotated=True,
+        field_constraints=True,
+        custom_class_name_generator=lambda x: x.title().replace("Ethdebug/Format/", "").replace("/", "_"),
+        use_exact_imports=True,
+        infer_discriminators=True,
+        **kwargs,
+    )
+
+def generate_all(schema_dir: Path, output_dir: Path, fast_output_dir: Path, modules: Optional[Set[str]] = None, jobs: int = 1) -> None:
+    """
+    Generate both model sets from the schemas in `schema_dir`, formatting the modules in `jobs` processes.
+
+    If `modules` is given, only these modules are written, and only if their content changed.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        pydantic_dir, fast_dir = Path(tmp_dir) / "format", Path(tmp_dir) / "format_fast"
+        generate_models(schema_dir, pydantic_dir, "pydantic_v2.BaseModel", defer_build=True, jobs=jobs)
+        generate_models(schema_dir, fast_dir, "msgspec.Struct", jobs=jobs)
+        if modules is None:
+            modules = {path.relative_to(pydantic_dir).as_posix() for path in pydantic_dir.rglob("*.py")}
+        copy_modules(pydantic_dir, output_dir, (module for module in sorted(modules) if (pydantic_dir / module).exists()))
+        copy_modules(fast_dir, fast_output_dir, (module for module in FAST_MODULES if module in modules and (fast_dir / module).exists()))
 
-# Ensure output directory exists
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+def copy_modules(source_dir: Path, output_dir: Path, modules: Iterable[str]) -> None:
+    """
+    Copy generated modules, leaving files that did not change untouched.
+    """
+    for module in modules:
+        source, target = source_dir / module, output_dir / module
+        content = source.read_bytes()
+        if target.exists() and target.read_bytes() == content:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        print(f"wrote {target}")
 
-# Temporarily rename LICENSE file so it doesn't cause parsing issues
-license_path = SCHEMA_DIR / "LICENSE"
+def module_name(schema: str) -> str:
+    """
+    The path of the module generated from a schema, relative to the output directory.
+    """
+    path = PurePosixPath(schema[: -len(SCHEMA_SUFFIX)].replace("-", "_").replace(".", "_") + "_schema.py")
+    return path.as_posix()
 
-with NamedTemporaryFile(delete=False) as tmp_file:
-    if license_path.exists():
-        license_path.rename(tmp_file.name)
+def schema_refs(schema_dir: Path, schema: str) -> Set[str]:
+    """
+    The schemas referenced by a schema, as paths relative to `schema_dir`.
+    """
+    refs: Set[str] = set()
+    stack = [yaml.load((schema_dir / schema).read_text(encoding="utf-8"), Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if isinstance(ref, str) and not ref.startswith("#"):
+                ref = ref.split("#", 1)[0]
+                if ref.startswith(SCHEMA_URL):
+                    refs.add(ref[len(SCHEMA_URL):] + SCHEMA_SUFFIX)
+                else:
+                    refs.add((schema_dir / schema).parent.joinpath(ref).resolve().relative_to(schema_dir.resolve()).as_posix())
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    refs.discard(schema)
+    return refs
+
+def schema_hashes(schema_dir: Path) -> Dict[str, str]:
+    return {
+        path.relative_to(schema_dir).as_posix(): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(schema_dir.rglob("*" + SCHEMA_SUFFIX))
+    }
+
+def generator_hash() -> str:
+    """
+    A hash of the generator sources and of this script, which determine the output for given schemas.
+    """
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    package_dir = Path(importlib.util.find_spec("datamodel_code_generator").origin).parent
+    for path in sorted(package_dir.rglob("*")):
+        if path.suffix in (".py", ".jinja2"):
+            digest.update(path.relative_to(package_dir).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def closure(refs: Dict[str, Set[str]], schema: str) -> Set[str]:
+    """
+    The schemas a schema refers to directly or indirectly, including itself.
+    """
+    result = {schema}
+    stack = [schema]
+    while stack:
+        for ref in refs.get(stack.pop(), ()):
+            if ref not in result:
+                result.add(ref)
+                stack.append(ref)
+    return result
+
+def regenerate(schema_dir: Path, output_dir: Path, fast_output_dir: Path, manifest: Path, incremental: bool, jobs: int = 1) -> None:
+    hashes = schema_hashes(schema_dir)
+    generator = generator_hash()
+    previous = json.loads(manifest.read_text()) if incremental and manifest.exists() else None
+    if previous is not None and previous["generator"] != generator:
+        previous = None
+    # The references of unchanged schemas are taken from the manifest
+    known = previous["schemas"] if previous is not None else {}
+    refs = {
+        schema: set(known[schema]["refs"]) if schema in known and known[schema]["hash"] == digest else schema_refs(schema_dir, schema)
+        for schema, digest in hashes.items()
+    }
+    if previous is None:
+        generate_all(schema_dir, output_dir, fast_output_dir, jobs=jobs)
+    else:
+        changed = {schema for schema, digest in hashes.items() if known.get(schema, {}).get("hash") != digest}
+        removed = set(known) - set(hashes)
+        affected = {schema for schema in hashes if closure(refs, schema) & (changed | removed)}
+        for schema in removed:
+            for directory in (output_dir, fast_output_dir):
+                (directory / module_name(schema)).unlink(missing_ok=True)
+        if affected:
+            # A module only depends on the schemas in its closure: the generator reuses identical models and resolves
+            # duplicate class names within a module, never across modules. The generator is part of the manifest, so a
+            # generator that changes this gets a full run.
+            inputs = set().union(*(closure(refs, schema) for schema in affected)) & set(hashes)
+            with TemporaryDirectory() as tmp_dir:
+                # The resolver of `schema:` references expects the schemas in a `format/schemas` directory
+                subset_dir = Path(tmp_dir) / "format" / "schemas"
+                for schema in inputs:
+                    (subset_dir / schema).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(schema_dir / schema, subset_dir / schema)
+                modules = {module_name(schema) for schema in affected}
+                # Packages of new schema directories
+                modules.update(
+                    (PurePosixPath(module).parent / "__init__.py").as_posix()
+                    for module in list(modules)
+                    if not (output_dir / PurePosixPath(module).parent / "__init__.py").exists()
+                )
+                generate_all(subset_dir, output_dir, fast_output_dir, modules, jobs)
+        print(f"{len(affected)} of {len(hashes)} schemas affected by {len(changed)} changed and {len(removed)} removed schemas")
+    manifest.write_text(json.dumps({
+        "generator": generator,
+        "schemas": {schema: {"hash": digest, "refs": sorted(refs[schema])} for schema, digest in hashes.items()},
+    }, indent=2, sort_keys=True) + "\n")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--incremental", action="store_true", help="only regenerate modules whose schemas changed")
+    parser.add_argument("--schemas", type=Path, default=SCHEMA_DIR, help="schema directory (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR, help="output directory of the pydantic models (default: %(default)s)")
+    parser.add_argument("--fast-output", type=Path, default=FAST_OUTPUT_DIR, help="output directory of the msgspec models (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=1, help="number of processes formatting the modules, 0 for one per CPU (default: 1)")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST, help="manifest of the last run (default: %(default)s)")
+    args = parser.parse_args()
+
+    # Ensure output directories exist
+    args.output.mkdir(parents=True, exist_ok=True)
+    args.fast_output.mkdir(parents=True, exist_ok=True)
+
+    # Temporarily move LICENSE file so it doesn't cause parsing issues
+    license_path = args.schemas / "LICENSE"
+    with NamedTemporaryFile(delete=False) as tmp_file:
         temp_license_path = Path(tmp_file.name)
+    moved = license_path.exists()
+    if moved:
+        shutil.move(license_path, temp_license_path)
     try:
-        generate(
-            input_=SCHEMA_DIR,
-            input_file_type=InputFileType.JsonSchema,
-            output=OUTPUT_DIR,
-            output_model_type=DataModelType.PydanticV2BaseModel,
-            target_python_version=PythonVersion.PY_312,
-            allow_extra_fields=False,
-            disable_timestamp=True,
-            reuse_model=True,
-            use_annotated=True,
-            field_constraints=True,
-            custom_class_name_generator=lambda x: x.title().replace("Ethdebug/Format/", "").replace("/", "_"),
-            use_exact_imports=True
-        )
+        regenerate(args.schemas, args.output, args.fast_output, args.manifest, args.incremental, args.jobs)
     finally:
         # Restore LICENSE file
-        if temp_license_path.exists():
-            temp_license_path.rename(license_path)
\ No newline at end of file
+        if moved:
+            shutil.move(temp_license_path, license_path)
+        else:
+            temp_license_path.unlink()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+"""
+Source coverage of traces.
+
+Coverage is collected in two phases. While traces are streamed, `Coverage`
+only sets the bit of every executed program counter in a bitmap per code hash
+and environment ("call" for runtime code, "create" for creation code), so
+recording costs about one set insertion per step and bitmaps of many
+transactions are merged with a bitwise or. Only at the end, `Coverage.project`
+maps the bitmaps through the `CoverageTable` of each program (the source
+ranges and branches of its instructions, by program counter) into the
+`SourceCoverage` of every source: covered bytes, lines and branches, which
+`to_lcov` exports.
+
+    coverage = Coverage()
+    for path in trace_paths:
+        with ReplayMachine(path) as machine:
+            await coverage.add_trace(await machine.trace(), registry=registry)
+    report = coverage.project(registry)
+    Path("lcov.info").write_text(to_lcov(report, sources_of(info)))
+
+Traces recorded in trace files are read column-wise, without creating a state
+per step. Bitmaps only record which instructions were executed, not how often
+or in which order, so line hits in LCOV are 0 or 1, and a direction of a
+branch (`JUMPI`) counts as taken when the first instruction of that direction
+was executed, or when the branch was executed and the other direction never
+was.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from eth_hash.auto import keccak
+
+from ethdebug.machine import MachineTrace
+from ethdebug.program.canonical import to_json
+from ethdebug.program.contexts import code_ranges, instruction_offset
+from ethdebug.replay.frames import FrameIndex
+from ethdebug.replay.machine import ReplayTrace
+from ethdebug.replay.trace_file import TraceFile
+
+if TYPE_CHECKING:
+    from ethdebug.format.program_schema import Program
+    from ethdebug.program.registry import ProgramRegistry
+
+MAGIC = b"EDCOVER\x00"
+VERSION = 1
+ENVIRONMENTS = ("call", "create")
+
+# (code hash, environment)
+Key = Tuple[bytes, str]
+
+_HEADER = struct.Struct("<8sH")
+_ENTRY = struct.Struct("<32sBQ")
+_NONE = 2 ** 64 - 1
+# Instructions that start a frame running other code
+_CALLS = ("CALL", "CALLCODE", "DELEGATECALL", "STATICCALL")
+_CREATES = ("CREATE", "CREATE2")
+
+class Coverage:
+    """
+    The executed program counters of the code of many traces, as a bitmap per code hash and environment.
+    """
+    bitmaps: Dict[Key, bytearray]
+
+    def __init__(self) -> None:
+        self.bitmaps = {}
+
+    def __len__(self) -> int:
+        return len(self.bitmaps)
+
+    def mark(self, code_hash: bytes, environment: str, pcs: Iterable[int]) -> None:
+        """
+        Mark program counters as executed.
+        """
+        pcs = pcs if isinstance(pcs, (set, frozenset)) else set(pcs)
+        if not pcs:
+            return
+        bitmap = self.bitmaps.get((code_hash, environment))
+        if bitmap is None:
+            bitmap = self.bitmaps[(code_hash, environment)] = bytearray()
+        size = max(pcs) // 8 + 1
+        if size > len(bitmap):
+            bitmap.extend(bytes(size - len(bitmap)))
+        for pc in pcs:
+            bitmap[pc >> 3] |= 1 << (pc & 7)
+
+    def is_covered(self, code_hash: bytes, environment: str, pc: int) -> bool:
+        bitmap = self.bitmaps.get((code_hash, environment))
+        return bitmap is not None and pc >> 3 < len(bitmap) and bool(bitmap[pc >> 3] >> (pc & 7) & 1)
+
+    def pcs(self, code_hash: bytes, environment: str) -> List[int]:
+        """
+        The executed program counters of some code, in increasing order.
+        """
+        bitmap = self.bitmaps.get((code_hash, environment), b"")
+        return [index * 8 + bit for index, byte in enumerate(bitmap) if byte for bit in range(8) if byte >> bit & 1]
+
+    def merge(self, other: Coverage) -> None:
+        """
+        Add the executed program counters of another coverage, e.g. of another transaction.
+        """
+        for key, bitmap in other.bitmaps.items():
+            mine = self.bitmaps.get(key)
+            if mine is None:
+                self.bitmaps[key] = bytearray(bitmap)
+                continue
+            size = max(len(mine), len(bitmap))
+            merged = int.from_bytes(mine, "little") | int.from_bytes(bitmap, "little")
+            self.bitmaps[key] = bytearray(merged.to_bytes(size, "little"))
+
+    async def add_trace(
+        self,
+        trace: MachineTrace,
+        *,
+        environment: str = "call",
+        address: Optional[str] = None,
+        registry: Optional[ProgramRegistry] = None,
+    ) -> int:
+        """
+        Mark the program counters executed in a trace, and return its number of steps.
+
+        Traces of trace files are read directly from the file. Other traces are
+        streamed state by state, and their call frames are recognized like
+        `FrameIndex.from_trace` does.
+
+        :param environment: The environment of the outermost frame, "create" for contract creations.
+        :param address: The address called by the transaction, if known.
+        :param registry: If given, the code of every frame is resolved in it, so that
+            `project` finds programs whose code does not match exactly (e.g. because of immutables).
+        """
+        if isinstance(trace, ReplayTrace):
+            return self.add_trace_file(trace.file, environment=environment, registry=registry)
+        index = FrameIndex()
+        keys: Dict[int, Optional[Key]] = {}
+        key: Optional[Key] = None
+        frame_id = None
+        pcs: set = set()
+        steps = 0
+        async for state, executing in index.stream(trace, address=address):
+            steps += 1
+            if executing != frame_id:
+                if key is not None:
+                    self.mark(*key, pcs)
+                pcs = set()
+                frame_id = executing
+                if executing not in keys:
+                    frame = index.frame(executing)
+                    kind = "create" if frame.kind in ("create", "create2") else environment if frame.kind == "root" else "call"
+                    keys[executing] = None if frame.code_hash is None else (frame.code_hash, kind)
+                    if registry is not None and frame.code_hash is not None:
+                        registry.resolve(bytes(await state.code.read(0, await state.code.length())), kind)
+                key = keys[executing]
+            pcs.add(await state.program_counter())
+        if key is not None:
+            self.mark(*key, pcs)
+        return steps
+
+    def add_trace_file(self, file: TraceFile, *, environment: str = "call", registry: Optional[ProgramRegistry] = None) -> int:
+        """
+        Mark the program counters executed in a trace file, and return its number of steps.
+
+        The steps between two changes of the executed code are marked at once.
+        A change enters a frame if it follows a call or create and starts at
+        program counter 0. Anything else returns to the innermost caller with the
+        new code, which also covers callees that fail on a call or create.
+        """
+        pcs = file.section("pc")
+        opcodes = file.section("opcode")
+        change_steps = file.section("code_change_step")
+        calls = {index for index, name in enumerate(file.opcodes) if name in _CALLS}
+        creates = {index for index, name in enumerate(file.opcodes) if name in _CREATES}
+        change_blobs = file.section("code_change_blob")
+        hashes: Dict[int, bytes] = {}
+        resolved = set()
+        # The code blob and environment of each active frame; frames that do not change the code are not seen
+        frames: List[Tuple[int, str]] = []
+        for position, step in enumerate(change_steps):
+            blob = change_blobs[position]
+            previous = opcodes[step - 1] if step > 0 else None
+            if not frames:
+                frames.append((blob, environment))
+            elif pcs[step] == 0 and (previous in calls or previous in creates):
+                frames.append((blob, "create" if previous in creates else "call"))
+            else:
+                while len(frames) > 1:
+                    frames.pop()
+                    if frames[-1][0] == blob:
+                        break
+            kind = frames[-1][1]
+            code = None
+            if blob not in hashes:
+                code = file.blob(step, "code")
+                hashes[blob] = keccak(code)
+            if registry is not None and (blob, kind) not in resolved:
+                resolved.add((blob, kind))
+                registry.resolve(code if code is not None else file.blob(step, "code"), kind)
+            end = change_steps[position + 1] if position + 1 < len(change_steps) else file.steps
+            self.mark(hashes[blob], kind, set(pcs[step:end]))
+        return file.steps
+
+    def project(self, programs: Union[ProgramRegistry, Mapping[Key, CoverageTable]]) -> Dict[Any, SourceCoverage]:
+        """
+        The coverage of the sources of the programs of all executed code, by source id.
+
+        :param programs: The coverage tables by code hash and environment, or a registry
+            to resolve the code hashes in. Code without a program is ignored.
+        """
+        sources: Dict[Any, SourceCoverage] = {}
+        tables: Dict[int, CoverageTable] = {}
+        for (code_hash, environment), bitmap in self.bitmaps.items():
+            if isinstance(programs, Mapping):
+                table = programs.get((code_hash, environment))
+            else:
+                resolution = programs.resolve_hash(code_hash, environment)
+                if resolution is None:
+                    continue
+                table = tables.get(resolution.entry.id)
+                if table is None:
+                    table = tables[resolution.entry.id] = CoverageTable.build(programs.load(resolution).json)
+            if table is not None:
+                table.project(bitmap, sources)
+        return sources
+
+    def to_bytes(self) -> bytes:
+        records = bytearray()
+        for (code_hash, environment), bitmap in self.bitmaps.items():
+            records += _ENTRY.pack(code_hash, ENVIRONMENTS.index(environment), len(bitmap)) + bitmap
+        return _HEADER.pack(MAGIC, VERSION) + zlib.compress(bytes(records))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Coverage:
+        if len(data) < _HEADER.size or data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a coverage file")
+        _, version = _HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"Unsupported coverage version {version}")
+        records = zlib.decompress(data[_HEADER.size:])
+        coverage = cls()
+        position = 0
+        while position < len(records):
+            code_hash, environment, size = _ENTRY.unpack_from(records, position)
+            position += _ENTRY.size
+            coverage.bitmaps[(code_hash, ENVIRONMENTS[environment])] = bytearray(records[position:position + size])
+            position += size
+        return coverage
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Coverage:
+        return cls.from_bytes(Path(path).read_bytes())
+
+@dataclass
+class Branch:
+    """
+    A conditional jump in a source, identified by its source range.
+
+    :param executed: Whether the jump was executed.
+    :param taken: Whether the jump was taken.
+    :param not_taken: Whether execution continued after the jump.
+    """
+    start: int
+    end: int
+    executed: bool = False
+    taken: bool = False
+    not_taken: bool = False
+
+@dataclass
+class SourceCoverage:
+    """
+    The coverage of a source: the code ranges of its instructions, and its branches.
+
+    :param ranges: Whether any instruction with a code range was executed, by range (start, end).
+    :param branches: The branches by the code range of their jump.
+    """
+    source: Any
+    ranges: Dict[Tuple[int, int], bool] = field(default_factory=dict)
+    branches: Dict[Tuple[int, int], Branch] = field(default_factory=dict)
+
+    def paint(self, length: Optional[int] = None) -> bytearray:
+        """
+        The coverage of every byte: 0 if no instruction covers it, otherwise 2 if the innermost
+        range covering it was executed and 1 if not. Bytes beyond `length` are ignored.
+        """
+        if length is None:
+            length = max((end for _, end in self.ranges), default=0)
+        painted = bytearray(length)
+        # Painting the longest ranges first leaves every byte with the state of its innermost range
+        for (start, end), executed in sorted(self.ranges.items(), key=lambda item: item[0][0] - item[0][1]):
+            end = min(end, length)
+            if start < end:
+                painted[start:end] = (b"\x02" if executed else b"\x01") * (end - start)
+        return painted
+
+    def byte_coverage(self, length: Optional[int] = None) -> Tuple[int, int]:
+        """
+        The number of covered bytes and of bytes that belong to any instruction.
+        """
+        painted = self.paint(length)
+        return painted.count(2), len(painted) - painted.count(0)
+
+    def uncovered(self, length: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        The (start, end) byte ranges of code that was not executed.
+        """
+        painted = self.paint(length)
+        result = []
+        position = painted.find(1)
+        while position >= 0:
+            end = len(painted)
+            for state in (0, 2):
+                found = painted.find(state, position)
+                if found >= 0:
+                    end = min(end, found)
+            result.append((position, end))
+            position = painted.find(1, end)
+        return result
+
+    def lines(self, contents: str) -> Dict[int, bool]:
+        """
+        Whether each line (numbered from 1) with code was executed: a line is executed when any
+        of its bytes is covered, skipping whitespace.
+        """
+        text = contents.encode()
+        painted = self.paint(len(text))
+        result: Dict[int, bool] = {}
+        start = 0
+        for number, line in enumerate(text.split(b"\n"), start=1):
+            states = {painted[offset] for offset in range(start, start + len(line)) if not text[offset:offset + 1].isspace()}
+            if states - {0}:
+                result[number] = 2 in states
+            start += len(line) + 1
+        return result
+
+class CoverageTable:
+    """
+    The source ranges and conditional jumps of the instructions of a program, by program counter.
+    """
+    sources: List[Any]
+    pcs: array
+    # The code ranges of instruction i are range_offsets[i] until range_offsets[i + 1]
+    range_offsets: array
+    range_sources: array
+    range_starts: array
+    range_ends: array
+    # The instructions that are conditional jumps, with the program counters of their targets
+    # (_NONE if unknown) and of the instructions after them
+    branch_instructions: array
+    branch_targets: array
+    branch_next: array
+
+    def __init__(self) -> None:
+        self.sources = []
+        self.pcs = array("Q")
+        self.range_offsets = array("I", [0])
+        self.range_sources = array("I")
+        self.range_starts = array("Q")
+        self.range_ends = array("Q")
+        self.branch_instructions = array("I")
+        self.branch_targets = array("Q")
+        self.branch_next = array("Q")
+
+    @classmethod
+    def build(cls, program: Union[Program, Mapping[str, Any]]) -> CoverageTable:
+        """
+        Build the table of a program. Code ranges without a `range` (the whole source)
+        and ranges that solc marks with negative offsets are left out.
+        """
+        table = cls()
+        source_ids: Dict[Any, int] = {}
+        # Converting JSON would walk all the pointers of its contexts
+        program = program if isinstance(program, Mapping) else to_json(program)
+        instructions = sorted(program.get("instructions", []), key=instruction_offset)
+        for index, instruction in enumerate(instructions):
+            table.pcs.append(instruction_offset(instruction))
+            for code in code_ranges(instruction.get("context")):
+                code_range = code.get("range")
+                if code_range is None:
+                    continue
+                start, length = _uint(code_range["offset"]), _uint(code_range["length"])
+                if start < 0 or length < 0:
+                    continue
+                source = (code.get("source") or {}).get("id")
+                if source not in source_ids:
+                    source_ids[source] = len(table.sources)
+                    table.sources.append(source)
+                table.range_sources.append(source_ids[source])
+                table.range_starts.append(start)
+                table.range_ends.append(start + length)
+            table.range_offsets.append(len(table.range_starts))
+            operation = instruction.get("operation") or {}
+            if operation.get("mnemonic") == "JUMPI":
+                target = _NONE
+                previous = (instructions[index - 1].get("operation") or {}) if index else {}
+                if previous.get("mnemonic", "").startswith("PUSH") and previous.get("arguments"):
+                    # Pushed values beyond any code are not jump targets
+                    target = min(_uint(previous["arguments"][0]), _NONE)
+                table.branch_instructions.append(index)
+                table.branch_targets.append(target)
+                table.branch_next.append(instruction_offset(instructions[index + 1]) if index + 1 < len(instructions) else _NONE)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.pcs)
+
+    def index_of(self, pc: int) -> Optional[int]:
+        index = bisect_right(self.pcs, pc) - 1
+        return index if index >= 0 and self.pcs[index] == pc else None
+
+    def project(self, bitmap: bytes, sources: Dict[Any, SourceCoverage]) -> None:
+        """
+        Add the coverage of the executed program counters in a bitmap to the coverage of the sources.
+        """
+        def executed(pc: int) -> bool:
+            return pc >> 3 < len(bitmap) and bool(bitmap[pc >> 3] >> (pc & 7) & 1)
+
+        coverages = []
+        for source in self.sources:
+            coverage = sources.get(source)
+            if coverage is None:
+                coverage = sources[source] = SourceCoverage(source)
+            coverages.append(coverage)
+        offsets, range_sources, starts, ends = self.range_offsets, self.range_sources, self.range_starts, self.range_ends
+        for index, pc in enumerate(self.pcs):
+            covered = executed(pc)
+            for position in range(offsets[index], offsets[index + 1]):
+                ranges = coverages[range_sources[position]].ranges
+                key = (starts[position], ends[position])
+                ranges[key] = ranges.get(key, False) or covered
+        for index, target, next_pc in zip(self.branch_instructions, self.branch_targets, self.branch_next):
+            start = offsets[index]
+            if start == offsets[index + 1]:
+                # Branches without a source range cannot be reported
+                continue
+            # Branches are reported at their innermost range
+            position = min(range(start, offsets[index + 1]), key=lambda position: ends[position] - starts[position])
+            branches = coverages[range_sources[position]].branches
+            key = (starts[position], ends[position])
+            branch = branches.get(key)
+            if branch is None:
+                branch = branches[key] = Branch(*key)
+            if not executed(self.pcs[index]):
+                continue
+            after = next_pc != _NONE and executed(next_pc)
+            if target == _NONE:
+                # Without a known target, the jump was taken at least once if execution never continued after it
+                taken, not_taken = not after, after
+            else:
+                taken = executed(target)
+                not_taken = after or not taken
+            branch.executed = True
+            branch.taken = branch.taken or taken
+            branch.not_taken = branch.not_taken or not_taken
+
+def sources_of(info: Mapping[str, Any]) -> Dict[Any, Tuple[str, str]]:
+    """
+    The paths and contents of the sources of a compilation, by source id, from the JSON of
+    an `Info` or of a compilation.
+    """
+    compilation = info.get("compilation", info)
+    return {
+        source["id"]: (source.get("path", str(source["id"])), source["contents"])
+        for source in compilation.get("sources", []) if "contents" in source
+    }
+
+def to_lcov(coverage: Mapping[Any, SourceCoverage], sources: Mapping[Any, Tuple[str, str]]) -> str:
+    """
+    Export the coverage of sources in the LCOV format, given the paths and contents of
+    the sources by source id (see `sources_of`). Sources without contents are left out.
+    """
+    lines = []
+    for source_id, source_coverage in coverage.items():
+        if source_id not in sources:
+            continue
+        path, contents = sources[source_id]
+        line_starts = [0]
+        text = contents.encode()
+        position = text.find(b"\n")
+        while position >= 0:
+            line_starts.append(position + 1)
+            position = text.find(b"\n", position + 1)
+        lines += ["TN:", f"SF:{path}"]
+        branches_found = branches_hit = 0
+        for block, (_, branch) in enumerate(sorted(source_coverage.branches.items())):
+            line = bisect_right(line_starts, branch.start)
+            for number, covered in enumerate((branch.not_taken, branch.taken)):
+                lines.append(f"BRDA:{line},{block},{number},{int(covered) if branch.executed else '-'}")
+                branches_found += 1
+                branches_hit += covered
+        line_coverage = source_coverage.lines(contents)
+        for line, covered in sorted(line_coverage.items()):
+            lines.append(f"DA:{line},{int(covered)}")
+        lines += [
+            f"BRF:{branches_found}",
+            f"BRH:{branches_hit}",
+            f"LF:{len(line_coverage)}",
+            f"LH:{sum(line_coverage.values())}",
+            "end_of_record",
+        ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+def _uint(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else value
@@ -1,5 +1,10 @@
+import argparse
+import asyncio
+import json
+import sys
 from dataclasses import dataclass, replace
-from typing import  AsyncIterable, Dict
+from pathlib import Path
+from typing import  AsyncIterable, Dict, List, Optional
 from ethdebug.format.pointer_schema import Pointer
 from ethdebug.format.pointer.template_schema import PointerTemplate
 from ethdebug.machine import MachineState
@@ -41,10 +46,53 @@ async def initialize_generate_regions_options(dereference_options: DereferenceOp
     """
     initial_stack_length = 0
     if dereference_options.state:
-        initial_stack_length = await dereference_options.state.stack.length
+        initial_stack_length = await dereference_options.state.stack.length()
 
     return GenerateRegionsOptions(
         templates= dereference_options.templates,
         initial_stack_length= initial_stack_length,
         state= dereference_options.state,
-    )
\ No newline at end of file
+    )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Profile dereferencing a pointer against a captured state:
+
+        python -m ethdebug.dereference profile pointer.json state.snapshot [--repeat N] [--read]
+            [--top N] [--cprofile FILE] [--stacks FILE]
+
+    The pointer document is either a pointer or an object with a `pointer` and its
+    `templates`, and the state is a snapshot recorded with `ethdebug.snapshot.RecordingState`
+    or a state saved with `InMemoryState.to_json`.
+    """
+    parser = argparse.ArgumentParser(prog="python -m ethdebug.dereference", description="Dereference ethdebug pointers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    profile_parser = commands.add_parser("profile", help="Profile dereferencing a pointer against a captured state.")
+    profile_parser.add_argument("pointer", type=Path, help="JSON of a pointer, or of an object with a pointer and templates")
+    profile_parser.add_argument("state", type=Path, help="Snapshot of a machine state, or JSON of an in-memory state")
+    profile_parser.add_argument("--repeat", type=int, default=10, help="Number of times to dereference and view the pointer")
+    profile_parser.add_argument("--read", action="store_true", help="Also read all regions through the view")
+    profile_parser.add_argument("--top", type=int, default=20, help="Number of rows of the hot-spot table")
+    profile_parser.add_argument("--cprofile", type=Path, help="Write cProfile statistics of all repetitions to a file")
+    profile_parser.add_argument("--stacks", type=Path, help="Write the self time of pointer nodes as collapsed stacks to a file")
+    args = parser.parse_args(argv)
+
+    from ethdebug.dereference.profile import load_pointer, load_state, profile
+
+    pointer, templates = load_pointer(json.loads(args.pointer.read_text()))
+    state = load_state(args.state)
+    run = profile(pointer, templates, state, repeat=args.repeat, read=args.read)
+    if args.cprofile is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        result = profiler.runcall(asyncio.run, run)
+        profiler.dump_stats(args.cprofile)
+    else:
+        result = asyncio.run(run)
+    print(result.format(args.top))
+    if args.stacks is not None:
+        args.stacks.write_text(result.stacks())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import AsyncIterable, Callable
+from time import perf_counter
+from typing import AsyncIterable, Callable, Iterable
 
+from ethdebug import instrument
 from ethdebug.data import Data
 from ethdebug.format.pointer.expression_schema import PointerExpression
 from ..machine import MachineState
@@ -21,13 +23,21 @@ class Cursor(CursorABC):
     async def view(self, state: MachineState) -> View:
         """
         View the cursor with a given MachineState
+
+        With instrumentation enabled, the calls made while viewing are collected in `View.report`.
         """
+        report = instrument.Report() if instrument.enabled else None
         regions_list = []
-        async for region in self._simple_cursor(state):
-            regions_list.append(region)
+        if report is None:
+            async for region in self._simple_cursor(state):
+                regions_list.append(region)
+        else:
+            with instrument.collecting(report):
+                async for region in self._simple_cursor(state):
+                    regions_list.append(region)
 
         regions = Regions(tuple(regions_list))
-        return View(state, regions)
+        return View(state, regions, report)
     
 class View(ViewABC):
     """
@@ -35,10 +45,13 @@ class View(ViewABC):
     """
     _state: MachineState
     _regions: Regions
+    # The instrumentation report of viewing the cursor and of reads through the view
+    report: instrument.Report | None
 
-    def __init__(self, state: MachineState, regions: Regions):
+    def __init__(self, state: MachineState, regions: Regions, report: instrument.Report | None = None):
         self._state = state
         self._regions = regions
+        self.report = report
 
     def regions(self) -> Regions:
         """
@@ -51,6 +64,9 @@ class View(ViewABC):
         Read bytes from the machine state corresponding to the bytes range
         for a particular concrete Region
         """
+        if self.report is not None:
+            with instrument.collecting(self.report):
+                return await read(region, self._state)
         return await read(region, self._state)
 
 @dataclass
@@ -65,7 +81,6 @@ class Region(RegionABC):
     offset: PointerExpression | Data | None
     length: PointerExpression | Data | None
 
-@dataclass
 class Regions(RegionsABC):
     """
     An immutable collection of concrete regions.
@@ -75,21 +90,66 @@ class Regions(RegionsABC):
 
     It also provides a couple interfaces of its own for accessing regions by
     name.
+
+    Collections created by `add` share one buffer as long as only the latest
+    collection is added to, and keep the latest region of every name, so that
+    adding a region and looking up a name don't depend on the number of regions.
     """
-    _regions: tuple[RegionABC, ...]
-    _this_region: RegionABC | None = None
+    _buffer: list[RegionABC]
+    _count: int
+    _this_region: RegionABC | None
+    _latest: dict[str, RegionABC]
+
+    def __init__(self, regions: Iterable[RegionABC], this_region: RegionABC | None = None):
+        self._buffer = list(regions)
+        self._count = len(self._buffer)
+        self._this_region = this_region
+        self._latest = {region.name: region for region in self._buffer if region.name is not None}
+
+    @classmethod
+    def _create(cls, buffer: list[RegionABC], count: int, this_region: RegionABC | None, latest: dict[str, RegionABC]) -> Regions:
+        regions = cls.__new__(cls)
+        regions._buffer = buffer
+        regions._count = count
+        regions._this_region = this_region
+        regions._latest = latest
+        return regions
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Regions):
+            return NotImplemented
+        return self.all() == other.all() and self._this_region == other._this_region
+
+    def __repr__(self) -> str:
+        return f"Regions({self.all()!r}, {self._this_region!r})"
 
     def all(self) -> tuple[RegionABC, ...]:
         """
         Get all regions in the collection
         """
-        return self._regions
-    
+        return tuple(self._buffer[:self._count])
+
+    def add(self, region: RegionABC) -> RegionsABC:
+        """
+        Add a region to the collection.
+        """
+        buffer = self._buffer
+        if len(buffer) != self._count:
+            # Another collection was created by adding to this one
+            buffer = buffer[:self._count]
+        buffer.append(region)
+        latest = self._latest
+        if region.name is not None:
+            latest = {**latest, region.name: region}
+        return Regions._create(buffer, self._count + 1, self._this_region, latest)
+
     def set_this(self, region: RegionABC) -> RegionsABC:
         """
         Replace the current `$this` region with a new one.
+
+        The region can also be looked up by its own name, as regions may refer to themselves by name.
         """
-        return Regions(self._regions, region)
+        return Regions._create(self._buffer, self._count, region, self._latest)
 
     def named(self, name: str) -> tuple[RegionABC, ...]:
         """
@@ -101,19 +161,20 @@ class Regions(RegionsABC):
         """
         if name == "$this":
             return (self._this_region,) if self._this_region else tuple()
-        return tuple(region for region in self._regions if region.name == name)
+        return tuple(region for region in self.all() if region.name == name)
 
     def lookup(self, name: str) -> RegionABC | None:
         """
-        Obtain an ordered list of all regions with a particular name.
-        
-        This is useful, e.g., when looking to concatenate a series of
-        sequential regions that were generated by index from a list
-        collection
+        Obtain the latest region with a particular name.
         """
-        if name == "$this":
+        if instrument.enabled:
+            start = perf_counter()
+            region = self._lookup(name)
+            instrument.record("lookup", "$this" if name == "$this" else "named", perf_counter() - start)
+            return region
+        return self._lookup(name)
+
+    def _lookup(self, name: str) -> RegionABC | None:
+        if name == "$this" or self._this_region is not None and self._this_region.name == name:
             return self._this_region
-        for region in reversed(self._regions):
-            if region.name == name:
-                return region
-        return None
+        return self._latest.get(name)
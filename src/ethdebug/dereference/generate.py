@@ -1,11 +1,13 @@
+from time import perf_counter
 from typing import AsyncIterable, Dict, List
 from dataclasses import dataclass, replace
+from ethdebug import instrument
 from ethdebug.dereference.cursor import Regions, Region
 from ethdebug.format.pointer.template_schema import PointerTemplate
 from ethdebug.format.pointer_schema import Pointer
 from ethdebug.machine import MachineState
 from ethdebug.data import Data
-from .memo import DereferencePointer, Memo, SaveRegions, SaveVariables
+from .memo import DereferencePointer, Memo, SaveRegions, SaveTemplates, SaveVariables
 from .process import process_pointer, ProcessState
 
 @dataclass
@@ -23,25 +25,46 @@ async def generate_regions(
     # Extract records for mutation
     regions = process_options.regions
     variables = process_options.variables
+    templates = process_options.templates
 
+    instrumented = instrument.enabled
     stack: List[Memo] = [DereferencePointer(pointer)]
     while stack:
         memo = stack.pop()
+        if instrumented:
+            start = perf_counter()
 
         memos: List[Memo] = []
         if isinstance(memo, DereferencePointer):
-            async for region in process_pointer(memo.pointer, options):
+            state = replace(process_options, regions=regions, variables=variables, templates=templates, yields=memo.yields)
+            async for region in process_pointer(memo.pointer, state):
                 if isinstance(region, Region):
-                    yield region
+                    if instrumented:
+                        # The time the consumer takes is not part of processing the memo
+                        paused = perf_counter()
+                        yield region
+                        start += perf_counter() - paused
+                    else:
+                        yield region
+                elif isinstance(region, DereferencePointer) and memo.yields:
+                    # Regions of nested pointers are renamed like the regions of the template they belong to
+                    yields = dict(memo.yields)
+                    yields.update((name, memo.yields.get(renamed, renamed)) for name, renamed in region.yields.items())
+                    memos.append(DereferencePointer(region.pointer, yields))
                 else:
                     memos.append(region)
         elif isinstance(memo, SaveRegions):
-            regions = replace(regions, regions=memo.regions)
+            for region in memo.regions.all():
+                regions = regions.add(region)
         elif isinstance(memo, SaveVariables):
-            variables.update(memo.variables)
+            variables = {**variables, **memo.variables}
+        elif isinstance(memo, SaveTemplates):
+            templates = {**templates, **memo.templates}
 
         # Add new memos to the stack in reverse order
         stack.extend(reversed(memos))
+        if instrumented:
+            instrument.record("memo", type(memo).__name__, perf_counter() - start, subject=memo)
 
 
 async def initialize_process_state(
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 from typing import Union, Dict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from ethdebug.format.pointer_schema import Pointer
+from ethdebug.format.pointer.template_schema import PointerTemplate
 from ethdebug.cursor import Regions
 from ethdebug.data import Data
 
 @dataclass
 class DereferencePointer:
     pointer: Pointer
+    # Names of the regions yielded by a template, by the names used in the template
+    yields: Dict[str, str] = field(default_factory=dict)
 
 @dataclass
 class SaveRegions:
@@ -18,5 +21,9 @@ class SaveRegions:
 class SaveVariables:
     variables: Dict[str, Data]
 
+@dataclass
+class SaveTemplates:
+    templates: Dict[str, PointerTemplate]
+
 # Union type for Memo
-Memo = Union[DereferencePointer, SaveRegions, SaveVariables]
\ No newline at end of file
+Memo = Union[DereferencePointer, SaveRegions, SaveVariables, SaveTemplates]
@@ -1,15 +1,17 @@
 from functools import singledispatch
 from typing import AsyncGenerator, Dict, List, Union
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from ethdebug.data import Data
 from ethdebug.evaluate import EvaluateOptions, evaluate
-from ethdebug.dereference.memo import DereferencePointer, Memo, SaveRegions, SaveVariables
+from ethdebug.dereference.memo import DereferencePointer, Memo, SaveRegions, SaveTemplates, SaveVariables
 from ethdebug.dereference.region import adjust_stack_length, evaluate_region
 from ethdebug.format.pointer.collection.conditional_schema import PointerCollectionConditional
 from ethdebug.format.pointer.collection.group_schema import PointerCollectionGroup
 from ethdebug.format.pointer.collection.list_schema import PointerCollectionList
 from ethdebug.format.pointer.collection.reference_schema import PointerCollectionReference
 from ethdebug.format.pointer.collection.scope_schema import PointerCollectionScope
+from ethdebug.format.pointer.collection.templates_schema import PointerCollectionTemplates
+from ethdebug.format.pointer.collection_schema import PointerCollection
 from ethdebug.format.pointer.region_schema import PointerRegion
 from ethdebug.format.pointer.template_schema import PointerTemplate
 from ethdebug.format.pointer_schema import Pointer
@@ -23,9 +25,13 @@ class ProcessState:
     stack_length_change: int
     regions: Regions
     variables: Dict[str, Data]
+    yields: Dict[str, str] = field(default_factory=dict)
 
+    def evaluate_options(self) -> EvaluateOptions:
+        return EvaluateOptions(state=self.state, regions=self.regions, variables=self.variables)
 
-Process = AsyncGenerator[Region | Memo]
+
+Process = AsyncGenerator[Union[Region, Memo], None]
 
 
 @singledispatch
@@ -33,22 +39,22 @@ async def process_pointer(pointer: Pointer, state: ProcessState) -> Process:
     raise TypeError(f"Unexpected pointer type: {type(pointer)}")
     yield None # <- If the function does not contain a yield statement, it will not be a generator function
 
+@process_pointer.register(Pointer)
+@process_pointer.register(PointerCollection)
+async def process_root(pointer: Union[Pointer, PointerCollection], state: ProcessState) -> Process:
+    async for item in process_pointer(pointer.root, state):
+        yield item
 
 @process_pointer.register(PointerRegion)
 async def process_region(region: PointerRegion, state: ProcessState) -> Process:
     adjusted = adjust_stack_length(region, state.stack_length_change)
-    evaluated_region = await evaluate_region(
-        adjusted,
-        EvaluateOptions(
-            state=state.state,
-            regions=state.regions,
-            variables=state.variables
-        )
-    )
+    evaluated_region = await evaluate_region(adjusted, state.evaluate_options())
+    if evaluated_region.name is not None:
+        evaluated_region = replace(evaluated_region, name=state.yields.get(evaluated_region.name, evaluated_region.name))
 
     yield evaluated_region
 
-    if region.root.name is not None:
+    if evaluated_region.name is not None:
         yield SaveRegions(Regions((evaluated_region,)))
 
 @process_pointer.register(PointerCollectionGroup)
@@ -58,8 +64,8 @@ async def process_group(collection: PointerCollectionGroup, options: ProcessStat
 
 @process_pointer.register(PointerCollectionList)
 async def process_list(collection: PointerCollectionList, options: ProcessState) -> Process:
-    count = (await evaluate(collection.list.count.root, options)).as_uint()
-    
+    count = (await evaluate(collection.list.count.root, options.evaluate_options())).as_uint()
+
     for index in range(count):
         yield SaveVariables({
             collection.list.each.root: Data.from_int(index)
@@ -68,7 +74,7 @@ async def process_list(collection: PointerCollectionList, options: ProcessState)
 
 @process_pointer.register(PointerCollectionConditional)
 async def process_conditional(collection: PointerCollectionConditional, options: ProcessState) -> Process:
-    condition = (await evaluate(collection.if_.root, options)).as_uint()
+    condition = (await evaluate(collection.if_.root, options.evaluate_options())).as_uint()
 
     if condition:
         yield DereferencePointer(collection.then)
@@ -83,7 +89,7 @@ async def process_scope(collection: PointerCollectionScope, options: ProcessStat
     new_variables = {}
 
     for identifier, expression in collection.define.items():
-        data = await evaluate(expression.root, replace(options, variables= all_variables))
+        data = await evaluate(expression.root, replace(options.evaluate_options(), variables=all_variables))
         all_variables[identifier] = data
         new_variables[identifier] = data
 
@@ -99,8 +105,8 @@ async def process_reference(collection: PointerCollectionReference, options: Pro
         raise ValueError(f"Unknown pointer template named {template_name}")
 
     missing_variables = [
-        identifier for identifier in template.expect
-        if identifier not in options.variables
+        identifier.root for identifier in template.expect
+        if identifier.root not in options.variables
     ]
 
     if missing_variables:
@@ -110,4 +116,10 @@ async def process_reference(collection: PointerCollectionReference, options: Pro
             f"Please ensure these variables are defined prior to this reference."
         )
 
-    yield DereferencePointer(template.for_)
\ No newline at end of file
+    yields = {name: identifier.root for name, identifier in (collection.yields or {}).items()}
+    yield DereferencePointer(template.for_, yields)
+
+@process_pointer.register(PointerCollectionTemplates)
+async def process_templates(collection: PointerCollectionTemplates, options: ProcessState) -> Process:
+    yield SaveTemplates(collection.templates)
+    yield DereferencePointer(collection.in_)
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Profiling of dereferencing a pointer against a captured machine state.
+
+`profile` dereferences and views a pointer a number of times with
+instrumentation enabled, and attributes the time and the reads to the nodes
+of the pointer: the pointers of its collections and the expression nodes
+they evaluate, identified by their JSON path in the pointer document (e.g.
+`/group/2/list/is/slot/$keccak256/0`). Run it with
+
+    python -m ethdebug.dereference profile pointer.json state.snapshot
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, RootModel
+
+from ethdebug import instrument
+from ethdebug.dereference.__main__ import DereferenceOptions, dereference
+from ethdebug.dereference.cursor import View
+from ethdebug.dereference.memo import DereferencePointer
+from ethdebug.format.pointer.collection_schema import PointerCollection
+from ethdebug.format.pointer.expression_schema import PointerExpression
+from ethdebug.format.pointer.region_schema import PointerRegion
+from ethdebug.format.pointer.template_schema import PointerTemplate
+from ethdebug.format.pointer_schema import Pointer
+from ethdebug.in_memory import InMemoryState
+from ethdebug.machine import MachineState
+from ethdebug.snapshot import Snapshot, SnapshotState
+
+_WRAPPERS = (Pointer, PointerCollection, PointerRegion, PointerExpression)
+
+# The path of the reads made through `View.read` rather than while dereferencing
+VIEW_PATH = "(view)"
+
+@dataclass
+class Node:
+    """
+    The calls of a pointer or expression node. `seconds` includes the time of
+    nested expressions, `self_seconds` does not.
+    """
+    path: str
+    kind: str
+    expression: bool = False
+    count: int = 0
+    seconds: float = 0.0
+    self_seconds: float = 0.0
+    reads: Dict[str, int] = field(default_factory=dict)
+
+@dataclass
+class Profile:
+    """
+    The result of profiling a pointer: the time of each repetition, the
+    instrumentation report of all repetitions, and the calls by node.
+    """
+    times: List[float]
+    regions: int
+    report: instrument.Report
+    nodes: Dict[str, Node]
+
+    def hot_spots(self, limit: Optional[int] = None) -> List[Node]:
+        """
+        The nodes by descending self time.
+        """
+        nodes = sorted(self.nodes.values(), key=lambda node: (-node.self_seconds, node.path))
+        return nodes if limit is None else nodes[:limit]
+
+    def format(self, limit: Optional[int] = 20) -> str:
+        """
+        A summary, the hot-spot table, and the reads by location.
+        """
+        lines = [
+            f"{len(self.times)} repetitions, {self.regions} regions, "
+            f"min {min(self.times) * 1e3:.3f} ms, mean {sum(self.times) / len(self.times) * 1e3:.3f} ms",
+            "",
+            f"{'path':<48} {'node':<32} {'count':>8} {'self ms':>10} {'total ms':>10}  reads",
+        ]
+        for node in self.hot_spots(limit):
+            reads = " ".join(f"{location}:{count}" for location, count in sorted(node.reads.items()))
+            lines.append(
+                f"{node.path:<48} {node.kind:<32} {node.count:>8} "
+                f"{node.self_seconds * 1e3:>10.3f} {node.seconds * 1e3:>10.3f}  {reads}"
+            )
+        lines += ["", f"{'location':<12} {'reads':>10} {'total ms':>10}"]
+        for (category, location), entry in sorted(self.report.entries.items()):
+            if category == "read":
+                lines.append(f"{location:<12} {entry.count:>10} {entry.seconds * 1e3:>10.3f}")
+        return "\n".join(lines)
+
+    def stacks(self) -> str:
+        """
+        The self time of the nodes in microseconds as collapsed stacks, the input of `flamegraph.pl`.
+        """
+        lines = []
+        for path, node in sorted(self.nodes.items()):
+            microseconds = round(node.self_seconds * 1e6)
+            if microseconds > 0:
+                lines.append(f"{';'.join(frames(path))} {microseconds}")
+        return "\n".join(lines) + "\n"
+
+def frames(path: str) -> List[str]:
+    """
+    The frames of a node path, with indices attached to the preceding key: `/group/2/list` is `pointer;group[2];list`.
+    """
+    result = ["pointer"]
+    for segment in path.split("/") if path.startswith("/") else [path]:
+        if not segment:
+            continue
+        if segment.isdigit() and len(result) > 1:
+            result[-1] += f"[{segment}]"
+        else:
+            result.append(segment)
+    return result
+
+def node_paths(model: Any, path: str = "") -> Dict[int, Tuple[str, str]]:
+    """
+    The JSON path and type of every model in a parsed pointer, by the id of the model.
+    """
+    paths: Dict[int, Tuple[str, str]] = {}
+
+    def visit(value: Any, path: str) -> None:
+        if isinstance(value, (list, tuple)):
+            for index, item in enumerate(value):
+                visit(item, f"{path}/{index}")
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                visit(item, f"{path}/{key}")
+        elif isinstance(value, BaseModel):
+            if id(value) not in paths:
+                paths[id(value)] = (path, type(value).__name__)
+            if isinstance(value, RootModel):
+                visit(value.root, path)
+                if isinstance(value, PointerRegion):
+                    paths[id(value)] = paths[id(value.root)] = (path, f"{value.root.location} region")
+                elif isinstance(value, _WRAPPERS) and isinstance(value.root, BaseModel):
+                    # Wrappers have the type of the node they wrap
+                    paths[id(value)] = paths[id(value.root)]
+                return
+            for name, model_field in type(value).model_fields.items():
+                item = getattr(value, name)
+                if item is not None:
+                    visit(item, f"{path}/{_json_key(name, model_field.alias)}")
+
+    visit(model, path)
+    return paths
+
+def _json_key(name: str, alias: Optional[str]) -> str:
+    """
+    The key of a field in JSON. Aliases of deferred models are not resolved, but follow
+    the naming of the generated models: `$sum` is `field_sum`, and `in` is `in_`.
+    """
+    if alias:
+        return alias
+    if name.startswith("field_"):
+        return "$" + name[len("field_"):]
+    return name.rstrip("_")
+
+class _Attribution:
+    """
+    Attributes the calls reported by the instrumentation to the nodes of a pointer.
+    """
+    def __init__(self, paths: Dict[int, Tuple[str, str]]):
+        self.paths = paths
+        self.nodes: Dict[str, Node] = {}
+        # Reads are reported before the `$read` expression that makes them
+        self.pending_reads: List[str] = []
+
+    def node(self, subject: Any) -> Optional[Node]:
+        if isinstance(subject, DereferencePointer):
+            subject = subject.pointer
+        known = self.paths.get(id(subject))
+        if known is None:
+            return None
+        path, kind = known
+        path = path or "/"
+        node = self.nodes.get(path)
+        if node is None:
+            node = self.nodes[path] = Node(path, kind)
+        return node
+
+    def __call__(self, category: str, key: str, seconds: float, count: int, subject: Any) -> None:
+        if category == "read":
+            self.pending_reads.append(key)
+            return
+        if category not in ("expression", "memo"):
+            return
+        node = self.node(subject)
+        reads, self.pending_reads = (self.pending_reads, []) if key == "Read" else ([], self.pending_reads)
+        if node is None:
+            return
+        node.expression = category == "expression"
+        node.count += count
+        node.seconds += seconds
+        for location in reads:
+            node.reads[location] = node.reads.get(location, 0) + 1
+
+    def flush_reads(self) -> None:
+        if self.pending_reads:
+            node = self.nodes.setdefault(VIEW_PATH, Node(VIEW_PATH, "View.read"))
+            for location in self.pending_reads:
+                node.count += 1
+                node.reads[location] = node.reads.get(location, 0) + 1
+            self.pending_reads.clear()
+
+    def compute_self_seconds(self) -> None:
+        """
+        Subtract the time of nested expressions. An expression is evaluated while processing
+        the nearest pointer or expression above it, while nested pointers are processed separately.
+        """
+        for node in self.nodes.values():
+            node.self_seconds = node.seconds
+        for path, node in self.nodes.items():
+            if not node.expression:
+                continue
+            parent = self.parent(path)
+            if parent is not None:
+                parent.self_seconds -= node.seconds
+        for node in self.nodes.values():
+            node.self_seconds = max(node.self_seconds, 0.0)
+
+    def parent(self, path: str) -> Optional[Node]:
+        while path.startswith("/") and path != "/":
+            path = path.rsplit("/", 1)[0] or "/"
+            if path in self.nodes:
+                return self.nodes[path]
+        return None
+
+def load_pointer(document: Dict[str, Any]) -> Tuple[Pointer, Dict[str, PointerTemplate]]:
+    """
+    Load a pointer document, either a pointer or an object with a `pointer` and its `templates`.
+    """
+    if "pointer" in document:
+        templates = {
+            name: PointerTemplate.model_validate(template) for name, template in document.get("templates", {}).items()
+        }
+        return Pointer.model_validate(document["pointer"]), templates
+    return Pointer.model_validate(document), {}
+
+def load_state(path: Path) -> MachineState:
+    """
+    Load a snapshot saved with `Snapshot.save`, or a state saved with `InMemoryState.to_json`.
+    """
+    data = path.read_bytes()
+    if Snapshot.is_snapshot(data):
+        return SnapshotState(Snapshot.from_bytes(data))
+    return InMemoryState.from_json(json.loads(data))
+
+async def profile(
+    pointer: Pointer,
+    templates: Dict[str, PointerTemplate],
+    state: MachineState,
+    repeat: int = 10,
+    read: bool = False,
+) -> Profile:
+    """
+    Dereference and view a pointer `repeat` times, and read all regions through the view if `read` is set.
+    """
+    if repeat < 1:
+        raise ValueError(f"Invalid number of repetitions {repeat}")
+    attribution = _Attribution(node_paths(pointer))
+    for name, template in templates.items():
+        attribution.paths.update(node_paths(template, f"/templates/{name}"))
+    # The first dereference builds the deferred models, which is not part of the profile
+    await dereference_and_view(pointer, templates, state, read)
+    times = []
+    regions = 0
+    with instrument.listening(attribution), instrument.instrumented() as report:
+        for _ in range(repeat):
+            start = perf_counter()
+            view = await dereference_and_view(pointer, templates, state, read)
+            times.append(perf_counter() - start)
+            attribution.flush_reads()
+            regions = len(view.regions().all())
+    attribution.compute_self_seconds()
+    return Profile(times, regions, report, attribution.nodes)
+
+async def dereference_and_view(
+    pointer: Pointer,
+    templates: Dict[str, PointerTemplate],
+    state: MachineState,
+    read: bool,
+) -> View:
+    cursor = await dereference(pointer, DereferenceOptions(state=state, templates=templates))
+    view = await cursor.view(state)
+    if read:
+        for region in view.regions().all():
+            await view.read(region)
+    return view
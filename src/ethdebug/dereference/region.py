@@ -1,11 +1,12 @@
-from functools import singledispatch
-from typing import TypeVar, Union
+from time import perf_counter
+from typing import Union
+from ethdebug import instrument
 from ethdebug.format.data.unsigned_schema import DataUnsigned
 from ethdebug.format.data.value_schema import DataValue
 from ethdebug.format.pointer.expression_schema import Arithmetic, Operands, PointerExpression, Literal
 from ethdebug.dereference.cursor import Region
 from ethdebug.data import Data
-from ethdebug.evaluate import evaluate, EvaluateOptions
+from ethdebug.evaluate import UnresolvedLookup, evaluate, EvaluateOptions
 from ethdebug.format.pointer.region.stack_schema import PointerRegionStack
 from ethdebug.format.pointer.region_schema import PointerRegion
 from dataclasses import replace
@@ -31,47 +32,59 @@ async def evaluate_region(
     If at the end of the algorithm, the region is still not fully evaluated,
     a `CircularReferenceError` is raised.
     """
-    slot = getattr(region.root, "slot", None)
-
+    name = region.root.name.root if region.root.name is not None else None
     this_region = Region(
-        name="$this",
+        name=name,
         location=region.root.location,
-        slot=slot,
-        offset=region.root.offset,
-        length=region.root.length
+        slot=as_expression(getattr(region.root, "slot", None)),
+        offset=as_expression(region.root.offset),
+        length=as_expression(region.root.length)
     )
+    instrumented = instrument.enabled
+    if instrumented:
+        start = perf_counter()
     first_itereation = True
-    
+    iterations = 0
+
     while first_itereation or not is_fixed_point(last_region, this_region):
         first_itereation = False
         last_region = this_region
-        try:
-            if isinstance(this_region.offset, PointerExpression):
-                data = await evaluate(this_region.offset, options=options.set_this(this_region))
-                this_region = replace(this_region, offset=data)
-            if isinstance(this_region.length, PointerExpression):
-                data = await evaluate(this_region.length.root, options=options.set_this(this_region))
-                this_region = replace(this_region, length=data)
-            if isinstance(this_region.slot, PointerExpression):
-                data = await evaluate(this_region.slot.root, options=options.set_this(this_region))
-                this_region = replace(this_region, slot=data)
-        except KeyError as e:
-            ...
+        iterations += 1
+        for property in ("offset", "length", "slot"):
+            expression = getattr(this_region, property)
+            if not isinstance(expression, PointerExpression):
+                continue
+            try:
+                data = await evaluate(expression.root, options=options.set_this(this_region))
+            except UnresolvedLookup:
+                # A lookup of a property of `$this` that is not evaluated yet, retried in the next iteration
+                continue
+            this_region = replace(this_region, **{property: data})
+    if instrumented:
+        instrument.record("region", this_region.location, perf_counter() - start, subject=region)
+        instrument.record("iterations", this_region.location, count=iterations)
     if not is_fully_evaluated(this_region):
         raise CircularReferenceError(
-            f"Region {getattr(region.root, 'name', '<unnamed>')} could not be fully evaluated. "
+            f"Region {name or '<unnamed>'} could not be fully evaluated. "
         )
 
-    result = replace(this_region, name=getattr(region.root, "name", None))
-    return result
+    return this_region
+
+def as_expression(value: Union[PointerExpression, int, str, dict, None]) -> Union[PointerExpression, None]:
+    """
+    The defaults of the region schemes (like the `offset` and `length` of a stack region) are not validated by the models.
+    """
+    if value is None or isinstance(value, PointerExpression):
+        return value
+    return PointerExpression.model_validate(value)
 
 def is_fully_evaluated(region: Region) -> bool:
     """
     Returns True if all properties of the region are evaluated to a value.
     """
-    return region.slot is None or isinstance(region.slot, Data) and \
-        region.offset is None or isinstance(region.offset, Data) and \
-        region.length is None or isinstance(region.length, Data)
+    return (region.slot is None or isinstance(region.slot, Data)) and \
+        (region.offset is None or isinstance(region.offset, Data)) and \
+        (region.length is None or isinstance(region.length, Data))
 
 def is_fixed_point(a: Region, b: Region) -> bool:
     """
@@ -81,26 +94,19 @@ def is_fixed_point(a: Region, b: Region) -> bool:
         type(a.offset) == type(b.offset) and \
         type(a.length) == type(b.length)
 
-@singledispatch
 def adjust_stack_length(
   region: PointerRegion,
   stack_length_change: int
 ) -> PointerRegion:
-    return region
-
-@adjust_stack_length.register(PointerRegionStack)
-def _(region: PointerRegionStack, stack_length_change: int) -> PointerRegion:
+    """
+    Shift the slot of a stack region by the change of the stack length since the pointer was dereferenced.
+    """
+    if not isinstance(region.root, PointerRegionStack) or stack_length_change == 0:
+        return region
     slot : PointerExpression
-    if stack_length_change == 0:
-        slot = region.slot
-    elif stack_length_change > 0:
-        slot = PointerExpression(root=Arithmetic(field_sum=Operands(root=[region.slot, PointerExpression(root=Literal(DataValue(root=DataUnsigned(stack_length_change))))])))
+    change = PointerExpression(root=Literal(DataValue(root=DataUnsigned(abs(stack_length_change)))))
+    if stack_length_change > 0:
+        slot = PointerExpression(root=Arithmetic(**{"$sum": Operands(root=[region.root.slot, change])}))
     else:
-        slot = PointerExpression(root=Arithmetic(field_difference=Operands(root=[region.slot, PointerExpression(root=Literal(DataValue(root=DataUnsigned(stack_length_change))))])))
-    return PointerRegion(root=PointerRegionStack(
-        location=region.location,
-        name=region.name,
-        slot=slot,
-        offset=region.offset,
-        length=region.length
-    ))
\ No newline at end of file
+        slot = PointerExpression(root=Arithmetic(**{"$difference": Operands(root=[region.root.slot, change])}))
+    return PointerRegion(root=region.root.model_copy(update={"slot": slot}))
\ No newline at end of file
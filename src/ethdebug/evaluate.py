@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from functools import singledispatch
+from functools import singledispatch, wraps
+from time import perf_counter
 import typing
+from typing import Any, Awaitable, Callable
 from ethdebug.read import read
 from ethdebug.cursor import Region, Regions
 from ethdebug.data import Data
@@ -10,6 +12,7 @@ from ethdebug.format.pointer.expression_schema import Arithmetic, Constant, Poin
 from ethdebug.format.pointer.identifier_schema import PointerIdentifier
 from ethdebug.machine import MachineState
 from eth_hash.auto import keccak
+from ethdebug import instrument
 
 @dataclass
 class EvaluateOptions:
@@ -27,14 +30,50 @@ class EvaluateOptions:
             variables=self.variables
         )
 
+class UnresolvedLookup(ValueError):
+    """
+    A lookup of a property of a region that is not evaluated yet.
+    """
+
 @singledispatch
 async def evaluate(
     expression: PointerExpression,
     options: EvaluateOptions,
 ) -> Data:
+    """
+    Evaluate an expression node, i.e. the `root` of a `PointerExpression`.
+
+    Other node types can be added with `evaluate.register`; only the evaluators
+    of this module are timed by `ethdebug.instrument`.
+    """
     raise ValueError("Unsupported expression type")
 
-@evaluate.register
+def _register(evaluator: Callable[[Any, EvaluateOptions], Awaitable[Data]]) -> Callable[[Any, EvaluateOptions], Awaitable[Data]]:
+    """
+    Register an evaluator with `evaluate`, timing it when instrumentation is enabled.
+
+    When disabled, the evaluator's coroutine is returned as is, so no coroutine is added per expression node.
+    """
+    @wraps(evaluator)
+    def dispatched(expression: Any, options: EvaluateOptions) -> Awaitable[Data]:
+        if instrument.enabled:
+            return _evaluate_instrumented(evaluator, expression, options)
+        return evaluator(expression, options)
+    evaluate.register(dispatched)
+    return evaluator
+
+async def _evaluate_instrumented(
+    evaluator: Callable[[Any, EvaluateOptions], Awaitable[Data]],
+    expression: Any,
+    options: EvaluateOptions,
+) -> Data:
+    start = perf_counter()
+    try:
+        return await evaluator(expression, options)
+    finally:
+        instrument.record("expression", expression.__class__.__name__, perf_counter() - start, subject=expression)
+
+@_register
 async def _(expression: Literal, options: EvaluateOptions) -> Data:
     """
     Evaluate a literal expression.
@@ -47,7 +86,7 @@ async def _(expression: Literal, options: EvaluateOptions) -> Data:
     else:
         raise ValueError(f"Unsupported literal type: {type(expression.root)}")
     
-@evaluate.register
+@_register
 async def _(expression: Constant, options: EvaluateOptions) -> Data:
     """
     Evaluate a constant expression.
@@ -56,7 +95,7 @@ async def _(expression: Constant, options: EvaluateOptions) -> Data:
         return Data.from_int(32)
     raise ValueError(f"Unsupported constant: {expression.root}")
 
-@evaluate.register
+@_register
 async def _(expression: Variable, options: EvaluateOptions) -> Data:
     """
     Evaluate a variable expression.
@@ -66,7 +105,7 @@ async def _(expression: Variable, options: EvaluateOptions) -> Data:
         raise ValueError(f"Unknown variable: {expression.root.root}")
     return data
 
-@evaluate.register
+@_register
 async def _(expression: Arithmetic, options: EvaluateOptions) -> Data:
    """
    Evaluate an arithmetic expression.
@@ -181,7 +220,7 @@ async def evaluate_arithmetic_remainder(
     result = a.as_uint() % b.as_uint()
     return Data.from_int(result).pad_until_at_least(max(len(a), len(b)))
 
-@evaluate.register
+@_register
 async def _(expression: Resize, options: EvaluateOptions) -> Data:
     """
     Evaluate a resize expression.
@@ -213,7 +252,7 @@ async def _(expression: Resize, options: EvaluateOptions) -> Data:
     # Resize the result
     return result.resize_to(new_size)
 
-@evaluate.register
+@_register
 async def _(expression: Keccak256, options: EvaluateOptions) -> Data:
     """
     Evaluate a keccack256 expression.
@@ -223,10 +262,15 @@ async def _(expression: Keccak256, options: EvaluateOptions) -> Data:
     for operand in expression.field_keccak256:
         subs.append(await evaluate(operand.root, options))
     preimage = Data.zero().concat(*subs)
+    if instrument.enabled:
+        start = perf_counter()
+        hash = Data.from_bytes(keccak(preimage))
+        instrument.record("keccak", f"{(len(preimage) + 31) // 32 * 32} bytes", perf_counter() - start)
+        return hash
     hash = Data.from_bytes(keccak(preimage))
     return hash
 
-@evaluate.register
+@_register
 async def _(expression: Lookup, options: EvaluateOptions) -> Data:
     """
     Evaluate a lookup expression.
@@ -244,38 +288,49 @@ async def _(expression: Lookup, options: EvaluateOptions) -> Data:
     if reference is None:
         raise ValueError(f"Invalid lookup operation: {expression.root}")
     
-    region = options.regions.lookup(str(reference.root))
+    region = options.regions.lookup(reference_name(reference))
     if region is None:
-        raise ValueError(f"Regiond not found: {reference.root}")
+        raise ValueError(f"Regiond not found: {reference_name(reference)}")
     
     data = region_lookup(property, region)
 
     if data is None:
-        raise ValueError(f'Region named {reference.root} does not have ${property} needed by lookup')
+        raise ValueError(f'Region named {reference_name(reference)} does not have ${property} needed by lookup')
     return data
 
-@evaluate.register
+@_register
 async def _(expression: Read, options: EvaluateOptions) -> Data:
     """
     Evaluate a read expression.
     """
     identifier = expression.field_read
-    region = options.regions.lookup(str(identifier))
+    region = options.regions.lookup(reference_name(identifier))
     if region is None:
-        raise ValueError(f"Regiond not found: {identifier}")
+        raise ValueError(f"Regiond not found: {reference_name(identifier)}")
     data = await read(region, options.state)
     return data
 
 
+def reference_name(reference: Reference) -> str:
+    """
+    The name of the region a reference refers to, `$this` is not a valid identifier and is kept as a plain string.
+    """
+    name = reference.root
+    return name if isinstance(name, str) else name.root
+
 def region_lookup(
     property: typing.Literal['.slot', '.offset', '.length'],
     region: Region
 ) -> Data | None:
     if property == '.slot':
-        return region.slot
+        data = region.slot
     elif property == '.offset':
-        return region.offset
+        data = region.offset
     elif property == '.length':
-        return region.length
+        data = region.length
     else:
-        raise ValueError(f"Invalid property: {property}")
\ No newline at end of file
+        raise ValueError(f"Invalid property: {property}")
+    if isinstance(data, PointerExpression):
+        # Only the `$this` region is looked up while its properties are evaluated
+        raise UnresolvedLookup(f"Property {property} of region {region.name or '$this'} is not evaluated yet")
+    return data
\ No newline at end of file
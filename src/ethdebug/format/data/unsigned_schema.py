@@ -5,10 +5,13 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from pydantic import Field, RootModel
+from pydantic import ConfigDict, Field, RootModel
 
 
-class DataUnsigned(RootModel[int]):
+class DataUnsigned(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         int,
         Field(
@@ -5,13 +5,16 @@ from __future__ import annotations
 
 from typing import Annotated, Union
 
-from pydantic import Field, RootModel
+from pydantic import ConfigDict, Field, RootModel
 
 from .hex_schema import DataHex
 from .unsigned_schema import DataUnsigned
 
 
-class DataValue(RootModel[Union[DataUnsigned, DataHex]]):
+class DataValue(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         Union[DataUnsigned, DataHex],
         Field(
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from typing import Annotated, Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..materials.compilation_schema import MaterialsCompilation
 from ..pointer.template_schema import PointerTemplate
@@ -13,6 +13,9 @@ from ..type_schema import Type
 
 
 class InfoResources(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     types: Annotated[
         Dict[str, Type],
         Field(
@@ -28,6 +31,3 @@ class InfoResources(BaseModel):
         ),
     ]
     compilation: Optional[MaterialsCompilation] = None
-
-
-InfoResources.model_rebuild()
@@ -5,12 +5,15 @@ from __future__ import annotations
 
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .materials.compilation_schema import MaterialsCompilation
 from .program_schema import Program
 
 
 class Info(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     programs: List[Program]
     compilation: MaterialsCompilation
@@ -5,13 +5,16 @@ from __future__ import annotations
 
 from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .id_schema import MaterialsId
 from .source_schema import MaterialsSource
 
 
 class Compiler(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     name: Annotated[str, Field(description='Compiler name')]
     version: Annotated[
         str,
@@ -23,9 +26,15 @@ class Compiler(BaseModel):
 
 class Settings(BaseModel):
     pass
+    model_config = ConfigDict(
+        defer_build=True,
+    )
 
 
 class MaterialsCompilation(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     id: Annotated[
         MaterialsId,
         Field(
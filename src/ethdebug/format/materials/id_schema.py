@@ -5,10 +5,13 @@ from __future__ import annotations
 
 from typing import Annotated, Union
 
-from pydantic import Field, RootModel
+from pydantic import ConfigDict, Field, RootModel
 
 
-class MaterialsId(RootModel[Union[float, str]]):
+class MaterialsId(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         Union[float, str],
         Field(
@@ -6,7 +6,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .id_schema import MaterialsId
 
@@ -17,5 +17,8 @@ class Type(Enum):
 
 
 class MaterialsReference(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     id: MaterialsId
     type: Optional[Type] = None
@@ -5,13 +5,16 @@ from __future__ import annotations
 
 from typing import Annotated, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..data.value_schema import DataValue
 from .reference_schema import MaterialsReference
 
 
 class Range(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     offset: Annotated[
         DataValue, Field(description='Byte offset at beginning of range.\n')
     ]
@@ -21,6 +24,9 @@ class Range(BaseModel):
 
 
 class MaterialsSourceRange(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     compilation: Annotated[
         Optional[MaterialsReference], Field(title='Compilation reference by ID')
     ] = None
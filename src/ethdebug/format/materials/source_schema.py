@@ -5,12 +5,15 @@ from __future__ import annotations
 
 from typing import Annotated, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .id_schema import MaterialsId
 
 
 class MaterialsSource(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     id: Annotated[
         MaterialsId,
         Field(
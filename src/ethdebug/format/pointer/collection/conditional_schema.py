@@ -7,17 +7,17 @@ from typing import Annotated, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from ...pointer_schema import Pointer
 from ..expression_schema import PointerExpression
 
 
 class PointerCollectionConditional(BaseModel):
     model_config = ConfigDict(
         extra='forbid',
+        defer_build=True,
     )
     if_: Annotated[PointerExpression, Field(alias='if')]
     then: Pointer
     else_: Annotated[Optional[Pointer], Field(alias='else')] = None
 
 
-PointerCollectionConditional.model_rebuild()
+from ...pointer_schema import Pointer
@@ -7,14 +7,13 @@ from typing import Annotated, List
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from ...pointer_schema import Pointer
-
 
 class PointerCollectionGroup(BaseModel):
     model_config = ConfigDict(
         extra='forbid',
+        defer_build=True,
     )
     group: Annotated[List[Pointer], Field(min_length=1)]
 
 
-PointerCollectionGroup.model_rebuild()
+from ...pointer_schema import Pointer
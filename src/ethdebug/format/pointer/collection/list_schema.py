@@ -7,12 +7,14 @@ from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from ...pointer_schema import Pointer
 from ..expression_schema import PointerExpression
 from ..identifier_schema import PointerIdentifier
 
 
 class List(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     count: Annotated[
         PointerExpression,
         Field(description='The size of the list that this collection represents.\n'),
@@ -35,8 +37,9 @@ class List(BaseModel):
 class PointerCollectionList(BaseModel):
     model_config = ConfigDict(
         extra='forbid',
+        defer_build=True,
     )
     list: List
 
 
-List.model_rebuild()
+from ...pointer_schema import Pointer
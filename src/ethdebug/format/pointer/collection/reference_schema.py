@@ -13,6 +13,7 @@ from ..identifier_schema import PointerIdentifier
 class PointerCollectionReference(BaseModel):
     model_config = ConfigDict(
         extra='forbid',
+        defer_build=True,
     )
     template: Annotated[PointerIdentifier, Field(title='Template identifier')]
     yields: Annotated[
@@ -5,10 +5,13 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from pydantic import Field, RootModel
+from pydantic import ConfigDict, Field, RootModel
 
 
-class PointerIdentifier(RootModel[str]):
+class PointerIdentifier(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         str,
         Field(
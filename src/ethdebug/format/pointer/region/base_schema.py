@@ -6,7 +6,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from ..identifier_schema import PointerIdentifier
 
@@ -22,5 +22,8 @@ class Location(Enum):
 
 
 class PointerRegionBase(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     name: Optional[PointerIdentifier] = None
     location: Location
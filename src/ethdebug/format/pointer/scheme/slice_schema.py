@@ -5,12 +5,15 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..expression_schema import PointerExpression
 
 
 class PointerSchemeSlice(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     offset: Annotated[
         PointerExpression,
         Field(
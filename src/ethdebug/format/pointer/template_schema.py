@@ -7,13 +7,13 @@ from typing import Annotated, List
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from ..pointer_schema import Pointer
 from .identifier_schema import PointerIdentifier
 
 
 class PointerTemplate(BaseModel):
     model_config = ConfigDict(
         extra='forbid',
+        defer_build=True,
     )
     expect: Annotated[
         List[PointerIdentifier],
@@ -23,3 +23,6 @@ class PointerTemplate(BaseModel):
         ),
     ]
     for_: Annotated[Pointer, Field(alias='for')]
+
+
+from ..pointer_schema import Pointer
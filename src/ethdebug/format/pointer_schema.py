@@ -5,13 +5,15 @@ from __future__ import annotations
 
 from typing import Annotated, Union
 
-from pydantic import Field, RootModel
+from pydantic import ConfigDict, Field, RootModel
 
-from .pointer.collection_schema import PointerCollection
 from .pointer.region_schema import PointerRegion
 
 
-class Pointer(RootModel[Union[PointerRegion, PointerCollection]]):
+class Pointer(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         Union[PointerRegion, PointerCollection],
         Field(
@@ -317,4 +319,4 @@ class Pointer(RootModel[Union[PointerRegion, PointerCollection]]):
     ]
 
 
-Pointer.model_rebuild()
+from .pointer.collection_schema import PointerCollection
@@ -3,10 +3,13 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from ...materials.source_range_schema import MaterialsSourceRange
 
 
 class ProgramContextCode(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     code: MaterialsSourceRange
@@ -5,8 +5,11 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ProgramContextFrame(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     frame: Annotated[str, Field(title='Relevant compilation frame')]
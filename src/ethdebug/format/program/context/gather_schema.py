@@ -5,12 +5,15 @@ from __future__ import annotations
 
 from typing import Annotated, List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..context_schema import ProgramContext
 
 
 class ProgramContextGather(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     gather: Annotated[
         List[ProgramContext], Field(min_length=2, title='Contexts to gather')
     ]
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from typing import Annotated, List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ...materials.source_range_schema import MaterialsSourceRange
 from ...pointer_schema import Pointer
@@ -14,10 +14,16 @@ from ...type_schema import Type
 
 
 class ProgramContextVariables(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     variables: Annotated[List[Variable], Field(min_length=1)]
 
 
 class Variable(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     identifier: Annotated[Optional[str], Field(min_length=1)] = None
     declaration: Annotated[
         Optional[MaterialsSourceRange],
@@ -35,6 +41,3 @@ class Variable(BaseModel):
         Optional[Pointer],
         Field(description='Allocation information for the variable, if it exists.\n'),
     ] = None
-
-
-ProgramContextVariables.model_rebuild()
@@ -3,8 +3,11 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ProgramContext(BaseModel):
     pass
+    model_config = ConfigDict(
+        defer_build=True,
+    )
@@ -5,13 +5,16 @@ from __future__ import annotations
 
 from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..data.value_schema import DataValue
 from .context_schema import ProgramContext
 
 
 class Operation(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     mnemonic: Annotated[
         str, Field(description='The mnemonic operation code (PUSH1, e.g.)')
     ]
@@ -25,6 +28,9 @@ class Operation(BaseModel):
 
 
 class ProgramInstruction(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     offset: Annotated[
         DataValue,
         Field(
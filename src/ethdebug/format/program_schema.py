@@ -6,7 +6,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from .materials.reference_schema import MaterialsReference
 from .materials.source_range_schema import MaterialsSourceRange
@@ -20,11 +20,17 @@ class Environment(Enum):
 
 
 class Contract(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     name: Optional[str] = None
     definition: MaterialsSourceRange
 
 
 class Program(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     compilation: Annotated[
         Optional[MaterialsReference],
         Field(
@@ -1,32 +1,31 @@
 # generated by datamodel-codegen:
 #   filename:  type/base.schema.yaml
+# The discriminated unions of this module were applied by hand, because the format/schemas submodule was not
+# checked out when generate_model.py started to infer them. Keep it in sync by hand until the submodule is
+# available and test_models_are_generated can regenerate it.
 
 from __future__ import annotations
 
 from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, ConfigDict, Discriminator, Field, RootModel, Tag
 
 from .reference_schema import TypeReference
 
 
 class Elementarytype(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
     kind: str
     contains: Optional[Any] = None
 
 
-class TypeBase(RootModel[Union[Elementarytype, Complextype]]):
-    root: Annotated[
-        Union[Elementarytype, Complextype],
-        Field(
-            description='Defines the minimally necessary schema for a data type. Types belong to a particular `class` (`"elementary"` or `"complex"`), and are further identified by a particular `kind`.',
-            title='ethdebug/format/type/base',
-        ),
-    ]
-
-
 class Complextype(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[
         Literal['complex'],
         Field(alias='class', description='Indicates that this is a complex type'),
@@ -45,10 +44,16 @@ class Complextype(BaseModel):
 
 
 class Typewrapper(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     type: Union[TypeBase, TypeReference]
 
 
-class Typewrapperarray(RootModel[List[Typewrapper]]):
+class Typewrapperarray(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         List[Typewrapper],
         Field(
@@ -58,9 +63,35 @@ class Typewrapperarray(RootModel[List[Typewrapper]]):
     ]
 
 
-class Typewrapperobject(RootModel[Optional[Dict[str, Typewrapper]]]):
+class Typewrapperobject(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Optional[Dict[str, Typewrapper]] = None
 
 
-TypeBase.model_rebuild()
-Complextype.model_rebuild()
+_TYPE_BASE_TAGS = {'elementary': 'Elementarytype', 'complex': 'Complextype'}
+
+
+def _type_base_tag(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        return _TYPE_BASE_TAGS.get(value.get('class', 'elementary'))
+    name = type(value).__name__
+    return name if name in _TYPE_BASE_TAGS.values() else None
+
+
+class TypeBase(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
+    root: Annotated[
+        Union[
+            Annotated[Elementarytype, Tag('Elementarytype')],
+            Annotated[Complextype, Tag('Complextype')],
+        ],
+        Field(
+            description='Defines the minimally necessary schema for a data type. Types belong to a particular `class` (`"elementary"` or `"complex"`), and are further identified by a particular `kind`.',
+            discriminator=Discriminator(_type_base_tag),
+            title='ethdebug/format/type/base',
+        ),
+    ]
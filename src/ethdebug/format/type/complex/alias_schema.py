@@ -5,13 +5,16 @@ from __future__ import annotations
 
 from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..definition_schema import TypeDefinition
 from ..wrapper_schema import TypeWrapper
 
 
 class TypeComplexAlias(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['complex'], Field(alias='class')] = 'complex'
     kind: Literal['alias']
     contains: TypeWrapper
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from typing import Annotated, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, ConfigDict, Field, RootModel
 
 from ..definition_schema import TypeDefinition
 from ..elementary.contract_schema import TypeElementaryContract
@@ -22,6 +22,9 @@ class Parameters(TypeWrapper):
 
 
 class Contains(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     parameters: Parameters
     returns: Annotated[
         Optional[Union[TypeWrapper_1, Parameters]],
@@ -40,6 +43,9 @@ class Contains(BaseModel):
 
 
 class Type_Complex_Function(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['complex'], Field(alias='class')] = 'complex'
     kind: Literal['function'] = 'function'
     contains: Annotated[
@@ -55,6 +61,9 @@ class Type_Complex_Function(BaseModel):
 
 
 class Contains1(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     parameters: Parameters
     returns: Annotated[
         Optional[Union[TypeWrapper_1, Parameters]],
@@ -66,6 +75,9 @@ class Contains1(BaseModel):
 
 
 class TypeComplexFunction2(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['complex'], Field(alias='class')] = 'complex'
     kind: Literal['function'] = 'function'
     contains: Annotated[
@@ -80,9 +92,10 @@ class TypeComplexFunction2(BaseModel):
     external: Literal[False] = False
 
 
-class TypeComplexFunction(
-    RootModel[Union[Type_Complex_Function, TypeComplexFunction2]]
-):
+class TypeComplexFunction(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         Union[Type_Complex_Function, TypeComplexFunction2],
         Field(
@@ -5,17 +5,23 @@ from __future__ import annotations
 
 from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..wrapper_schema import TypeWrapper
 
 
 class Contains(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     key: TypeWrapper
     value: TypeWrapper
 
 
 class TypeComplexMapping(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['complex'], Field(alias='class')] = 'complex'
     kind: Literal['mapping']
     contains: Annotated[Contains, Field(title='Mapping key/value types')]
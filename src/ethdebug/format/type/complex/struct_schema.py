@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from typing import Annotated, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..definition_schema import TypeDefinition
 from ..wrapper_schema import TypeWrapper
@@ -16,6 +16,9 @@ class Memberfield(TypeWrapper):
 
 
 class TypeComplexStruct(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['complex'], Field(alias='class')] = 'complex'
     kind: Literal['struct']
     contains: List[Memberfield]
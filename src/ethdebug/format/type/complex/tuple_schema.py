@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from typing import Annotated, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..wrapper_schema import TypeWrapper
 
@@ -20,6 +20,9 @@ class Element(TypeWrapper):
 
 
 class TypeComplexTuple(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['complex'], Field(alias='class')] = 'complex'
     kind: Literal['tuple']
     contains: List[Element]
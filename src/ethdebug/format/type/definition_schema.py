@@ -5,22 +5,31 @@ from __future__ import annotations
 
 from typing import Annotated, Optional, Union
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, ConfigDict, Field, RootModel
 
 from ..materials.source_range_schema import MaterialsSourceRange
 
 
 class Type_Definition(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     name: str
     location: Optional[MaterialsSourceRange] = None
 
 
 class TypeDefinition2(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     name: Optional[str] = None
     location: MaterialsSourceRange
 
 
-class TypeDefinition(RootModel[Union[Type_Definition, TypeDefinition2]]):
+class TypeDefinition(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         Union[Type_Definition, TypeDefinition2],
         Field(
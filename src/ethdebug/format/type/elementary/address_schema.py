@@ -5,10 +5,13 @@ from __future__ import annotations
 
 from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TypeElementaryAddress(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
     kind: Literal['address']
     payable: Annotated[
@@ -5,12 +5,15 @@ from __future__ import annotations
 
 from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ...data.unsigned_schema import DataUnsigned
 
 
 class TypeElementaryBytes(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
     kind: Literal['bytes']
     size: Annotated[
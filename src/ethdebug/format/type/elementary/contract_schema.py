@@ -5,12 +5,15 @@ from __future__ import annotations
 
 from typing import Annotated, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, ConfigDict, Field, RootModel
 
 from ..definition_schema import TypeDefinition
 
 
 class Type_Elementary_Contract(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
     kind: Literal['contract']
     payable: Annotated[
@@ -25,6 +28,9 @@ class Type_Elementary_Contract(BaseModel):
 
 
 class TypeElementaryContract2(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
     kind: Literal['contract']
     payable: Annotated[
@@ -41,6 +47,9 @@ class TypeElementaryContract2(BaseModel):
 
 
 class TypeElementaryContract3(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     class_: Annotated[Literal['elementary'], Field(alias='class')] = 'elementary'
     kind: Literal['contract']
     payable: Annotated[
@@ -56,13 +65,10 @@ class TypeElementaryContract3(BaseModel):
     ]
 
 
-class TypeElementaryContract(
-    RootModel[
-        Union[
-            Type_Elementary_Contract, TypeElementaryContract2, TypeElementaryContract3
-        ]
-    ]
-):
+class TypeElementaryContract(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         Union[
             Type_Elementary_Contract, TypeElementaryContract2, TypeElementaryContract3
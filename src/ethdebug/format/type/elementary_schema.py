@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Kind(Enum):
@@ -22,4 +22,7 @@ class Kind(Enum):
 
 
 class TypeElementary(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     kind: Kind
@@ -11,5 +11,6 @@ from pydantic import BaseModel, ConfigDict
 class TypeReference(BaseModel):
     model_config = ConfigDict(
         extra='forbid',
+        defer_build=True,
     )
     id: Union[str, float]
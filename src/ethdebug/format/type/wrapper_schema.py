@@ -5,14 +5,20 @@ from __future__ import annotations
 
 from typing import Annotated, Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, ConfigDict, Field, RootModel
 
 
 class TypeWrapper(BaseModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     type: Any
 
 
-class Array(RootModel[List[TypeWrapper]]):
+class Array(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[
         List[TypeWrapper],
         Field(
@@ -22,5 +28,8 @@ class Array(RootModel[List[TypeWrapper]]):
     ]
 
 
-class Object(RootModel[Optional[Dict[str, TypeWrapper]]]):
+class Object(RootModel):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Optional[Dict[str, TypeWrapper]] = None
@@ -0,0 +1,78 @@
+"""
+Conversion between the msgspec models of `ethdebug.format_fast` and the
+pydantic models of `ethdebug.format`.
+
+Both packages are generated from the same schemas, so every model of
+`ethdebug.format_fast` has a pydantic counterpart with the same name in the
+corresponding module of `ethdebug.format`.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any, Optional, Type, TypeVar
+
+import msgspec
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+_FAST = "ethdebug.format_fast"
+_PYDANTIC = "ethdebug.format"
+
+def pydantic_model(fast_type: type) -> Type[BaseModel]:
+    """
+    Get the pydantic model that corresponds to a msgspec model.
+    """
+    module = fast_type.__module__
+    if not module.startswith(_FAST + "."):
+        raise ValueError(f"{fast_type.__qualname__} is not a model of {_FAST}")
+    return getattr(importlib.import_module(_PYDANTIC + module[len(_FAST):]), fast_type.__qualname__)
+
+def fast_type(model: Type[BaseModel]) -> Any:
+    """
+    Get the msgspec model that corresponds to a pydantic model.
+
+    Pydantic root models correspond to type aliases, which are returned as is.
+    """
+    module = model.__module__
+    if not module.startswith(_PYDANTIC + "."):
+        raise ValueError(f"{model.__qualname__} is not a model of {_PYDANTIC}")
+    return getattr(importlib.import_module(_FAST + module[len(_PYDANTIC):]), model.__qualname__)
+
+def to_pydantic(value: msgspec.Struct, model: Optional[Type[M]] = None) -> M:
+    """
+    Convert a msgspec model to its pydantic counterpart, or to `model` if given.
+
+    The value is validated by the pydantic model. Fields that hold their
+    default value are left out, so they are unset in the pydantic model as
+    if they were omitted from the decoded document.
+    """
+    if model is None:
+        model = pydantic_model(type(value))  # type: ignore[assignment]
+    return model.model_validate(_to_builtins(value))  # type: ignore[union-attr]
+
+def from_pydantic(value: BaseModel, type_: Any = None) -> Any:
+    """
+    Convert a pydantic model to its msgspec counterpart, or to `type_` if given.
+    """
+    if type_ is None:
+        type_ = fast_type(type(value))
+    return msgspec.convert(value.model_dump(mode="json", by_alias=True, exclude_unset=True), type_)
+
+def _to_builtins(value: Any) -> Any:
+    if isinstance(value, msgspec.Struct):
+        config = value.__struct_config__
+        result = {} if config.tag_field is None else {config.tag_field: config.tag}
+        for field in msgspec.structs.fields(value):
+            item = getattr(value, field.name)
+            if field.default is not msgspec.NODEFAULT and item == field.default:
+                continue
+            if field.default_factory is not msgspec.NODEFAULT and item == field.default_factory():
+                continue
+            result[field.encode_name] = _to_builtins(item)
+        return result
+    if isinstance(value, (list, tuple)):
+        return [_to_builtins(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_builtins(item) for key, item in value.items()}
+    return msgspec.to_builtins(value)
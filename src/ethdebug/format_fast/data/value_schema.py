@@ -0,0 +1,20 @@
+# generated by datamodel-codegen:
+#   filename:  data/value.schema.yaml
+
+from __future__ import annotations
+
+from typing import Annotated, Union
+
+from msgspec import Meta
+
+from .hex_schema import DataHex
+from .unsigned_schema import DataUnsigned
+
+DataValue = Annotated[
+    Union[DataUnsigned, DataHex],
+    Meta(
+        description='A non-negative integer value, expressed either as a native JSON number or as\na `0x`-prefixed hexadecimal string.\n',
+        examples=['0x0000', 2],
+        title='ethdebug/format/data/value',
+    ),
+]
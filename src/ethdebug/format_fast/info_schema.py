@@ -0,0 +1,16 @@
+# generated by datamodel-codegen:
+#   filename:  info.schema.yaml
+
+from __future__ import annotations
+
+from typing import List
+
+from msgspec import Struct
+
+from .materials.compilation_schema import MaterialsCompilation
+from .program_schema import Program
+
+
+class Info(Struct):
+    programs: List[Program]
+    compilation: MaterialsCompilation
@@ -0,0 +1,21 @@
+# generated by datamodel-codegen:
+#   filename:  materials/reference.schema.yaml
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Optional
+
+from msgspec import Struct
+
+from .id_schema import MaterialsId
+
+
+class Type(Enum):
+    compilation = 'compilation'
+    source = 'source'
+
+
+class MaterialsReference(Struct):
+    id: MaterialsId
+    type: Optional[Type] = None
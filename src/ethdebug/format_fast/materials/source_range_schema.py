@@ -0,0 +1,34 @@
+# generated by datamodel-codegen:
+#   filename:  materials/source-range.schema.yaml
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+from msgspec import Meta, Struct
+
+from ..data.value_schema import DataValue
+from .reference_schema import MaterialsReference
+
+
+class Range(Struct):
+    offset: Annotated[
+        DataValue, Meta(description='Byte offset at beginning of range.\n')
+    ]
+    length: Annotated[DataValue, Meta(description='Number of bytes contained in range')]
+
+
+class MaterialsSourceRange(Struct):
+    source: Annotated[MaterialsReference, Meta(title='Source reference by ID')]
+    compilation: Optional[
+        Annotated[MaterialsReference, Meta(title='Compilation reference by ID')]
+    ] = None
+    range: Optional[
+        Annotated[
+            Range,
+            Meta(
+                description='Ranges that span the entire source contents **may** omit this field\nas a shorthand. This field is otherwise **required**.\n',
+                title='Bytes range within source contents',
+            ),
+        ]
+    ] = None
@@ -0,0 +1,2 @@
+# generated by datamodel-codegen:
+#   filename:  schemas
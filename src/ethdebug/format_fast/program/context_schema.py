@@ -0,0 +1,10 @@
+# generated by datamodel-codegen:
+#   filename:  program/context.schema.yaml
+
+from __future__ import annotations
+
+from msgspec import Struct
+
+
+class ProgramContext(Struct):
+    pass
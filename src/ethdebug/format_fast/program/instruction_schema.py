@@ -0,0 +1,44 @@
+# generated by datamodel-codegen:
+#   filename:  program/instruction.schema.yaml
+
+from __future__ import annotations
+
+from typing import Annotated, List, Optional
+
+from msgspec import Meta, Struct
+
+from ..data.value_schema import DataValue
+from .context_schema import ProgramContext
+
+
+class Operation(Struct):
+    mnemonic: Annotated[
+        str, Meta(description='The mnemonic operation code (PUSH1, e.g.)')
+    ]
+    arguments: Optional[
+        Annotated[
+            List[DataValue],
+            Meta(description='The immediate arguments to the operation, if relevant.'),
+        ]
+    ] = None
+
+
+class ProgramInstruction(Struct):
+    offset: Annotated[
+        DataValue,
+        Meta(
+            description="The byte offset where the instruction begins within the bytecode.\n\nFor legacy contract bytecode (non-EOF), this value is equivalent to the\ninstruction's program counter. For EOF bytecode, this value **must** be\nthe offset from the start of the container, not the start of a particular\ncode section within that container.\n",
+            title='Instruction byte offset',
+        ),
+    ]
+    operation: Optional[
+        Annotated[Operation, Meta(title='Machine operation information')]
+    ] = None
+    context: Optional[
+        Annotated[
+            ProgramContext,
+            Meta(
+                description='The context known to exist following the execution of this instruction.\n\nThis field is **optional**. Omitting it is equivalent to specifying the\nempty context value (`{}`).\n'
+            ),
+        ]
+    ] = {}
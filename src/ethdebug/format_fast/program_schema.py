@@ -0,0 +1,56 @@
+# generated by datamodel-codegen:
+#   filename:  program.schema.yaml
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Annotated, List, Optional
+
+from msgspec import Meta, Struct
+
+from .materials.reference_schema import MaterialsReference
+from .materials.source_range_schema import MaterialsSourceRange
+from .program.context_schema import ProgramContext
+from .program.instruction_schema import ProgramInstruction
+
+
+class Environment(Enum):
+    call = 'call'
+    create = 'create'
+
+
+class Contract(Struct):
+    definition: MaterialsSourceRange
+    name: Optional[str] = None
+
+
+class Program(Struct):
+    contract: Contract
+    environment: Annotated[
+        Environment,
+        Meta(
+            description='Whether this bytecode is for contract creation or runtime calls.\n',
+            title='Bytecode execution environment',
+        ),
+    ]
+    instructions: Annotated[
+        List[ProgramInstruction],
+        Meta(description='The full array of instructions for the bytecode.\n'),
+    ]
+    compilation: Optional[
+        Annotated[
+            MaterialsReference,
+            Meta(
+                description='A reference to the compilation as an `{ "id": ... }` object.\n',
+                title='Compilation reference by ID',
+            ),
+        ]
+    ] = None
+    context: Optional[
+        Annotated[
+            ProgramContext,
+            Meta(
+                description='The context known to exist prior to the execution of the first\ninstruction in the bytecode.\n\nThis field is **optional**. Omitting it is equivalent to specifying the\nempty context value (`{}`).\n'
+            ),
+        ]
+    ] = {}
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional
+
+from ethdebug.data import Data
+
+WORD_SIZE = 32
+
+class InMemoryState:
+    """
+    A `MachineState` whose data is held in memory, e.g. for tests, benchmarks, or states captured from another machine.
+
+    The stack is given from bottom to top, storage slots that are not given read as zero.
+    """
+    def __init__(
+        self,
+        stack: Iterable[bytes] = (),
+        memory: bytes = b"",
+        storage: Optional[Dict[int, bytes]] = None,
+        transient: Optional[Dict[int, bytes]] = None,
+        calldata: bytes = b"",
+        returndata: bytes = b"",
+        code: bytes = b"",
+        trace_index: int = 0,
+        program_counter: int = 0,
+        opcode: str = "STOP",
+    ):
+        self.stack = InMemoryStack(list(stack))
+        self.memory = InMemoryBytes(memory)
+        self.storage = InMemoryStorage(storage or {})
+        self.transient = InMemoryStorage(transient or {})
+        self.calldata = InMemoryBytes(calldata)
+        self.returndata = InMemoryBytes(returndata)
+        self.code = InMemoryBytes(code)
+        self._trace_index = trace_index
+        self._program_counter = program_counter
+        self._opcode = opcode
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> InMemoryState:
+        """
+        Load a state saved with `to_json`. Missing sections are empty.
+        """
+        return cls(
+            stack=[bytes.fromhex(_unhex(word)) for word in data.get("stack", [])],
+            memory=bytes.fromhex(_unhex(data.get("memory", ""))),
+            storage={int(slot, 16): bytes.fromhex(_unhex(word)) for slot, word in data.get("storage", {}).items()},
+            transient={int(slot, 16): bytes.fromhex(_unhex(word)) for slot, word in data.get("transient", {}).items()},
+            calldata=bytes.fromhex(_unhex(data.get("calldata", ""))),
+            returndata=bytes.fromhex(_unhex(data.get("returndata", ""))),
+            code=bytes.fromhex(_unhex(data.get("code", ""))),
+            trace_index=data.get("traceIndex", 0),
+            program_counter=data.get("programCounter", 0),
+            opcode=data.get("opcode", "STOP"),
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        The state as JSON, with bytes as hex strings and the stack from bottom to top.
+        """
+        return {
+            "stack": ["0x" + word.hex() for word in self.stack.words],
+            "memory": "0x" + self.memory.data.hex(),
+            "storage": {hex(slot): "0x" + word.hex() for slot, word in sorted(self.storage.slots.items())},
+            "transient": {hex(slot): "0x" + word.hex() for slot, word in sorted(self.transient.slots.items())},
+            "calldata": "0x" + self.calldata.data.hex(),
+            "returndata": "0x" + self.returndata.data.hex(),
+            "code": "0x" + self.code.data.hex(),
+            "traceIndex": self._trace_index,
+            "programCounter": self._program_counter,
+            "opcode": self._opcode,
+        }
+
+    async def trace_index(self) -> int:
+        return self._trace_index
+
+    async def program_counter(self) -> int:
+        return self._program_counter
+
+    async def opcode(self) -> str:
+        return self._opcode
+
+class InMemoryStack:
+    """
+    Slot 0 is the top of the stack.
+    """
+    def __init__(self, words: list[bytes]):
+        self.words = words
+
+    async def length(self) -> int:
+        return len(self.words)
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        if not 0 <= slot < len(self.words):
+            raise ValueError(f"Stack slot {slot} out of range, the stack has {len(self.words)} items")
+        return Data(_slice(self.words[len(self.words) - 1 - slot].rjust(WORD_SIZE, b"\x00"), offset, length))
+
+class InMemoryBytes:
+    """
+    Memory, calldata, returndata or code. Bytes beyond the end read as zero.
+    """
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def length(self) -> int:
+        return len(self.data)
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        return Data(_slice(self.data, offset, length))
+
+class InMemoryStorage:
+    def __init__(self, slots: Dict[int, bytes]):
+        self.slots = slots
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        word = self.slots.get(slot, b"").rjust(WORD_SIZE, b"\x00")
+        return Data(_slice(word, offset, length))
+
+def _slice(data: bytes, offset: int, length: int) -> bytes:
+    return data[offset:offset + length].ljust(length, b"\x00")
+
+def _unhex(value: str) -> str:
+    return value[2:] if value.startswith("0x") else value
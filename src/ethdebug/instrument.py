@@ -0,0 +1,161 @@
+"""
+Opt-in counters and timings of the hot paths of evaluating and dereferencing pointers.
+
+Instrumentation is disabled by default, and the instrumented code only checks
+`instrument.enabled` then. When enabled, every call is counted and timed by
+category and key:
+
+- `expression`: evaluated expression nodes, by node type (`Arithmetic`, `Read`, ...),
+- `keccak`: keccak256 hashes, by the number of hashed bytes rounded up to words,
+- `lookup`: region lookups, of `$this` and of named regions,
+- `region`: regions evaluated by `evaluate_region`, by location,
+- `iterations`: fixed-point iterations of `evaluate_region`, by location,
+- `memo`: memos processed by `generate_regions`, by memo type,
+- `read`: machine reads, by location.
+
+Times include the time of nested calls, e.g. the time of an `Arithmetic` node
+includes the time of its operands. All calls are added to a process-wide
+report (`aggregate()`), and to the reports that are being collected: the
+report of a `Cursor.view` (available as `View.report`, including the reads
+through the view), or a report collected with `instrumented()`.
+
+    with instrument.instrumented() as report:
+        view = await cursor.view(state)
+    print(report.format())
+
+Listeners registered with `listening()` receive every call together with its
+subject: the expression node, the memo, the pointer region, or the region read.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+enabled = False
+
+@dataclass
+class Entry:
+    count: int = 0
+    seconds: float = 0.0
+
+class Report:
+    """
+    Counts and times by category and key.
+    """
+    entries: Dict[Tuple[str, str], Entry]
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, category: str, key: str, seconds: float = 0.0, count: int = 1) -> None:
+        entry = self.entries.get((category, key))
+        if entry is None:
+            entry = self.entries[(category, key)] = Entry()
+        entry.count += count
+        entry.seconds += seconds
+
+    def merge(self, other: Report) -> None:
+        for (category, key), entry in other.entries.items():
+            self.record(category, key, entry.seconds, entry.count)
+
+    def count(self, category: str, key: str | None = None) -> int:
+        """
+        The count of a key, or of all keys of a category.
+        """
+        return sum(entry.count for (c, k), entry in self.entries.items() if c == category and key in (None, k))
+
+    def seconds(self, category: str, key: str | None = None) -> float:
+        """
+        The time of a key, or of all keys of a category.
+        """
+        return sum(entry.seconds for (c, k), entry in self.entries.items() if c == category and key in (None, k))
+
+    def to_json(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (category, key), entry in sorted(self.entries.items()):
+            result.setdefault(category, {})[key] = {"count": entry.count, "seconds": entry.seconds}
+        return result
+
+    def format(self) -> str:
+        """
+        A table of all entries, by category and by descending time.
+        """
+        lines = [f"{'category':<12} {'key':<24} {'count':>10} {'total ms':>10} {'µs/call':>10}"]
+        for (category, key), entry in sorted(self.entries.items(), key=lambda item: (item[0][0], -item[1].seconds, item[0][1])):
+            per_call = entry.seconds / entry.count * 1e6 if entry.count else 0.0
+            lines.append(f"{category:<12} {key:<24} {entry.count:>10} {entry.seconds * 1e3:>10.3f} {per_call:>10.2f}")
+        return "\n".join(lines)
+
+_aggregate = Report()
+_collecting: ContextVar[Tuple[Report, ...]] = ContextVar("collecting", default=())
+
+# Called with the category, key, seconds, count and subject of every call
+Listener = Callable[[str, str, float, int, Any], None]
+_listeners: Tuple[Listener, ...] = ()
+
+def record(category: str, key: str, seconds: float = 0.0, count: int = 1, subject: Any = None) -> None:
+    """
+    Add a call to the process-wide report and to the reports being collected.
+    """
+    _aggregate.record(category, key, seconds, count)
+    for report in _collecting.get():
+        report.record(category, key, seconds, count)
+    for listener in _listeners:
+        listener(category, key, seconds, count, subject)
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+def aggregate() -> Report:
+    """
+    The process-wide report of all calls since instrumentation was enabled or reset.
+    """
+    return _aggregate
+
+def reset() -> None:
+    global _aggregate
+    _aggregate = Report()
+
+@contextmanager
+def collecting(report: Report) -> Iterator[Report]:
+    """
+    Add the calls made in this context (and in tasks created in it) to a report.
+    """
+    token = _collecting.set(_collecting.get() + (report,))
+    try:
+        yield report
+    finally:
+        _collecting.reset(token)
+
+@contextmanager
+def listening(listener: Listener) -> Iterator[None]:
+    """
+    Call a listener with every call made while in this context.
+    """
+    global _listeners
+    _listeners = _listeners + (listener,)
+    try:
+        yield
+    finally:
+        _listeners = tuple(other for other in _listeners if other is not listener)
+
+@contextmanager
+def instrumented() -> Iterator[Report]:
+    """
+    Enable instrumentation and collect the calls made in this context in a new report.
+    """
+    previous = enabled
+    enable()
+    try:
+        with collecting(Report()) as report:
+            yield report
+    finally:
+        if not previous:
+            disable()
@@ -12,6 +12,20 @@ class MachineTrace(Protocol):
     def __aiter__(self) -> AsyncIterable[MachineState]:
         ...
 
+class SeekableMachineTrace(MachineTrace, Protocol):
+    """
+    A trace that also provides random access to its states, e.g. to step backwards.
+
+    Traces that can only be iterated forwards can be made seekable with
+    `ethdebug.replay.seekable.SeekableTrace`.
+    """
+
+    async def state_at(self, trace_index: int) -> MachineState:
+        """
+        Get the state at a trace index. Raises IndexError if the trace has no such state.
+        """
+        ...
+
 class MachineState(Protocol):
     async def trace_index(self) -> int:
         ...
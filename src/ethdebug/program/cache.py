@@ -0,0 +1,438 @@
+"""
+A persistent, content-addressed cache of loaded programs and their lookup tables.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import pydantic
+
+from ethdebug.program.canonical import to_json
+from ethdebug.program.contexts import code_ranges, instruction_offset
+from ethdebug.program.pointers import PointerTable
+from ethdebug.program.scope import ScopeIndex, ScopeVariable
+
+if TYPE_CHECKING:
+    from ethdebug.format.program_schema import Program
+
+MAGIC = b"ETHDBGPC"
+# Bump when the layout of cache files or the derived tables change
+FORMAT_VERSION = 2
+
+# The magic is followed by the position and length of the JSON header at the end of the file
+_HEADER = len(MAGIC) + 16
+_ALIGNMENT = 8
+# Code ranges without a `range` span the whole source
+_WHOLE_SOURCE = 2 ** 64 - 1
+
+def library_version() -> str:
+    """
+    The version of the installed ethdebug distribution, or "unknown" when running from source.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("ethdebug")
+    except PackageNotFoundError:
+        return "unknown"
+
+class ProgramCache:
+    """
+    A directory of cache files, one per ethdebug document.
+
+    Files are named by a hash of the raw document together with the versions
+    of this library, pydantic and the file format, so a changed document or
+    library never reads a stale entry. Each file holds the programs of the
+    document and their lookup tables as flat arrays that are memory-mapped
+    and used in place: a warm load neither parses nor validates the document
+    nor builds any index. Files are written atomically, and unreadable files
+    are rebuilt.
+
+    Cache files only contain JSON and flat arrays, so reading a file that was
+    tampered with can give wrong results, but never runs code.
+    """
+    directory: Path
+    version: str
+
+    def __init__(self, directory: Union[str, PathLike], version: Optional[str] = None):
+        """
+        :param directory: The cache directory, created if it does not exist.
+        :param version: The library version to key entries by, see `library_version`.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.version = version if version is not None else library_version()
+
+    def key(self, raw: bytes) -> str:
+        """
+        Get the cache key of a raw JSON document.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{FORMAT_VERSION}:{self.version}:{pydantic.VERSION}:{sys.byteorder}:".encode())
+        digest.update(raw)
+        return digest.hexdigest()
+
+    def path(self, raw: bytes) -> Path:
+        return self.directory / f"{self.key(raw)}.bin"
+
+    def load_program(self, source: Union[bytes, str, PathLike], *, validate: bool = True) -> CachedProgram:
+        """
+        Load a `Program` document from the cache, or parse it and add it to the cache.
+
+        :param source: The raw JSON, or the path to a JSON file.
+        :param validate: Validate the program with pydantic before caching it.
+            The validated model is stored as JSON, so `CachedProgram.program` only needs
+            pydantic's fast JSON validation to restore it.
+        """
+        programs = self._load(_read(source), "program", validate)
+        return programs[0]
+
+    def load_info(self, source: Union[bytes, str, PathLike], *, validate: bool = True) -> List[CachedProgram]:
+        """
+        Load the programs of an `Info` document from the cache, or parse it and add it to the cache.
+
+        See `load_program`.
+        """
+        return self._load(_read(source), "info", validate)
+
+    def clear(self) -> None:
+        """
+        Remove all cache files.
+        """
+        for path in self.directory.glob("*.bin"):
+            path.unlink()
+
+    def _load(self, raw: bytes, kind: str, validate: bool) -> List[CachedProgram]:
+        path = self.path(raw)
+        programs = _open(path, kind, validate)
+        if programs is None:
+            _write(path, raw, kind, validate)
+            programs = _open(path, kind, validate)
+            if programs is None:
+                raise ValueError(f"Failed to read cache file {path}")
+        return programs
+
+class CachedProgram:
+    """
+    A program and its lookup tables, backed by a cache file.
+
+    Tables are read in place from the memory-mapped file. The program itself
+    is only decoded when `json` or `program` is accessed.
+    """
+    def __init__(self, buffer: memoryview, header: Mapping[str, Any]):
+        self._buffer = buffer
+        self._header = header
+        self._sources = header["sources"]
+        self._source_ids = {_source_key(source): index for index, source in enumerate(self._sources)}
+        self._pcs = self._section("pcs")
+        self._pc_indices = self._section("pc_indices")
+        self._instruction_pcs = self._section("instruction_pcs")
+        self._instruction_offsets = self._section("instruction_offsets")
+        self._code_sources = self._section("code_sources")
+        self._code_starts = self._section("code_starts")
+        self._code_ends = self._section("code_ends")
+        self._code_max_ends = self._section("code_max_ends")
+        self._code_instructions = self._section("code_instructions")
+        self._scope_ids = self._section("scope_ids")
+        self._scope_offsets = self._section("scope_offsets")
+        self._scope_variables = self._section("scope_variables")
+        self._variable_offsets = self._section("variable_offsets")
+        self._pointer_offsets = self._section("pointer_offsets")
+        self._variables: Dict[int, ScopeVariable] = {}
+
+    def _section(self, name: str) -> memoryview:
+        offset, length, typecode = self._header["sections"][name]
+        section = self._buffer[offset:offset + length]
+        return section.cast(typecode) if typecode else section
+
+    def _blob(self, name: str, offsets: memoryview, index: int) -> bytes:
+        return bytes(self._section(name)[offsets[index]:offsets[index + 1]])
+
+    def __len__(self) -> int:
+        """
+        The number of instructions.
+        """
+        return len(self._pc_indices)
+
+    @property
+    def validated(self) -> bool:
+        return self._header["validated"]
+
+    def pcs(self) -> memoryview:
+        """
+        The offsets of all instructions, in increasing order.
+        """
+        return self._pcs
+
+    def index_of(self, pc: int) -> int:
+        """
+        Get the position in `Program.instructions` of the instruction at a given program counter.
+        """
+        position = bisect_left(self._pcs, pc)
+        if position == len(self._pcs) or self._pcs[position] != pc:
+            raise ValueError(f"No instruction at offset {pc}")
+        return self._pc_indices[position]
+
+    def instruction(self, pc: int) -> Any:
+        """
+        Get the instruction at a given program counter as JSON.
+        """
+        return json.loads(self._blob("instructions", self._instruction_offsets, self.index_of(pc)))
+
+    def instructions_in(self, source: Any, offset: int = 0, length: int = 0) -> List[int]:
+        """
+        Get the program counters of the instructions whose code ranges overlap a source range.
+
+        A range of length 0 finds the instructions whose code contains `offset`.
+
+        :param source: The id of the source, as in `MaterialsReference`.
+        """
+        source_id = self._source_ids.get(_source_key(source))
+        if source_id is None:
+            return []
+        first = bisect_left(self._code_sources, source_id)
+        last = bisect_right(self._code_sources, source_id, first)
+        end = offset + max(length, 1)
+        # Ranges are ordered by start; the running maximum of their ends skips those ending before `offset`
+        position = bisect_right(self._code_max_ends, offset, first, last)
+        indices = set()
+        while position < last and self._code_starts[position] < end:
+            if self._code_ends[position] > offset:
+                indices.add(self._code_instructions[position])
+            position += 1
+        return sorted(self._instruction_pcs[index] for index in indices)
+
+    def scope_id_at(self, pc: int) -> int:
+        """
+        Get the id of the scope at a given program counter, see `ScopeIndex.scope_id_at`.
+        """
+        return self._scope_ids[self.index_of(pc)]
+
+    def variables_at(self, pc: int) -> Tuple[ScopeVariable, ...]:
+        """
+        Get the variables in scope after executing the instruction at a given program counter.
+        """
+        scope_id = self.scope_id_at(pc)
+        return tuple(
+            self.variable(self._scope_variables[position])
+            for position in range(self._scope_offsets[scope_id], self._scope_offsets[scope_id + 1])
+        )
+
+    def variable(self, variable_id: int) -> ScopeVariable:
+        variable = self._variables.get(variable_id)
+        if variable is None:
+            identifier, declaration, type, pointer_id = json.loads(
+                self._blob("variables", self._variable_offsets, variable_id)
+            )
+            variable = self._variables[variable_id] = ScopeVariable(variable_id, identifier, declaration, type, pointer_id)
+        return variable
+
+    def pointer(self, pointer_id: int) -> Any:
+        """
+        Get the pointer with the given id (see `ScopeVariable.pointer_id`) as JSON.
+        """
+        return json.loads(self._blob("pointers", self._pointer_offsets, pointer_id))
+
+    @cached_property
+    def pointers(self) -> PointerTable:
+        """
+        A `PointerTable` of the program's variable pointers, with the ids of `ScopeVariable.pointer_id`.
+        """
+        table = PointerTable()
+        for pointer_id in range(len(self._pointer_offsets) - 1):
+            table.intern(self.pointer(pointer_id))
+        return table
+
+    @cached_property
+    def json(self) -> Mapping[str, Any]:
+        program = json.loads(bytes(self._section("program")))
+        program["instructions"] = [
+            json.loads(self._blob("instructions", self._instruction_offsets, index)) for index in range(len(self))
+        ]
+        return program
+
+    @cached_property
+    def program(self) -> Program:
+        """
+        The program model, restored from the model stored when the cache entry was created with validation.
+        """
+        from ethdebug.format.program_schema import Program
+        if self.validated:
+            return Program.model_validate_json(bytes(self._section("model")))
+        return Program.model_validate(self.json)
+
+def _read(source: Union[bytes, str, PathLike]) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as f:
+        return f.read()
+
+def _source_key(source: Any) -> str:
+    return json.dumps(source)
+
+def _open(path: Path, kind: str, validate: bool) -> Optional[List[CachedProgram]]:
+    """
+    Map a cache file, or return None if it is missing, incomplete or not what is needed.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except (OSError, ValueError):
+        return None
+    if len(buffer) < _HEADER or bytes(buffer[:len(MAGIC)]) != MAGIC:
+        return None
+    header_position, header_length = array("Q", bytes(buffer[len(MAGIC):_HEADER]))
+    if header_position + header_length != len(buffer):
+        return None
+    try:
+        header = json.loads(bytes(buffer[header_position:]))
+    except ValueError:
+        return None
+    if header["kind"] != kind or (validate and not all(program["validated"] for program in header["programs"])):
+        return None
+    return [CachedProgram(buffer, program) for program in header["programs"]]
+
+def _write(path: Path, raw: bytes, kind: str, validate: bool) -> None:
+    document = json.loads(raw)
+    programs = [document] if kind == "program" else document.get("programs", [])
+    models: List[Optional[bytes]] = [None] * len(programs)
+    if validate:
+        if kind == "program":
+            from ethdebug.format.program_schema import Program
+            models = [_dump_model(Program.model_validate(document))]
+        else:
+            from ethdebug.format.info_schema import Info
+            models = [_dump_model(program) for program in Info.model_validate(document).programs]
+
+    body = bytearray()
+
+    def add(section: Union[bytes, array]) -> Tuple[int, int, str]:
+        while len(body) % _ALIGNMENT:
+            body.append(0)
+        offset = len(body)
+        body.extend(section.tobytes() if isinstance(section, array) else section)
+        # Section offsets are relative to the start of the file
+        return _HEADER + offset, len(body) - offset, section.typecode if isinstance(section, array) else ""
+
+    headers = []
+    for program, model in zip(programs, models):
+        tables = _tables(program, model)
+        headers.append({
+            "sources": tables.pop("sources"),
+            "validated": model is not None,
+            "sections": {name: add(section) for name, section in tables.items()},
+        })
+
+    header = json.dumps({"kind": kind, "programs": headers}, separators=(",", ":")).encode()
+    while len(body) % _ALIGNMENT:
+        body.append(0)
+    data = MAGIC + array("Q", [_HEADER + len(body), len(header)]).tobytes() + bytes(body) + header
+
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+def _dump_model(model: pydantic.BaseModel) -> bytes:
+    return model.model_dump_json(by_alias=True, exclude_unset=True).encode()
+
+def _tables(program: Mapping[str, Any], model: Optional[bytes]) -> Dict[str, Any]:
+    """
+    Build the lookup tables of a program.
+    """
+    program = to_json(program)
+    instructions = program.get("instructions", [])
+    offsets = [instruction_offset(instruction) for instruction in instructions]
+    order = sorted(range(len(instructions)), key=offsets.__getitem__)
+    tables: Dict[str, Any] = {"instruction_pcs": array("Q", offsets)}
+    tables["pcs"] = array("Q", (offsets[index] for index in order))
+    tables["pc_indices"] = array("I", order)
+    tables["instruction_offsets"], tables["instructions"] = _blobs(instructions)
+    tables["program"] = json.dumps(
+        {key: value for key, value in program.items() if key != "instructions"}, separators=(",", ":")
+    ).encode()
+
+    # Source ranges, ordered by source and start
+    sources: Dict[str, int] = {}
+    source_list: List[Any] = []
+    ranges = []
+    for index, instruction in enumerate(instructions):
+        for code in code_ranges(instruction.get("context")):
+            source = (code.get("source") or {}).get("id")
+            key = _source_key(source)
+            if key not in sources:
+                sources[key] = len(source_list)
+                source_list.append(source)
+            code_range = code.get("range")
+            if code_range is None:
+                start, end = 0, _WHOLE_SOURCE
+            else:
+                start, length = _uint(code_range["offset"]), _uint(code_range["length"])
+                if start < 0 or length < 0:
+                    # solc marks code without a source location with -1
+                    continue
+                end = start + length
+            ranges.append((sources[key], start, end, index))
+    ranges.sort()
+    tables["sources"] = source_list
+    tables["code_sources"] = array("I", (source for source, _, _, _ in ranges))
+    tables["code_starts"] = array("Q", (start for _, start, _, _ in ranges))
+    tables["code_ends"] = array("Q", (end for _, _, end, _ in ranges))
+    max_ends = array("Q")
+    for position, (source, _, end, _) in enumerate(ranges):
+        if position and ranges[position - 1][0] == source:
+            end = max(end, max_ends[-1])
+        max_ends.append(end)
+    tables["code_max_ends"] = max_ends
+    tables["code_instructions"] = array("I", (index for _, _, _, index in ranges))
+
+    # In-scope variables
+    scope = ScopeIndex.build(program)
+    scope_ids = array("I", (scope.scope_id_at(offset) for offset in offsets))
+    scopes: Dict[int, Tuple[ScopeVariable, ...]] = {}
+    for offset, scope_id in zip(offsets, scope_ids):
+        if scope_id not in scopes:
+            scopes[scope_id] = scope.variables_at(offset)
+    scope_offsets = array("I", [0])
+    scope_variables = array("I")
+    for scope_id in range(max(scopes, default=-1) + 1):
+        scope_variables.extend(variable.id for variable in scopes.get(scope_id, ()))
+        scope_offsets.append(len(scope_variables))
+    tables["scope_ids"] = scope_ids
+    tables["scope_offsets"] = scope_offsets
+    tables["scope_variables"] = scope_variables
+    tables["variable_offsets"], tables["variables"] = _blobs(
+        [variable.identifier, variable.declaration, variable.type, variable.pointer_id] for variable in scope.variables()
+    )
+    tables["pointer_offsets"], tables["pointers"] = _blobs(entry.value for entry in scope.pointers)
+    if model is not None:
+        tables["model"] = model
+    return tables
+
+def _blobs(values: Any) -> Tuple[array, bytes]:
+    """
+    Serialize values as consecutive compact JSON, with the offsets of each value.
+    """
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for value in values:
+        blob.extend(json.dumps(value, separators=(",", ":")).encode())
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+def _uint(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else value
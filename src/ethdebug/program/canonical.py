@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Mapping
+
+from pydantic import BaseModel
+
+def to_json(value: Any) -> Any:
+    """
+    Convert an ethdebug value into its plain JSON representation.
+
+    Pydantic models are dumped using their schema aliases (`for`, `in`, `$sum`, ...)
+    and without unset optional fields, so that a model and the JSON it was
+    parsed from produce the same representation.
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    if isinstance(value, Mapping):
+        return {str(key): to_json(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+def canonical_key(value: Any) -> str:
+    """
+    Obtain a canonical string for a JSON value or ethdebug model.
+
+    Two values produce the same key if and only if they are structurally equal,
+    regardless of the order in which object keys were written. The key is
+    hashable and can be used directly as a dictionary key.
+    """
+    return json.dumps(to_json(value), sort_keys=True, separators=(",", ":"))
+
+def structural_hash(value: Any) -> str:
+    """
+    Obtain a stable structural hash of a JSON value or ethdebug model.
+
+    Unlike `hash(canonical_key(value))`, the result does not depend on the
+    interpreter's hash seed, so it can be persisted and compared across processes.
+    """
+    return hashlib.blake2b(canonical_key(value).encode("utf-8"), digest_size=16).hexdigest()
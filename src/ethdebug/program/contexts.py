@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Tuple
+
+from ethdebug.program.canonical import canonical_key, to_json
+
+if TYPE_CHECKING:
+    from ethdebug.format.program.context_schema import ProgramContext
+    from ethdebug.format.program_schema import Program
+
+@dataclass(frozen=True)
+class ContextNode:
+    """
+    A unique, normalized program context stored in a `ContextTable`.
+
+    `fields` holds the context's own information (`code`, `variables`,
+    `frame`, `remark`, ...) as JSON. Nested `gather` and `pick` contexts are
+    stored as ids of other nodes in the same table.
+    """
+    id: int
+    fields: Mapping[str, Any]
+    gather: Tuple[int, ...]
+    pick: Tuple[int, ...]
+
+    def is_empty(self) -> bool:
+        return not self.fields and not self.gather and not self.pick
+
+class ContextTable:
+    """
+    A table of normalized, structurally unique program contexts.
+
+    Contexts are normalized while they are interned:
+    - nested `gather` contexts are flattened into their parent `gather`,
+      duplicate and empty members are removed,
+    - nested `pick` contexts are flattened into their parent `pick`,
+      duplicate alternatives are removed,
+    - a `pick` with a single alternative left is gathered instead,
+    - a `gather` consisting of a single context is replaced by that context.
+
+    Subtrees are interned bottom-up (hash-consing), so two contexts are
+    structurally equal after normalization if and only if their ids are equal.
+    """
+    _nodes: List[ContextNode]
+    _ids: Dict[str, int]
+    _json: Dict[int, Any]
+
+    def __init__(self):
+        self._nodes = []
+        self._ids = {}
+        self._json = {}
+        self.empty = self._intern_node({}, (), ())
+
+    def intern(self, context: ProgramContext | Mapping[str, Any] | None) -> int:
+        """
+        Normalize a context and return the id of its unique representative.
+        """
+        context = to_json(context) if context is not None else {}
+        return self._intern(context)
+
+    def _intern(self, context: Mapping[str, Any]) -> int:
+        fields = {key: value for key, value in context.items() if key not in ("gather", "pick")}
+
+        gather: List[int] = []
+
+        def add_to_gather(node: ContextNode) -> None:
+            if node.is_empty():
+                return
+            if not node.fields and not node.pick:
+                gather.extend(node.gather)
+            else:
+                gather.append(node.id)
+
+        for member in context.get("gather", ()):
+            add_to_gather(self._nodes[self._intern(member)])
+
+        pick: List[int] = []
+        for alternative in context.get("pick", ()):
+            node = self._nodes[self._intern(alternative)]
+            if not node.fields and not node.gather and node.pick:
+                pick.extend(node.pick)
+            else:
+                pick.append(node.id)
+        pick = _unique(pick)
+        if len(pick) == 1:
+            add_to_gather(self._nodes[pick.pop()])
+
+        gather = _unique(gather)
+        if not fields and not pick and len(gather) == 1:
+            return gather[0]
+
+        return self._intern_node(fields, tuple(gather), tuple(pick))
+
+    def _intern_node(self, fields: Mapping[str, Any], gather: Tuple[int, ...], pick: Tuple[int, ...]) -> int:
+        key = canonical_key({"fields": fields, "gather": gather, "pick": pick})
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = len(self._nodes)
+            self._ids[key] = node_id
+            self._nodes.append(ContextNode(id=node_id, fields=fields, gather=gather, pick=pick))
+        return node_id
+
+    def node(self, context_id: int) -> ContextNode:
+        return self._nodes[context_id]
+
+    def to_json(self, context_id: int) -> Any:
+        """
+        Reconstruct the normalized JSON context for an id.
+        """
+        if context_id not in self._json:
+            node = self._nodes[context_id]
+            context = dict(node.fields)
+            if node.gather:
+                context["gather"] = [self.to_json(member) for member in node.gather]
+            if node.pick:
+                context["pick"] = [self.to_json(alternative) for alternative in node.pick]
+            self._json[context_id] = context
+        return self._json[context_id]
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+class ProgramContexts:
+    """
+    The normalized context of every instruction of a program.
+
+    Instructions only store the id of their context in a compact array, so
+    comparing the contexts of two instructions (e.g. of consecutive steps in a
+    trace) is a comparison of two integers.
+    """
+    table: ContextTable
+    _context_ids: array
+    _offsets: Dict[int, int]
+
+    def __init__(self, table: ContextTable, context_ids: array, offsets: Dict[int, int]):
+        self.table = table
+        self._context_ids = context_ids
+        self._offsets = offsets
+
+    @staticmethod
+    def build(program: Program | Mapping[str, Any], table: ContextTable | None = None) -> ProgramContexts:
+        """
+        Normalize and intern the contexts of all instructions of a program.
+
+        :param program: The program, either as model or as JSON.
+        :param table: The table to intern contexts into, e.g. to share contexts between programs.
+        """
+        table = table if table is not None else ContextTable()
+        context_ids = array("I")
+        offsets: Dict[int, int] = {}
+        # Interning the same raw context twice is wasted work; solc repeats
+        # identical contexts on many instructions.
+        raw_ids: Dict[str, int] = {}
+        for index, instruction in enumerate(to_json(program).get("instructions", ())):
+            offsets[instruction_offset(instruction)] = index
+            context = instruction.get("context")
+            raw_key = canonical_key(context) if context else ""
+            context_id = raw_ids.get(raw_key)
+            if context_id is None:
+                context_id = raw_ids[raw_key] = table.intern(context)
+            context_ids.append(context_id)
+        return ProgramContexts(table, context_ids, offsets)
+
+    def context_id_at(self, pc: int) -> int:
+        """
+        Get the id of the normalized context of the instruction at a given program counter.
+        """
+        return self._context_ids[self.index_of(pc)]
+
+    def context_at(self, pc: int) -> ContextNode:
+        return self.table.node(self.context_id_at(pc))
+
+    def same_context(self, pc_a: int, pc_b: int) -> bool:
+        """
+        Check whether two instructions have structurally equal contexts.
+        """
+        return self.context_id_at(pc_a) == self.context_id_at(pc_b)
+
+    def index_of(self, pc: int) -> int:
+        """
+        Get the position in `Program.instructions` of the instruction at a given program counter.
+        """
+        index = self._offsets.get(pc)
+        if index is None:
+            raise ValueError(f"No instruction at offset {pc}")
+        return index
+
+    def context_ids(self) -> array:
+        """
+        The context id of every instruction, in instruction order.
+        """
+        return self._context_ids
+
+    def offsets(self) -> Dict[int, int]:
+        """
+        Map from program counter to position in `Program.instructions`.
+        """
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self._context_ids)
+
+def structurally_equal(a: ProgramContext | Mapping[str, Any] | None, b: ProgramContext | Mapping[str, Any] | None) -> bool:
+    """
+    Check whether two contexts are equal after normalization.
+
+    Prefer comparing ids from a shared `ContextTable` when comparing many contexts.
+    """
+    table = ContextTable()
+    return table.intern(a) == table.intern(b)
+
+def instruction_offset(instruction: Mapping[str, Any]) -> int:
+    """
+    Get the byte offset of a (JSON) instruction as an integer.
+    """
+    offset = instruction["offset"]
+    if isinstance(offset, str):
+        return int(offset, 16)
+    return offset
+
+def code_ranges(context: Any) -> Iterator[Mapping[str, Any]]:
+    """
+    Find the code ranges of a (JSON) context, including those of nested `gather` and `pick` contexts.
+    """
+    if not isinstance(context, Mapping):
+        return
+    if isinstance(context.get("code"), Mapping):
+        yield context["code"]
+    for key in ("gather", "pick"):
+        for nested in context.get(key) or ():
+            yield from code_ranges(nested)
+
+def _unique(ids: List[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
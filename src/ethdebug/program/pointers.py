@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+from ethdebug.program.canonical import canonical_key, structural_hash, to_json
+
+if TYPE_CHECKING:
+    from ethdebug.format.pointer.template_schema import PointerTemplate
+    from ethdebug.format.pointer_schema import Pointer
+    from ethdebug.format.program_schema import Program
+
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class PointerEntry:
+    """
+    A unique pointer stored in a `PointerTable`.
+    """
+    id: int
+    key: str
+    value: Any
+
+    def digest(self) -> str:
+        """
+        A stable structural hash of the pointer, see `structural_hash`.
+        """
+        return structural_hash(self.value)
+
+@dataclass(frozen=True)
+class PreparedPointer:
+    """
+    A validated pointer together with the validated templates it references.
+
+    Both are already adjusted to the stack length change the pointer was
+    prepared for, so they must be dereferenced without further adjustment.
+    """
+    pointer: Pointer
+    templates: Dict[str, PointerTemplate]
+
+class PointerTable:
+    """
+    A table of structurally unique pointers.
+
+    Compilers repeat the same pointer on every instruction where a variable is
+    in scope. The table canonicalizes each pointer, stores it once and hands out
+    a small integer id instead. Preparation work that only depends on the
+    pointer itself (template resolution, stack adjustment, validation) is cached
+    against that id, so it is done once per unique pointer, no matter how often
+    the pointer occurs in a program or how many steps of a trace consult it.
+    """
+    _entries: List[PointerEntry]
+    _ids: Dict[str, int]
+    _templates: Dict[str, Any]
+    _prepared: Dict[Tuple[int, Hashable], Any]
+
+    def __init__(self, templates: Optional[Mapping[str, PointerTemplate | Any]] = None):
+        self._entries = []
+        self._ids = {}
+        self._templates = {name: to_json(template) for name, template in (templates or {}).items()}
+        self._prepared = {}
+
+    @staticmethod
+    def from_program(
+        program: Program | Mapping[str, Any],
+        templates: Optional[Mapping[str, PointerTemplate | Any]] = None
+    ) -> PointerTable:
+        """
+        Build a table of all variable pointers found in a program's contexts.
+        """
+        table = PointerTable(templates)
+        for pointer in program_pointers(program):
+            table.intern(pointer)
+        return table
+
+    def intern(self, pointer: Pointer | Any) -> int:
+        """
+        Add a pointer to the table unless a structurally equal pointer is
+        already present, and return the id of the stored pointer.
+        """
+        key = canonical_key(pointer)
+        pointer_id = self._ids.get(key)
+        if pointer_id is None:
+            pointer_id = len(self._entries)
+            self._ids[key] = pointer_id
+            self._entries.append(PointerEntry(id=pointer_id, key=key, value=to_json(pointer)))
+        return pointer_id
+
+    def lookup(self, pointer: Pointer | Any) -> int | None:
+        """
+        Get the id of a pointer without adding it to the table.
+        """
+        return self._ids.get(canonical_key(pointer))
+
+    def entry(self, pointer_id: int) -> PointerEntry:
+        return self._entries[pointer_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[PointerEntry]:
+        return iter(self._entries)
+
+    def prepare(self, pointer_id: int, kind: Hashable, factory: Callable[[Any], T]) -> T:
+        """
+        Compute `factory(pointer)` at most once for each pointer and `kind`.
+
+        `kind` distinguishes different kinds of preparation work on the same
+        pointer, e.g. stack adjustments for different stack length changes.
+        """
+        cache_key = (pointer_id, kind)
+        if cache_key not in self._prepared:
+            self._prepared[cache_key] = factory(self._entries[pointer_id].value)
+        return self._prepared[cache_key]
+
+    def templates(self, pointer_id: int) -> Dict[str, Any]:
+        """
+        Resolve the templates (transitively) referenced by a pointer.
+        """
+        return self.prepare(
+            pointer_id,
+            "templates",
+            lambda pointer: referenced_templates(pointer, self._templates)
+        )
+
+    def adjusted(self, pointer_id: int, stack_length_change: int) -> Tuple[Any, Dict[str, Any]]:
+        """
+        The pointer and its referenced templates, with all stack regions
+        adjusted to a changed stack length.
+        """
+        def adjust(pointer: Any) -> Tuple[Any, Dict[str, Any]]:
+            templates = {
+                name: {**template, "for": adjust_stack_length(template["for"], stack_length_change)}
+                for name, template in self.templates(pointer_id).items()
+            }
+            return adjust_stack_length(pointer, stack_length_change), templates
+
+        return self.prepare(pointer_id, ("adjusted", stack_length_change), adjust)
+
+    def prepared(self, pointer_id: int, stack_length_change: int = 0) -> PreparedPointer:
+        """
+        The validated, stack-adjusted pointer and templates, ready to be dereferenced.
+        """
+        def validate(_: Any) -> PreparedPointer:
+            from ethdebug.format.pointer.template_schema import PointerTemplate
+            from ethdebug.format.pointer_schema import Pointer
+
+            pointer, templates = self.adjusted(pointer_id, stack_length_change)
+            return PreparedPointer(
+                pointer=Pointer.model_validate(pointer),
+                templates={
+                    name: PointerTemplate.model_validate(template)
+                    for name, template in templates.items()
+                },
+            )
+
+        return self.prepare(pointer_id, ("prepared", stack_length_change), validate)
+
+def program_pointers(program: Program | Mapping[str, Any]) -> Iterator[Any]:
+    """
+    Iterate over all variable pointers in the contexts of a program, in
+    instruction order and including duplicates.
+    """
+    program_json = to_json(program)
+    yield from context_pointers(program_json.get("context"))
+    for instruction in program_json.get("instructions", ()):
+        yield from context_pointers(instruction.get("context"))
+
+def context_pointers(context: Any) -> Iterator[Any]:
+    """
+    Iterate over all variable pointers in a (JSON) program context, including
+    those nested in `gather` and `pick` contexts.
+    """
+    if not context:
+        return
+    for variable in context.get("variables", ()):
+        if "pointer" in variable:
+            yield variable["pointer"]
+    for nested in context.get("gather", ()):
+        yield from context_pointers(nested)
+    for nested in context.get("pick", ()):
+        yield from context_pointers(nested)
+
+def referenced_templates(pointer: Any, templates: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Collect the templates a (JSON) pointer references, directly or through other
+    templates. Templates defined inline by a `templates` collection take
+    precedence over the given ones within the collection's `in` pointer.
+
+    Raises a `ValueError` if a reference names an unknown template.
+    """
+    resolved: Dict[str, Any] = {}
+
+    def visit(pointer: Any, scope: Mapping[str, Any]) -> None:
+        if not isinstance(pointer, Mapping):
+            return
+        if "templates" in pointer:
+            inner = {**scope, **pointer["templates"]}
+            for template in pointer["templates"].values():
+                visit(template.get("for"), inner)
+            visit(pointer.get("in"), inner)
+        elif "template" in pointer:
+            name = pointer["template"]
+            if name not in scope:
+                raise ValueError(f"Unknown pointer template named {name}")
+            if name not in resolved:
+                resolved[name] = scope[name]
+                visit(scope[name].get("for"), scope)
+        else:
+            for child in _child_pointers(pointer):
+                visit(child, scope)
+
+    visit(pointer, templates)
+    return resolved
+
+def adjust_stack_length(pointer: Any, stack_length_change: int) -> Any:
+    """
+    Rewrite the slot of every stack region in a (JSON) pointer to account for
+    a change in stack length, like `ethdebug.dereference.region.adjust_stack_length`
+    does for a single region.
+    """
+    if stack_length_change == 0 or not isinstance(pointer, Mapping):
+        return pointer
+    if pointer.get("location") == "stack" and "slot" in pointer:
+        if stack_length_change > 0:
+            slot = {"$sum": [pointer["slot"], stack_length_change]}
+        else:
+            slot = {"$difference": [pointer["slot"], -stack_length_change]}
+        return {**pointer, "slot": slot}
+
+    adjusted = dict(pointer)
+    for key in _POINTER_KEYS:
+        if key in pointer:
+            adjusted[key] = adjust_stack_length(pointer[key], stack_length_change)
+    if "group" in pointer:
+        adjusted["group"] = [adjust_stack_length(item, stack_length_change) for item in pointer["group"]]
+    if "list" in pointer:
+        adjusted["list"] = {**pointer["list"], "is": adjust_stack_length(pointer["list"]["is"], stack_length_change)}
+    if "templates" in pointer:
+        adjusted["templates"] = {
+            name: {**template, "for": adjust_stack_length(template["for"], stack_length_change)}
+            for name, template in pointer["templates"].items()
+        }
+    return adjusted
+
+# Keys of pointer collections whose values are pointers themselves
+_POINTER_KEYS = ("then", "else", "in")
+
+def _child_pointers(pointer: Mapping[str, Any]) -> Iterable[Any]:
+    for key in _POINTER_KEYS:
+        if key in pointer:
+            yield pointer[key]
+    yield from pointer.get("group", ())
+    if "list" in pointer:
+        yield pointer["list"].get("is")
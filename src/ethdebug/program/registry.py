@@ -0,0 +1,413 @@
+"""
+A registry of the programs of many contracts, resolved by the code they are
+compiled to.
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from os import PathLike
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from eth_hash.auto import keccak
+
+from ethdebug.program.canonical import to_json
+from ethdebug.program.contexts import ProgramContexts
+from ethdebug.program.pointers import PointerTable
+from ethdebug.program.scope import ScopeIndex
+
+if TYPE_CHECKING:
+    from ethdebug.format.info_schema import Info
+    from ethdebug.format.program_schema import Program
+
+# How code is matched, from the most to the least specific
+MATCHES = ("exact", "immutables", "metadata")
+
+# Loaded programs take about 10 times the size of their compact JSON (measured
+# with tracemalloc on solc output), which is used to estimate their memory usage
+_SIZE_FACTOR = 10
+_DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+_LINK_PLACEHOLDER = re.compile(r"__.{36}__")
+_LIBRARY_PREFIX_LENGTH = 21
+
+_Mask = Tuple[Tuple[int, int], ...]
+Bytecode = Union[bytes, str, Mapping[str, Any]]
+ProgramSource = Union["Program", Mapping[str, Any], Callable[[], Any]]
+
+@dataclass(frozen=True)
+class ProgramEntry:
+    """
+    A program known to a registry.
+
+    :param id: The id of the program in the registry.
+    :param name: The name of the contract, if known.
+    :param environment: "call" for runtime code, "create" for creation code.
+    :param compilation: The id of the compilation the program belongs to, if known.
+    :param code_hash: The keccak256 hash of the compiled code, with unlinked libraries and immutables as zeros.
+    :param code_length: The length of the compiled code.
+    """
+    id: int
+    name: Optional[str]
+    environment: str
+    compilation: Optional[str]
+    code_hash: bytes
+    code_length: int
+
+@dataclass(frozen=True)
+class Resolution:
+    """
+    The program of some code.
+
+    :param entry: The matching program.
+    :param match: How the code matched, see `MATCHES`. "immutables" ignores
+        immutables and linked library addresses, "metadata" also ignores the
+        CBOR metadata appended by the compiler.
+    :param code_hash: The keccak256 hash of the resolved code.
+    """
+    entry: ProgramEntry
+    match: str
+    code_hash: bytes
+
+@dataclass
+class LoadedProgram:
+    """
+    A program with its lookup structures.
+
+    Indexes are built from the program's JSON; the pydantic model is only
+    validated when `program` is accessed.
+    """
+    entry: ProgramEntry
+    json: Mapping[str, Any]
+    contexts: ProgramContexts
+    scope: ScopeIndex
+    size: int
+
+    @property
+    def pointers(self) -> PointerTable:
+        return self.scope.pointers
+
+    @cached_property
+    def program(self) -> Program:
+        from ethdebug.format.program_schema import Program
+        return Program.model_validate(self.json)
+
+class ProgramRegistry:
+    """
+    Programs of many compilations, indexed by the hash of their code.
+
+    Deployed code rarely equals the compiled code: immutables and library
+    addresses are filled in at deployment, the metadata appended by the
+    compiler differs between otherwise identical builds, and creation code is
+    followed by the constructor arguments. Every program is therefore indexed
+    under the hash of its code with these parts masked (set to zero). Code is
+    resolved by masking it the same way, which takes one hash per distinct
+    mask and code length; results are cached by the hash of the code.
+
+    Programs are kept as compact JSON until they are needed. Loaded programs
+    and their indexes are kept in a least recently used cache, evicted once
+    their estimated size exceeds the memory budget.
+    """
+    def __init__(self, memory_budget: int = _DEFAULT_MEMORY_BUDGET):
+        """
+        :param memory_budget: The estimated size in bytes of the loaded programs to keep.
+        """
+        self.memory_budget = memory_budget
+        self._entries: List[ProgramEntry] = []
+        self._sources: List[Union[bytes, Callable[[], Any]]] = []
+        # (environment, code length) -> [(match, mask, hash -> entry id)]
+        self._groups: Dict[Tuple[str, int], List[Tuple[int, _Mask, Dict[bytes, int]]]] = {}
+        self._lengths: Dict[str, List[int]] = {}
+        self._hashes: Dict[Tuple[bytes, str], int] = {}
+        self._resolved: Dict[Tuple[bytes, str], Optional[Resolution]] = {}
+        self._loaded: OrderedDict[int, LoadedProgram] = OrderedDict()
+        self._loaded_size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, entry_id: int) -> ProgramEntry:
+        return self._entries[entry_id]
+
+    def entries(self) -> List[ProgramEntry]:
+        return list(self._entries)
+
+    def add(
+        self,
+        program: ProgramSource,
+        bytecode: Bytecode,
+        *,
+        environment: Optional[str] = None,
+        name: Optional[str] = None,
+        compilation: Optional[str] = None,
+        immutable_references: Optional[Any] = None,
+    ) -> ProgramEntry:
+        """
+        Register the program of some compiled code.
+
+        :param program: The program as model or JSON, or a function loading it on demand.
+            Models and JSON are stored as compact JSON until the program is loaded.
+        :param bytecode: The compiled code as bytes, as hex (where unlinked libraries are
+            placeholders), or as solc `evm.bytecode` / `evm.deployedBytecode` output.
+        :param environment: "call" or "create", by default the environment of the program.
+        :param name: The contract name, by default the name of the program's contract.
+        :param compilation: The compilation id, by default the id referenced by the program.
+        :param immutable_references: The immutable references of the code, in solc's format.
+        """
+        if not callable(program):
+            program = to_json(program)
+            environment = environment or program.get("environment")
+            name = name or (program.get("contract") or {}).get("name")
+            compilation = compilation or _compilation_id(program.get("compilation"))
+            source: Union[bytes, Callable[[], Any]] = json.dumps(program, separators=(",", ":")).encode()
+        else:
+            source = program
+        if environment not in ("call", "create"):
+            raise ValueError(f"Unknown environment {environment!r}")
+
+        code, masks = _parse_bytecode(bytecode, immutable_references)
+        if environment == "call" and code[:1] == b"\x73" and not any(code[1:_LIBRARY_PREFIX_LENGTH]):
+            # Libraries start with PUSH20 of their own address, which is set at deployment
+            masks.append((1, _LIBRARY_PREFIX_LENGTH))
+        entry = ProgramEntry(
+            id=len(self._entries),
+            name=name,
+            environment=environment,
+            compilation=compilation,
+            code_hash=keccak(code),
+            code_length=len(code),
+        )
+        self._entries.append(entry)
+        self._sources.append(source)
+        self._hashes.setdefault((entry.code_hash, environment), entry.id)
+
+        levels: List[Tuple[int, _Mask]] = [(0, ())]
+        mask = _merge(masks)
+        if mask:
+            levels.append((1, mask))
+        metadata = _metadata_range(code)
+        if metadata is not None:
+            levels.append((2, _merge(masks + [metadata])))
+        groups = self._groups.setdefault((environment, len(code)), [])
+        if not groups:
+            lengths = self._lengths.setdefault(environment, [])
+            lengths.append(len(code))
+            lengths.sort(reverse=True)
+        for level, mask in levels:
+            for group_level, group_mask, table in groups:
+                if (group_level, group_mask) == (level, mask):
+                    break
+            else:
+                table = {}
+                groups.append((level, mask, table))
+                groups.sort(key=lambda group: group[0])
+            table.setdefault(_masked_hash(code, mask), entry.id)
+        self._resolved.clear()
+        return entry
+
+    def add_info(self, info: Union[Info, Mapping[str, Any]], bytecodes: Mapping[Tuple[str, str], Bytecode]) -> List[ProgramEntry]:
+        """
+        Register the programs of an `Info` document.
+
+        Programs do not include their code, so it is given separately.
+
+        :param bytecodes: The code of each program by contract name and environment, as in `add`.
+            Programs without code are skipped.
+        """
+        info = to_json(info)
+        compilation = _compilation_id(info.get("compilation"))
+        entries = []
+        for program in info.get("programs", ()):
+            name = (program.get("contract") or {}).get("name")
+            bytecode = bytecodes.get((name, program.get("environment")))
+            if bytecode is not None:
+                entries.append(self.add(program, bytecode, compilation=_compilation_id(program.get("compilation")) or compilation))
+        return entries
+
+    def add_solc_output(self, output: Union[str, PathLike, Mapping[str, Any]]) -> List[ProgramEntry]:
+        """
+        Register the programs of solc standard JSON output, given as JSON or a path to it.
+
+        Both the creation and the runtime programs of every contract are registered,
+        if the output contains their code.
+        """
+        if not isinstance(output, Mapping):
+            with open(output, "r") as f:
+                output = json.load(f)
+        compilation = _compilation_id((output.get("ethdebug") or {}).get("compilation"))
+        entries = []
+        for contracts in output.get("contracts", {}).values():
+            for name, contract in contracts.items():
+                evm = contract.get("evm") or {}
+                for key, environment in (("bytecode", "create"), ("deployedBytecode", "call")):
+                    bytecode = evm.get(key) or {}
+                    if bytecode.get("object") and bytecode.get("ethdebug"):
+                        entries.append(self.add(
+                            bytecode["ethdebug"],
+                            bytecode,
+                            environment=environment,
+                            name=name,
+                            compilation=compilation,
+                        ))
+        return entries
+
+    def resolve(self, code: bytes, environment: str = "call") -> Optional[Resolution]:
+        """
+        Find the program of some code, or None if it is unknown.
+
+        :param code: The executed code, e.g. read from `MachineState.code`.
+            For creation code, this is the initcode including the constructor arguments.
+        :param environment: "call" for runtime code, "create" for creation code.
+        """
+        code = bytes(code)
+        code_hash = keccak(code)
+        key = (code_hash, environment)
+        if key in self._resolved:
+            return self._resolved[key]
+        resolution = None
+        # Creation code is matched as a prefix, preferring the longest match
+        lengths = [len(code)] if environment == "call" else self._lengths.get(environment, [])
+        for length in lengths:
+            if length > len(code):
+                continue
+            prefix = code if length == len(code) else code[:length]
+            # Groups are ordered from the most to the least specific match
+            for level, mask, table in self._groups.get((environment, length), ()):
+                entry_id = table.get(code_hash if prefix is code and not mask else _masked_hash(prefix, mask))
+                if entry_id is not None:
+                    resolution = Resolution(self._entries[entry_id], MATCHES[level], code_hash)
+                    break
+            if resolution is not None:
+                break
+        self._resolved[key] = resolution
+        return resolution
+
+    def resolve_hash(self, code_hash: bytes, environment: str = "call") -> Optional[Resolution]:
+        """
+        Find the program of code by its hash (e.g. `Frame.code_hash`), or None if it is unknown.
+
+        Only exact matches and code that was resolved before are found, since
+        masked matching needs the code itself.
+        """
+        key = (code_hash, environment)
+        if key in self._resolved:
+            return self._resolved[key]
+        entry_id = self._hashes.get(key)
+        if entry_id is None:
+            return None
+        resolution = self._resolved[key] = Resolution(self._entries[entry_id], "exact", code_hash)
+        return resolution
+
+    def load(self, entry: Union[int, ProgramEntry, Resolution]) -> LoadedProgram:
+        """
+        Get a program with its lookup structures, loading it if necessary.
+        """
+        if isinstance(entry, Resolution):
+            entry = entry.entry
+        entry_id = entry.id if isinstance(entry, ProgramEntry) else entry
+        loaded = self._loaded.get(entry_id)
+        if loaded is not None:
+            self._loaded.move_to_end(entry_id)
+            return loaded
+        source = self._sources[entry_id]
+        if isinstance(source, bytes):
+            program = json.loads(source)
+            size = len(source) * _SIZE_FACTOR
+        else:
+            program = to_json(source())
+            size = len(json.dumps(program, separators=(",", ":"))) * _SIZE_FACTOR
+        contexts = ProgramContexts.build(program)
+        scope = ScopeIndex.build(program, contexts=contexts)
+        loaded = LoadedProgram(self._entries[entry_id], program, contexts, scope, size)
+        self._loaded[entry_id] = loaded
+        self._loaded_size += size
+        # The program just loaded is kept, even if it exceeds the budget on its own
+        while self._loaded_size > self.memory_budget and len(self._loaded) > 1:
+            _, evicted = self._loaded.popitem(last=False)
+            self._loaded_size -= evicted.size
+        return loaded
+
+    def program(self, code: bytes, environment: str = "call") -> Optional[LoadedProgram]:
+        """
+        Resolve some code and load its program, see `resolve` and `load`.
+        """
+        resolution = self.resolve(code, environment)
+        return self.load(resolution) if resolution is not None else None
+
+    def is_loaded(self, entry: Union[int, ProgramEntry]) -> bool:
+        return (entry.id if isinstance(entry, ProgramEntry) else entry) in self._loaded
+
+    def memory_usage(self) -> int:
+        """
+        The estimated size in bytes of the loaded programs.
+        """
+        return self._loaded_size
+
+def _compilation_id(compilation: Any) -> Optional[str]:
+    if isinstance(compilation, Mapping) and compilation.get("id") is not None:
+        return str(compilation["id"])
+    return None
+
+def _parse_bytecode(bytecode: Bytecode, immutable_references: Optional[Any]) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Get the code and the ranges set at deployment (linked libraries and immutables).
+    """
+    masks: List[Tuple[int, int]] = []
+    if isinstance(bytecode, Mapping):
+        if immutable_references is None:
+            immutable_references = bytecode.get("immutableReferences")
+        bytecode = bytecode.get("object", "")
+    if isinstance(bytecode, str):
+        hex_code = bytecode[2:] if bytecode.startswith("0x") else bytecode
+        for placeholder in _LINK_PLACEHOLDER.finditer(hex_code):
+            masks.append((placeholder.start() // 2, placeholder.end() // 2))
+        code = bytes.fromhex(_LINK_PLACEHOLDER.sub("0" * 40, hex_code))
+    else:
+        code = bytes(bytecode)
+    masks.extend(_immutable_ranges(immutable_references))
+    return code, masks
+
+def _immutable_ranges(references: Optional[Any]) -> Iterable[Tuple[int, int]]:
+    """
+    Accepts solc's `{id: [{"start": ..., "length": ...}]}` or a sequence of `(start, length)`.
+    """
+    if not references:
+        return
+    groups: Iterable[Sequence[Any]] = references.values() if isinstance(references, Mapping) else [references]
+    for group in groups:
+        for reference in group:
+            start, length = (reference["start"], reference["length"]) if isinstance(reference, Mapping) else reference
+            yield start, start + length
+
+def _metadata_range(code: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Find the CBOR metadata solc appends to code, followed by its length in two bytes.
+    """
+    if len(code) < 2:
+        return None
+    length = int.from_bytes(code[-2:], "big")
+    start = len(code) - 2 - length
+    # The metadata is a CBOR map
+    if length == 0 or start < 0 or not 0xa0 <= code[start] <= 0xb7:
+        return None
+    return start, len(code) - 2
+
+def _merge(ranges: List[Tuple[int, int]]) -> _Mask:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+def _masked_hash(code: bytes, mask: _Mask) -> bytes:
+    if not mask:
+        return keccak(code)
+    masked = bytearray(code)
+    for start, end in mask:
+        masked[start:end] = bytes(end - start)
+    return keccak(bytes(masked))
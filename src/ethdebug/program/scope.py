@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+from ethdebug.program.canonical import canonical_key
+from ethdebug.program.contexts import ProgramContexts
+from ethdebug.program.pointers import PointerTable
+
+if TYPE_CHECKING:
+    from ethdebug.format.program_schema import Program
+
+@dataclass(frozen=True)
+class ScopeVariable:
+    """
+    A unique variable declared by a `variables` context.
+
+    The pointer is not stored inline, but as an id into the `PointerTable`
+    of the `ScopeIndex` the variable belongs to.
+    """
+    id: int
+    identifier: str | None
+    declaration: Any
+    type: Any
+    pointer_id: int | None
+
+class ScopeIndex:
+    """
+    The variables in scope at every instruction of a program.
+
+    The index is built in a single pass over the program's interned contexts
+    (see `ProgramContexts`), so each unique context is analyzed once. Every unique
+    variable is interned once and every unique set of variables (a scope) is
+    stored once as a sorted tuple of variable ids. Consecutive instructions
+    usually share their scope, so each instruction only stores the id of its
+    scope in a compact array. Looking up the variables at a program counter
+    takes constant time.
+
+    A variable is considered in scope at an instruction if it is declared by
+    the instruction's context, including contexts nested in `gather` and `pick`.
+    Variables of the alternatives of a `pick` context are all included, since
+    any of them may be in scope.
+    """
+    pointers: PointerTable
+    contexts: ProgramContexts
+    _variables: List[ScopeVariable]
+    _scopes: List[Tuple[ScopeVariable, ...]]
+    _scope_ids: array
+
+    def __init__(
+        self,
+        pointers: PointerTable,
+        contexts: ProgramContexts,
+        variables: List[ScopeVariable],
+        scopes: List[Tuple[ScopeVariable, ...]],
+        scope_ids: array
+    ):
+        self.pointers = pointers
+        self.contexts = contexts
+        self._variables = variables
+        self._scopes = scopes
+        self._scope_ids = scope_ids
+
+    @staticmethod
+    def build(
+        program: Program | Mapping[str, Any],
+        pointers: Optional[PointerTable] = None,
+        contexts: Optional[ProgramContexts] = None
+    ) -> ScopeIndex:
+        """
+        Compute the in-scope variables of every instruction of a program.
+
+        :param program: The program, either as model or as JSON.
+        :param pointers: The pointer table to intern variable pointers into.
+        :param contexts: The program's interned contexts, if already built.
+        """
+        pointers = pointers if pointers is not None else PointerTable()
+        contexts = contexts if contexts is not None else ProgramContexts.build(program)
+        table = contexts.table
+        variables: List[ScopeVariable] = []
+        variable_ids: Dict[str, int] = {}
+        scopes: List[Tuple[ScopeVariable, ...]] = []
+        scope_ids: Dict[FrozenSet[int], int] = {}
+        context_variables: Dict[int, FrozenSet[int]] = {}
+        context_scopes: Dict[int, int] = {}
+
+        def intern_variable(variable: Mapping[str, Any]) -> int:
+            key = canonical_key(variable)
+            variable_id = variable_ids.get(key)
+            if variable_id is None:
+                variable_id = len(variables)
+                variable_ids[key] = variable_id
+                pointer = variable.get("pointer")
+                variables.append(ScopeVariable(
+                    id=variable_id,
+                    identifier=variable.get("identifier"),
+                    declaration=variable.get("declaration"),
+                    type=variable.get("type"),
+                    pointer_id=pointers.intern(pointer) if pointer is not None else None,
+                ))
+            return variable_id
+
+        def collect_variables(context_id: int) -> FrozenSet[int]:
+            if context_id not in context_variables:
+                node = table.node(context_id)
+                ids = {intern_variable(variable) for variable in node.fields.get("variables", ())}
+                for nested in node.gather + node.pick:
+                    ids |= collect_variables(nested)
+                context_variables[context_id] = frozenset(ids)
+            return context_variables[context_id]
+
+        def scope_of(context_id: int) -> int:
+            if context_id not in context_scopes:
+                ids = collect_variables(context_id)
+                scope_id = scope_ids.get(ids)
+                if scope_id is None:
+                    scope_id = len(scopes)
+                    scope_ids[ids] = scope_id
+                    scopes.append(tuple(variables[i] for i in sorted(ids)))
+                context_scopes[context_id] = scope_id
+            return context_scopes[context_id]
+
+        # Scopes are computed once per unique context, not once per instruction
+        instruction_scopes = array("I", (scope_of(context_id) for context_id in contexts.context_ids()))
+        return ScopeIndex(pointers, contexts, variables, scopes, instruction_scopes)
+
+    def variables_at(self, pc: int) -> Tuple[ScopeVariable, ...]:
+        """
+        Get the variables in scope after executing the instruction at a given
+        program counter.
+        """
+        return self._scopes[self.scope_id_at(pc)]
+
+    def scope_id_at(self, pc: int) -> int:
+        """
+        Get the id of the scope at a given program counter. Two program counters
+        have the same variables in scope if and only if their scope ids are equal.
+        """
+        return self._scope_ids[self.contexts.index_of(pc)]
+
+    def variable(self, variable_id: int) -> ScopeVariable:
+        return self._variables[variable_id]
+
+    def variables(self) -> Tuple[ScopeVariable, ...]:
+        """
+        All unique variables declared anywhere in the program.
+        """
+        return tuple(self._variables)
+
+    def runs(self) -> Iterator[Tuple[int, int, Tuple[ScopeVariable, ...]]]:
+        """
+        Iterate over maximal runs of consecutive instructions that share the
+        same scope, as `(first index, last index + 1, variables)` triples.
+        """
+        start = 0
+        for index in range(1, len(self._scope_ids) + 1):
+            if index == len(self._scope_ids) or self._scope_ids[index] != self._scope_ids[start]:
+                yield start, index, self._scopes[self._scope_ids[start]]
+                start = index
+
+    def __len__(self) -> int:
+        return len(self._scope_ids)
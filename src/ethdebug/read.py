@@ -1,14 +1,30 @@
+from time import perf_counter
+from typing import Awaitable
+
+from ethdebug import instrument
 from ethdebug.cursor import Region
 from ethdebug.data import Data
 from ethdebug.machine import MachineState
 
 
-async def read(region: Region, state: MachineState) -> Data:
+def read(region: Region, state: MachineState) -> Awaitable[Data]:
+    if instrument.enabled:
+        return _read_instrumented(region, state)
+    return _read(region, state)
+
+async def _read_instrumented(region: Region, state: MachineState) -> Data:
+    start = perf_counter()
+    try:
+        return await _read(region, state)
+    finally:
+        instrument.record("read", region.location, perf_counter() - start, subject=region)
+
+async def _read(region: Region, state: MachineState) -> Data:
     location = region.location
 
-    slot = region.slot.as_uint() if region.slot else 0
-    offset = region.offset.as_uint() if region.offset else 0
-    length = region.length.as_uint() if region.length else 32
+    slot = region.slot.as_uint() if region.slot is not None else 0
+    offset = region.offset.as_uint() if region.offset is not None else 0
+    length = region.length.as_uint() if region.length is not None else 32
 
     if location == "stack":
         return await state.stack.read(slot, offset, length)
@@ -0,0 +1,349 @@
+"""
+The call frames of a trace: which frame executes at each step, and the tree of
+calls between them.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from eth_hash.auto import keccak
+
+from ethdebug.machine import MachineState, MachineTrace, SeekableMachineTrace
+
+KINDS = ("root", "call", "callcode", "delegatecall", "staticcall", "create", "create2")
+_KIND_IDS = {kind: index for index, kind in enumerate(KINDS)}
+
+# Stack slots of the called address and the number of arguments of instructions that start a frame
+_CALLS = {
+    "CALL": (1, 7),
+    "CALLCODE": (1, 7),
+    "DELEGATECALL": (1, 6),
+    "STATICCALL": (1, 6),
+    "CREATE": (None, 3),
+    "CREATE2": (None, 4),
+}
+_HALTS = {"STOP", "RETURN", "REVERT", "SELFDESTRUCT", "INVALID"}
+_NONE = 0xFFFFFFFF
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    A call frame.
+
+    :param id: The id of the frame, frames are numbered in the order they are entered.
+    :param parent: The id of the calling frame, None for the outermost frame.
+    :param depth: The call depth, 0 for the outermost frame.
+    :param kind: How the frame was entered, see `KINDS`.
+    :param entry: The first step executed in the frame.
+    :param exit: The last step executed in the frame, including the steps of its callees.
+    :param address: The address whose code is executed, if known.
+    :param storage_address: The address whose storage is used, differs for DELEGATECALL and CALLCODE.
+    :param code_hash: The keccak256 hash of the executed code (the initcode for CREATE and CREATE2).
+    """
+    id: int
+    parent: Optional[int]
+    depth: int
+    kind: str
+    entry: int
+    exit: int
+    address: Optional[str]
+    storage_address: Optional[str]
+    code_hash: Optional[bytes]
+
+class FrameIndex:
+    """
+    The call tree of a trace.
+
+    Frames are stored in columns indexed by frame id, in the order the frames
+    are entered, so the descendants of a frame have consecutive ids. Addresses
+    and code hashes are stored once in tables. The frame executing at each step
+    is found by binary search over the steps at which the executing frame
+    changes.
+    """
+
+    def __init__(self) -> None:
+        self._parents = array("I")
+        self._depths = array("H")
+        self._kinds = array("B")
+        self._entries = array("Q")
+        self._exits = array("Q")
+        self._addresses = array("I")
+        self._storage_addresses = array("I")
+        self._code_hashes = array("I")
+        self._address_table: List[Optional[str]] = []
+        self._address_ids: Dict[Optional[str], int] = {}
+        self._hash_table: List[Optional[bytes]] = []
+        self._hash_ids: Dict[Optional[bytes], int] = {}
+        self._change_steps = array("Q")
+        self._change_frames = array("I")
+
+    @classmethod
+    async def from_trace(
+        cls,
+        trace: MachineTrace,
+        *,
+        address: Optional[str] = None,
+        depth: Optional[Callable[[MachineState], Awaitable[int]]] = None,
+    ) -> FrameIndex:
+        """
+        Build the call tree of a trace in a single pass.
+
+        If the machine does not report the call depth, frames are recognized by
+        their first state (program counter 0 and an empty stack right after a
+        call or create), and they end after a halting instruction or when the
+        caller resumes after the call instruction with the stack of a finished
+        call (after an exceptional halt).
+
+        :param trace: The trace to index.
+        :param address: The address called by the transaction, if known.
+        :param depth: Determines the call depth of a state, if the machine knows it.
+        """
+        index = cls()
+        async for _ in index.stream(trace, address=address, depth=depth):
+            pass
+        return index
+
+    async def stream(
+        self,
+        trace: MachineTrace,
+        *,
+        address: Optional[str] = None,
+        depth: Optional[Callable[[MachineState], Awaitable[int]]] = None,
+    ) -> AsyncIterator[Tuple[MachineState, int]]:
+        """
+        Build the call tree of a trace into this (empty) index while streaming the trace,
+        yielding every state with the id of the frame executing it. See `from_trace`.
+        """
+        builder = _Builder(self, address)
+        async for state in trace:
+            await builder.append(state, await depth(state) if depth is not None else None)
+            yield state, builder.active[-1]
+        builder.finish()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def frame(self, frame_id: int) -> Frame:
+        parent = self._parents[frame_id]
+        return Frame(
+            id=frame_id,
+            parent=None if parent == _NONE else parent,
+            depth=self._depths[frame_id],
+            kind=KINDS[self._kinds[frame_id]],
+            entry=self._entries[frame_id],
+            exit=self._exits[frame_id],
+            address=self._address_table[self._addresses[frame_id]],
+            storage_address=self._address_table[self._storage_addresses[frame_id]],
+            code_hash=self._hash_table[self._code_hashes[frame_id]],
+        )
+
+    def frame_at(self, step: int) -> int:
+        """
+        Get the id of the frame executing at a step.
+        """
+        index = bisect_right(self._change_steps, step) - 1
+        if index < 0 or step > self._exits[0]:
+            raise IndexError(f"Step {step} out of range")
+        return self._change_frames[index]
+
+    def call_stack(self, step: int) -> List[int]:
+        """
+        Get the ids of the frames active at a step, from the outermost to the executing frame.
+        """
+        frames = [self.frame_at(step)]
+        while self._parents[frames[-1]] != _NONE:
+            frames.append(self._parents[frames[-1]])
+        return frames[::-1]
+
+    def descendants(self, frame_id: int) -> range:
+        """
+        Get the ids of all frames called directly or indirectly by a frame.
+        """
+        return range(frame_id + 1, bisect_right(self._entries, self._exits[frame_id]))
+
+    def children(self, frame_id: int) -> Iterator[int]:
+        """
+        Get the ids of the frames called directly by a frame.
+        """
+        descendants = self.descendants(frame_id)
+        child = descendants.start
+        while child < descendants.stop:
+            yield child
+            child = self.descendants(child).stop
+
+    def last_step(self, frame_id: int, step: int) -> int:
+        """
+        Get the last step at or before `step` that was executed in a frame that is active at `step`.
+
+        For a frame that is waiting for a call to return, this is the step of the call instruction.
+        """
+        executing = self.frame_at(step)
+        if executing == frame_id:
+            return step
+        while True:
+            parent = self._parents[executing]
+            if parent == _NONE:
+                raise ValueError(f"Frame {frame_id} is not active at step {step}")
+            if parent == frame_id:
+                return self._entries[executing] - 1
+            executing = parent
+
+    async def state(self, trace: SeekableMachineTrace, frame_id: int, step: int) -> FrameState:
+        """
+        Get the state of a frame at a step, as seen from that frame.
+
+        For the executing frame this is the state at the step. For a calling
+        frame it is the state at its call instruction, where its stack,
+        memory, calldata and returndata are those it had before the call.
+        """
+        return FrameState(await trace.state_at(self.last_step(frame_id, step)), self.frame(frame_id))
+
+class FrameState(MachineState):
+    """
+    The state of a frame, see `FrameIndex.state`.
+    """
+    frame: Frame
+
+    def __init__(self, state: MachineState, frame: Frame):
+        self._state = state
+        self.frame = frame
+
+    async def trace_index(self) -> int:
+        return await self._state.trace_index()
+
+    async def program_counter(self) -> int:
+        return await self._state.program_counter()
+
+    async def opcode(self) -> str:
+        return await self._state.opcode()
+
+    @property
+    def stack(self) -> Any:
+        return self._state.stack
+
+    @property
+    def memory(self) -> Any:
+        return self._state.memory
+
+    @property
+    def storage(self) -> Any:
+        return self._state.storage
+
+    @property
+    def transient(self) -> Any:
+        return self._state.transient
+
+    @property
+    def calldata(self) -> Any:
+        return self._state.calldata
+
+    @property
+    def returndata(self) -> Any:
+        return self._state.returndata
+
+    @property
+    def code(self) -> Any:
+        return self._state.code
+
+class _Builder:
+    """
+    Maintain the active frames while streaming the states of a trace.
+    """
+    def __init__(self, index: FrameIndex, address: Optional[str]):
+        self.index = index
+        self.active: List[int] = []
+        # The call instruction of each active frame's caller: (pc, stack length after the call)
+        self.resume: List[Any] = []
+        self.address = address
+        self.previous: Optional[Dict[str, Any]] = None
+        self.step = -1
+
+    async def append(self, state: MachineState, depth: Optional[int]) -> None:
+        index = self.index
+        self.step = step = await state.trace_index()
+        pc = await state.program_counter()
+        stack_length = await state.stack.length()
+        previous = self.previous
+        if previous is None:
+            await self._enter(state, "root", self.address, self.address)
+        elif depth is not None:
+            while len(self.active) - 1 > depth:
+                await self._exit(state)
+            if len(self.active) - 1 < depth:
+                await self._enter_from(state, previous)
+        elif previous["opcode"] in _CALLS and pc == 0 and stack_length == 0:
+            await self._enter_from(state, previous)
+        elif len(self.active) > 1 and (
+            previous["opcode"] in _HALTS or self.resume[-1][:2] == (pc, stack_length)
+        ):
+            await self._exit(state)
+
+        if not index._change_frames or index._change_frames[-1] != self.active[-1]:
+            index._change_steps.append(step)
+            index._change_frames.append(self.active[-1])
+
+        opcode = await state.opcode()
+        self.previous = {"opcode": opcode, "pc": pc, "stack_length": stack_length}
+        if opcode in _CALLS:
+            address_slot, arguments = _CALLS[opcode]
+            if address_slot is not None and address_slot < stack_length:
+                self.previous["address"] = _to_address(await state.stack.read(address_slot, 0, 32))
+            self.previous["resume_stack_length"] = stack_length - arguments + 1
+
+    async def _enter_from(self, state: MachineState, previous: Dict[str, Any]) -> None:
+        kind = previous["opcode"].lower() if previous["opcode"] in _CALLS else "call"
+        address = previous.get("address")
+        caller = self.active[-1]
+        storage_address = (
+            self.index._address_table[self.index._storage_addresses[caller]]
+            if kind in ("delegatecall", "callcode") else address
+        )
+        self.resume.append((previous["pc"] + 1, previous.get("resume_stack_length"), kind))
+        await self._enter(state, kind, address, storage_address)
+
+    async def _enter(self, state: MachineState, kind: str, address: Optional[str], storage_address: Optional[str]) -> None:
+        index = self.index
+        code_length = await state.code.length()
+        code_hash = keccak(bytes(await state.code.read(0, code_length))) if code_length else None
+        frame_id = len(index._entries)
+        index._parents.append(self.active[-1] if self.active else _NONE)
+        index._depths.append(len(self.active))
+        index._kinds.append(_KIND_IDS[kind])
+        index._entries.append(self.step)
+        index._exits.append(self.step)
+        index._addresses.append(self._address_id(address))
+        index._storage_addresses.append(self._address_id(storage_address))
+        index._code_hashes.append(index._hash_ids.setdefault(code_hash, len(index._hash_table)))
+        if len(index._hash_table) < len(index._hash_ids):
+            index._hash_table.append(code_hash)
+        self.active.append(frame_id)
+
+    async def _exit(self, state: MachineState) -> None:
+        """
+        Close the executing frame, `state` is the first state of the caller after the call.
+        """
+        index = self.index
+        frame_id = self.active.pop()
+        _, _, kind = self.resume.pop()
+        index._exits[frame_id] = self.step - 1
+        if kind in ("create", "create2") and await state.stack.length():
+            # The caller finds the address of the created contract on the stack
+            address = _to_address(await state.stack.read(0, 0, 32))
+            index._addresses[frame_id] = index._storage_addresses[frame_id] = self._address_id(address)
+
+    def _address_id(self, address: Optional[str]) -> int:
+        index = self.index
+        address_id = index._address_ids.setdefault(address, len(index._address_table))
+        if address_id == len(index._address_table):
+            index._address_table.append(address)
+        return address_id
+
+    def finish(self) -> None:
+        for frame_id in self.active:
+            self.index._exits[frame_id] = self.step
+
+def _to_address(word: bytes) -> str:
+    return "0x" + bytes(word)[-20:].hex()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, AsyncIterator, List, Optional, Union
+
+from ethdebug.data import Data
+from ethdebug.machine import Machine, MachineState, SeekableMachineTrace
+from ethdebug.replay.trace_file import WORD_SIZE, TraceFile
+
+class ReplayMachine(Machine):
+    """
+    A machine that replays a trace recorded in a trace file (see `TraceWriter`).
+
+    The file is memory-mapped, so opening even very long traces is instant and
+    only the parts of the file that are actually read are loaded.
+    """
+    file: TraceFile
+
+    def __init__(self, source: Union[str, Path, TraceFile]):
+        self.file = source if isinstance(source, TraceFile) else TraceFile(source)
+
+    async def trace(self) -> ReplayTrace:
+        return ReplayTrace(self.file)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> ReplayMachine:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class ReplayTrace(SeekableMachineTrace):
+    """
+    The states of a recorded trace. Besides iterating over all states, any state
+    can be accessed directly by its trace index.
+    """
+    file: TraceFile
+
+    def __init__(self, file: TraceFile):
+        self.file = file
+
+    async def __aiter__(self) -> AsyncIterator[ReplayState]:
+        for trace_index in range(len(self.file)):
+            yield ReplayState(self.file, trace_index)
+
+    async def state_at(self, trace_index: int) -> ReplayState:
+        if not 0 <= trace_index < len(self.file):
+            raise IndexError(f"Trace index {trace_index} out of range, the trace has {len(self.file)} steps")
+        return ReplayState(self.file, trace_index)
+
+    def __len__(self) -> int:
+        return len(self.file)
+
+class ReplayState(MachineState):
+    """
+    The machine state at one step of a recorded trace.
+
+    State is reconstructed lazily: creating a state is free, and the stack is
+    only rebuilt on the first stack access.
+    """
+    file: TraceFile
+    index: int
+    _stack: Optional[List[bytes]]
+
+    def __init__(self, file: TraceFile, index: int):
+        self.file = file
+        self.index = index
+        self._stack = None
+
+    async def trace_index(self) -> int:
+        return self.index
+
+    async def program_counter(self) -> int:
+        return self.file.pc(self.index)
+
+    async def opcode(self) -> str:
+        return self.file.opcode(self.index)
+
+    def words(self) -> List[bytes]:
+        """
+        The stack at this step, from bottom to top.
+        """
+        if self._stack is None:
+            self._stack = self.file.stack(self.index)
+        return self._stack
+
+    @property
+    def stack(self) -> ReplayStack:
+        return ReplayStack(self)
+
+    @property
+    def memory(self) -> ReplayMemory:
+        return ReplayMemory(self.file, self.index)
+
+    @property
+    def storage(self) -> ReplayStorage:
+        return ReplayStorage(self.file, self.index)
+
+    @property
+    def transient(self) -> ReplayTransientStorage:
+        return ReplayTransientStorage(self.file, self.index)
+
+    @property
+    def calldata(self) -> ReplayBlob:
+        return ReplayBlob(self.file, self.index, "calldata")
+
+    @property
+    def returndata(self) -> ReplayBlob:
+        return ReplayBlob(self.file, self.index, "returndata")
+
+    @property
+    def code(self) -> ReplayBlob:
+        return ReplayBlob(self.file, self.index, "code")
+
+class ReplayStack:
+    """
+    The stack of a `ReplayState`. Slot 0 is the top of the stack.
+    """
+    def __init__(self, state: ReplayState):
+        self._state = state
+
+    async def length(self) -> int:
+        return len(self._state.words())
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        words = self._state.words()
+        if not 0 <= slot < len(words):
+            raise ValueError(f"Stack slot {slot} out of range, the stack has {len(words)} items")
+        return Data(_slice(words[len(words) - 1 - slot], offset, length))
+
+class ReplayMemory:
+    def __init__(self, file: TraceFile, index: int):
+        self._file = file
+        self._index = index
+
+    async def length(self) -> int:
+        return self._file.memory_size(self._index)
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        return Data(self._file.memory(self._index, offset, length))
+
+class ReplayStorage:
+    """
+    The storage of the address executing at a step.
+    """
+    transient = False
+
+    def __init__(self, file: TraceFile, index: int):
+        self._file = file
+        self._index = index
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        return Data(_slice(self._file.storage(self._index, slot, self.transient), offset, length))
+
+class ReplayTransientStorage(ReplayStorage):
+    transient = True
+
+class ReplayBlob:
+    """
+    Calldata, returndata or code at a step.
+    """
+    def __init__(self, file: TraceFile, index: int, name: str):
+        self._file = file
+        self._index = index
+        self._name = name
+
+    async def length(self) -> int:
+        return len(self._file.blob(self._index, self._name))
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        return Data(_slice(self._file.blob(self._index, self._name), offset, length))
+
+def _slice(data: bytes, offset: int, length: int) -> bytes:
+    """
+    Read `length` bytes at `offset`, bytes beyond the end read as zero (like the EVM does for calldata and code).
+    """
+    return data[offset:offset + length].ljust(length, b"\x00")
@@ -0,0 +1,179 @@
+"""
+An index of all memory writes of a trace, for finding the steps at which a
+memory region changed.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ethdebug.cursor import Region
+from ethdebug.machine import MachineTrace
+
+# Memory writes by opcode: the stack slots of the destination offset and size,
+# or the fixed size of the write
+_WRITES: Dict[str, Tuple[int, int]] = {
+    "CALLDATACOPY": (0, 2),
+    "CODECOPY": (0, 2),
+    "RETURNDATACOPY": (0, 2),
+    "MCOPY": (0, 2),
+    "EXTCODECOPY": (1, 3),
+    "CALL": (5, 6),
+    "CALLCODE": (5, 6),
+    "DELEGATECALL": (4, 5),
+    "STATICCALL": (4, 5),
+}
+_FIXED_WRITES = {"MSTORE": 32, "MSTORE8": 1}
+
+class MemoryIndex:
+    """
+    All memory writes of a trace, as intervals `[offset, offset + length)` at steps.
+
+    The writes are kept in columns ordered by step. Two segment trees over the
+    (compressed) offsets answer which writes overlap a region: one holds each
+    write in the nodes that cover its interval, to find the writes containing
+    the start of the region, and one holds each write in the nodes above its
+    start offset, to find the writes starting inside the region. Every node
+    lists its writes in step order, so the writes of a step range are found by
+    binary search. A query takes O(log(n)^2 + k) for n writes and k results.
+
+    Memory belongs to a call frame, but the index does not distinguish frames:
+    writes to the memory of other frames at the same offsets are reported too.
+    """
+
+    def __init__(self, steps: array, offsets: array, lengths: array):
+        self._steps = steps
+        self._offsets = offsets
+        self._lengths = lengths
+        coordinates = set(offsets)
+        coordinates.update(offset + length for offset, length in zip(offsets, lengths))
+        self._coordinates = sorted(coordinates)
+        position = {coordinate: index for index, coordinate in enumerate(self._coordinates)}
+        size = 1
+        while size < len(self._coordinates):
+            size *= 2
+        self._size = size
+        self._covering: Dict[int, array] = {}
+        self._starting: Dict[int, array] = {}
+        for write, (offset, length) in enumerate(zip(offsets, lengths)):
+            if not length:
+                continue
+            left, right = position[offset] + size, position[offset + length] + size
+            node = left
+            while node:
+                self._starting.setdefault(node, array("Q")).append(write)
+                node >>= 1
+            while left < right:
+                if left & 1:
+                    self._covering.setdefault(left, array("Q")).append(write)
+                    left += 1
+                if right & 1:
+                    right -= 1
+                    self._covering.setdefault(right, array("Q")).append(write)
+                left >>= 1
+                right >>= 1
+
+    @classmethod
+    def build(cls, writes: Iterable[Tuple[int, int, int]]) -> MemoryIndex:
+        """
+        Build an index from writes `(step, offset, length)` in the order of their steps.
+        """
+        steps, offsets, lengths = array("Q"), array("Q"), array("Q")
+        for step, offset, length in writes:
+            steps.append(step)
+            offsets.append(offset)
+            lengths.append(length)
+        return cls(steps, offsets, lengths)
+
+    @classmethod
+    async def from_trace(cls, trace: MachineTrace) -> MemoryIndex:
+        """
+        Index the memory writes of the instructions of a trace in a single pass.
+
+        A write becomes visible at the step after the instruction. This also
+        applies to the output of calls, which is actually written when the call
+        returns, so watchpoints on call outputs trigger too early rather than
+        not at all.
+        """
+        writes = []
+        async for state in trace:
+            opcode = await state.opcode()
+            if opcode in _FIXED_WRITES:
+                offset, length = (await state.stack.read(0, 0, 32)).as_uint(), _FIXED_WRITES[opcode]
+            elif opcode in _WRITES:
+                offset_slot, length_slot = _WRITES[opcode]
+                length = (await state.stack.read(length_slot, 0, 32)).as_uint()
+                offset = (await state.stack.read(offset_slot, 0, 32)).as_uint() if length else 0
+            else:
+                continue
+            if length:
+                writes.append((await state.trace_index() + 1, offset, length))
+        return cls.build(writes)
+
+    def __len__(self) -> int:
+        """
+        The number of writes.
+        """
+        return len(self._steps)
+
+    def write(self, index: int) -> Tuple[int, int, int]:
+        """
+        Get the write `(step, offset, length)` with the given index.
+        """
+        return self._steps[index], self._offsets[index], self._lengths[index]
+
+    def writes(self, offset: int, length: int, start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """
+        Get the indices of all writes at steps in `[start, stop)` that overlap `[offset, offset + length)`.
+
+        :param stop: The end of the step range, by default the end of the trace.
+        """
+        if not length or not self._coordinates:
+            return []
+        first = bisect_left(self._steps, start)
+        last = len(self._steps) if stop is None else bisect_left(self._steps, stop)
+        if first >= last:
+            return []
+        found: List[int] = []
+
+        def collect(nodes: Dict[int, array], node: int) -> None:
+            writes = nodes.get(node)
+            if writes:
+                found.extend(writes[bisect_left(writes, first):bisect_left(writes, last)])
+
+        # Writes containing `offset`
+        leaf = bisect_right(self._coordinates, offset) - 1
+        if 0 <= leaf < len(self._coordinates) - 1:
+            node = leaf + self._size
+            while node:
+                collect(self._covering, node)
+                node >>= 1
+
+        # Writes starting in `(offset, offset + length)`
+        left = bisect_right(self._coordinates, offset) + self._size
+        right = bisect_left(self._coordinates, offset + length) + self._size
+        while left < right:
+            if left & 1:
+                collect(self._starting, left)
+                left += 1
+            if right & 1:
+                right -= 1
+                collect(self._starting, right)
+            left >>= 1
+            right >>= 1
+        return sorted(found)
+
+    def changes(self, region: Region, steps: Optional[range] = None) -> List[int]:
+        """
+        Get the steps at which any byte of a memory region was written.
+
+        :param region: A memory region with concrete offset and length, as produced by `Cursor.view`.
+        :param steps: The steps to search, all steps by default.
+        """
+        if region.location != "memory":
+            raise ValueError(f"Expected a memory region, got {region.location}")
+        offset = region.offset.as_uint() if region.offset is not None else 0
+        length = region.length.as_uint() if region.length is not None else 32
+        start, stop = (steps.start, steps.stop) if steps is not None else (0, None)
+        return sorted({self._steps[write] for write in self.writes(offset, length, start, stop)})
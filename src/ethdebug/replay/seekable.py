@@ -0,0 +1,418 @@
+"""
+Random access into traces that can only be iterated forwards.
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ethdebug.data import Data
+from ethdebug.machine import MachineState, MachineStorage, MachineTrace, MachineTransientStorage, SeekableMachineTrace
+from ethdebug.replay.machine import _slice
+from ethdebug.replay.trace_file import WORD_SIZE
+
+DEFAULT_CHECKPOINT_INTERVAL = 256
+DEFAULT_MEMORY_LIMIT = 256 << 20
+
+_BLOBS = ("calldata", "returndata", "code")
+
+@dataclass(frozen=True)
+class _Checkpoint:
+    """
+    The full stack and memory after a step, plus where the deltas of the following steps start.
+    """
+    step: int
+    stack: Tuple[bytes, ...]
+    memory: bytes
+    push_position: int
+    write_index: int
+
+    @property
+    def size(self) -> int:
+        return len(self.stack) * WORD_SIZE + len(self.memory)
+
+class SeekableTrace(SeekableMachineTrace):
+    """
+    Make any trace seekable.
+
+    The states of the wrapped trace are consumed on demand, as far as needed to
+    reach the requested trace index, and recorded as deltas: the program
+    counter, opcode, pushed and popped stack words, and memory writes of every
+    step. In addition, the full stack and memory are recorded as a checkpoint
+    at most every `checkpoint_interval` steps, so accessing any state replays
+    at most that many steps. Checkpoints are taken more often when they are
+    cheap, i.e. when the deltas since the last checkpoint have grown as large
+    as the stack and memory themselves.
+
+    When checkpoints and deltas together exceed `memory_limit` bytes, every
+    other checkpoint is dropped and the interval is doubled. Deltas are never
+    dropped, so the limit bounds the checkpoint overhead, not the total size.
+
+    Calldata, returndata and code are recorded whenever they change. Storage
+    and transient storage cannot be enumerated, so their reads are forwarded to
+    the `storage` and `transient` of the wrapped state, which must stay valid
+    after the wrapped trace moved on. These objects are kept for every step at
+    which they change (by identity), so wrapped traces that share them between
+    states take less memory. Like deltas, they are never dropped, and only the
+    size of the objects themselves counts towards `memory_usage`, not the size
+    of what they refer to.
+    """
+    checkpoint_interval: int
+    memory_limit: int
+
+    def __init__(
+        self,
+        trace: MachineTrace,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    ):
+        if checkpoint_interval < 1:
+            raise ValueError("The checkpoint interval must be positive")
+        self.checkpoint_interval = checkpoint_interval
+        self.memory_limit = memory_limit
+        self._source: Optional[AsyncIterator[MachineState]] = trace.__aiter__()
+        self._spacing = 1
+
+        self._pcs = array("Q")
+        self._opcodes = array("H")
+        self._opcode_ids: Dict[str, int] = {}
+        self._opcode_names: List[str] = []
+        self._pops = array("H")
+        self._pushes = array("H")
+        self._push_words = bytearray()
+        self._memory_sizes = array("Q")
+        self._resets = array("Q")
+        self._write_steps = array("Q")
+        self._write_offsets = array("Q")
+        self._write_positions = array("Q")
+        self._write_data = bytearray()
+        self._blob_steps: Dict[str, array] = {name: array("Q") for name in _BLOBS}
+        self._blob_values: Dict[str, List[bytes]] = {name: [] for name in _BLOBS}
+        self._blob_bytes = 0
+        self._storage_steps = array("Q")
+        self._storages: List[Tuple[MachineStorage, MachineTransientStorage]] = []
+        self._storage_bytes = 0
+        self._checkpoints: List[_Checkpoint] = []
+        self._checkpoint_steps: List[int] = []
+        self._checkpoint_bytes = 0
+
+        # The state after the last recorded step
+        self._stack: List[bytes] = []
+        self._memory = bytearray()
+        self._delta_bytes = 0
+        # The stack at the last accessed step, to make stepping forwards cheap
+        self._cursor: Tuple[int, List[bytes]] = (-1, [])
+        self._cursor_push = 0
+
+    def __len__(self) -> int:
+        """
+        The number of states recorded so far. The length of the trace is only known once it was consumed.
+        """
+        return len(self._pcs)
+
+    @property
+    def checkpoints(self) -> int:
+        return len(self._checkpoints)
+
+    def memory_usage(self) -> int:
+        """
+        The approximate number of bytes used by checkpoints, deltas and the storages of the wrapped states.
+        """
+        return (
+            self._checkpoint_bytes + len(self._push_words) + len(self._write_data) + self._blob_bytes
+            + self._storage_bytes + sum(column.itemsize * len(column) for column in self._columns())
+        )
+
+    def _columns(self) -> List[array]:
+        return [
+            self._pcs, self._opcodes, self._pops, self._pushes, self._memory_sizes, self._resets,
+            self._write_steps, self._write_offsets, self._write_positions, *self._blob_steps.values(),
+            self._storage_steps,
+        ]
+
+    async def __aiter__(self) -> AsyncIterator[MachineState]:
+        trace_index = 0
+        while True:
+            try:
+                state = await self.state_at(trace_index)
+            except IndexError:
+                return
+            yield state
+            trace_index += 1
+
+    async def state_at(self, trace_index: int) -> SeekableState:
+        if trace_index < 0:
+            raise IndexError(f"Trace index {trace_index} out of range")
+        while trace_index >= len(self._pcs):
+            if not await self._record_next():
+                raise IndexError(f"Trace index {trace_index} out of range, the trace has {len(self._pcs)} steps")
+        return SeekableState(self, trace_index, self._stack_at(trace_index))
+
+    async def _record_next(self) -> bool:
+        """
+        Record the next state of the wrapped trace, return False if there is none.
+        """
+        if self._source is None:
+            return False
+        try:
+            state = await self._source.__anext__()
+        except StopAsyncIteration:
+            self._source = None
+            return False
+        step = len(self._pcs)
+        self._pcs.append(await state.program_counter())
+        opcode = await state.opcode()
+        if opcode not in self._opcode_ids:
+            self._opcode_ids[opcode] = len(self._opcode_names)
+            self._opcode_names.append(opcode)
+        self._opcodes.append(self._opcode_ids[opcode])
+
+        length = await state.stack.length()
+        stack = [bytes(await state.stack.read(slot, 0, WORD_SIZE)) for slot in range(length - 1, -1, -1)]
+        common = _common_prefix(self._stack, stack)
+        self._pops.append(len(self._stack) - common)
+        self._pushes.append(len(stack) - common)
+        for word in stack[common:]:
+            self._push_words += word
+        self._delta_bytes += (len(stack) - common) * WORD_SIZE
+        self._stack = stack
+
+        size = await state.memory.length()
+        memory = bytes(await state.memory.read(0, size)) if size else b""
+        if size < len(self._memory):
+            # Memory never shrinks within a call frame, so another frame is executing
+            self._resets.append(step)
+            self._memory = bytearray(size)
+        elif size > len(self._memory):
+            self._memory.extend(bytes(size - len(self._memory)))
+        for start, end in _changed_ranges(self._memory, memory):
+            self._write_steps.append(step)
+            self._write_offsets.append(start)
+            self._write_positions.append(len(self._write_data))
+            self._write_data += memory[start:end]
+            self._memory[start:end] = memory[start:end]
+            self._delta_bytes += end - start
+        self._memory_sizes.append(size)
+
+        for name in _BLOBS:
+            view = getattr(state, name)
+            blob_length = await view.length()
+            blob = bytes(await view.read(0, blob_length)) if blob_length else b""
+            values = self._blob_values[name]
+            if (values[-1] if values else b"") != blob:
+                self._blob_steps[name].append(step)
+                values.append(blob)
+                self._blob_bytes += len(blob)
+        storages = (state.storage, state.transient)
+        if not self._storages or any(new is not old for new, old in zip(storages, self._storages[-1])):
+            self._storage_steps.append(step)
+            self._storages.append(storages)
+            self._storage_bytes += sys.getsizeof(storages) + sum(map(sys.getsizeof, storages))
+
+        last = self._checkpoint_steps[-1] if self._checkpoints else None
+        spacing = self.checkpoint_interval * self._spacing
+        size = len(self._stack) * WORD_SIZE + len(self._memory)
+        if last is None or step - last >= spacing or self._delta_bytes >= size * self._spacing:
+            self._checkpoint(step)
+        return True
+
+    def _checkpoint(self, step: int) -> None:
+        checkpoint = _Checkpoint(step, tuple(self._stack), bytes(self._memory), len(self._push_words), len(self._write_steps))
+        self._checkpoints.append(checkpoint)
+        self._checkpoint_steps.append(step)
+        self._checkpoint_bytes += checkpoint.size
+        self._delta_bytes = 0
+        while self.memory_usage() > self.memory_limit and len(self._checkpoints) > 1:
+            # Keep the first checkpoint, and every other one after it
+            self._checkpoints = self._checkpoints[::2]
+            self._checkpoint_steps = self._checkpoint_steps[::2]
+            self._checkpoint_bytes = sum(checkpoint.size for checkpoint in self._checkpoints)
+            self._spacing *= 2
+
+    def _checkpoint_before(self, step: int) -> _Checkpoint:
+        return self._checkpoints[bisect_right(self._checkpoint_steps, step) - 1]
+
+    def _stack_at(self, step: int) -> List[bytes]:
+        """
+        Reconstruct the stack after a step, from bottom to top.
+        """
+        checkpoint = self._checkpoint_before(step)
+        cursor_step, cursor_stack = self._cursor
+        if checkpoint.step <= cursor_step <= step:
+            # Continue from the last accessed step, usually the previous one
+            start, stack = cursor_step, list(cursor_stack)
+            push = self._cursor_push
+        else:
+            start, stack = checkpoint.step, list(checkpoint.stack)
+            push = checkpoint.push_position
+        pops, pushes, words = self._pops, self._pushes, self._push_words
+        for current in range(start + 1, step + 1):
+            pop = pops[current]
+            if pop:
+                del stack[len(stack) - pop:]
+            for _ in range(pushes[current]):
+                stack.append(bytes(words[push:push + WORD_SIZE]))
+                push += WORD_SIZE
+        self._cursor = (step, stack)
+        self._cursor_push = push
+        return stack
+
+    def memory_at(self, step: int, offset: int, length: int) -> bytes:
+        """
+        Reconstruct `length` bytes of memory starting at `offset` after a step.
+        """
+        checkpoint = self._checkpoint_before(step)
+        result = bytearray(length)
+        end = offset + length
+        reset_index = bisect_right(self._resets, step) - 1
+        reset = self._resets[reset_index] if reset_index >= 0 else -1
+        if reset > checkpoint.step:
+            first = bisect_left(self._write_steps, reset)
+        else:
+            first = checkpoint.write_index
+            available = checkpoint.memory[offset:end]
+            result[:len(available)] = available
+        last = bisect_right(self._write_steps, step, lo=first)
+        offsets, positions, data = self._write_offsets, self._write_positions, self._write_data
+        for index in range(first, last):
+            write_start = offsets[index]
+            write_length = (positions[index + 1] if index + 1 < len(positions) else len(data)) - positions[index]
+            write_end = write_start + write_length
+            if write_end <= offset or write_start >= end:
+                continue
+            low, high = max(offset, write_start), min(end, write_end)
+            position = positions[index] + low - write_start
+            result[low - offset:high - offset] = data[position:position + high - low]
+        return bytes(result)
+
+    def blob_at(self, step: int, name: str) -> bytes:
+        index = bisect_right(self._blob_steps[name], step) - 1
+        return self._blob_values[name][index] if index >= 0 else b""
+
+    def storages_at(self, step: int) -> Tuple[MachineStorage, MachineTransientStorage]:
+        """
+        Get the storage and transient storage of the wrapped state at a step.
+        """
+        return self._storages[bisect_right(self._storage_steps, step) - 1]
+
+class SeekableState(MachineState):
+    """
+    A state of a `SeekableTrace`.
+    """
+    def __init__(self, trace: SeekableTrace, index: int, stack: List[bytes]):
+        self._trace = trace
+        self.index = index
+        self._stack = stack
+
+    async def trace_index(self) -> int:
+        return self.index
+
+    async def program_counter(self) -> int:
+        return self._trace._pcs[self.index]
+
+    async def opcode(self) -> str:
+        return self._trace._opcode_names[self._trace._opcodes[self.index]]
+
+    @property
+    def stack(self) -> SeekableStack:
+        return SeekableStack(self._stack)
+
+    @property
+    def memory(self) -> SeekableMemory:
+        return SeekableMemory(self._trace, self.index)
+
+    @property
+    def storage(self) -> MachineStorage:
+        return self._trace.storages_at(self.index)[0]
+
+    @property
+    def transient(self) -> MachineTransientStorage:
+        return self._trace.storages_at(self.index)[1]
+
+    @property
+    def calldata(self) -> SeekableBlob:
+        return SeekableBlob(self._trace.blob_at(self.index, "calldata"))
+
+    @property
+    def returndata(self) -> SeekableBlob:
+        return SeekableBlob(self._trace.blob_at(self.index, "returndata"))
+
+    @property
+    def code(self) -> SeekableBlob:
+        return SeekableBlob(self._trace.blob_at(self.index, "code"))
+
+class SeekableStack:
+    """
+    The stack of a `SeekableState`. Slot 0 is the top of the stack.
+    """
+    def __init__(self, words: List[bytes]):
+        self._words = words
+
+    async def length(self) -> int:
+        return len(self._words)
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        if not 0 <= slot < len(self._words):
+            raise ValueError(f"Stack slot {slot} out of range, the stack has {len(self._words)} items")
+        return Data(_slice(self._words[len(self._words) - 1 - slot], offset, length))
+
+class SeekableMemory:
+    def __init__(self, trace: SeekableTrace, index: int):
+        self._trace = trace
+        self._index = index
+
+    async def length(self) -> int:
+        return self._trace._memory_sizes[self._index]
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        return Data(self._trace.memory_at(self._index, offset, length))
+
+class SeekableBlob:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    async def length(self) -> int:
+        return len(self._data)
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        return Data(_slice(self._data, offset, length))
+
+def _common_prefix(old: List[bytes], new: List[bytes]) -> int:
+    """
+    The number of items at the bottom of two stacks that are unchanged.
+    """
+    length = min(len(old), len(new))
+    if old[:length] == new[:length]:
+        return length
+    for index in range(length):
+        if old[index] != new[index]:
+            return index
+    return length
+
+def _changed_ranges(old: Any, new: bytes, granularity: int = WORD_SIZE) -> List[Tuple[int, int]]:
+    """
+    Find the ranges where two equally long buffers differ, at the given granularity.
+
+    Equal halves are skipped by comparing slices, so only few comparisons are
+    needed when little changed.
+    """
+    ranges: List[Tuple[int, int]] = []
+
+    def compare(start: int, end: int) -> None:
+        if old[start:end] == new[start:end]:
+            return
+        if end - start <= granularity:
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+            return
+        middle = start + max((end - start) // 2 // granularity, 1) * granularity
+        compare(start, middle)
+        compare(middle, end)
+
+    compare(0, len(new))
+    return ranges
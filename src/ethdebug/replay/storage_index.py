@@ -0,0 +1,197 @@
+"""
+An index of all storage and transient storage writes of a trace, for reading
+storage at any step without replaying the trace.
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from ethdebug.data import Data
+from ethdebug.machine import MachineState, MachineStorage, MachineTrace
+
+_WORD_SIZE = 32
+_STORES = {"SSTORE": False, "TSTORE": True}
+_NEVER = (1 << 64) - 1
+
+# (context, transient, slot)
+_Key = Tuple[int, bool, int]
+
+class StorageIndex:
+    """
+    All writes of a trace, grouped by storage slot.
+
+    The writes of each slot are stored as a sorted column of steps and a
+    column of values, so the value of a slot at any step is found with a
+    binary search. Slots belong to a context (usually the address whose
+    storage is written); `contexts` lists the contexts by id.
+
+    A write at step k is visible in the state at step k, i.e. for an SSTORE
+    executed at step k-1. Writes of a call frame that reverted are visible
+    until the step the frame returned at. Slots that are not written before a
+    step have their initial value, if it is known (e.g. from a read).
+    """
+    contexts: List[Hashable]
+
+    def __init__(
+        self,
+        ranges: Dict[_Key, Tuple[int, int]],
+        steps: array,
+        values: bytes,
+        contexts: List[Hashable],
+        reverted: Optional[array] = None,
+        initial: Optional[Dict[_Key, bytes]] = None,
+    ):
+        self._ranges = ranges
+        self._steps = steps
+        self._values = values
+        self._reverted = reverted
+        self._initial = initial or {}
+        self.contexts = contexts
+
+    @classmethod
+    def build(
+        cls,
+        writes: Iterable[Tuple[int, int, bool, int, bytes]],
+        contexts: List[Hashable],
+        initial: Iterable[Tuple[int, int, bytes]] = (),
+        reverts: Iterable[Tuple[int, int, int]] = (),
+    ) -> StorageIndex:
+        """
+        Build an index from writes `(step, context, transient, slot, value)` in the order of their steps.
+
+        :param initial: The values `(context, slot, value)` of storage slots before the trace.
+        :param reverts: Ranges `(start, end, step)` of writes (by their position in `writes`, end
+            exclusive) made by a call frame that reverted, and the step at which it returned.
+        """
+        reverted_at: Dict[int, int] = {}
+        for start, end, step in reverts:
+            for position in range(start, end):
+                # Writes of nested frames that reverted earlier keep their step
+                reverted_at.setdefault(position, step)
+        grouped: Dict[_Key, List[Tuple[int, bytes, int]]] = {}
+        for position, (step, context, transient, slot, value) in enumerate(writes):
+            grouped.setdefault((context, transient, slot), []).append((step, value, reverted_at.get(position, _NEVER)))
+        ranges: Dict[_Key, Tuple[int, int]] = {}
+        steps = array("Q")
+        values = bytearray()
+        reverted = array("Q") if reverted_at else None
+        for key, slot_writes in grouped.items():
+            ranges[key] = (len(steps), len(steps) + len(slot_writes))
+            for step, value, revert_step in slot_writes:
+                steps.append(step)
+                values += value.rjust(_WORD_SIZE, b"\x00")
+                if reverted is not None:
+                    reverted.append(revert_step)
+        initial_values = {(context, False, slot): value.rjust(_WORD_SIZE, b"\x00") for context, slot, value in initial}
+        return cls(ranges, steps, bytes(values), contexts, reverted, initial_values)
+
+    @classmethod
+    async def from_trace(
+        cls,
+        trace: MachineTrace,
+        context: Optional[Callable[[MachineState], Awaitable[Hashable]]] = None,
+    ) -> StorageIndex:
+        """
+        Index the SSTORE and TSTORE instructions of a trace in a single pass.
+
+        :param trace: The trace to index.
+        :param context: Determines the storage context (e.g. the executing address) of a state.
+            By default, all writes belong to the same context.
+        """
+        writes = []
+        context_ids: Dict[Hashable, int] = {}
+        async for state in trace:
+            transient = _STORES.get(await state.opcode())
+            if transient is None:
+                continue
+            slot = (await state.stack.read(0, 0, _WORD_SIZE)).as_uint()
+            value = bytes(await state.stack.read(1, 0, _WORD_SIZE))
+            key = await context(state) if context is not None else None
+            context_id = context_ids.setdefault(key, len(context_ids))
+            writes.append((await state.trace_index() + 1, context_id, transient, slot, value))
+        return cls.build(writes, list(context_ids) or [None])
+
+    def __len__(self) -> int:
+        """
+        The number of writes.
+        """
+        return len(self._steps)
+
+    def read(self, step: int, slot: int, context: int = 0, transient: bool = False) -> Optional[bytes]:
+        """
+        Get the value of a slot at a step, or None if it was neither written before nor has a known initial value.
+        """
+        key = (context, transient, slot)
+        start, end = self._ranges.get(key, (0, 0))
+        index = bisect_right(self._steps, step, start, end) - 1
+        reverted = self._reverted
+        if reverted is not None:
+            # Skip the writes of call frames that reverted at or before the step
+            while index >= start and reverted[index] <= step:
+                index -= 1
+        if index < start:
+            return self._initial.get(key)
+        return self._values[index * _WORD_SIZE:(index + 1) * _WORD_SIZE]
+
+    def initial(self, slot: int, context: int = 0) -> Optional[bytes]:
+        """
+        Get the value of a storage slot before the trace, or None if it is not known.
+        """
+        return self._initial.get((context, False, slot))
+
+    def writes(self, slot: int, context: int = 0, transient: bool = False) -> List[Tuple[int, bytes]]:
+        """
+        Get all writes `(step, value)` of a slot, in the order of their steps.
+
+        Writes of call frames that reverted are left out.
+        """
+        start, end = self._ranges.get((context, transient, slot), (0, 0))
+        reverted = self._reverted
+        return [
+            (self._steps[index], self._values[index * _WORD_SIZE:(index + 1) * _WORD_SIZE])
+            for index in range(start, end)
+            if reverted is None or reverted[index] == _NEVER
+        ]
+
+    def slots(self, context: int = 0, transient: bool = False) -> List[int]:
+        """
+        Get all slots that are written in a context.
+        """
+        return sorted(slot for key_context, key_transient, slot in self._ranges
+                      if key_context == context and key_transient == transient)
+
+    def storage(
+        self,
+        step: int,
+        context: int = 0,
+        transient: bool = False,
+        fallback: Optional[MachineStorage] = None,
+    ) -> IndexedStorage:
+        """
+        Get the (transient) storage of a context at a step.
+
+        :param fallback: Reads slots that were not written before the step, e.g. from
+            the state before the trace. By default, these slots read as zero.
+        """
+        return IndexedStorage(self, step, context, transient, fallback)
+
+class IndexedStorage:
+    """
+    The storage of a context at a step, see `StorageIndex.storage`.
+    """
+    def __init__(self, index: StorageIndex, step: int, context: int, transient: bool, fallback: Optional[MachineStorage]):
+        self._index = index
+        self._step = step
+        self._context = context
+        self._transient = transient
+        self._fallback = fallback
+
+    async def read(self, slot: int, offset: int = 0, length: int = _WORD_SIZE) -> Data:
+        value = self._index.read(self._step, slot, self._context, self._transient)
+        if value is None:
+            if self._fallback is not None:
+                return await self._fallback.read(slot, offset, length)
+            value = bytes(_WORD_SIZE)
+        return Data(value[offset:offset + length].ljust(length, b"\x00"))
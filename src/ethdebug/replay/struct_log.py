@@ -0,0 +1,381 @@
+"""
+Import geth-style struct logs (the result of `debug_traceTransaction` with the
+default struct logger) into the trace file format.
+
+Struct logs repeat the full stack, memory and touched storage at every step,
+which makes them huge for long transactions. The importer reads the JSON
+incrementally, one struct log at a time, and only writes what changed since
+the previous step, so memory use during the conversion is bounded by the size
+of a single struct log.
+"""
+from __future__ import annotations
+
+import io
+import json
+import re
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.trace_file import DEFAULT_CHECKPOINT_INTERVAL, WORD_SIZE, TraceWriter
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_KEY = '"structLogs"'
+_ZERO_WORD = "0" * 2 * WORD_SIZE
+
+# Calls that execute code in the storage context of the called address; for
+# DELEGATECALL and CALLCODE the storage context stays the same.
+_CALLS = ("CALL", "STATICCALL")
+_CREATES = ("CREATE", "CREATE2")
+# Instructions that end a call frame without reverting its state changes
+_HALTS = ("STOP", "RETURN", "SELFDESTRUCT")
+
+Source = Union[str, Path, IO[bytes], IO[str]]
+
+def iter_struct_logs(source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the struct logs of a `debug_traceTransaction` result, without
+    loading the whole document.
+
+    The document may either be the trace result itself, or a JSON-RPC response
+    containing it. Only the `structLogs` array is read.
+
+    :param source: A path or a file object.
+    :param chunk_size: The number of characters read at once.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8") as file:
+            yield from _StructLogReader(file, chunk_size)
+    elif isinstance(source, io.TextIOBase):
+        yield from _StructLogReader(source, chunk_size)
+    else:
+        yield from _StructLogReader(io.TextIOWrapper(source, encoding="utf-8"), chunk_size)
+
+class _StructLogReader:
+    """
+    Decode the elements of the `structLogs` array one by one from a buffer
+    that holds at most a chunk plus the element currently being decoded.
+    """
+    def __init__(self, file: IO[str], chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _read(self, minimum: int = 0) -> bool:
+        """
+        Append at least a chunk (or `minimum` characters) to the buffer, dropping what was consumed.
+        """
+        if self._eof:
+            return False
+        data = self._file.read(max(self._chunk_size, minimum))
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position:] + data
+        self._position = 0
+        return True
+
+    def _skip_whitespace(self) -> str:
+        """
+        Skip whitespace and return the next character, or "" at the end of the input.
+        """
+        while True:
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read():
+                return ""
+
+    def _expect(self, token: str) -> None:
+        if self._skip_whitespace() != token:
+            raise ValueError(f"Malformed struct logs: expected '{token}' after \"structLogs\"")
+        self._position += 1
+
+    def _find_key(self) -> None:
+        while True:
+            index = self._buffer.find(_KEY, self._position)
+            if index >= 0:
+                self._position = index + len(_KEY)
+                return
+            # Keep a possibly incomplete key at the end of the buffer
+            self._position = max(self._position, len(self._buffer) - len(_KEY))
+            if not self._read():
+                raise ValueError("Malformed struct logs: no \"structLogs\" array found")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._find_key()
+        self._expect(":")
+        self._expect("[")
+        first = True
+        while True:
+            token = self._skip_whitespace()
+            if token == "]":
+                return
+            if not first:
+                if token != ",":
+                    raise ValueError(f"Malformed struct logs: expected ',' or ']' but got {token!r}")
+                self._position += 1
+                self._skip_whitespace()
+            first = False
+            while True:
+                try:
+                    log, end = self._decoder.raw_decode(self._buffer, self._position)
+                    break
+                except json.JSONDecodeError as error:
+                    # The struct log is incomplete, read at least as much again to stay linear
+                    if not self._read(len(self._buffer) - self._position):
+                        raise ValueError(f"Malformed struct logs: {error.msg}") from None
+            if not isinstance(log, dict):
+                raise ValueError(f"Malformed struct logs: expected an object but got {log!r}")
+            self._position = end
+            yield log
+
+def convert_struct_logs(
+    source: Source,
+    destination: Union[str, Path],
+    *,
+    address: Optional[str] = None,
+    calldata: Optional[bytes] = None,
+    checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+) -> int:
+    """
+    Convert struct logs into a trace file and return the number of steps.
+
+    Struct logs do not contain addresses. To attribute storage to the right
+    address, the address of each call frame is taken from the arguments of the
+    call that created it. Frames created by CREATE or CREATE2 (and the
+    outermost frame, unless `address` is given) have no known address.
+
+    Storage is tracked through SLOAD and SSTORE instructions: the value of a
+    slot loaded before it is written is recorded as its initial value, and the
+    writes of a call frame that fails (reverts or halts with an error) are
+    undone when it returns. Struct logs do not tell whether the outermost frame
+    failed, so its writes are always kept.
+
+    :param source: A path or a file object containing the struct logs.
+    :param destination: The path of the trace file to write.
+    :param address: The address called by the transaction.
+    :param calldata: The calldata of the transaction.
+    :param checkpoint_interval: The number of steps between checkpoints, see `TraceWriter`.
+    """
+    with TraceWriter(destination, checkpoint_interval=checkpoint_interval) as writer:
+        importer = _Importer(writer, address)
+        for log in iter_struct_logs(source):
+            importer.append(log, calldata if writer.steps == 0 else None)
+        return writer.steps
+
+def import_struct_logs(source: Source, destination: Union[str, Path], **options: Any) -> ReplayMachine:
+    """
+    Convert struct logs into a trace file (see `convert_struct_logs`) and open it for replay.
+    """
+    convert_struct_logs(source, destination, **options)
+    return ReplayMachine(destination)
+
+class _Importer:
+    """
+    Turn consecutive struct logs into deltas for a `TraceWriter`.
+    """
+    def __init__(self, writer: TraceWriter, address: Optional[str]):
+        self.writer = writer
+        self.frames: List[Optional[str]] = [_normalize_address(address) if address else None]
+        writer.set_address(self.frames[0])
+        self.stack: List[str] = []
+        self.memory: List[str] = []
+        self.storage: Dict[Optional[str], Dict[int, int]] = {}
+        # Per nested frame, the write counts of the writer and the length of the journal when it was entered
+        self.entered: List[Tuple[Tuple[int, int], int]] = []
+        # The previous values of slots written in nested frames, to restore them when a frame fails
+        self.journal: List[Tuple[Optional[str], int, Optional[int]]] = []
+        self.returndata: Optional[str] = None
+        self.previous: Optional[Dict[str, Any]] = None
+
+    def append(self, log: Dict[str, Any], calldata: Optional[bytes]) -> None:
+        depth = log.get("depth", 1)
+        frame_changed = self._enter_frame(depth)
+        address = self.frames[-1]
+        if frame_changed:
+            self.writer.set_address(address)
+
+        stack = log.get("stack") or []
+        common = _common_prefix(self.stack, stack)
+        push = [int(word, 16) for word in stack[common:]]
+        pop = len(self.stack) - common
+        self.stack = stack
+
+        memory = log.get("memory")
+        writes: List[Tuple[int, bytes]] = []
+        clear_memory = False
+        memory_size = None
+        if memory is not None:
+            if isinstance(memory, str):
+                memory = _split_words(memory)
+            clear_memory = frame_changed or len(memory) < len(self.memory)
+            writes = _memory_writes([] if clear_memory else self.memory, memory)
+            memory_size = len(memory) * WORD_SIZE
+            self.memory = memory
+        elif frame_changed:
+            clear_memory = True
+            memory_size = 0
+            self.memory = []
+
+        storage_writes = self._storage(log, address, stack)
+
+        returndata = None
+        if log.get("returnData") is not None and log["returnData"] != self.returndata:
+            self.returndata = log["returnData"]
+            returndata = _from_hex(self.returndata)
+
+        self.writer.append(
+            log.get("pc", 0),
+            log.get("op", "INVALID"),
+            pop=pop,
+            push=push,
+            memory=writes,
+            memory_size=memory_size,
+            clear_memory=clear_memory,
+            storage=storage_writes,
+            returndata=returndata,
+            calldata=calldata,
+        )
+        self.previous = log
+
+    def _storage(self, log: Dict[str, Any], address: Optional[str], stack: List[str]) -> List[Tuple[int, int]]:
+        """
+        Record the initial value of a slot loaded at this step, and return the write of a slot stored at it.
+        """
+        op = log.get("op")
+        if op not in ("SLOAD", "SSTORE") or not stack:
+            return []
+        known = self.storage.setdefault(address, {})
+        slot = int(stack[-1], 16)
+        if op == "SSTORE":
+            if len(stack) < 2:
+                return []
+            value = int(stack[-2], 16)
+        else:
+            value = _lookup_slot(log.get("storage") or {}, slot)
+            if value is None or known.get(slot) == value:
+                return []
+            if slot not in known:
+                known[slot] = value
+                self.writer.set_initial_storage(slot, value)
+                return []
+            # Frames without a known address share their storage, so a load can contradict a previous write
+        if self.entered:
+            self.journal.append((address, slot, known.get(slot)))
+        known[slot] = value
+        return [(slot, value)]
+
+    def _exit_frames(self, depth: int) -> None:
+        """
+        Leave the frames deeper than `depth`, undoing their writes if the last of them failed.
+        """
+        previous = self.previous or {}
+        since, journal_length = self.entered[depth - 1]
+        del self.entered[depth - 1:]
+        if previous.get("op") in _HALTS and not previous.get("error"):
+            return
+        self.writer.revert_writes(since)
+        for address, slot, value in reversed(self.journal[journal_length:]):
+            if value is None:
+                del self.storage[address][slot]
+            else:
+                self.storage[address][slot] = value
+        del self.journal[journal_length:]
+
+    def _enter_frame(self, depth: int) -> bool:
+        """
+        Update the call frames for the depth of the next struct log and return whether the frame changed.
+        """
+        if depth == len(self.frames):
+            return False
+        if depth > len(self.frames):
+            previous = self.previous or {}
+            op = previous.get("op")
+            stack = previous.get("stack") or []
+            if op in _CALLS and len(stack) >= 2:
+                address = _normalize_address(stack[-2])
+            elif op in _CREATES:
+                address = None
+            else:
+                address = self.frames[-1]
+            marker = (self.writer.write_counts(), len(self.journal))
+            self.entered.extend([marker] * (depth - len(self.frames)))
+            self.frames.extend([address] * (depth - len(self.frames)))
+        else:
+            depth = max(depth, 1)
+            self._exit_frames(depth)
+            del self.frames[depth:]
+            if not self.entered:
+                self.journal.clear()
+        return True
+
+def _common_prefix(old: List[str], new: List[str]) -> int:
+    """
+    The number of items at the bottom of two stacks that are unchanged.
+    """
+    length = min(len(old), len(new))
+    if old[:length] == new[:length]:
+        return length
+    for index in range(length):
+        if old[index] != new[index]:
+            return index
+    return length
+
+def _memory_writes(old: List[str], new: List[str]) -> List[Tuple[int, bytes]]:
+    """
+    Compute the writes that turn memory `old` into memory `new`, both given as lists of hex words.
+
+    Unchanged ranges are found by comparing slices, which is much faster than
+    comparing word by word when only few words changed.
+    """
+    changed: List[int] = []
+
+    def compare(start: int, end: int) -> None:
+        if new[start:end] == old[start:end]:
+            return
+        if end - start <= 8:
+            for index in range(start, end):
+                if index >= len(old) or old[index] != new[index]:
+                    if index < len(old) or new[index] != _ZERO_WORD:
+                        changed.append(index)
+            return
+        middle = (start + end) // 2
+        compare(start, middle)
+        compare(middle, end)
+
+    compare(0, len(new))
+    writes = []
+    index = 0
+    while index < len(changed):
+        start = end = changed[index]
+        while index + 1 < len(changed) and changed[index + 1] == end + 1:
+            index += 1
+            end += 1
+        writes.append((start * WORD_SIZE, bytes.fromhex("".join(new[start:end + 1]))))
+        index += 1
+    return writes
+
+def _lookup_slot(storage: Dict[str, str], slot: int) -> Optional[int]:
+    """
+    Get the value of a slot from the `storage` of a struct log, whose keys may or may not be padded or prefixed.
+    """
+    value = storage.get(slot.to_bytes(WORD_SIZE, "big").hex())
+    if value is None:
+        value = next((value for key, value in storage.items() if int(key, 16) == slot), None)
+    return None if value is None else int(value, 16)
+
+def _split_words(memory: str) -> List[str]:
+    memory = memory[2:] if memory.startswith("0x") else memory
+    return [memory[start:start + 2 * WORD_SIZE] for start in range(0, len(memory), 2 * WORD_SIZE)]
+
+def _from_hex(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+def _normalize_address(value: str) -> str:
+    return "0x" + (int(value, 16) & ((1 << 160) - 1)).to_bytes(20, "big").hex()
@@ -0,0 +1,658 @@
+"""
+A compact binary file format for recorded EVM traces.
+
+A trace file stores, for every step of a trace, only what changed since the
+previous step: the program counter and opcode, the number of stack items
+popped and the words pushed, memory writes, storage and transient storage
+writes, and changes of the returndata, calldata, code and executing address.
+Every `checkpoint_interval` steps the full stack and memory are stored as a
+checkpoint, so the state at any step can be reconstructed from the nearest
+checkpoint before it and the deltas in between. Checkpoints are cheap: the
+stack is stored as references to the pushed words, and memory as a table of
+pages, where only pages written since the previous checkpoint are stored anew.
+
+All data lives in flat, typed sections (columns) of the file, so a reader can
+memory-map the file and access any step without parsing the whole trace.
+
+File layout:
+- a fixed-size header with a magic number, the format version and the
+  position of the footer,
+- the sections, each aligned to 8 bytes,
+- a JSON footer listing the sections with their offset, size and item type,
+  plus small tables (opcode names, addresses) and trace metadata.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from hashlib import blake2b
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from ethdebug.replay.memory_index import MemoryIndex
+from ethdebug.replay.storage_index import StorageIndex
+
+MAGIC = b"EDTRACE\x00"
+VERSION = 1
+WORD_SIZE = 32
+DEFAULT_CHECKPOINT_INTERVAL = 256
+PAGE_SIZE = 1024
+
+_HEADER = struct.Struct("<8sH6xQQ")
+_BYTEORDER = "little"
+
+Word = Union[int, bytes, str]
+"""
+A stack or storage word, either as unsigned integer, as (at most 32) bytes, or as hex string.
+"""
+
+# Typed sections: name -> array typecode
+_COLUMNS: Dict[str, str] = {
+    # per step
+    "pc": "I",
+    "opcode": "B",
+    "pop": "H",
+    "push": "H",
+    "memory_size": "I",
+    # per memory write
+    "memory_write_step": "I",
+    "memory_write_offset": "Q",
+    "memory_write_length": "I",
+    "memory_write_position": "Q",
+    "memory_reset_step": "I",
+    # per storage / transient storage write, slot and value are stored in `*_words`
+    "storage_write_step": "I",
+    "storage_write_context": "I",
+    "transient_write_step": "I",
+    "transient_write_context": "I",
+    # per reverted call frame, the range of its writes and the step it returned at
+    "storage_revert_start": "Q",
+    "storage_revert_end": "Q",
+    "storage_revert_step": "I",
+    "transient_revert_start": "Q",
+    "transient_revert_end": "Q",
+    "transient_revert_step": "I",
+    # per storage slot with a known value before the trace, slot and value are stored in `storage_initial_words`
+    "storage_initial_context": "I",
+    # changes of blob-valued state and of the executing address
+    "returndata_change_step": "I",
+    "returndata_change_blob": "I",
+    "calldata_change_step": "I",
+    "calldata_change_blob": "I",
+    "code_change_step": "I",
+    "code_change_blob": "I",
+    "context_change_step": "I",
+    "context_change_id": "I",
+    # deduplicated blobs, stored in `blob_data`
+    "blob_position": "Q",
+    "blob_length": "Q",
+    # per checkpoint: the stack as indices of pushed words in `checkpoint_stack`,
+    # memory as positions of pages in `memory_pages` in `checkpoint_page`
+    "checkpoint_stack_position": "Q",
+    "checkpoint_stack_count": "I",
+    "checkpoint_page_position": "Q",
+    "checkpoint_memory_length": "Q",
+    "checkpoint_push": "Q",
+    "checkpoint_memory_write": "Q",
+    "checkpoint_stack": "Q",
+    "checkpoint_page": "Q",
+}
+
+# Untyped (byte) sections
+_BLOBS = ("push_words", "memory_data", "storage_words", "transient_words", "storage_initial_words", "blob_data", "memory_pages")
+
+def to_word(value: Word) -> bytes:
+    """
+    Convert a stack or storage word to its 32 byte big-endian representation.
+    """
+    if isinstance(value, int):
+        return value.to_bytes(WORD_SIZE, "big")
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(value) > WORD_SIZE:
+        raise ValueError(f"Word is longer than {WORD_SIZE} bytes: 0x{bytes(value).hex()}")
+    return bytes(value).rjust(WORD_SIZE, b"\x00")
+
+def to_address(value: Union[bytes, str]) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return value.lower() if value.startswith("0x") else "0x" + value.lower()
+
+class _Spool:
+    """
+    An append-only section that is buffered in memory and spilled to a temporary file.
+    """
+    _BUFFER_ITEMS = 1 << 16
+
+    def __init__(self, typecode: Optional[str] = None):
+        self.typecode = typecode
+        self.count = 0
+        self._file: IO[bytes] = tempfile.TemporaryFile()
+        self._buffer = array(typecode) if typecode else None
+
+    def append(self, value: int) -> None:
+        assert self._buffer is not None
+        self._buffer.append(value)
+        self.count += 1
+        if len(self._buffer) >= self._BUFFER_ITEMS:
+            self._flush()
+
+    def write(self, data: bytes) -> int:
+        """
+        Append raw bytes and return the position they were written at.
+        """
+        position = self.count
+        self._file.write(data)
+        self.count += len(data)
+        return position
+
+    def _flush(self) -> None:
+        if self._buffer:
+            if sys.byteorder != _BYTEORDER:
+                self._buffer.byteswap()
+            self._file.write(self._buffer.tobytes())
+            self._buffer = array(self._buffer.typecode)
+
+    def copy_to(self, out: IO[bytes]) -> int:
+        self._flush()
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, out)
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+class TraceWriter:
+    """
+    Write a trace file step by step.
+
+    Every call to `append` records the machine state at the next step as a
+    delta relative to the state at the previous step. The writer keeps track of
+    the current stack and memory to write checkpoints; all other data is
+    spooled to temporary files, so memory use does not grow with the length of
+    the trace.
+
+    Use the writer as a context manager, or call `close` to finish the file.
+    """
+
+    def __init__(self, path: Union[str, Path], checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        if checkpoint_interval < 1:
+            raise ValueError("The checkpoint interval must be positive")
+        self.checkpoint_interval = checkpoint_interval
+        self.steps = 0
+        self.stack: List[bytes] = []
+        self.memory = bytearray()
+        self._stack_refs: List[int] = []
+        self._pushed = 0
+        self._pages: List[int] = []
+        self._dirty_pages: Set[int] = set()
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._columns = {name: _Spool(typecode) for name, typecode in _COLUMNS.items()}
+        self._blobs = {name: _Spool() for name in _BLOBS}
+        self._blob_ids: Dict[bytes, int] = {}
+        self._opcodes: Dict[str, int] = {}
+        self._contexts: Dict[Optional[str], int] = {None: 0}
+        self._context = 0
+        self._current: Dict[str, int] = {}
+        self._closed = False
+
+    def append(
+        self,
+        pc: int,
+        opcode: str,
+        *,
+        pop: int = 0,
+        push: Sequence[Word] = (),
+        memory: Iterable[Tuple[int, bytes]] = (),
+        memory_size: Optional[int] = None,
+        clear_memory: bool = False,
+        storage: Iterable[Tuple[Word, Word]] = (),
+        transient: Iterable[Tuple[Word, Word]] = (),
+        returndata: Optional[bytes] = None,
+        calldata: Optional[bytes] = None,
+        code: Optional[bytes] = None,
+        address: Optional[Union[bytes, str]] = None,
+    ) -> int:
+        """
+        Record the next step and return its trace index.
+
+        :param pc: The program counter at this step.
+        :param opcode: The mnemonic of the instruction at this step, e.g. `"PUSH1"`.
+        :param pop: The number of stack items removed since the previous step.
+        :param push: The words pushed since the previous step, the last one being the new top of the stack.
+        :param memory: Memory writes since the previous step as `(offset, data)` pairs, applied in order.
+        :param memory_size: The size of memory in bytes. Defaults to the previous size, grown to fit all writes.
+        :param clear_memory: Whether memory was cleared before the writes of this step, because another call
+            frame started executing or returned.
+        :param storage: Storage writes as `(slot, value)` pairs, in the storage of the executing address.
+        :param transient: Transient storage writes as `(slot, value)` pairs.
+        :param returndata: The new returndata, if it changed.
+        :param calldata: The new calldata, if it changed.
+        :param code: The code being executed, if it changed.
+        :param address: The address whose code is executed, if it changed.
+        """
+        step = self.steps
+        columns = self._columns
+        if pop > len(self.stack):
+            raise ValueError(f"Cannot pop {pop} items from a stack of {len(self.stack)} items at step {step}")
+        memory = [(offset, bytes(data)) for offset, data in memory]
+        required = max([offset + len(data) for offset, data in memory], default=0)
+        if not clear_memory:
+            required = max(required, len(self.memory))
+        if memory_size is not None and memory_size < required:
+            raise ValueError(f"Memory size {memory_size} is smaller than the memory of {required} bytes at step {step}")
+
+        columns["pc"].append(pc)
+        columns["opcode"].append(self._opcode_id(opcode))
+
+        if pop:
+            del self.stack[len(self.stack) - pop:]
+            del self._stack_refs[len(self._stack_refs) - pop:]
+        words = [to_word(word) for word in push]
+        self.stack.extend(words)
+        self._stack_refs.extend(range(self._pushed, self._pushed + len(words)))
+        self._pushed += len(words)
+        columns["pop"].append(pop)
+        columns["push"].append(len(words))
+        if words:
+            self._blobs["push_words"].write(b"".join(words))
+
+        if clear_memory:
+            self.memory = bytearray()
+            self._pages = []
+            self._dirty_pages.clear()
+            columns["memory_reset_step"].append(step)
+        for offset, data in memory:
+            end = offset + len(data)
+            if end > len(self.memory):
+                self.memory.extend(bytes(end - len(self.memory)))
+            self.memory[offset:end] = data
+            self._dirty_pages.update(range(offset // PAGE_SIZE, (end + PAGE_SIZE - 1) // PAGE_SIZE))
+            columns["memory_write_step"].append(step)
+            columns["memory_write_offset"].append(offset)
+            columns["memory_write_length"].append(len(data))
+            columns["memory_write_position"].append(self._blobs["memory_data"].write(data))
+        if memory_size is None:
+            memory_size = (len(self.memory) + WORD_SIZE - 1) // WORD_SIZE * WORD_SIZE
+        self.memory.extend(bytes(memory_size - len(self.memory)))
+        columns["memory_size"].append(memory_size)
+
+        if address is not None:
+            self.set_address(address)
+        for name, writes in (("storage", storage), ("transient", transient)):
+            for slot, value in writes:
+                columns[f"{name}_write_step"].append(step)
+                columns[f"{name}_write_context"].append(self._context)
+                self._blobs[f"{name}_words"].write(to_word(slot) + to_word(value))
+
+        for name, blob in (("returndata", returndata), ("calldata", calldata), ("code", code)):
+            if blob is not None:
+                self._change_blob(step, name, bytes(blob))
+
+        if step % self.checkpoint_interval == 0:
+            self._checkpoint()
+        self.steps += 1
+        return step
+
+    def _opcode_id(self, opcode: str) -> int:
+        opcode_id = self._opcodes.get(opcode)
+        if opcode_id is None:
+            if len(self._opcodes) > 0xff:
+                raise ValueError("A trace can contain at most 256 distinct opcodes")
+            opcode_id = self._opcodes[opcode] = len(self._opcodes)
+        return opcode_id
+
+    def set_address(self, address: Optional[Union[bytes, str]]) -> None:
+        """
+        Set the address executing from the next step on, or None if the address is unknown.
+        """
+        context = self._contexts.setdefault(None if address is None else to_address(address), len(self._contexts))
+        if context != self._context:
+            self._context = context
+            self._columns["context_change_step"].append(self.steps)
+            self._columns["context_change_id"].append(context)
+
+    def set_initial_storage(self, slot: Word, value: Word) -> None:
+        """
+        Record the value of a storage slot of the executing address before the trace, e.g. when it is first read.
+        """
+        self._columns["storage_initial_context"].append(self._context)
+        self._blobs["storage_initial_words"].write(to_word(slot) + to_word(value))
+
+    def write_counts(self) -> Tuple[int, int]:
+        """
+        Get the number of storage and transient storage writes so far, see `revert_writes`.
+        """
+        return self._columns["storage_write_step"].count, self._columns["transient_write_step"].count
+
+    def revert_writes(self, since: Tuple[int, int]) -> None:
+        """
+        Undo the storage and transient storage writes since `since` (see `write_counts`) from the next step
+        on, because the call frame that made them reverted.
+        """
+        for name, start in zip(("storage", "transient"), since):
+            end = self._columns[f"{name}_write_step"].count
+            if end > start:
+                self._columns[f"{name}_revert_start"].append(start)
+                self._columns[f"{name}_revert_end"].append(end)
+                self._columns[f"{name}_revert_step"].append(self.steps)
+
+    def _change_blob(self, step: int, name: str, blob: bytes) -> None:
+        digest = blake2b(blob, digest_size=16).digest()
+        blob_id = self._blob_ids.get(digest)
+        if blob_id is None:
+            blob_id = self._blob_ids[digest] = self._columns["blob_position"].count
+            self._columns["blob_position"].append(self._blobs["blob_data"].write(blob))
+            self._columns["blob_length"].append(len(blob))
+        if self._current.get(name) != blob_id:
+            self._current[name] = blob_id
+            self._columns[f"{name}_change_step"].append(step)
+            self._columns[f"{name}_change_blob"].append(blob_id)
+
+    def _checkpoint(self) -> None:
+        columns = self._columns
+        columns["checkpoint_stack_position"].append(columns["checkpoint_stack"].count)
+        columns["checkpoint_stack_count"].append(len(self._stack_refs))
+        for ref in self._stack_refs:
+            columns["checkpoint_stack"].append(ref)
+
+        # Pages that were not written since the previous checkpoint are shared with it
+        pages = self._pages
+        pages_data = self._blobs["memory_pages"]
+        for page in range((len(self.memory) + PAGE_SIZE - 1) // PAGE_SIZE):
+            if page >= len(pages) or page in self._dirty_pages:
+                start = page * PAGE_SIZE
+                position = pages_data.write(bytes(self.memory[start:start + PAGE_SIZE]).ljust(PAGE_SIZE, b"\x00"))
+                if page < len(pages):
+                    pages[page] = position
+                else:
+                    pages.append(position)
+        self._dirty_pages.clear()
+        columns["checkpoint_page_position"].append(columns["checkpoint_page"].count)
+        columns["checkpoint_memory_length"].append(len(self.memory))
+        for position in pages:
+            columns["checkpoint_page"].append(position)
+
+        columns["checkpoint_push"].append(self._pushed)
+        columns["checkpoint_memory_write"].append(columns["memory_write_step"].count)
+
+    def close(self) -> None:
+        """
+        Write all sections and the footer, and close the file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        sections: Dict[str, List[Any]] = {}
+        spools: List[Tuple[str, _Spool]] = [*self._columns.items(), *self._blobs.items()]
+        for name, spool in spools:
+            padding = -self._file.tell() % 8
+            self._file.write(bytes(padding))
+            offset = self._file.tell()
+            length = spool.copy_to(self._file)
+            sections[name] = [offset, length, spool.typecode or "B"]
+            spool.close()
+        footer = json.dumps({
+            "version": VERSION,
+            "byteorder": _BYTEORDER,
+            "steps": self.steps,
+            "checkpoint_interval": self.checkpoint_interval,
+            "opcodes": list(self._opcodes),
+            "contexts": list(self._contexts),
+            "sections": sections,
+        }).encode()
+        footer_offset = self._file.tell()
+        self._file.write(footer)
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, footer_offset, len(footer)))
+        self._file.close()
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class TraceFile:
+    """
+    Random access to a memory-mapped trace file.
+
+    Nothing is decoded when the file is opened. Reading the state at a step
+    starts from the checkpoint at or before that step and applies only the
+    deltas in between, so access time does not depend on the length of the
+    trace. Memory reads only reconstruct the requested bytes.
+    """
+    steps: int
+    checkpoint_interval: int
+    opcodes: List[str]
+    contexts: List[Optional[str]]
+
+    def __init__(self, path: Union[str, Path]):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError(f"Not a trace file: {path}")
+        if len(self._mmap) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not a trace file: {path}")
+        magic, version, footer_offset, footer_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a trace file: {path}")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported trace file version {version}")
+        footer = json.loads(self._mmap[footer_offset:footer_offset + footer_length])
+        self.steps = footer["steps"]
+        self.checkpoint_interval = footer["checkpoint_interval"]
+        self.opcodes = footer["opcodes"]
+        self.contexts = footer["contexts"]
+        self._view = memoryview(self._mmap)
+        self._storage_index: Optional[StorageIndex] = None
+        self._memory_index: Optional[MemoryIndex] = None
+        swap = footer["byteorder"] != sys.byteorder
+        self._sections: Dict[str, Any] = {}
+        for name, (offset, length, typecode) in footer["sections"].items():
+            section = self._view[offset:offset + length]
+            if typecode != "B":
+                if swap:
+                    section = array(typecode, section.tobytes())
+                    section.byteswap()
+                else:
+                    section = section.cast(typecode)
+            self._sections[name] = section
+
+    def section(self, name: str) -> Any:
+        """
+        Get a section of the file as sequence of integers (or bytes for untyped sections).
+        """
+        return self._sections[name]
+
+    def __len__(self) -> int:
+        return self.steps
+
+    def _check(self, step: int) -> None:
+        if not 0 <= step < self.steps:
+            raise IndexError(f"Trace index {step} out of range, the trace has {self.steps} steps")
+
+    def pc(self, step: int) -> int:
+        self._check(step)
+        return self._sections["pc"][step]
+
+    def opcode(self, step: int) -> str:
+        self._check(step)
+        return self.opcodes[self._sections["opcode"][step]]
+
+    def stack(self, step: int) -> List[bytes]:
+        """
+        Reconstruct the stack at a step, from bottom to top.
+        """
+        self._check(step)
+        sections = self._sections
+        checkpoint = step // self.checkpoint_interval
+        position = sections["checkpoint_stack_position"][checkpoint]
+        refs = list(sections["checkpoint_stack"][position:position + sections["checkpoint_stack_count"][checkpoint]])
+        pops, pushes = sections["pop"], sections["push"]
+        push = sections["checkpoint_push"][checkpoint]
+        for current in range(checkpoint * self.checkpoint_interval + 1, step + 1):
+            pop = pops[current]
+            if pop:
+                del refs[len(refs) - pop:]
+            count = pushes[current]
+            if count:
+                refs.extend(range(push, push + count))
+                push += count
+        words = sections["push_words"]
+        return [bytes(words[ref * WORD_SIZE:(ref + 1) * WORD_SIZE]) for ref in refs]
+
+    def memory_size(self, step: int) -> int:
+        self._check(step)
+        return self._sections["memory_size"][step]
+
+    def memory(self, step: int, offset: int, length: int) -> bytes:
+        """
+        Reconstruct `length` bytes of memory starting at `offset` at a step.
+
+        Bytes beyond the end of memory read as zero.
+        """
+        self._check(step)
+        sections = self._sections
+        checkpoint = step // self.checkpoint_interval
+        result = bytearray(length)
+        end = offset + length
+
+        write_steps = sections["memory_write_step"]
+        resets = sections["memory_reset_step"]
+        reset = resets[bisect_right(resets, step) - 1] if resets and resets[0] <= step else -1
+        if reset > checkpoint * self.checkpoint_interval:
+            # Memory was cleared after the checkpoint, start from empty memory
+            first = bisect_left(write_steps, reset)
+        else:
+            first = sections["checkpoint_memory_write"][checkpoint]
+            table = sections["checkpoint_page_position"][checkpoint]
+            snapshot_end = min(end, sections["checkpoint_memory_length"][checkpoint])
+            pages, data = sections["checkpoint_page"], sections["memory_pages"]
+            for page in range(offset // PAGE_SIZE, (snapshot_end + PAGE_SIZE - 1) // PAGE_SIZE):
+                low, high = max(offset, page * PAGE_SIZE), min(snapshot_end, (page + 1) * PAGE_SIZE)
+                position = pages[table + page] + low - page * PAGE_SIZE
+                result[low - offset:high - offset] = data[position:position + high - low]
+        last = bisect_right(write_steps, step, lo=first)
+        offsets, lengths, positions = (
+            sections["memory_write_offset"], sections["memory_write_length"], sections["memory_write_position"]
+        )
+        data = sections["memory_data"]
+        for index in range(first, last):
+            write_start = offsets[index]
+            write_end = write_start + lengths[index]
+            if write_end <= offset or write_start >= end:
+                continue
+            low, high = max(offset, write_start), min(end, write_end)
+            position = positions[index] + low - write_start
+            result[low - offset:high - offset] = data[position:position + high - low]
+
+        return bytes(result)
+
+    def context(self, step: int) -> int:
+        """
+        Get the id of the address executing at a step, see `contexts`.
+        """
+        self._check(step)
+        index = bisect_right(self._sections["context_change_step"], step) - 1
+        return self._sections["context_change_id"][index] if index >= 0 else 0
+
+    def address(self, step: int) -> Optional[str]:
+        return self.contexts[self.context(step)]
+
+    def storage(self, step: int, slot: Word, transient: bool = False) -> bytes:
+        """
+        Get the value of a (transient) storage slot of the executing address at a step.
+
+        Slots that were never written read as their initial value if it is known, and as zero otherwise.
+        """
+        value = self.storage_index().read(step, int.from_bytes(to_word(slot), "big"), self.context(step), transient)
+        return bytes(WORD_SIZE) if value is None else value
+
+    def storage_index(self) -> StorageIndex:
+        """
+        Get the index of all storage and transient storage writes, built on first use.
+        """
+        if self._storage_index is None:
+            self._storage_index = StorageIndex.build(
+                self._storage_writes(), self.contexts, self._initial_storage(), self._storage_reverts(),
+            )
+        return self._storage_index
+
+    def memory_index(self) -> MemoryIndex:
+        """
+        Get the index of all memory writes, built on first use.
+        """
+        if self._memory_index is None:
+            sections = self._sections
+            self._memory_index = MemoryIndex(
+                array("Q", sections["memory_write_step"]),
+                array("Q", sections["memory_write_offset"]),
+                array("Q", sections["memory_write_length"]),
+            )
+        return self._memory_index
+
+    def _storage_writes(self) -> Iterator[Tuple[int, int, bool, int, bytes]]:
+        for transient, name in ((False, "storage"), (True, "transient")):
+            words = self._sections[f"{name}_words"]
+            for index, (step, context) in enumerate(zip(self._sections[f"{name}_write_step"], self._sections[f"{name}_write_context"])):
+                start = index * 2 * WORD_SIZE
+                slot = int.from_bytes(words[start:start + WORD_SIZE], "big")
+                yield step, context, transient, slot, bytes(words[start + WORD_SIZE:start + 2 * WORD_SIZE])
+
+    def _initial_storage(self) -> Iterator[Tuple[int, int, bytes]]:
+        # Files written before initial values were recorded do not have these sections
+        words = self._sections.get("storage_initial_words", b"")
+        for index, context in enumerate(self._sections.get("storage_initial_context", ())):
+            start = index * 2 * WORD_SIZE
+            yield context, int.from_bytes(words[start:start + WORD_SIZE], "big"), bytes(words[start + WORD_SIZE:start + 2 * WORD_SIZE])
+
+    def _storage_reverts(self) -> Iterator[Tuple[int, int, int]]:
+        # Positions of transient storage writes follow those of storage writes, see `_storage_writes`
+        offset = 0
+        for name in ("storage", "transient"):
+            sections = [self._sections.get(f"{name}_revert_{column}", ()) for column in ("start", "end", "step")]
+            for start, end, step in zip(*sections):
+                yield offset + start, offset + end, step
+            offset = len(self._sections["storage_write_step"])
+
+    def blob(self, step: int, name: str) -> bytes:
+        """
+        Get the `returndata`, `calldata` or `code` at a step.
+        """
+        self._check(step)
+        index = bisect_right(self._sections[f"{name}_change_step"], step) - 1
+        if index < 0:
+            return b""
+        blob_id = self._sections[f"{name}_change_blob"][index]
+        position = self._sections["blob_position"][blob_id]
+        return bytes(self._sections["blob_data"][position:position + self._sections["blob_length"][blob_id]])
+
+    def close(self) -> None:
+        if hasattr(self, "_sections"):
+            for section in self._sections.values():
+                if isinstance(section, memoryview):
+                    section.release()
+            self._sections.clear()
+            self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> TraceFile:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
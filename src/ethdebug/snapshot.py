@@ -0,0 +1,303 @@
+"""
+Snapshots of the machine data read from a machine state, for offline replay.
+
+A `RecordingState` wraps a `MachineState` and records every read made through
+it with its result: stack words, memory, calldata, returndata and code ranges,
+storage and transient storage slots, section lengths, and the trace index,
+program counter and opcode. The recorded `Snapshot` is saved to a compact
+file, and a `SnapshotState` replays it: the same reads return the same data
+without access to the original machine.
+
+    recording = RecordingState(state)
+    cursor = await dereference(pointer, DereferenceOptions(state=recording, templates={}))
+    view = await cursor.view(recording)
+    recording.snapshot.save("slow-pointer.snapshot")
+
+    replay = SnapshotState(Snapshot.load("slow-pointer.snapshot"))
+
+File layout: a header with a magic number and the format version, followed by
+the zlib-compressed records, each starting with a record type and a section.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from ethdebug.data import Data
+from ethdebug.machine import MachineState
+
+MAGIC = b"EDSNAP\x00\x00"
+VERSION = 1
+WORD_SIZE = 32
+
+SECTIONS = ("stack", "memory", "storage", "transient", "calldata", "returndata", "code")
+# Sections addressed by slot, all others are addressed by offset only
+SLOTTED = ("stack", "storage", "transient")
+
+_HEADER = struct.Struct("<8sH")
+_READ = struct.Struct("<BBQI")
+_LENGTH = struct.Struct("<BBQ")
+_SCALAR = struct.Struct("<BQ")
+_RECORD_READ, _RECORD_LENGTH, _RECORD_TRACE_INDEX, _RECORD_PROGRAM_COUNTER, _RECORD_OPCODE = range(5)
+
+# (section, slot, offset, length), the slot is 0 for sections addressed by offset
+ReadKey = Tuple[str, int, int, int]
+
+@dataclass
+class Snapshot:
+    """
+    The results of the reads made from a machine state.
+    """
+    reads: Dict[ReadKey, bytes] = field(default_factory=dict)
+    lengths: Dict[str, int] = field(default_factory=dict)
+    trace_index: Optional[int] = None
+    program_counter: Optional[int] = None
+    opcode: Optional[str] = None
+
+    def to_bytes(self) -> bytes:
+        records = bytearray()
+        for section, length in self.lengths.items():
+            records += _LENGTH.pack(_RECORD_LENGTH, SECTIONS.index(section), length)
+        for (section, slot, offset, length), data in self.reads.items():
+            records += _READ.pack(_RECORD_READ, SECTIONS.index(section), offset, length)
+            if section in SLOTTED:
+                records += slot.to_bytes(WORD_SIZE, "big")
+            records += len(data).to_bytes(4, "little") + data
+        for record, value in ((_RECORD_TRACE_INDEX, self.trace_index), (_RECORD_PROGRAM_COUNTER, self.program_counter)):
+            if value is not None:
+                records += _SCALAR.pack(record, value)
+        if self.opcode is not None:
+            opcode = self.opcode.encode()
+            records += bytes((_RECORD_OPCODE, len(opcode))) + opcode
+        return _HEADER.pack(MAGIC, VERSION) + zlib.compress(bytes(records))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Snapshot:
+        if len(data) < _HEADER.size:
+            raise ValueError("Not a snapshot: the data is too short")
+        magic, version = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a snapshot: wrong magic number")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        records = zlib.decompress(data[_HEADER.size:])
+        snapshot = cls()
+        position = 0
+        while position < len(records):
+            record = records[position]
+            if record == _RECORD_READ:
+                _, section_index, offset, length = _READ.unpack_from(records, position)
+                section = SECTIONS[section_index]
+                position += _READ.size
+                slot = 0
+                if section in SLOTTED:
+                    slot = int.from_bytes(records[position:position + WORD_SIZE], "big")
+                    position += WORD_SIZE
+                size = int.from_bytes(records[position:position + 4], "little")
+                position += 4
+                snapshot.reads[(section, slot, offset, length)] = records[position:position + size]
+                position += size
+            elif record == _RECORD_LENGTH:
+                _, section_index, length = _LENGTH.unpack_from(records, position)
+                snapshot.lengths[SECTIONS[section_index]] = length
+                position += _LENGTH.size
+            elif record in (_RECORD_TRACE_INDEX, _RECORD_PROGRAM_COUNTER):
+                _, value = _SCALAR.unpack_from(records, position)
+                if record == _RECORD_TRACE_INDEX:
+                    snapshot.trace_index = value
+                else:
+                    snapshot.program_counter = value
+                position += _SCALAR.size
+            elif record == _RECORD_OPCODE:
+                size = records[position + 1]
+                snapshot.opcode = records[position + 2:position + 2 + size].decode()
+                position += 2 + size
+            else:
+                raise ValueError(f"Invalid snapshot: unknown record type {record} at {position}")
+        return snapshot
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Snapshot:
+        return cls.from_bytes(Path(path).read_bytes())
+
+    @staticmethod
+    def is_snapshot(data: bytes) -> bool:
+        """
+        Whether some data (e.g. the start of a file) is a snapshot.
+        """
+        return data[:len(MAGIC)] == MAGIC
+
+class RecordingState:
+    """
+    A `MachineState` that records the reads made from another state into `snapshot`.
+    """
+    def __init__(self, state: MachineState, snapshot: Optional[Snapshot] = None):
+        self.state = state
+        self.snapshot = Snapshot() if snapshot is None else snapshot
+
+    async def trace_index(self) -> int:
+        self.snapshot.trace_index = await self.state.trace_index()
+        return self.snapshot.trace_index
+
+    async def program_counter(self) -> int:
+        self.snapshot.program_counter = await self.state.program_counter()
+        return self.snapshot.program_counter
+
+    async def opcode(self) -> str:
+        self.snapshot.opcode = await self.state.opcode()
+        return self.snapshot.opcode
+
+    @property
+    def stack(self) -> RecordingSlots:
+        return RecordingSlots(self.state.stack, "stack", self.snapshot)
+
+    @property
+    def memory(self) -> RecordingBytes:
+        return RecordingBytes(self.state.memory, "memory", self.snapshot)
+
+    @property
+    def storage(self) -> RecordingSlots:
+        return RecordingSlots(self.state.storage, "storage", self.snapshot)
+
+    @property
+    def transient(self) -> RecordingSlots:
+        return RecordingSlots(self.state.transient, "transient", self.snapshot)
+
+    @property
+    def calldata(self) -> RecordingBytes:
+        return RecordingBytes(self.state.calldata, "calldata", self.snapshot)
+
+    @property
+    def returndata(self) -> RecordingBytes:
+        return RecordingBytes(self.state.returndata, "returndata", self.snapshot)
+
+    @property
+    def code(self) -> RecordingBytes:
+        return RecordingBytes(self.state.code, "code", self.snapshot)
+
+class RecordingSlots:
+    """
+    Records the reads of the stack, storage or transient storage.
+    """
+    def __init__(self, section, name: str, snapshot: Snapshot):
+        self.section = section
+        self.name = name
+        self.snapshot = snapshot
+
+    async def length(self) -> int:
+        length = await self.section.length()
+        self.snapshot.lengths[self.name] = length
+        return length
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        data = await self.section.read(slot, offset, length)
+        self.snapshot.reads[(self.name, slot, offset, length)] = bytes(data)
+        return data
+
+class RecordingBytes:
+    """
+    Records the reads of memory, calldata, returndata or code.
+    """
+    def __init__(self, section, name: str, snapshot: Snapshot):
+        self.section = section
+        self.name = name
+        self.snapshot = snapshot
+
+    async def length(self) -> int:
+        length = await self.section.length()
+        self.snapshot.lengths[self.name] = length
+        return length
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        data = await self.section.read(offset, length)
+        self.snapshot.reads[(self.name, 0, offset, length)] = bytes(data)
+        return data
+
+class SnapshotState:
+    """
+    A `MachineState` that replays the reads recorded in a snapshot.
+
+    Reads return exactly the recorded data. Byte ranges within a recorded range of
+    the same section are also served; any other read raises a ValueError.
+    """
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+
+    async def trace_index(self) -> int:
+        return _recorded(self.snapshot.trace_index, "trace index")
+
+    async def program_counter(self) -> int:
+        return _recorded(self.snapshot.program_counter, "program counter")
+
+    async def opcode(self) -> str:
+        return _recorded(self.snapshot.opcode, "opcode")
+
+    @property
+    def stack(self) -> SnapshotSlots:
+        return SnapshotSlots(self.snapshot, "stack")
+
+    @property
+    def memory(self) -> SnapshotBytes:
+        return SnapshotBytes(self.snapshot, "memory")
+
+    @property
+    def storage(self) -> SnapshotSlots:
+        return SnapshotSlots(self.snapshot, "storage")
+
+    @property
+    def transient(self) -> SnapshotSlots:
+        return SnapshotSlots(self.snapshot, "transient")
+
+    @property
+    def calldata(self) -> SnapshotBytes:
+        return SnapshotBytes(self.snapshot, "calldata")
+
+    @property
+    def returndata(self) -> SnapshotBytes:
+        return SnapshotBytes(self.snapshot, "returndata")
+
+    @property
+    def code(self) -> SnapshotBytes:
+        return SnapshotBytes(self.snapshot, "code")
+
+class SnapshotSlots:
+    def __init__(self, snapshot: Snapshot, name: str):
+        self.snapshot = snapshot
+        self.name = name
+
+    async def length(self) -> int:
+        return _recorded(self.snapshot.lengths.get(self.name), f"{self.name} length")
+
+    async def read(self, slot: int, offset: int = 0, length: int = WORD_SIZE) -> Data:
+        data = self.snapshot.reads.get((self.name, slot, offset, length))
+        if data is None:
+            raise ValueError(f"The snapshot has no read of {self.name} slot {slot} at offset {offset} with length {length}")
+        return Data(data)
+
+class SnapshotBytes:
+    def __init__(self, snapshot: Snapshot, name: str):
+        self.snapshot = snapshot
+        self.name = name
+
+    async def length(self) -> int:
+        return _recorded(self.snapshot.lengths.get(self.name), f"{self.name} length")
+
+    async def read(self, offset: int, length: int = WORD_SIZE) -> Data:
+        data = self.snapshot.reads.get((self.name, 0, offset, length))
+        if data is not None:
+            return Data(data)
+        for (section, _, start, size), recorded in self.snapshot.reads.items():
+            if section == self.name and start <= offset and offset + length <= start + size:
+                return Data(recorded[offset - start:offset - start + length])
+        raise ValueError(f"The snapshot has no read of {self.name} at offset {offset} with length {length}")
+
+def _recorded(value, name: str):
+    if value is None:
+        raise ValueError(f"The snapshot has no {name}")
+    return value
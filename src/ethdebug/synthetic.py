@@ -0,0 +1,241 @@
+"""
+Deterministic synthetic inputs for benchmarks and differential tests.
+
+A `Generator` produces, from a seed, the JSON of types and of the pointers to
+values of these types (with nested groups, lists, conditionals, scopes and
+templates), programs with many instructions whose contexts repeat like those
+of compiler output, and an `InMemoryState` holding the values the pointers
+point to. The same seed and options always produce the same output.
+
+Values are laid out like Solidity lays them out in memory: elementary values
+take a word, and structs and arrays are referred to by a word holding the
+memory offset of their members, an array starting with its length.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from ethdebug.in_memory import InMemoryState
+
+WORD_SIZE = 32
+# Like the free memory pointer of Solidity, values are allocated after the scratch space
+MEMORY_START = 0x80
+
+# Template of a word in memory, used by some pointers to elementary values
+TEMPLATES = {
+    "memory-word": {
+        "expect": ["word-offset"],
+        "for": {"name": "word", "location": "memory", "offset": "word-offset", "length": "$wordsize"},
+    },
+}
+
+MNEMONICS = ["ADD", "MUL", "SUB", "DUP1", "DUP2", "SWAP1", "POP", "MLOAD", "MSTORE", "SLOAD", "JUMPDEST", "JUMPI", "JUMP"]
+
+@dataclass
+class SyntheticVariable:
+    """
+    A variable with the JSON of its type and pointer, and its value in the state: an `int`
+    for elementary values, and a list of values for structs and arrays.
+    """
+    identifier: str
+    type: Dict[str, Any]
+    pointer: Dict[str, Any]
+    value: Any
+
+@dataclass
+class SyntheticProgram:
+    """
+    The JSON of a program, the variables its contexts refer to, and the state they point into.
+    """
+    program: Dict[str, Any]
+    variables: List[SyntheticVariable]
+    state: InMemoryState
+
+class Generator:
+    """
+    Generates synthetic inputs from a seed.
+
+    `depth` is the maximum nesting of structs and arrays, and `fan_out` the
+    maximum number of members of a struct and of elements of an array. The
+    probabilities control how often pointers use conditionals, scopes and
+    templates where they could.
+    """
+    def __init__(
+        self,
+        seed: int = 0,
+        depth: int = 3,
+        fan_out: int = 4,
+        conditionals: float = 0.2,
+        scopes: float = 0.3,
+        templates: float = 0.2,
+    ):
+        if depth < 0 or fan_out < 1:
+            raise ValueError(f"Invalid depth {depth} or fan-out {fan_out}")
+        self.rng = random.Random(seed)
+        self.depth = depth
+        self.fan_out = fan_out
+        self.conditionals = conditionals
+        self.scopes = scopes
+        self.templates = templates
+        self._names = 0
+
+    def type(self, depth: int | None = None) -> Dict[str, Any]:
+        """
+        The JSON of a type nesting structs and arrays at most `depth` times.
+        """
+        depth = self.depth if depth is None else depth
+        choice = self.rng.random()
+        if depth == 0 or choice < 0.3:
+            kind = self.rng.choice(("uint", "bool", "address"))
+            if kind == "uint":
+                return {"class": "elementary", "kind": "uint", "bits": 8 * self.rng.randint(1, 32)}
+            return {"class": "elementary", "kind": kind}
+        if choice < 0.65:
+            return {"class": "complex", "kind": "struct", "contains": [
+                {"name": f"member{index}", "type": self.type(depth - 1)}
+                for index in range(self.rng.randint(1, self.fan_out))
+            ]}
+        return {"class": "complex", "kind": "array", "contains": {"type": self.type(depth - 1)}}
+
+    def variables(self, count: int) -> Tuple[List[SyntheticVariable], InMemoryState]:
+        """
+        Variables of random types and a state holding their values. The value (or memory
+        offset) of variable `i` is in stack slot `i`.
+        """
+        memory = bytearray(MEMORY_START)
+        variables = []
+        words = []
+        for slot in range(count):
+            type_ = self.type()
+            uses_templates = [False]
+            pointer = self._pointer(type_, {"location": "stack", "slot": slot}, uses_templates)
+            if uses_templates[0]:
+                pointer = {"templates": TEMPLATES, "in": pointer}
+            word, value = self._value(type_, memory)
+            words.append(word)
+            variables.append(SyntheticVariable(f"variable{slot}", type_, pointer, value))
+        memory[0x40:0x60] = len(memory).to_bytes(WORD_SIZE, "big")
+        return variables, InMemoryState(stack=reversed(words), memory=bytes(memory))
+
+    def program(self, instructions: int, variables: int = 16, sources: int = 4, block_length: int = 8) -> SyntheticProgram:
+        """
+        A program with `instructions` instructions, in blocks of about `block_length`
+        instructions sharing the same context. Contexts are taken from a pool of code
+        ranges and of scopes of the `variables` variables, so most of them are repeated.
+        """
+        program_variables, state = self.variables(variables)
+        ranges = [
+            {"source": {"id": self.rng.randrange(sources)}, "range": {"offset": self.rng.randrange(10_000), "length": self.rng.randint(1, 200)}}
+            for _ in range(max(1, instructions // (block_length * 4)))
+        ]
+        scopes = [
+            [
+                {"identifier": variable.identifier, "type": variable.type, "pointer": variable.pointer}
+                for variable in self.rng.sample(program_variables, self.rng.randint(0, min(4, variables)))
+            ]
+            for _ in range(max(1, len(ranges) // 4))
+        ]
+        result = []
+        offset = 0
+        while len(result) < instructions:
+            code = {"code": self.rng.choice(ranges)}
+            scope = self.rng.choice(scopes)
+            context = {"gather": [code, {"variables": scope}]} if scope else code
+            for _ in range(min(self.rng.randint(1, 2 * block_length), instructions - len(result))):
+                instruction = {"offset": offset, "context": context}
+                if self.rng.random() < 0.3:
+                    size = self.rng.randint(1, 32)
+                    instruction["operation"] = {"mnemonic": f"PUSH{size}", "arguments": ["0x" + self.rng.randbytes(size).hex()]}
+                    offset += 1 + size
+                else:
+                    instruction["operation"] = {"mnemonic": self.rng.choice(MNEMONICS)}
+                    offset += 1
+                result.append(instruction)
+        program = {
+            "contract": {"name": "Synthetic", "definition": {"source": {"id": 0}}},
+            "environment": "call",
+            "instructions": result,
+        }
+        return SyntheticProgram(program, program_variables, state)
+
+    def _name(self, prefix: str) -> str:
+        self._names += 1
+        return f"{prefix}-{self._names}"
+
+    def _pointer(self, type_: Dict[str, Any], word: Dict[str, Any], uses_templates: List[bool]) -> Dict[str, Any]:
+        """
+        The pointer to a value of a type, given the region of the word holding the value or its memory offset.
+        """
+        if type_["class"] == "elementary":
+            return self._elementary_pointer(word, uses_templates)
+        pointer_name = self._name("pointer")
+        base: Any = {"$read": pointer_name}
+        if self.rng.random() < self.scopes:
+            variable = self._name("base")
+            scoped = self._members(type_, variable, uses_templates)
+            return {"group": [{"name": pointer_name, **word}, {"define": {variable: base}, "in": scoped}]}
+        return {"group": [{"name": pointer_name, **word}, self._members(type_, base, uses_templates)]}
+
+    def _members(self, type_: Dict[str, Any], base: Any, uses_templates: List[bool]) -> Dict[str, Any]:
+        if type_["kind"] == "struct":
+            return {"group": [
+                self._pointer(member["type"], _memory_word({"$sum": [base, index * WORD_SIZE]}), uses_templates)
+                for index, member in enumerate(type_["contains"])
+            ]}
+        count_name, index = self._name("count"), self._name("index")
+        element = _memory_word({"$sum": [base, WORD_SIZE, {"$product": [index, "$wordsize"]}]})
+        return {"group": [
+            {"name": count_name, **_memory_word(base)},
+            {"list": {
+                "count": {"$read": count_name},
+                "each": index,
+                "is": self._pointer(type_["contains"]["type"], element, uses_templates),
+            }},
+        ]}
+
+    def _elementary_pointer(self, word: Dict[str, Any], uses_templates: List[bool]) -> Dict[str, Any]:
+        name = self._name("value")
+        if word["location"] != "memory":
+            return {"name": name, **word}
+        if self.rng.random() < self.templates:
+            uses_templates[0] = True
+            return {"define": {"word-offset": word["offset"]}, "in": {"template": "memory-word", "yields": {"word": name}}}
+        region = {"name": name, **word}
+        if self.rng.random() < self.conditionals:
+            # Memory words are aligned, so the remainder is always zero
+            decoy = {"name": name, "location": "code", "offset": 0, "length": 0}
+            aligned = {"$remainder": [word["offset"], WORD_SIZE]}
+            if self.rng.random() < 0.5:
+                return {"if": aligned, "then": decoy, "else": region}
+            return {"if": {"$difference": ["$wordsize", aligned]}, "then": region, "else": decoy}
+        return region
+
+    def _value(self, type_: Dict[str, Any], memory: bytearray) -> Tuple[bytes, Any]:
+        """
+        A random value of a type, allocating the members of structs and arrays in memory.
+        Returns the word holding the value or its memory offset, and the value.
+        """
+        kind = type_["kind"]
+        if kind in ("uint", "bool", "address"):
+            value = self.rng.getrandbits({"uint": type_.get("bits", 256), "bool": 1, "address": 160}[kind])
+            return value.to_bytes(WORD_SIZE, "big"), value
+        if kind == "struct":
+            members = [member["type"] for member in type_["contains"]]
+            header = []
+        else:
+            members = [type_["contains"]["type"]] * self.rng.randint(0, self.fan_out)
+            header = [len(members).to_bytes(WORD_SIZE, "big")]
+        offset = len(memory)
+        memory.extend(bytes(WORD_SIZE * (len(header) + len(members))))
+        words, values = list(header), []
+        for member in members:
+            word, value = self._value(member, memory)
+            words.append(word)
+            values.append(value)
+        memory[offset:offset + WORD_SIZE * len(words)] = b"".join(words)
+        return offset.to_bytes(WORD_SIZE, "big"), values
+
+def _memory_word(offset: Any) -> Dict[str, Any]:
+    return {"location": "memory", "offset": offset, "length": "$wordsize"}
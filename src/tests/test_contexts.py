@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+from ethdebug.program.contexts import ContextTable, ProgramContexts, structurally_equal
+
+script_dir = Path(__file__).parent
+
+def code(offset: int) -> dict:
+    return {"code": {"source": {"id": 0}, "range": {"offset": offset, "length": 1}}}
+
+def test_flattens_nested_gathers():
+    table = ContextTable()
+    nested = table.intern({"gather": [code(1), {"gather": [code(2), code(3)]}]})
+    flat = table.intern({"gather": [code(1), code(2), code(3)]})
+    assert nested == flat
+    assert table.to_json(nested) == {"gather": [code(1), code(2), code(3)]}
+
+def test_removes_duplicate_and_empty_gather_members():
+    table = ContextTable()
+    assert table.intern({"gather": [code(1), {}, code(1)]}) == table.intern(code(1))
+    assert table.intern({"gather": [{}, {}]}) == table.empty
+
+def test_dedupes_picks():
+    table = ContextTable()
+    assert table.intern({"pick": [code(1), {"code": {"range": {"length": 1, "offset": 1}, "source": {"id": 0}}}]}) == table.intern(code(1))
+    nested = table.intern({"pick": [code(1), {"pick": [code(2), code(1)]}]})
+    assert table.to_json(nested) == {"pick": [code(1), code(2)]}
+
+def test_keeps_fields_next_to_nested_contexts():
+    table = ContextTable()
+    context = {"frame": "step", "gather": [code(1), {"remark": "x"}], "pick": [code(2), code(3)]}
+    assert table.to_json(table.intern(context)) == context
+
+def test_structural_equality():
+    assert structurally_equal({"gather": [code(1), {"gather": [code(2), code(3)]}]}, {"gather": [code(1), code(2), code(3)]})
+    assert not structurally_equal(code(1), code(2))
+    assert structurally_equal(None, {})
+
+def test_interns_solc_program_contexts():
+    with open(script_dir / "mega_playground/output.json", 'r') as f:
+        output = json.load(f)
+    program = output["contracts"]["mega_playground.sol"]["MegaFeaturePlayground"]["evm"]["deployedBytecode"]["ethdebug"]
+    contexts = ProgramContexts.build(program)
+    instructions = program["instructions"]
+    assert len(contexts) == len(instructions)
+    assert len(contexts.table) < len(instructions) // 10
+    first, second = instructions[0]["offset"], instructions[1]["offset"]
+    assert contexts.same_context(first, second) == (instructions[0]["context"] == instructions[1]["context"])
+    for instruction in instructions:
+        assert contexts.table.to_json(contexts.context_id_at(instruction["offset"])) == instruction["context"]
@@ -0,0 +1,185 @@
+import pytest
+from eth_hash.auto import keccak
+from ethdebug.coverage import Coverage, CoverageTable, sources_of, to_lcov
+from ethdebug.program.registry import ProgramRegistry
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.trace_file import TraceWriter
+
+SOURCE = """contract C {
+  function f(bool x) public {
+    if (x) {
+      a();
+    }
+    b();
+  }
+}
+"""
+CODE = bytes.fromhex("6006576001505b00")
+
+def code(text: str) -> dict:
+    return {"code": {"source": {"id": 0}, "range": {"offset": SOURCE.index(text), "length": len(text)}}}
+
+FUNCTION = SOURCE[SOURCE.index("function"):SOURCE.rindex("}", 0, len(SOURCE) - 2) + 1]
+IF = SOURCE[SOURCE.index("if (x)"):SOURCE.index("}", SOURCE.index("a();")) + 1]
+
+PROGRAM = {
+    "contract": {"name": "C", "definition": {"source": {"id": 0}}},
+    "environment": "call",
+    "instructions": [
+        {"offset": 0, "operation": {"mnemonic": "PUSH1", "arguments": ["0x06"]}, "context": {"gather": [code(FUNCTION), code("x")]}},
+        {"offset": 2, "operation": {"mnemonic": "JUMPI"}, "context": code(IF)},
+        {"offset": 3, "operation": {"mnemonic": "PUSH1", "arguments": ["0x01"]}, "context": code("a();")},
+        {"offset": 5, "operation": {"mnemonic": "POP"}, "context": code("a();")},
+        {"offset": 6, "operation": {"mnemonic": "JUMPDEST"}, "context": code("b();")},
+        {"offset": 7, "operation": {"mnemonic": "STOP"}, "context": code("b();")},
+    ],
+}
+
+MNEMONICS = {instruction["offset"]: instruction["operation"]["mnemonic"] for instruction in PROGRAM["instructions"]}
+
+def write_trace(path, pcs):
+    with TraceWriter(path) as writer:
+        for step, pc in enumerate(pcs):
+            writer.append(pc, MNEMONICS[pc], code=CODE if step == 0 else None)
+    return path
+
+class StreamedTrace:
+    """
+    A trace that can only be streamed, hiding that it is backed by a trace file.
+    """
+    def __init__(self, trace):
+        self.trace = trace
+
+    async def __aiter__(self):
+        async for state in self.trace:
+            yield state
+
+async def add(coverage, path, streamed=False, **options):
+    with ReplayMachine(path) as machine:
+        trace = await machine.trace()
+        return await coverage.add_trace(StreamedTrace(trace) if streamed else trace, **options)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streamed", [False, True])
+async def test_marks_executed_pcs_of_frames(tmp_path, streamed):
+    path = tmp_path / "trace.bin"
+    steps = [
+        # pc, opcode, stack (bottom to top), code
+        (0, "CALL", [0x99, 0, 0, 0, 0, 0, 0xbb, 0xffff], b"\x01"),
+        (0, "PUSH1", [], b"\x02"),
+        (2, "STOP", [1], None),
+        (1, "DELEGATECALL", [0x99, 1, 0, 0, 0, 0, 0xcc, 0xffff], b"\x01"),
+        (0, "JUMP", [], b"\x03"),
+        (5, "ADD", [1], None),
+        (2, "PUSH1", [0x99, 1, 0], b"\x01"),
+        (4, "CREATE", [0x99, 1, 0, 0, 0, 0], None),
+        (0, "RETURN", [], b"\x04"),
+        (5, "STOP", [0x99, 1, 0, 0xdd], b"\x01"),
+    ]
+    with TraceWriter(path) as writer:
+        previous = []
+        for pc, opcode, stack, code_ in steps:
+            writer.append(pc, opcode, pop=len(previous), push=stack, code=code_)
+            previous = stack
+
+    coverage = Coverage()
+    assert await add(coverage, path, streamed) == 10
+    assert coverage.pcs(keccak(b"\x01"), "call") == [0, 1, 2, 4, 5]
+    assert coverage.pcs(keccak(b"\x02"), "call") == [0, 2]
+    assert coverage.pcs(keccak(b"\x03"), "call") == [0, 5]
+    assert coverage.pcs(keccak(b"\x04"), "create") == [0]
+    assert len(coverage) == 4
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streamed", [False, True])
+async def test_callee_halting_on_a_call_returns(tmp_path, streamed):
+    path = tmp_path / "trace.bin"
+    steps = [
+        (0, "CALL", [0x99, 0, 0, 0, 0, 0, 0xbb, 0xffff], b"\x01"),
+        (0, "PUSH1", [], b"\x02"),
+        # The callee runs out of gas on its own call, so the caller continues with 0 on its stack
+        (2, "CALL", [0, 0, 0, 0, 0, 0xcc, 0xffff], None),
+        (1, "STOP", [0x99, 0], b"\x01"),
+    ]
+    with TraceWriter(path) as writer:
+        previous = []
+        for pc, opcode, stack, code_ in steps:
+            writer.append(pc, opcode, pop=len(previous), push=stack, code=code_)
+            previous = stack
+
+    coverage = Coverage()
+    await add(coverage, path, streamed, environment="create")
+    assert coverage.pcs(keccak(b"\x01"), "create") == [0, 1]
+    assert coverage.pcs(keccak(b"\x02"), "call") == [0, 2]
+    assert len(coverage) == 2
+
+def test_merges_and_saves(tmp_path):
+    a, b = Coverage(), Coverage()
+    a.mark(b"\x01" * 32, "call", [0, 3, 700])
+    b.mark(b"\x01" * 32, "call", [1, 3])
+    b.mark(b"\x02" * 32, "create", [9])
+    a.merge(b)
+    assert a.pcs(b"\x01" * 32, "call") == [0, 1, 3, 700]
+    assert a.is_covered(b"\x02" * 32, "create", 9)
+    assert not a.is_covered(b"\x02" * 32, "call", 9)
+
+    a.save(tmp_path / "coverage.bin")
+    assert Coverage.load(tmp_path / "coverage.bin").bitmaps == a.bitmaps
+    with pytest.raises(ValueError):
+        Coverage.from_bytes(b"not coverage")
+
+@pytest.mark.asyncio
+async def test_projects_to_sources(tmp_path):
+    coverage = Coverage()
+    # x is false: the jump to b() is taken
+    await add(coverage, write_trace(tmp_path / "false.bin", [0, 2, 6, 7]))
+    table = CoverageTable.build(PROGRAM)
+    assert len(table) == 6
+    sources = coverage.project({(keccak(CODE), "call"): table})
+    source = sources[0]
+
+    assert source.lines(SOURCE) == {2: True, 3: True, 4: False, 5: True, 6: True, 7: True}
+    assert source.uncovered() == [(SOURCE.index("a();"), SOURCE.index("a();") + 4)]
+    covered, coverable = source.byte_coverage(len(SOURCE))
+    assert coverable == len(FUNCTION)
+    assert covered == coverable - 4
+    (branch,) = source.branches.values()
+    assert (branch.start, branch.executed, branch.taken, branch.not_taken) == (SOURCE.index("if"), True, True, False)
+
+    # x is true as well
+    other = Coverage()
+    await add(other, write_trace(tmp_path / "true.bin", [0, 2, 3, 5, 6, 7]))
+    coverage.merge(other)
+    registry = ProgramRegistry()
+    registry.add(PROGRAM, CODE)
+    source = coverage.project(registry)[0]
+    assert all(source.lines(SOURCE).values())
+    assert source.uncovered() == []
+    (branch,) = source.branches.values()
+    assert (branch.taken, branch.not_taken) == (True, True)
+
+def test_lcov(tmp_path):
+    coverage = Coverage()
+    coverage.mark(keccak(CODE), "call", [0, 2, 6, 7])
+    sources = coverage.project({(keccak(CODE), "call"): CoverageTable.build(PROGRAM)})
+    info = {"compilation": {"id": "c", "compiler": {"name": "solc", "version": "0.8.29"}, "sources": [
+        {"id": 0, "path": "C.sol", "contents": SOURCE, "language": "Solidity"},
+    ]}}
+    assert to_lcov(sources, sources_of(info)).splitlines() == [
+        "TN:",
+        "SF:C.sol",
+        "BRDA:3,0,0,0",
+        "BRDA:3,0,1,1",
+        "DA:2,1",
+        "DA:3,1",
+        "DA:4,0",
+        "DA:5,1",
+        "DA:6,1",
+        "DA:7,1",
+        "BRF:2",
+        "BRH:1",
+        "LF:6",
+        "LH:5",
+        "end_of_record",
+    ]
+    assert to_lcov(sources, {}) == ""
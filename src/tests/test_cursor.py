@@ -0,0 +1,32 @@
+from ethdebug.data import Data
+from ethdebug.dereference.cursor import Region, Regions
+
+def region(name, offset: int) -> Region:
+    return Region(name=name, location="memory", slot=None, offset=Data.from_int(offset), length=Data.from_int(32))
+
+def test_lookup_finds_latest_region():
+    regions = Regions((region("a", 0), region("b", 1), region("a", 2)))
+    assert regions.lookup("a") == region("a", 2)
+    assert regions.named("a") == (region("a", 0), region("a", 2))
+    assert regions.lookup("c") is None
+
+def test_add_keeps_collections_immutable():
+    base = Regions((region("a", 0),))
+    first = base.add(region("a", 1))
+    # Adding to a collection that was already added to must not change the other one
+    second = base.add(region("b", 2))
+    assert base.all() == (region("a", 0),)
+    assert first.all() == (region("a", 0), region("a", 1))
+    assert second.all() == (region("a", 0), region("b", 2))
+    assert first.lookup("a") == region("a", 1)
+    assert first.lookup("b") is None
+    assert second.lookup("a") == region("a", 0)
+    assert first.add(region("c", 3)).all() == (region("a", 0), region("a", 1), region("c", 3))
+    assert second == Regions((region("a", 0), region("b", 2)))
+
+def test_this_region_is_found_by_its_name():
+    this = Region(name="item", location="memory", slot=None, offset=None, length=Data.from_int(32))
+    regions = Regions((region("item", 0),)).set_this(this)
+    assert regions.lookup("$this") is this
+    assert regions.lookup("item") is this
+    assert regions.named("item") == (region("item", 0),)
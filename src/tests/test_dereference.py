@@ -0,0 +1,156 @@
+import pytest
+from unittest.mock import AsyncMock
+from eth_hash.auto import keccak
+from ethdebug.data import Data
+from ethdebug.dereference.__main__ import DereferenceOptions, dereference
+from ethdebug.format.pointer_schema import Pointer
+from ethdebug.format.pointer.template_schema import PointerTemplate
+from ethdebug.machine import MachineState
+
+from tests.mock_machine import MockCalldata, MockCode, MockMemory, MockReturndata, MockStack, MockState, MockStorage, MockTransient
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+def mock_state(stack: list = [], memory: bytes = b"", storage: dict = {}, calldata: bytes = b"") -> MachineState:
+    """
+    A state reading from the given data. The stack is given from bottom to top.
+    """
+    def read_bytes(data: bytes):
+        return AsyncMock(side_effect=lambda offset, length: Data(data[offset:offset + length].ljust(length, b"\x00")))
+
+    def read_slot(slots):
+        return AsyncMock(side_effect=lambda slot, offset, length: Data(slots(slot).rjust(32, b"\x00")[offset:offset + length]))
+
+    return MockState(
+        trace_index=AsyncMock(return_value=0),
+        opcode=AsyncMock(return_value="STOP"),
+        program_counter=AsyncMock(return_value=0),
+        stack=MockStack(length=AsyncMock(return_value=len(stack)), read=read_slot(lambda slot: stack[len(stack) - 1 - slot])),
+        memory=MockMemory(read=read_bytes(memory)),
+        storage=MockStorage(read=read_slot(lambda slot: storage.get(slot, word(0)))),
+        calldata=MockCalldata(read=read_bytes(calldata)),
+        returndata=MockReturndata(read=read_bytes(b"")),
+        transient=MockTransient(read=read_slot(lambda slot: word(0))),
+        code=MockCode(read=read_bytes(b"")),
+    )
+
+async def view(pointer: dict, state: MachineState, templates: dict = {}) -> list:
+    cursor = await dereference(Pointer.model_validate(pointer), DereferenceOptions(
+        state=state,
+        templates={name: PointerTemplate.model_validate(template) for name, template in templates.items()},
+    ))
+    view = await cursor.view(state)
+    return [(region.name, region.location, await view.read(region)) for region in view.regions().all()]
+
+@pytest.mark.asyncio
+async def test_memory_array():
+    # uint256[] in memory at 0x80, with the stack slot given by a scope
+    pointer = {
+        "define": {"uint256-array-memory-pointer-slot": 0},
+        "in": {"group": [
+            {"name": "array-start", "location": "stack", "slot": "uint256-array-memory-pointer-slot"},
+            {"name": "array-count", "location": "memory", "offset": {"$read": "array-start"}, "length": "$wordsize"},
+            {"list": {
+                "count": {"$read": "array-count"},
+                "each": "item-index",
+                "is": {
+                    "name": "array-item",
+                    "location": "memory",
+                    "offset": {"$sum": [
+                        {".offset": "array-count"},
+                        {".length": "array-count"},
+                        {"$product": ["item-index", {".length": "$this"}]},
+                    ]},
+                    "length": "$wordsize",
+                },
+            }},
+        ]},
+    }
+    state = mock_state(stack=[word(0x80)], memory=bytes(0x80) + word(3) + word(7) + word(8) + word(9))
+    regions = await view(pointer, state)
+    assert [name for name, _, _ in regions] == ["array-start", "array-count", "array-item", "array-item", "array-item"]
+    assert [data.as_uint() for _, _, data in regions[2:]] == [7, 8, 9]
+
+@pytest.mark.asyncio
+async def test_storage_mapping():
+    # mapping(uint256 => uint256) at slot 3
+    pointer = {
+        "define": {"key": "0x" + word(5).hex()},
+        "in": {"name": "value", "location": "storage", "slot": {"$keccak256": ["key", {"$wordsized": 3}]}},
+    }
+    slot = int.from_bytes(keccak(word(5) + word(3)), "big")
+    regions = await view(pointer, mock_state(storage={slot: word(42)}))
+    assert regions == [("value", "storage", Data(word(42)))]
+
+@pytest.mark.asyncio
+async def test_conditional_and_reference():
+    pointer = {"group": [
+        {"name": "flag", "location": "calldata", "offset": 0, "length": 1},
+        {"if": {"$read": "flag"}, "then": {"template": "word"}, "else": {"name": "none", "location": "code", "offset": 0, "length": 0}},
+    ]}
+    templates = {"word": {"expect": [], "for": {"name": "word", "location": "calldata", "offset": 1, "length": 2}}}
+    regions = await view(pointer, mock_state(calldata=b"\x01\xab\xcd"), templates)
+    assert regions[1] == ("word", "calldata", Data.from_hex("0xabcd"))
+    regions = await view(pointer, mock_state(calldata=b"\x00\xab\xcd"), templates)
+    assert [name for name, _, _ in regions] == ["flag", "none"]
+
+@pytest.mark.asyncio
+async def test_missing_template_variables():
+    pointer = Pointer.model_validate({"template": "word"})
+    templates = {"word": PointerTemplate.model_validate({"expect": ["index"], "for": {"location": "memory", "offset": "index", "length": 32}})}
+    state = mock_state()
+    cursor = await dereference(pointer, DereferenceOptions(state=state, templates=templates))
+    with pytest.raises(ValueError, match="missing expected variables with identifiers: index"):
+        await cursor.view(state)
+
+@pytest.mark.asyncio
+async def test_stack_slot_follows_stack_length():
+    pointer = Pointer.model_validate({"location": "stack", "slot": 0})
+    cursor = await dereference(pointer, DereferenceOptions(state=mock_state(stack=[word(1)]), templates={}))
+    # Two items were pushed since the pointer was dereferenced
+    view = await cursor.view(mock_state(stack=[word(1), word(2), word(3)]))
+    [region] = view.regions().all()
+    assert region.slot.as_uint() == 2
+    assert (await view.read(region)).as_uint() == 1
+
+@pytest.mark.asyncio
+async def test_templates_collection():
+    pointer = {
+        "templates": {"word": {"expect": ["offset"], "for": {"name": "word", "location": "calldata", "offset": "offset", "length": 2}}},
+        "in": {"define": {"offset": 1}, "in": {"template": "word"}},
+    }
+    regions = await view(pointer, mock_state(calldata=b"\x01\xab\xcd"))
+    assert regions == [("word", "calldata", Data.from_hex("0xabcd"))]
+
+@pytest.mark.asyncio
+async def test_packed_struct_template():
+    # struct { uint8 x; uint8 y; bytes4 salt; } packed in storage slot 0
+    pointer = {
+        "templates": {"packed-field": {
+            "expect": ["struct-storage-contract-variable-slot", "previous", "size"],
+            "for": {
+                "name": "field",
+                "location": "storage",
+                "slot": "struct-storage-contract-variable-slot",
+                "offset": {"$difference": ["previous", "size"]},
+                "length": "size",
+            },
+        }},
+        "in": {
+            "define": {"struct-storage-contract-variable-slot": 0},
+            "in": {"group": [
+                {"name": "packing-begin", "location": "storage", "slot": "struct-storage-contract-variable-slot", "offset": "$wordsize", "length": 0},
+                {"define": {"previous": {".offset": "packing-begin"}, "size": 1}, "in": {"template": "packed-field", "yields": {"field": "x"}}},
+                {"define": {"previous": {".offset": "x"}, "size": 1}, "in": {"template": "packed-field", "yields": {"field": "y"}}},
+                {"define": {"previous": {".offset": "y"}, "size": 4}, "in": {"template": "packed-field", "yields": {"field": "salt"}}},
+            ]},
+        },
+    }
+    state = mock_state(storage={0: bytes.fromhex("deadbeef") + b"\x02\x01"})
+    regions = await view(pointer, state)
+    assert [(name, data) for name, _, data in regions[1:]] == [
+        ("x", Data.from_hex("0x01")),
+        ("y", Data.from_hex("0x02")),
+        ("salt", Data.from_hex("0xdeadbeef")),
+    ]
@@ -5,7 +5,7 @@ from ethdebug.data import Data
 from ethdebug.dereference.cursor import Region, Regions
 from ethdebug.format.data.unsigned_schema import DataUnsigned
 from ethdebug.format.data.value_schema import DataValue
-from ethdebug.format.pointer.expression_schema import Arithmetic, Constant, Literal, Lookup, Resize, Variable
+from ethdebug.format.pointer.expression_schema import Arithmetic, Constant, Literal, Lookup, Read, Reference, Resize, Variable
 from ethdebug.format.pointer.identifier_schema import PointerIdentifier
 from ethdebug.machine import MachineState
 
@@ -128,6 +128,17 @@ async def test_evaluates_slot_lookup_expressions(options):
     expression = Lookup(**{".slot": "stack"})
     assert await evaluate(expression, options) == Data.from_int(42)
 
+@pytest.mark.asyncio
+async def test_evaluates_lookup_expressions_of_identifiers(options):
+    expression = Lookup(**{".offset": Reference(root=PointerIdentifier(root="stack"))})
+    assert await evaluate(expression, options) == Data.from_int(0x60)
+
+@pytest.mark.asyncio
+async def test_evaluates_read_expressions(options, state):
+    expression = Read.model_validate({"$read": "memory"})
+    assert await evaluate(expression, options) == Data.from_bytes(bytearray([0x11, 0x22, 0x33, 0x44]))
+    state.memory.read.assert_called_with(0x20 * 0x05, 42 - 0x1f)
+
 @pytest.mark.asyncio
 async def test_evaluates_resize_expressions(options):
     data = await evaluate(Resize(**{"$sized1": 0}), options)
@@ -141,3 +152,17 @@ async def test_evaluates_resize_expressions(options):
     assert len(data) == 32
     assert data == Data.from_int(0xabcd).resize_to(32)
 
+
+@pytest.mark.asyncio
+async def test_evaluate_is_extensible(options):
+    class Twice:
+        def __init__(self, value: int):
+            self.value = value
+
+    @evaluate.register
+    async def _(expression: Twice, options: EvaluateOptions) -> Data:
+        return Data.from_int(2 * expression.value)
+
+    assert await evaluate(Twice(21), options) == Data.from_int(42)
+    assert Twice in evaluate.registry
+    assert evaluate.dispatch(Literal) is not evaluate.dispatch(object)
@@ -0,0 +1,152 @@
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+import yaml
+from pydantic import ValidationError
+from ethdebug.format.pointer.expression_schema import Arithmetic, Lookup, PointerExpression, Read
+from ethdebug.format.pointer.region.memory_schema import PointerRegionMemory
+from ethdebug.format.pointer.region_schema import PointerRegion
+from ethdebug.format.type.base_schema import Complextype, Elementarytype, TypeBase
+
+ROOT = Path(__file__).resolve().parents[2]
+SCHEMAS = ROOT / "format" / "schemas"
+
+def test_expressions_are_tagged_by_their_keys():
+    assert isinstance(PointerExpression.model_validate({"$read": "x"}).root, Read)
+    assert isinstance(PointerExpression.model_validate({"$sum": [1, 2]}).root, Arithmetic)
+    assert isinstance(PointerExpression.model_validate({".offset": "x"}).root, Lookup)
+    # Validation errors only mention the tagged member
+    with pytest.raises(ValidationError) as error:
+        PointerExpression.model_validate({"$keccak256": 1})
+    assert error.value.error_count() == 1
+
+def test_regions_are_tagged_by_location():
+    region = PointerRegion.model_validate({"location": "memory", "offset": 0, "length": 32})
+    assert isinstance(region.root, PointerRegionMemory)
+    with pytest.raises(ValidationError):
+        PointerRegion.model_validate({"location": "memory", "slot": 0})
+
+def test_types_are_tagged_by_class():
+    assert isinstance(TypeBase.model_validate({"kind": "uint"}).root, Elementarytype)
+    complex_type = TypeBase.model_validate({"class": "complex", "kind": "array", "contains": {"type": {"kind": "uint"}}})
+    assert isinstance(complex_type.root, Complextype)
+    assert TypeBase.model_validate(complex_type.root) == complex_type
+
+def test_models_are_built_on_first_use():
+    script = (
+        "from ethdebug.format.pointer_schema import Pointer\n"
+        "from ethdebug.format.pointer.collection.group_schema import PointerCollectionGroup\n"
+        "assert not Pointer.__pydantic_complete__\n"
+        "pointer = Pointer.model_validate({'group': [{'location': 'stack', 'slot': 0}]})\n"
+        "assert isinstance(pointer.root.root, PointerCollectionGroup)\n"
+        "assert Pointer.__pydantic_complete__\n"
+    )
+    # A fresh interpreter, so that the models were not built by other tests
+    subprocess.run([sys.executable, "-c", script], check=True, env=dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent)))
+
+def load_generate_model():
+    spec = importlib.util.spec_from_file_location("generate_model", ROOT / "generate_model.py")
+    generate_model = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(generate_model)
+    return generate_model
+
+def test_models_are_generated(tmp_path, monkeypatch):
+    """
+    The models are the output of generate_model.py. The discriminated unions of pointer regions, collections,
+    expressions and types were applied by hand while the schemas were not available, which this checks.
+    In CI, a missing schemas submodule is an error rather than a reason to skip.
+    """
+    if not SCHEMAS.is_dir():
+        if os.environ.get("CI"):
+            pytest.fail("the schemas submodule (format) is not checked out")
+        pytest.skip("the schemas submodule (format) is not checked out")
+    pytest.importorskip("datamodel_code_generator")
+    generate_model = load_generate_model()
+    # The resolver of `schema:` references expects the schemas in a `format/schemas` directory
+    schemas = tmp_path / "format" / "schemas"
+    shutil.copytree(SCHEMAS, schemas, ignore=shutil.ignore_patterns("LICENSE"))
+    # The generated modules are formatted with the configuration of the project
+    monkeypatch.chdir(ROOT)
+    output, fast_output = tmp_path / "output" / "format", tmp_path / "output" / "format_fast"
+    generate_model.generate_all(schemas, output, fast_output)
+
+    differences = []
+    for directory in (output, fast_output):
+        for path in sorted(directory.rglob("*.py")):
+            checked_in = ROOT / "src" / "ethdebug" / directory.name / path.relative_to(directory)
+            if not checked_in.exists() or checked_in.read_bytes() != path.read_bytes():
+                differences.append(path.relative_to(output.parent).as_posix())
+    assert differences == []
+
+FIXTURE_SCHEMAS = {
+    "data/unsigned": {"type": "integer", "minimum": 0},
+    "data/hex": {"type": "string", "pattern": "^0x[0-9a-fA-F]{1,}$"},
+    "data/value": {"oneOf": [{"$ref": "schema:ethdebug/format/data/unsigned"}, {"$ref": "schema:ethdebug/format/data/hex"}]},
+    "first": {
+        "type": "object",
+        "properties": {
+            "value": {"$ref": "schema:ethdebug/format/data/value"},
+            "meta": {"type": "object", "title": "Meta", "properties": {"name": {"type": "integer"}}},
+        },
+    },
+    "second": {
+        "type": "object",
+        "properties": {
+            "size": {"$ref": "data/unsigned.schema.yaml"},
+            "meta": {"type": "object", "title": "Meta", "properties": {"name": {"type": "string"}}},
+        },
+    },
+}
+
+def write_schema(schema_dir: Path, name: str, body: dict) -> None:
+    path = schema_dir / f"{name}.schema.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({"$id": f"schema:ethdebug/format/{name}", "title": f"ethdebug/format/{name}", **body}))
+
+def read_tree(directory: Path) -> dict:
+    return {path.relative_to(directory).as_posix(): path.read_bytes() for path in sorted(directory.rglob("*.py"))}
+
+def test_incremental_generation_matches_full_run(tmp_path, monkeypatch, capsys):
+    pytest.importorskip("datamodel_code_generator")
+    generate_model = load_generate_model()
+    schemas = tmp_path / "format" / "schemas"
+    for name, body in FIXTURE_SCHEMAS.items():
+        write_schema(schemas, name, body)
+    monkeypatch.chdir(ROOT)
+
+    def run(name: str, incremental: bool) -> Path:
+        output = tmp_path / name
+        generate_model.regenerate(schemas, output / "format", output / "format_fast", output / "manifest.json", incremental)
+        return output
+
+    incremental = run("incremental", False)
+    manifest = (incremental / "manifest.json").read_bytes()
+    # The first edit only affects the schemas referencing data/hex. The second one makes a model of `first`
+    # identical to a model of `second`, which is outside its closure and must not be reused.
+    edits = [
+        ("data/hex", {"type": "string", "pattern": "^0x[0-9a-f]{1,}$"}),
+        ("first", {**FIXTURE_SCHEMAS["first"], "properties": {**FIXTURE_SCHEMAS["first"]["properties"], "meta": FIXTURE_SCHEMAS["second"]["properties"]["meta"]}}),
+    ]
+    for step, (name, body) in enumerate(edits):
+        before = {directory: read_tree(incremental / directory) for directory in ("format", "format_fast")}
+        write_schema(schemas, name, body)
+        capsys.readouterr()
+        run("incremental", True)
+        written = {line.removeprefix("wrote ") for line in capsys.readouterr().out.splitlines() if line.startswith("wrote ")}
+        full = run(f"full{step}", False)
+
+        expected = set()
+        for directory in ("format", "format_fast"):
+            after = read_tree(incremental / directory)
+            assert after == read_tree(full / directory)
+            expected.update(str(incremental / directory / module) for module, content in after.items() if before[directory].get(module) != content)
+        assert written == expected != set()
+        assert {Path(path).relative_to(incremental / "format").as_posix() for path in written if "format_fast" not in path} <= {
+            generate_model.module_name(schema) for schema in ("data/hex.schema.yaml", "data/value.schema.yaml", "first.schema.yaml")
+        }
+        assert (incremental / "manifest.json").read_bytes() != manifest
+        manifest = (incremental / "manifest.json").read_bytes()
@@ -0,0 +1,63 @@
+import json
+import pytest
+from pathlib import Path
+
+msgspec = pytest.importorskip("msgspec")
+
+from ethdebug.format.info_schema import Info
+from ethdebug.format.program_schema import Environment, Program
+from ethdebug.format_fast import info_schema as fast_info
+from ethdebug.format_fast import program_schema as fast_program
+from ethdebug.format_fast.convert import fast_type, from_pydantic, pydantic_model, to_pydantic
+
+script_dir = Path(__file__).parent
+
+def solc_info() -> dict:
+    """
+    An info document of the mega_playground fixture, completed with the sources of the compiler input.
+    """
+    with open(script_dir / "mega_playground/input.json", "r") as f:
+        standard_json_input = json.load(f)
+    with open(script_dir / "mega_playground/output.json", "r") as f:
+        output = json.load(f)
+    compilation = dict(output["ethdebug"]["compilation"], id="mega_playground")
+    compilation["sources"] = [
+        dict(source, contents=standard_json_input["sources"][source["path"]]["content"], language=standard_json_input["language"])
+        for source in compilation["sources"]
+    ]
+    programs = [
+        contract["evm"][bytecode]["ethdebug"]
+        for contracts in output["contracts"].values()
+        for contract in contracts.values()
+        for bytecode in ("bytecode", "deployedBytecode")
+        if "environment" in contract["evm"][bytecode]["ethdebug"]
+    ]
+    return {"compilation": compilation, "programs": programs}
+
+def test_decodes_like_the_pydantic_models():
+    raw = json.dumps(solc_info()).encode()
+    info = msgspec.json.decode(raw, type=fast_info.Info)
+    expected = Info.model_validate_json(raw)
+    assert info.compilation.compiler.name == expected.compilation.compiler.name
+    assert len(info.programs) == len(expected.programs)
+    program, expected_program = info.programs[-1], expected.programs[-1]
+    assert program.environment == fast_program.Environment.call
+    assert [instruction.offset for instruction in program.instructions] == [instruction.offset.root.root for instruction in expected_program.instructions]
+    assert to_pydantic(info) == expected
+    assert from_pydantic(expected) == info
+
+def test_rejects_invalid_documents():
+    program = {"contract": {"definition": {"source": {"id": 0}}}, "environment": "call", "instructions": [{"offset": "0x"}]}
+    with pytest.raises(msgspec.ValidationError, match="instructions\\[0\\].offset"):
+        msgspec.convert(program, fast_program.Program)
+    program["instructions"][0]["offset"] = "0x01"
+    assert msgspec.convert(program, fast_program.Program).instructions[0].offset == "0x01"
+
+def test_maps_models_between_packages():
+    assert pydantic_model(fast_program.Program) is Program
+    assert fast_type(Program) is fast_program.Program
+    assert fast_type(Environment) is fast_program.Environment
+    program = Program.model_validate({"contract": {"definition": {"source": {"id": 0}}}, "environment": "create", "instructions": []})
+    assert to_pydantic(from_pydantic(program)) == program
+    with pytest.raises(ValueError, match="not a model of ethdebug.format_fast"):
+        pydantic_model(dict)
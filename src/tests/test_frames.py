@@ -0,0 +1,75 @@
+import pytest
+from ethdebug.replay.frames import FrameIndex
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.trace_file import TraceWriter
+from eth_hash.auto import keccak
+
+def address(value):
+    return "0x" + value.to_bytes(20, "big").hex()
+
+STEPS = [
+    # pc, opcode, stack (bottom to top), code
+    (0, "CALL", [0x99, 0, 0, 0, 0, 0, 0xbb, 0xffff], b"\x01"),
+    (0, "PUSH1", [], b"\x02"),
+    (2, "STOP", [1], None),
+    (1, "DELEGATECALL", [0x99, 1, 0, 0, 0, 0, 0xcc, 0xffff], b"\x01"),
+    (0, "JUMP", [], b"\x03"),
+    (5, "ADD", [1], None),
+    (2, "PUSH1", [0x99, 1, 0], b"\x01"),
+    (4, "CREATE", [0x99, 1, 0, 0, 0, 0], None),
+    (0, "RETURN", [], b"\x04"),
+    (5, "STOP", [0x99, 1, 0, 0xdd], b"\x01"),
+]
+
+@pytest.mark.asyncio
+async def test_indexes_call_frames(tmp_path):
+    path = tmp_path / "trace.bin"
+    with TraceWriter(path) as writer:
+        previous = []
+        for pc, opcode, stack, code in STEPS:
+            writer.append(pc, opcode, pop=len(previous), push=stack, code=code)
+            previous = stack
+
+    with ReplayMachine(path) as machine:
+        trace = await machine.trace()
+        index = await FrameIndex.from_trace(trace, address="0xaa")
+
+        assert len(index) == 4
+        root, call, delegate, create = (index.frame(frame_id) for frame_id in range(4))
+        assert (root.kind, root.entry, root.exit, root.depth, root.parent) == ("root", 0, 9, 0, None)
+        assert root.address == root.storage_address == "0xaa"
+        assert root.code_hash == keccak(b"\x01")
+        assert (call.kind, call.entry, call.exit, call.depth, call.parent) == ("call", 1, 2, 1, 0)
+        assert call.address == call.storage_address == address(0xbb)
+        assert call.code_hash == keccak(b"\x02")
+        assert (delegate.kind, delegate.entry, delegate.exit) == ("delegatecall", 4, 5)
+        assert (delegate.address, delegate.storage_address) == (address(0xcc), "0xaa")
+        assert (create.kind, create.entry, create.exit, create.address) == ("create", 8, 8, address(0xdd))
+
+        assert [index.frame_at(step) for step in range(10)] == [0, 1, 1, 0, 2, 2, 0, 0, 3, 0]
+        assert index.call_stack(5) == [0, 2]
+        assert list(index.children(0)) == [1, 2, 3]
+        assert list(index.descendants(1)) == []
+
+        state = await index.state(trace, 0, 5)
+        assert state.frame == root
+        assert await state.trace_index() == 3
+        assert await state.opcode() == "DELEGATECALL"
+        assert await state.stack.length() == 8
+        assert await (await index.state(trace, 2, 5)).program_counter() == 5
+        with pytest.raises(ValueError, match="Frame 1 is not active at step 5"):
+            index.last_step(1, 5)
+
+@pytest.mark.asyncio
+async def test_uses_reported_call_depth(tmp_path):
+    path = tmp_path / "trace.bin"
+    depths = [0, 1, 1, 2, 0, 0]
+    with TraceWriter(path) as writer:
+        for step, depth in enumerate(depths):
+            writer.append(step, "CALL" if step in (0, 2) else "ADD")
+
+    with ReplayMachine(path) as machine:
+        async def depth(state):
+            return depths[await state.trace_index()]
+        index = await FrameIndex.from_trace(await machine.trace(), depth=depth)
+        assert [(frame.entry, frame.exit, frame.depth) for frame in map(index.frame, range(len(index)))] == [(0, 5, 0), (1, 3, 1), (3, 3, 2)]
@@ -0,0 +1,76 @@
+import pytest
+from ethdebug import instrument
+from ethdebug.dereference.__main__ import DereferenceOptions, dereference
+from ethdebug.format.pointer_schema import Pointer
+from ethdebug.in_memory import InMemoryState
+
+POINTER = {"group": [
+    {"name": "array-start", "location": "stack", "slot": 0},
+    {"name": "array-count", "location": "memory", "offset": {"$read": "array-start"}, "length": "$wordsize"},
+    {"list": {
+        "count": {"$read": "array-count"},
+        "each": "index",
+        "is": {"name": "item", "location": "storage", "slot": {"$keccak256": [{"$sum": ["index", 1]}]}},
+    }},
+]}
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+@pytest.fixture
+def state() -> InMemoryState:
+    return InMemoryState(stack=[word(0x80)], memory=bytes(0x80) + word(3))
+
+@pytest.fixture(autouse=True)
+def reset():
+    instrument.reset()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+async def view(state: InMemoryState):
+    cursor = await dereference(Pointer.model_validate(POINTER), DereferenceOptions(state=state, templates={}))
+    return await cursor.view(state)
+
+@pytest.mark.asyncio
+async def test_disabled_by_default(state):
+    result = await view(state)
+    assert result.report is None
+    assert instrument.aggregate().entries == {}
+
+@pytest.mark.asyncio
+async def test_reports_per_view(state):
+    instrument.enable()
+    first = await view(state)
+    second = await view(state)
+    for region in first.regions().all():
+        await first.read(region)
+
+    report = first.report
+    assert report.count("expression", "Read") == 2
+    assert report.count("expression", "Keccak256") == 3
+    assert report.count("keccak", "32 bytes") == 3
+    assert report.count("region") == 5
+    assert report.count("region", "storage") == 3
+    assert report.count("iterations", "storage") >= 3
+    assert report.count("memo", "DereferencePointer") == 7
+    assert report.count("memo", "SaveVariables") == 3
+    assert report.count("lookup", "named") == 2
+    # Two reads while viewing, and one read of every region through the view
+    assert report.count("read", "memory") == 2
+    assert report.count("read", "storage") == 3
+    assert report.seconds("expression") > 0
+
+    assert second.report.count("read") == 2
+    aggregate = instrument.aggregate()
+    assert aggregate.count("read") == report.count("read") + second.report.count("read")
+    assert aggregate.count("expression", "Read") == 4
+
+@pytest.mark.asyncio
+async def test_instrumented(state):
+    with instrument.instrumented() as report:
+        await view(state)
+    assert not instrument.enabled
+    assert report.count("read") == 2
+    assert report.to_json()["read"]["memory"]["count"] == 1
+    assert "DereferencePointer" in report.format()
@@ -0,0 +1,65 @@
+import random
+import pytest
+from ethdebug.data import Data
+from ethdebug.dereference.cursor import Region
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.memory_index import MemoryIndex
+from ethdebug.replay.trace_file import TraceFile, TraceWriter
+from tests.test_replay import record_random_trace
+
+def memory_region(offset, length):
+    return Region(location="memory", name=None, slot=None, offset=Data.from_int(offset), length=Data.from_int(length))
+
+def test_finds_overlapping_writes():
+    rng = random.Random(0)
+    writes = []
+    for step in range(2000):
+        for _ in range(rng.randint(0, 2)):
+            writes.append((step, rng.randrange(0, 4096), rng.choice([1, 32, 32, 64, 500])))
+    index = MemoryIndex.build(writes)
+    assert len(index) == len(writes)
+    for _ in range(500):
+        offset, length = rng.randrange(0, 4600), rng.randint(1, 100)
+        start = rng.randrange(0, 2000)
+        stop = rng.randrange(start, 2001)
+        expected = [
+            write for write, (step, write_offset, write_length) in enumerate(writes)
+            if start <= step < stop and write_offset < offset + length and offset < write_offset + write_length
+        ]
+        assert index.writes(offset, length, start, stop) == expected
+        assert index.changes(memory_region(offset, length), range(start, stop)) == sorted({writes[write][0] for write in expected})
+
+def test_zero_length_and_zero_offset_regions():
+    index = MemoryIndex.build([(1, 0x40, 32), (2, 0, 1)])
+    assert index.changes(memory_region(0x40, 0)) == []
+    assert index.changes(memory_region(0, 1)) == [2]
+    assert index.changes(memory_region(0, 0x41)) == [1, 2]
+
+def test_indexes_trace_file_writes(tmp_path):
+    path = tmp_path / "trace.bin"
+    record_random_trace(path, 300, checkpoint_interval=16)
+    with TraceFile(path) as trace:
+        index = trace.memory_index()
+        steps = index.changes(memory_region(64, 32))
+        for step in range(1, 300):
+            changed = trace.memory(step, 64, 32) != trace.memory(step - 1, 64, 32)
+            if changed and trace.memory_size(step) >= trace.memory_size(step - 1):
+                assert step in steps
+
+@pytest.mark.asyncio
+async def test_indexes_writes_of_any_trace(tmp_path):
+    path = tmp_path / "trace.bin"
+    with TraceWriter(path) as writer:
+        writer.append(0, "MSTORE", push=[0x80, 0x40])
+        writer.append(1, "CALLDATACOPY", pop=2, push=[0x20, 0, 0x100], memory=[(0x40, bytes(32))])
+        writer.append(2, "MSTORE8", pop=3, push=[1, 0x11f], memory=[(0x100, bytes(32))])
+        writer.append(3, "STOP", pop=2, memory=[(0x11f, b"\x01")])
+
+    with ReplayMachine(path) as machine:
+        index = await MemoryIndex.from_trace(await machine.trace())
+        assert [index.write(write) for write in range(len(index))] == [(1, 0x40, 32), (2, 0x100, 32), (3, 0x11f, 1)]
+        assert index.changes(memory_region(0x11f, 1)) == [2, 3]
+        assert index.changes(memory_region(0x11f, 1), range(3, 4)) == [3]
+        assert index.changes(memory_region(0x60, 0xa0)) == []
+        with pytest.raises(ValueError, match="Expected a memory region"):
+            index.changes(Region(location="stack", name=None, slot=Data.from_int(0), offset=None, length=None))
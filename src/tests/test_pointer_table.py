@@ -0,0 +1,82 @@
+import pytest
+from ethdebug.program.canonical import canonical_key, structural_hash
+from ethdebug.program.pointers import PointerTable, adjust_stack_length, referenced_templates
+
+def variable(identifier: str, pointer: dict) -> dict:
+    return {"identifier": identifier, "pointer": pointer}
+
+@pytest.fixture
+def program() -> dict:
+    x = {"location": "stack", "slot": 0}
+    y = {"name": "y", "location": "memory", "offset": {"$read": "x"}, "length": "$wordsize"}
+    # Same pointer as `y`, written with a different key order
+    y_reordered = {"length": "$wordsize", "offset": {"$read": "x"}, "location": "memory", "name": "y"}
+    return {
+        "contract": {"definition": {"source": {"id": 0}}},
+        "environment": "call",
+        "instructions": [
+            {"offset": 0, "context": {"variables": [variable("x", x)]}},
+            {"offset": 1, "context": {"variables": [variable("x", x), variable("y", y)]}},
+            {"offset": 2, "context": {"gather": [
+                {"variables": [variable("x", x)]},
+                {"pick": [{"variables": [variable("y", y_reordered)]}, {"remark": "none"}]},
+            ]}},
+            {"offset": 3},
+        ],
+    }
+
+def test_canonical_key_ignores_key_order():
+    assert canonical_key({"a": 1, "b": [1, {"c": 2, "d": 3}]}) == canonical_key({"b": [1, {"d": 3, "c": 2}], "a": 1})
+    assert structural_hash({"a": 1, "b": 2}) == structural_hash({"b": 2, "a": 1})
+    assert structural_hash({"a": 1}) != structural_hash({"a": 2})
+
+def test_stores_each_unique_pointer_once(program):
+    table = PointerTable.from_program(program)
+    assert len(table) == 2
+    assert table.lookup({"slot": 0, "location": "stack"}) == 0
+    assert table.lookup({"location": "stack", "slot": 1}) is None
+    assert table.intern({"location": "stack", "slot": 0}) == 0
+    assert len(table) == 2
+
+def test_prepares_each_pointer_once(program):
+    table = PointerTable.from_program(program)
+    calls = []
+    def factory(pointer):
+        calls.append(pointer)
+        return len(calls)
+    for _ in range(3):
+        assert table.prepare(0, "count", factory) == 1
+        assert table.prepare(1, "count", factory) == 2
+    assert len(calls) == 2
+
+def test_adjusts_nested_stack_regions():
+    pointer = {"group": [
+        {"location": "stack", "slot": 1},
+        {"list": {"count": 2, "each": "i", "is": {"location": "stack", "slot": "i"}}},
+        {"location": "memory", "offset": 0, "length": 32},
+    ]}
+    assert adjust_stack_length(pointer, 0) is pointer
+    assert adjust_stack_length(pointer, 2) == {"group": [
+        {"location": "stack", "slot": {"$sum": [1, 2]}},
+        {"list": {"count": 2, "each": "i", "is": {"location": "stack", "slot": {"$sum": ["i", 2]}}}},
+        {"location": "memory", "offset": 0, "length": 32},
+    ]}
+    assert adjust_stack_length({"location": "stack", "slot": 3}, -1) == {"location": "stack", "slot": {"$difference": [3, 1]}}
+
+def test_resolves_referenced_templates_transitively():
+    templates = {
+        "outer": {"expect": [], "for": {"group": [{"template": "inner"}]}},
+        "inner": {"expect": [], "for": {"location": "stack", "slot": 0}},
+        "unused": {"expect": [], "for": {"location": "stack", "slot": 1}},
+    }
+    assert set(referenced_templates({"define": {"a": 1}, "in": {"template": "outer"}}, templates)) == {"outer", "inner"}
+    with pytest.raises(ValueError, match="Unknown pointer template named missing"):
+        referenced_templates({"template": "missing"}, templates)
+
+def test_caches_adjusted_variants_with_templates():
+    table = PointerTable(templates={"t": {"expect": [], "for": {"location": "stack", "slot": 0}}})
+    pointer_id = table.intern({"group": [{"template": "t"}, {"location": "stack", "slot": 1}]})
+    pointer, templates = table.adjusted(pointer_id, 1)
+    assert pointer == {"group": [{"template": "t"}, {"location": "stack", "slot": {"$sum": [1, 1]}}]}
+    assert templates == {"t": {"expect": [], "for": {"location": "stack", "slot": {"$sum": [0, 1]}}}}
+    assert table.adjusted(pointer_id, 1) is table.adjusted(pointer_id, 1)
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from ethdebug.dereference.__main__ import main
+from ethdebug.dereference.profile import frames, load_pointer, profile
+from ethdebug.in_memory import InMemoryState
+
+DOCUMENT = {
+    "pointer": {"group": [
+        {"name": "array-start", "location": "stack", "slot": 0},
+        {"name": "array-count", "location": "memory", "offset": {"$read": "array-start"}, "length": "$wordsize"},
+        {"list": {
+            "count": {"$read": "array-count"},
+            "each": "index",
+            "is": {"define": {"item-offset": {"$sum": [{"$read": "array-start"}, 32, {"$product": ["index", 32]}]}},
+                   "in": {"template": "memory-word"}},
+        }},
+    ]},
+    "templates": {
+        "memory-word": {
+            "expect": ["item-offset"],
+            "for": {"name": "item", "location": "memory", "offset": "item-offset", "length": "$wordsize"},
+        },
+    },
+}
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+@pytest.fixture
+def state() -> InMemoryState:
+    return InMemoryState(stack=[word(0x80)], memory=bytes(0x80) + word(2) + word(7) + word(9), storage={1: word(5)})
+
+def test_state_json(state):
+    loaded = InMemoryState.from_json(json.loads(json.dumps(state.to_json())))
+    assert loaded.to_json() == state.to_json()
+    assert loaded.storage.slots == {1: word(5)}
+
+def test_frames():
+    assert frames("/") == ["pointer"]
+    assert frames("/group/2/list/is/offset/$sum/0") == ["pointer", "group[2]", "list", "is", "offset", "$sum[0]"]
+
+@pytest.mark.asyncio
+async def test_profile(state):
+    pointer, templates = load_pointer(DOCUMENT)
+    result = await profile(pointer, templates, state, repeat=3, read=True)
+    assert len(result.times) == 3
+    assert result.regions == 4
+
+    nodes = result.nodes
+    assert nodes["/"].kind == "PointerCollectionGroup"
+    assert nodes["/group/0"].kind == "stack region"
+    assert nodes["/group/2/list/is"].count == 6
+    assert nodes["/templates/memory-word/for"].count == 6
+    # Each `$read` of the array start reads the stack, each item offset reads it again
+    assert nodes["/group/1/offset"].reads == {"stack": 3}
+    assert nodes["/group/2/list/count"].reads == {"memory": 3}
+    assert nodes["/group/2/list/is/define/item-offset/$sum/0"].kind == "Read"
+    assert nodes["/group/2/list/is/define/item-offset/$sum/0"].reads == {"stack": 6}
+    assert nodes["(view)"].reads == {"stack": 3, "memory": 9}
+    assert result.report.count("read") == 3 * (1 + 1 + 2) + 3 * 4
+
+    sum_ = nodes["/group/2/list/is/define/item-offset"]
+    assert sum_.self_seconds <= sum_.seconds
+    assert result.hot_spots()[0].self_seconds == max(node.self_seconds for node in nodes.values())
+
+def test_main(state, tmp_path, capsys):
+    (tmp_path / "pointer.json").write_text(json.dumps(DOCUMENT))
+    (tmp_path / "state.json").write_text(json.dumps(state.to_json()))
+    assert main([
+        "profile", str(tmp_path / "pointer.json"), str(tmp_path / "state.json"), "--repeat", "2",
+        "--stacks", str(tmp_path / "stacks.txt"), "--cprofile", str(tmp_path / "profile.out"),
+    ]) == 0
+    output = capsys.readouterr().out
+    assert "2 repetitions, 4 regions" in output
+    assert "/templates/memory-word/for" in output
+    for line in (tmp_path / "stacks.txt").read_text().splitlines():
+        stack, microseconds = line.rsplit(" ", 1)
+        assert stack.startswith("pointer") and int(microseconds) > 0
+    assert (tmp_path / "profile.out").stat().st_size > 0
@@ -0,0 +1,110 @@
+import json
+import pytest
+from pathlib import Path
+from ethdebug.format.program_schema import Program
+from ethdebug.program.cache import ProgramCache
+from ethdebug.program.scope import ScopeIndex
+
+script_dir = Path(__file__).parent
+
+def code(offset: int, length: int, source: int = 0) -> dict:
+    return {"code": {"source": {"id": source}, "range": {"offset": offset, "length": length}}}
+
+@pytest.fixture
+def program() -> dict:
+    return {
+        "contract": {"name": "A", "definition": {"source": {"id": 0}}},
+        "environment": "call",
+        "instructions": [
+            {"offset": 0, "operation": {"mnemonic": "PUSH1", "arguments": ["0x80"]}, "context": code(0, 100)},
+            {"offset": 2, "context": {"gather": [
+                code(10, 5),
+                {"variables": [{"identifier": "a", "pointer": {"location": "stack", "slot": 0}}]},
+            ]}},
+            {"offset": "0x04", "context": {"pick": [code(12, 1), code(50, 10, source=1)]}},
+            {"offset": 3, "context": {"code": {"source": {"id": 1}}}},
+        ],
+    }
+
+def test_builds_and_reads_tables(tmp_path, program):
+    cache = ProgramCache(tmp_path)
+    cached = cache.load_program(json.dumps(program).encode())
+    assert list(cached.pcs()) == [0, 2, 3, 4]
+    assert cached.index_of(4) == 2
+    assert cached.instruction(0)["operation"]["mnemonic"] == "PUSH1"
+    with pytest.raises(ValueError, match="No instruction at offset 1"):
+        cached.index_of(1)
+
+    assert cached.instructions_in(0, 11) == [0, 2]
+    assert cached.instructions_in(0, 12, 1) == [0, 2, 4]
+    assert cached.instructions_in(0, 15, 50) == [0]
+    assert cached.instructions_in(0, 100) == []
+    assert cached.instructions_in(1, 1000) == [3]
+    assert cached.instructions_in(1, 55) == [3, 4]
+    assert cached.instructions_in(2, 0) == []
+
+    assert [variable.identifier for variable in cached.variables_at(2)] == ["a"]
+    assert cached.variables_at(0) == cached.variables_at(3) == ()
+    assert cached.pointer(cached.variables_at(2)[0].pointer_id) == {"location": "stack", "slot": 0}
+    assert len(cached.pointers) == 1
+    assert cached.json == json.loads(json.dumps(program))
+    assert cached.program.contract.name == "A"
+
+def test_warm_load_skips_parsing(tmp_path, program, monkeypatch):
+    raw = json.dumps(program).encode()
+    ProgramCache(tmp_path).load_program(raw)
+    monkeypatch.setattr(ScopeIndex, "build", lambda *args, **kwargs: pytest.fail("index rebuilt"))
+    cached = ProgramCache(tmp_path).load_program(raw)
+    assert [variable.identifier for variable in cached.variables_at(2)] == ["a"]
+    assert cached.program.contract.name == "A"
+
+def test_invalidates_entries(tmp_path, program):
+    raw = json.dumps(program).encode()
+    cache = ProgramCache(tmp_path, version="1")
+    path = cache.path(raw)
+    cache.load_program(raw, validate=False)
+    assert not cache.load_program(raw, validate=False).validated
+    # A validated entry is required, so the unvalidated one is rebuilt
+    assert cache.load_program(raw).validated
+    assert ProgramCache(tmp_path, version="2").path(raw) != path
+
+    program["instructions"][0]["offset"] = 1
+    assert list(cache.load_program(json.dumps(program).encode()).pcs()) == [1, 2, 3, 4]
+
+    path.write_bytes(path.read_bytes()[:-10])
+    assert cache.load_program(raw).instructions_in(0, 11) == [0, 2]
+    assert len(list(tmp_path.glob("*.bin"))) == 2
+    cache.clear()
+    assert list(tmp_path.glob("*")) == []
+
+def test_caches_solc_programs(tmp_path):
+    with open(script_dir / "mega_playground/output.json", "r") as f:
+        output = json.load(f)
+    program = output["contracts"]["mega_playground.sol"]["MegaFeaturePlayground"]["evm"]["deployedBytecode"]["ethdebug"]
+    cached = ProgramCache(tmp_path).load_program(json.dumps(program).encode(), validate=False)
+    assert len(cached) == len(program["instructions"])
+    for instruction in program["instructions"][::97]:
+        code_range = instruction["context"]["code"]["range"]
+        assert instruction["offset"] in cached.instructions_in(0, code_range["offset"], code_range["length"])
+        assert cached.instruction(instruction["offset"]) == instruction
+
+def test_caches_info_programs(tmp_path, program):
+    info = {
+        "compilation": {"id": "build", "compiler": {"name": "solc", "version": "0.8.29"}, "sources": []},
+        "programs": [program, dict(program, environment="create")],
+    }
+    path = tmp_path / "info.json"
+    path.write_text(json.dumps(info))
+    programs = ProgramCache(tmp_path / "cache").load_info(path)
+    assert [cached.program.environment.value for cached in programs] == ["call", "create"]
+
+def test_stores_validated_models_as_json(tmp_path):
+    with open(script_dir / "mega_playground/output.json", "r") as f:
+        output = json.load(f)
+    program = output["contracts"]["mega_playground.sol"]["MegaFeaturePlayground"]["evm"]["deployedBytecode"]["ethdebug"]
+    raw = json.dumps(program).encode()
+    ProgramCache(tmp_path).load_program(raw)
+    cached = ProgramCache(tmp_path).load_program(raw)
+    assert cached.validated
+    json.loads(bytes(cached._section("model")))
+    assert cached.program == Program.model_validate(program)
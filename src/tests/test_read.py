@@ -106,3 +106,10 @@ async def test_default_transient_values(state):
     result = await read(region, state)
     state.transient.read.assert_called_with(42, 0, 32)
     assert result == Data.from_bytes(bytearray([0xaa, 0xbb, 0xcc, 0xdd]))
+
+@pytest.mark.asyncio
+async def test_read_zero_length(state):
+    # Data.from_int(0) is empty, but still a given length
+    region = Region(name="packing-begin", location="storage", slot=Data.from_int(0), offset=Data.from_int(32), length=Data.from_int(0))
+    await read(region, state)
+    state.storage.read.assert_called_with(0, 32, 0)
@@ -0,0 +1,60 @@
+import pytest
+from ethdebug.data import Data
+from ethdebug.dereference.cursor import Region, Regions
+from ethdebug.dereference.region import CircularReferenceError, adjust_stack_length, evaluate_region
+from ethdebug.evaluate import EvaluateOptions
+from ethdebug.format.pointer.region_schema import PointerRegion
+
+@pytest.fixture
+def options() -> EvaluateOptions:
+    start = Region(name="start", location="memory", slot=None, offset=Data.from_int(0x80), length=Data.from_int(32))
+    return EvaluateOptions(state=None, regions=Regions((start,)), variables={"index": Data.from_int(2)})
+
+async def evaluate(region: dict, options: EvaluateOptions) -> Region:
+    return await evaluate_region(PointerRegion.model_validate(region), options)
+
+@pytest.mark.asyncio
+async def test_evaluates_references_to_this(options):
+    # The offset needs the length, which is only evaluated after it
+    region = await evaluate({
+        "name": "item",
+        "location": "memory",
+        "offset": {"$sum": [{".offset": "start"}, {"$product": ["index", {".length": "$this"}]}]},
+        "length": {".length": "start"},
+    }, options)
+    assert region == Region(name="item", location="memory", slot=None, offset=Data.from_int(0xc0), length=Data.from_int(32))
+
+    # Regions may refer to themselves by name
+    region = await evaluate({"name": "item", "location": "memory", "offset": {".length": "item"}, "length": 4}, options)
+    assert region.offset == Data.from_int(4)
+
+@pytest.mark.asyncio
+async def test_evaluates_scheme_defaults(options):
+    # The length of a segment defaults to the rest of the slot after its offset
+    region = await evaluate({"location": "stack", "slot": 1, "offset": 30}, options)
+    assert (region.slot, region.offset, region.length) == (Data.from_int(1), Data.from_int(30), Data.from_int(2))
+    region = await evaluate({"location": "storage", "slot": 1}, options)
+    assert (region.offset, region.length) == (Data.from_int(0), Data.from_int(32))
+
+@pytest.mark.asyncio
+async def test_circular_references(options):
+    with pytest.raises(CircularReferenceError):
+        await evaluate({"location": "memory", "offset": {".length": "$this"}, "length": {".offset": "$this"}}, options)
+
+@pytest.mark.asyncio
+async def test_errors_are_not_retried(options):
+    with pytest.raises(ValueError, match="Unknown variable: undefined-var"):
+        await evaluate({"location": "memory", "offset": "undefined-var", "length": 32}, options)
+    with pytest.raises(ValueError, match="Regiond not found: missing"):
+        await evaluate({"location": "memory", "offset": {".offset": "missing"}, "length": 32}, options)
+
+@pytest.mark.asyncio
+async def test_adjusts_stack_slots(options):
+    region = PointerRegion.model_validate({"name": "x", "location": "stack", "slot": 1, "length": 4})
+    assert adjust_stack_length(region, 0) is region
+    # Two items were pushed, or one was popped, since the pointer was dereferenced
+    assert (await evaluate_region(adjust_stack_length(region, 2), options)).slot.as_uint() == 3
+    assert (await evaluate_region(adjust_stack_length(region, -1), options)).slot.as_uint() == 0
+    assert (await evaluate_region(adjust_stack_length(region, 2), options)).length == Data.from_int(4)
+    memory = PointerRegion.model_validate({"location": "memory", "offset": 1, "length": 4})
+    assert adjust_stack_length(memory, 2) is memory
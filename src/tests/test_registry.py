@@ -0,0 +1,123 @@
+import json
+import os
+import pytest
+from pathlib import Path
+from ethdebug.program.registry import ProgramRegistry
+
+script_dir = Path(__file__).parent
+
+def program(name: str, environment: str = "call", size: int = 1) -> dict:
+    return {
+        "contract": {"name": name, "definition": {"source": {"id": 0}}},
+        "environment": environment,
+        "instructions": [
+            {"offset": offset, "context": {"variables": [{"identifier": name, "pointer": {"location": "stack", "slot": 0}}]}}
+            for offset in range(size)
+        ],
+    }
+
+def metadata(seed: bytes) -> bytes:
+    cbor = b"\xa1\x64ipfs\x58\x22" + (seed * 34)[:34]
+    return cbor + len(cbor).to_bytes(2, "big")
+
+def test_resolves_exact_runtime_and_creation_code():
+    registry = ProgramRegistry()
+    runtime = registry.add(program("A"), b"\x60\x80\x60\x40\x52\x00")
+    creation = registry.add(program("A", "create"), "0x6080604052fe")
+    assert registry.resolve(b"\x60\x80\x60\x40\x52\x00").entry == runtime
+    assert registry.resolve(bytes.fromhex("6080604052fe"), "create").entry == creation
+    assert registry.resolve(bytes.fromhex("6080604052fe")) is None
+    resolution = registry.resolve(b"\x60\x80\x60\x40\x52\x00")
+    assert resolution.match == "exact"
+    assert registry.resolve_hash(resolution.code_hash) == resolution
+
+def test_masks_immutables_libraries_and_metadata():
+    registry = ProgramRegistry()
+    body = bytes(range(1, 65))
+    immutable = body[:10] + bytes(32) + body[42:]
+    entry = registry.add(program("Immutable"), {
+        "object": (immutable + metadata(b"\x01")).hex(),
+        "immutableReferences": {"7": [{"start": 10, "length": 32}]},
+    })
+    library = registry.add(program("Library"), b"\x73" + bytes(20) + b"\x30\x14" + body)
+    linked = registry.add(program("Linked"), "60" + "__$" + "ab" * 17 + "$__" + "00")
+
+    deployed = body[:10] + b"\x2a" * 32 + body[42:]
+    resolution = registry.resolve(deployed + metadata(b"\x01"))
+    assert (resolution.entry, resolution.match) == (entry, "immutables")
+    resolution = registry.resolve(deployed + metadata(b"\x02"))
+    assert (resolution.entry, resolution.match) == (entry, "metadata")
+    assert registry.resolve(deployed + b"\x00" + metadata(b"\x02")) is None
+
+    resolution = registry.resolve(b"\x73" + b"\x11" * 20 + b"\x30\x14" + body)
+    assert (resolution.entry, resolution.match) == (library, "immutables")
+    resolution = registry.resolve(b"\x60" + b"\x22" * 20 + b"\x00")
+    assert (resolution.entry, resolution.match) == (linked, "immutables")
+    # Masked matches can only be found by hash once the code was resolved
+    assert registry.resolve_hash(resolution.code_hash) == resolution
+
+def test_resolves_creation_code_with_constructor_arguments():
+    registry = ProgramRegistry()
+    short = registry.add(program("Short", "create"), b"\x60\x00")
+    long = registry.add(program("Long", "create"), b"\x60\x00\x60\x00" + metadata(b"\x01"))
+    assert registry.resolve(b"\x60\x00" + bytes(64), "create").entry == short
+    resolution = registry.resolve(b"\x60\x00\x60\x00" + metadata(b"\x03") + bytes(64), "create")
+    assert (resolution.entry, resolution.match) == (long, "metadata")
+
+def test_loads_programs_lazily_and_evicts_least_recently_used():
+    loads = []
+    def loader(name):
+        def load():
+            loads.append(name)
+            return program(name, size=50)
+        return load
+
+    registry = ProgramRegistry(memory_budget=1)
+    entries = [registry.add(loader(name), bytes([index]), environment="call") for index, name in enumerate("ABC")]
+    assert loads == []
+    size = registry.load(entries[0]).size
+    assert registry.memory_usage() == size
+    registry.memory_budget = 2 * size
+    registry.load(entries[1])
+    registry.load(entries[0])
+    registry.load(entries[2])
+    assert loads == ["A", "B", "C"]
+    assert [registry.is_loaded(entry) for entry in entries] == [True, False, True]
+    assert registry.memory_usage() == 2 * size
+
+    loaded = registry.program(bytes([1]))
+    assert loads[-1] == "B"
+    assert [variable.identifier for variable in loaded.scope.variables_at(3)] == ["B"]
+    assert loaded.program.contract.name == "B"
+
+def test_registers_solc_output(tmp_path):
+    with open(script_dir / "mega_playground/output.json", "r") as f:
+        output = json.load(f)
+    codes = {}
+    for contracts in output["contracts"].values():
+        for name, contract in contracts.items():
+            for key in ("bytecode", "deployedBytecode"):
+                code = codes[(name, key)] = os.urandom(100) + metadata(os.urandom(1))
+                contract["evm"][key]["object"] = code.hex()
+    path = tmp_path / "output.json"
+    path.write_text(json.dumps(output))
+
+    registry = ProgramRegistry()
+    entries = registry.add_solc_output(path)
+    assert len(entries) == len(codes)
+    assert all(entry.compilation is None for entry in entries)
+    code = codes[("MegaFeaturePlayground", "deployedBytecode")]
+    loaded = registry.program(code)
+    assert (loaded.entry.name, loaded.entry.environment) == ("MegaFeaturePlayground", "call")
+    assert len(loaded.contexts) == len(output["contracts"]["mega_playground.sol"]["MegaFeaturePlayground"]["evm"]["deployedBytecode"]["ethdebug"]["instructions"])
+
+def test_registers_info_programs():
+    info = {
+        "compilation": {"id": "build", "compiler": {"name": "solc", "version": "0.8.29"}, "sources": []},
+        "programs": [program("A"), program("A", "create"), program("B")],
+    }
+    registry = ProgramRegistry()
+    entries = registry.add_info(info, {("A", "call"): b"\x01", ("A", "create"): b"\x02"})
+    assert [(entry.name, entry.environment, entry.compilation) for entry in entries] == [("A", "call", "build"), ("A", "create", "build")]
+    with pytest.raises(ValueError, match="Unknown environment"):
+        registry.add(lambda: program("C"), b"\x03")
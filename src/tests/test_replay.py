@@ -0,0 +1,212 @@
+import json
+import random
+import pytest
+from ethdebug.data import Data
+from ethdebug.dereference.cursor import Region
+from ethdebug.read import read
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.struct_log import import_struct_logs, iter_struct_logs
+from ethdebug.replay.trace_file import TraceFile, TraceWriter, to_word
+
+def record_random_trace(path, steps: int, checkpoint_interval: int, seed: int = 0) -> list:
+    """
+    Record a random trace and return the full state at every step, for comparison.
+    """
+    rng = random.Random(seed)
+    stack, memory, storage = [], bytearray(), {}
+    states = []
+    with TraceWriter(path, checkpoint_interval=checkpoint_interval) as writer:
+        for step in range(steps):
+            pop = rng.randint(0, min(len(stack), 3))
+            push = [rng.getrandbits(256) for _ in range(rng.randint(0, 2))]
+            del stack[len(stack) - pop:]
+            stack.extend(to_word(word) for word in push)
+            writes = []
+            clear_memory = step > 0 and rng.random() < 0.05
+            if clear_memory:
+                memory = bytearray()
+            for _ in range(rng.randint(0, 2)):
+                offset = rng.randrange(0, 3000)
+                data = rng.randbytes(rng.randint(1, 40))
+                writes.append((offset, data))
+                memory.extend(bytes(max(0, offset + len(data) - len(memory))))
+                memory[offset:offset + len(data)] = data
+            memory.extend(bytes((len(memory) + 31) // 32 * 32 - len(memory)))
+            stores = [(rng.randrange(4), rng.getrandbits(256)) for _ in range(rng.randint(0, 1))]
+            storage.update((slot, to_word(value)) for slot, value in stores)
+            writer.append(step * 2, rng.choice(["PUSH1", "MSTORE", "SSTORE"]), pop=pop, push=push,
+                          memory=writes, clear_memory=clear_memory, storage=stores)
+            states.append((list(stack), bytes(memory), dict(storage)))
+    return states
+
+@pytest.mark.parametrize("checkpoint_interval", [1, 7, 256])
+def test_reconstructs_every_step(tmp_path, checkpoint_interval):
+    path = tmp_path / "trace.bin"
+    states = record_random_trace(path, 300, checkpoint_interval)
+    with TraceFile(path) as trace:
+        assert len(trace) == 300
+        for step, (stack, memory, storage) in enumerate(states):
+            assert trace.pc(step) == step * 2
+            assert trace.stack(step) == stack
+            assert trace.memory_size(step) == len(memory)
+            assert trace.memory(step, 0, len(memory) + 8) == memory + bytes(8)
+            assert trace.memory(step, 17, 33) == memory[17:50].ljust(33, b"\x00")
+            for slot in range(4):
+                assert trace.storage(step, slot) == storage.get(slot, bytes(32))
+
+@pytest.mark.asyncio
+async def test_replays_machine_states(tmp_path):
+    path = tmp_path / "trace.bin"
+    with TraceWriter(path, checkpoint_interval=2) as writer:
+        writer.append(0, "PUSH1", push=[0x80], calldata=b"\x12\x34", code=b"\x60\x80", address="0xAB")
+        writer.append(2, "PUSH1", push=[0x40])
+        writer.append(4, "MSTORE", pop=2, memory=[(0x40, to_word(0x80))])
+        writer.append(5, "SSTORE", push=[1], storage=[(0, 0xff)], transient=[(1, 2)], returndata=b"\x01")
+
+    with ReplayMachine(path) as machine:
+        trace = await machine.trace()
+        states = [state async for state in trace]
+        assert len(states) == 4
+        assert [await state.opcode() for state in states] == ["PUSH1", "PUSH1", "MSTORE", "SSTORE"]
+
+        state = await trace.state_at(1)
+        assert await state.trace_index() == 1
+        assert await state.stack.length() == 2
+        assert await state.stack.read(0, 31, 1) == Data(b"\x40")
+        assert await read(Region(location="stack", name=None, slot=Data.from_int(1), offset=Data.from_int(30), length=Data.from_int(2)), state) == Data(b"\x00\x80")
+
+        state = await trace.state_at(3)
+        assert await state.memory.length() == 0x60
+        assert await state.memory.read(0x40) == Data(to_word(0x80))
+        assert await state.storage.read(0) == Data(to_word(0xff))
+        assert await state.transient.read(1, 31, 1) == Data(b"\x02")
+        assert await (await trace.state_at(2)).storage.read(0) == Data(bytes(32))
+        assert await state.calldata.read(0, 4) == Data(b"\x12\x34\x00\x00")
+        assert await state.code.length() == 2
+        assert await state.returndata.read(0, 1) == Data(b"\x01")
+        assert await (await trace.state_at(2)).returndata.length() == 0
+
+        with pytest.raises(ValueError, match="Stack slot 1 out of range"):
+            await state.stack.read(1)
+        with pytest.raises(IndexError):
+            await trace.state_at(4)
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "trace.bin"
+    path.write_bytes(b"not a trace file at all, but long enough for a header")
+    with pytest.raises(ValueError, match="Not a trace file"):
+        TraceFile(path)
+
+def test_rejects_inconsistent_steps(tmp_path):
+    with TraceWriter(tmp_path / "trace.bin") as writer:
+        with pytest.raises(ValueError, match="Cannot pop 1 items"):
+            writer.append(0, "POP", pop=1)
+        writer.append(0, "MSTORE", memory=[(0, bytes(64))])
+        with pytest.raises(ValueError, match="Memory size 32 is smaller"):
+            writer.append(1, "MLOAD", memory_size=32)
+
+def word_hex(value: int) -> str:
+    return value.to_bytes(32, "big").hex()
+
+STRUCT_LOGS = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "result": {
+        "gas": 50000,
+        "failed": False,
+        "returnValue": "",
+        "structLogs": [
+            {"pc": 0, "op": "PUSH1", "gas": 100, "gasCost": 3, "depth": 1, "stack": [], "memory": []},
+            {"pc": 2, "op": "PUSH1", "gas": 97, "gasCost": 3, "depth": 1, "stack": ["0x80"], "memory": []},
+            {"pc": 4, "op": "MSTORE", "gas": 94, "gasCost": 12, "depth": 1, "stack": ["0x80", "0x40"], "memory": []},
+            {"pc": 5, "op": "CALL", "gas": 82, "gasCost": 0, "depth": 1,
+             "stack": ["0x0", "0x0", "0x0", "0x0", "0x0", "0xbeef", "0xffff"],
+             "memory": [word_hex(0), word_hex(0), word_hex(0x80)]},
+            {"pc": 0, "op": "SSTORE", "gas": 60, "gasCost": 20000, "depth": 2, "stack": ["0x2a", "0x1"],
+             "memory": [], "storage": {word_hex(1): word_hex(0x2a)}},
+            {"pc": 1, "op": "STOP", "gas": 40, "gasCost": 0, "depth": 2, "stack": [],
+             "memory": [], "storage": {word_hex(1): word_hex(0x2a)}},
+            {"pc": 6, "op": "POP", "gas": 30, "gasCost": 2, "depth": 1, "stack": ["0x1"],
+             "memory": [word_hex(0), word_hex(0), word_hex(0x80)], "returnData": "0x01"},
+        ],
+    },
+}
+
+@pytest.mark.asyncio
+async def test_imports_struct_logs(tmp_path):
+    source = tmp_path / "trace.json"
+    source.write_text(json.dumps(STRUCT_LOGS, indent=1))
+    with import_struct_logs(source, tmp_path / "trace.bin", address="0xCAFE", calldata=b"\x01\x02") as machine:
+        trace = await machine.trace()
+        assert len(trace) == 7
+        assert [await state.opcode() async for state in trace] == [log["op"] for log in STRUCT_LOGS["result"]["structLogs"]]
+        assert await (await trace.state_at(0)).calldata.read(0, 2) == Data(b"\x01\x02")
+
+        state = await trace.state_at(3)
+        assert await state.stack.length() == 7
+        assert await state.stack.read(1) == Data(to_word(0xbeef))
+        assert await state.memory.length() == 96
+        assert await state.memory.read(0x40) == Data(to_word(0x80))
+
+        state = await trace.state_at(4)
+        assert machine.file.address(4) == "0x" + "beef".rjust(40, "0")
+        assert await state.memory.length() == 0
+        assert await state.storage.read(1) == Data(to_word(0x2a))
+
+        state = await trace.state_at(6)
+        assert machine.file.address(6) == "0x" + "cafe".rjust(40, "0")
+        assert await state.memory.read(0x40) == Data(to_word(0x80))
+        assert await state.storage.read(1) == Data(bytes(32))
+        assert await state.returndata.read(0, 1) == Data(b"\x01")
+
+def storage_logs(halt: dict) -> list:
+    """
+    Struct logs loading slot 1 and calling a contract that stores to slot 3 and halts with `halt`.
+    """
+    call = ["0x0", "0x0", "0x0", "0x0", "0x0", "0xbeef", "0xffff"]
+    return [
+        {"pc": 0, "op": "PUSH1", "depth": 1, "stack": []},
+        {"pc": 2, "op": "SLOAD", "depth": 1, "stack": ["0x1"], "storage": {word_hex(1): word_hex(5)}},
+        {"pc": 3, "op": "CALL", "depth": 1, "stack": ["0x5", *call]},
+        {"pc": 0, "op": "SSTORE", "depth": 2, "stack": ["0x7", "0x3"], "storage": {word_hex(3): word_hex(7)}},
+        {"pc": 1, "depth": 2, "stack": ["0x0", "0x0"], **halt},
+        {"pc": 4, "op": "SSTORE", "depth": 1, "stack": ["0x9", "0x1"], "storage": {word_hex(1): word_hex(9)}},
+        {"pc": 5, "op": "SLOAD", "depth": 1, "stack": ["0x1"], "storage": {word_hex(1): word_hex(9)}},
+    ]
+
+@pytest.mark.parametrize("halt, reverted", [
+    ({"op": "RETURN"}, False),
+    ({"op": "REVERT"}, True),
+    ({"op": "ADD", "error": "out of gas"}, True),
+])
+def test_imports_storage_of_struct_logs(tmp_path, halt, reverted):
+    source = tmp_path / "trace.json"
+    source.write_text(json.dumps({"structLogs": storage_logs(halt)}))
+    with import_struct_logs(source, tmp_path / "trace.bin", address="0xcafe") as machine:
+        trace = machine.file
+        index = trace.storage_index()
+        cafe, beef = (trace.contexts.index("0x" + name.rjust(40, "0")) for name in ("cafe", "beef"))
+
+        # A loaded slot has its value from the start, and is not written by the load
+        assert index.initial(1, cafe) == to_word(5)
+        assert index.writes(1, cafe) == [(5, to_word(9))]
+        assert trace.storage(0, 1) == to_word(5)
+        assert trace.storage(6, 1) == to_word(9)
+
+        # The writes of a failed frame are undone when it returns
+        assert trace.storage(3, 3) == to_word(7)
+        assert index.writes(3, beef) == ([] if reverted else [(3, to_word(7))])
+        assert index.read(5, 3, beef) == (None if reverted else to_word(7))
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_streams_struct_logs_in_chunks(tmp_path, chunk_size):
+    source = tmp_path / "trace.json"
+    source.write_text(json.dumps(STRUCT_LOGS["result"]))
+    assert list(iter_struct_logs(source, chunk_size=chunk_size)) == STRUCT_LOGS["result"]["structLogs"]
+
+@pytest.mark.parametrize("document", ['{"structLogs": [{"pc": 0}, {"pc"', '{"gas": 1}', '{"structLogs": [1]}'])
+def test_rejects_malformed_struct_logs(tmp_path, document):
+    source = tmp_path / "trace.json"
+    source.write_text(document)
+    with pytest.raises(ValueError, match="Malformed struct logs"):
+        list(iter_struct_logs(source, chunk_size=4))
@@ -0,0 +1,71 @@
+import json
+import pytest
+from pathlib import Path
+from ethdebug.program.scope import ScopeIndex
+
+script_dir = Path(__file__).parent
+
+def variable(identifier: str, slot: int) -> dict:
+    return {"identifier": identifier, "pointer": {"location": "stack", "slot": slot}}
+
+@pytest.fixture
+def program() -> dict:
+    return {
+        "contract": {"definition": {"source": {"id": 0}}},
+        "environment": "call",
+        "instructions": [
+            {"offset": 0},
+            {"offset": 1, "context": {"variables": [variable("a", 0)]}},
+            {"offset": 2, "context": {"variables": [variable("a", 0)]}},
+            {"offset": "0x03", "context": {"gather": [
+                {"variables": [variable("a", 0)]},
+                {"variables": [variable("b", 1)]},
+            ]}},
+            {"offset": 5, "context": {"pick": [
+                {"variables": [variable("b", 1)]},
+                {"variables": [variable("c", 1)]},
+            ]}},
+            {"offset": 6, "context": {"code": {"source": {"id": 0}}}},
+        ],
+    }
+
+def identifiers(variables) -> list:
+    return [variable.identifier for variable in variables]
+
+def test_computes_variables_per_instruction(program):
+    index = ScopeIndex.build(program)
+    assert identifiers(index.variables_at(0)) == []
+    assert identifiers(index.variables_at(1)) == ["a"]
+    assert identifiers(index.variables_at(2)) == ["a"]
+    assert identifiers(index.variables_at(3)) == ["a", "b"]
+    assert identifiers(index.variables_at(5)) == ["b", "c"]
+    assert identifiers(index.variables_at(6)) == []
+
+def test_interns_variables_and_pointers(program):
+    index = ScopeIndex.build(program)
+    assert len(index.variables()) == 3
+    assert index.variables_at(1)[0] is index.variables_at(3)[0]
+    # `b` and `c` share their pointer
+    b, c = index.variables_at(5)
+    assert b.pointer_id == c.pointer_id
+    assert len(index.pointers) == 2
+
+def test_shares_scopes_between_instructions(program):
+    index = ScopeIndex.build(program)
+    assert index.scope_id_at(1) == index.scope_id_at(2)
+    assert index.scope_id_at(0) == index.scope_id_at(6)
+    assert [(start, end) for start, end, _ in index.runs()] == [(0, 1), (1, 3), (3, 4), (4, 5), (5, 6)]
+
+def test_rejects_unknown_program_counters(program):
+    index = ScopeIndex.build(program)
+    with pytest.raises(ValueError, match="No instruction at offset 4"):
+        index.variables_at(4)
+
+def test_indexes_solc_programs():
+    with open(script_dir / "mega_playground/output.json", 'r') as f:
+        output = json.load(f)
+    program = output["contracts"]["mega_playground.sol"]["MegaFeaturePlayground"]["evm"]["deployedBytecode"]["ethdebug"]
+    index = ScopeIndex.build(program)
+    assert len(index) == len(program["instructions"])
+    for instruction in program["instructions"]:
+        assert index.variables_at(instruction["offset"]) == ()
@@ -0,0 +1,93 @@
+import random
+import pytest
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.seekable import SeekableTrace
+from tests.test_replay import record_random_trace
+
+class ForwardOnlyTrace:
+    def __init__(self, trace):
+        self.trace = trace
+        self.consumed = 0
+
+    async def __aiter__(self):
+        async for state in self.trace:
+            self.consumed += 1
+            yield state
+
+async def assert_same_state(actual, expected):
+    assert await actual.trace_index() == await expected.trace_index()
+    assert await actual.program_counter() == await expected.program_counter()
+    assert await actual.opcode() == await expected.opcode()
+    length = await expected.stack.length()
+    assert await actual.stack.length() == length
+    for slot in range(length):
+        assert await actual.stack.read(slot) == await expected.stack.read(slot)
+    size = await expected.memory.length()
+    assert await actual.memory.length() == size
+    assert await actual.memory.read(0, size + 32) == await expected.memory.read(0, size + 32)
+    assert await actual.memory.read(40, 50) == await expected.memory.read(40, 50)
+    for slot in range(4):
+        assert await actual.storage.read(slot) == await expected.storage.read(slot)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("checkpoint_interval, memory_limit", [(1, 1 << 30), (16, 1 << 30), (16, 1 << 14)])
+async def test_seeks_forward_only_traces(tmp_path, checkpoint_interval, memory_limit):
+    path = tmp_path / "trace.bin"
+    record_random_trace(path, 300, checkpoint_interval=300)
+    with ReplayMachine(path) as machine:
+        trace = await machine.trace()
+        source = ForwardOnlyTrace(trace)
+        seekable = SeekableTrace(source, checkpoint_interval=checkpoint_interval, memory_limit=memory_limit)
+
+        await assert_same_state(await seekable.state_at(10), await trace.state_at(10))
+        assert source.consumed == 11
+
+        indices = list(range(300))
+        random.Random(0).shuffle(indices)
+        for index in indices:
+            await assert_same_state(await seekable.state_at(index), await trace.state_at(index))
+        assert [await state.trace_index() async for state in seekable] == list(range(300))
+        if memory_limit < 1 << 30:
+            assert seekable.checkpoints < 300 // checkpoint_interval
+
+        with pytest.raises(IndexError):
+            await seekable.state_at(300)
+
+class SharedStorageTrace:
+    """
+    Wrap a trace so that all states of a call frame (here: of 50 steps) share their storage.
+    """
+    def __init__(self, trace):
+        self.trace = trace
+        self.storages = []
+
+    async def __aiter__(self):
+        index = 0
+        async for state in self.trace:
+            if index % 50 == 0:
+                self.storages.append(state.storage)
+            yield SharedStorageState(state, self.storages[-1])
+            index += 1
+
+class SharedStorageState:
+    def __init__(self, state, storage):
+        self._state = state
+        self.storage = storage
+        self.transient = None
+
+    def __getattr__(self, name):
+        return getattr(self._state, name)
+
+@pytest.mark.asyncio
+async def test_keeps_shared_storages_once(tmp_path):
+    path = tmp_path / "trace.bin"
+    record_random_trace(path, 300, checkpoint_interval=300)
+    with ReplayMachine(path) as machine:
+        source = SharedStorageTrace(await machine.trace())
+        seekable = SeekableTrace(source)
+        usage = seekable.memory_usage()
+        await seekable.state_at(299)
+        assert len(seekable._storages) == 6
+        assert seekable.memory_usage() > usage
+        for index in (0, 49, 50, 299):
+            assert (await seekable.state_at(index)).storage is source.storages[index // 50]
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+from ethdebug.dereference.__main__ import DereferenceOptions, dereference, main
+from ethdebug.format.pointer_schema import Pointer
+from ethdebug.in_memory import InMemoryState
+from ethdebug.snapshot import RecordingState, Snapshot, SnapshotState
+
+POINTER = {"group": [
+    {"name": "array-start", "location": "stack", "slot": 1},
+    {"name": "array-count", "location": "memory", "offset": {"$read": "array-start"}, "length": "$wordsize"},
+    {"list": {
+        "count": {"$read": "array-count"},
+        "each": "index",
+        "is": {"name": "item", "location": "storage", "slot": {"$keccak256": [{"$sum": ["index", 1]}]}},
+    }},
+    {"name": "selector", "location": "calldata", "offset": 0, "length": 4},
+]}
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+@pytest.fixture
+def state() -> InMemoryState:
+    return InMemoryState(
+        stack=[word(0x80), word(7)],
+        memory=bytes(0x80) + word(2),
+        storage={slot: word(slot) for slot in range(4)},
+        calldata=bytes.fromhex("a9059cbb") + word(1),
+        trace_index=12,
+        program_counter=345,
+        opcode="SLOAD",
+    )
+
+async def values(state) -> list:
+    cursor = await dereference(Pointer.model_validate(POINTER), DereferenceOptions(state=state, templates={}))
+    view = await cursor.view(state)
+    return [(region.name, bytes(await view.read(region))) for region in view.regions().all()]
+
+@pytest.mark.asyncio
+async def test_replays_recorded_reads(state, tmp_path):
+    recording = RecordingState(state)
+    expected = await values(recording)
+    assert await recording.program_counter() == 345
+    assert recording.snapshot.lengths == {"stack": 2}
+    assert ("memory", 0, 0x80, 32) in recording.snapshot.reads
+
+    recording.snapshot.save(tmp_path / "state.snapshot")
+    snapshot = Snapshot.load(tmp_path / "state.snapshot")
+    assert snapshot == recording.snapshot
+    replay = SnapshotState(snapshot)
+    assert await values(replay) == expected
+    assert await replay.program_counter() == 345
+    with pytest.raises(ValueError):
+        await replay.trace_index()
+
+@pytest.mark.asyncio
+async def test_reads_outside_snapshot():
+    snapshot = Snapshot(reads={
+        ("memory", 0, 0x40, 64): bytes(range(64)),
+        ("storage", 2**255, 0, 32): word(1),
+    })
+    replay = SnapshotState(snapshot)
+    assert bytes(await replay.memory.read(0x50, 4)) == bytes(range(16, 20))
+    assert (await replay.storage.read(2**255)).as_uint() == 1
+    with pytest.raises(ValueError):
+        await replay.memory.read(0x70, 32)
+    with pytest.raises(ValueError):
+        await replay.storage.read(1)
+    with pytest.raises(ValueError):
+        await replay.stack.length()
+    assert Snapshot.from_bytes(snapshot.to_bytes()) == snapshot
+
+def test_invalid_snapshot():
+    with pytest.raises(ValueError):
+        Snapshot.from_bytes(b"{}")
+    assert not Snapshot.is_snapshot(b'{"stack": []}')
+
+def test_profile_snapshot(state, tmp_path, capsys):
+    recording = RecordingState(state)
+    asyncio.run(values(recording))
+    recording.snapshot.save(tmp_path / "state.snapshot")
+    (tmp_path / "pointer.json").write_text(json.dumps(POINTER))
+    assert main(["profile", str(tmp_path / "pointer.json"), str(tmp_path / "state.snapshot"), "--repeat", "1", "--read"]) == 0
+    assert "1 repetitions, 5 regions" in capsys.readouterr().out
@@ -0,0 +1,64 @@
+import pytest
+from ethdebug.data import Data
+from ethdebug.replay.machine import ReplayMachine
+from ethdebug.replay.storage_index import StorageIndex
+from ethdebug.replay.trace_file import TraceFile, TraceWriter, to_word
+from tests.test_replay import record_random_trace
+
+def test_indexes_trace_file_writes(tmp_path):
+    path = tmp_path / "trace.bin"
+    states = record_random_trace(path, 300, checkpoint_interval=16)
+    with TraceFile(path) as trace:
+        index = trace.storage_index()
+        assert index.slots() == [0, 1, 2, 3]
+        for slot in range(4):
+            writes = index.writes(slot)
+            assert [step for step, _ in writes] == sorted(step for step, _ in writes)
+            for step, (_, _, storage) in enumerate(states):
+                assert (index.read(step, slot) or bytes(32)) == storage.get(slot, bytes(32))
+
+class ConstantStorage:
+    async def read(self, slot, offset=0, length=32):
+        return Data(b"\xee" * length)
+
+@pytest.mark.asyncio
+async def test_indexes_stores_of_any_trace(tmp_path):
+    path = tmp_path / "trace.bin"
+    with TraceWriter(path) as writer:
+        writer.append(0, "PUSH1", push=[0x2a, 1], address="0xa")
+        writer.append(2, "SSTORE", storage=[])
+        writer.append(3, "PUSH1", pop=2, push=[7, 1], storage=[(1, 0x2a)], address="0xb")
+        writer.append(5, "TSTORE")
+        writer.append(6, "SSTORE", pop=2, push=[8, 1], transient=[(1, 7)])
+        writer.append(7, "STOP", pop=2, storage=[(1, 8)])
+
+    with ReplayMachine(path) as machine:
+        trace = await machine.trace()
+        async def address(state):
+            return machine.file.address(await state.trace_index())
+        index = await StorageIndex.from_trace(trace, context=address)
+
+        assert index.contexts == ["0xa", "0xb"]
+        assert index.writes(1, context=0) == [(2, to_word(0x2a))]
+        assert index.writes(1, context=1) == [(5, to_word(8))]
+        assert index.writes(1, context=1, transient=True) == [(4, to_word(7))]
+        assert index.read(1, 1) is None
+        assert index.read(4, 1, context=0) == to_word(0x2a)
+
+        storage = index.storage(5, context=1)
+        assert await storage.read(1) == Data(to_word(8))
+        assert await storage.read(1, 31, 1) == Data(b"\x08")
+        assert await index.storage(4, context=1).read(1) == Data(bytes(32))
+        assert await index.storage(4, context=1, fallback=ConstantStorage()).read(1, 0, 2) == Data(b"\xee\xee")
+
+def test_initial_values_and_reverted_writes():
+    writes = [(1, 0, False, 1, to_word(1)), (3, 0, False, 1, to_word(2)), (4, 0, False, 1, to_word(3)), (5, 0, False, 2, to_word(4))]
+    # The frame writing at steps 3 to 5 reverted at step 8, a frame nested in it already at step 5
+    index = StorageIndex.build(writes, [None], initial=[(0, 1, to_word(9)), (0, 3, to_word(8))], reverts=[(2, 3, 5), (1, 4, 8)])
+    assert [index.read(step, 1) for step in range(10)] == [to_word(value) for value in (9, 1, 1, 2, 3, 2, 2, 2, 1, 1)]
+    assert index.read(6, 2) == to_word(4)
+    assert index.read(8, 2) is None
+    assert index.read(0, 3) == index.initial(3) == to_word(8)
+    assert index.read(0, 3, transient=True) is None
+    assert index.writes(1) == [(1, to_word(1))]
+    assert index.writes(2) == []
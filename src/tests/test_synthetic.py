@@ -0,0 +1,66 @@
+import pytest
+from ethdebug.dereference.__main__ import DereferenceOptions, dereference
+from ethdebug.format.pointer_schema import Pointer
+from ethdebug.format.program.context.variables_schema import ProgramContextVariables
+from ethdebug.format.program_schema import Program
+from ethdebug.format.type.base_schema import TypeBase
+from ethdebug.format.type.complex.array_schema import TypeComplexArray
+from ethdebug.format.type.complex.struct_schema import TypeComplexStruct
+from ethdebug.format.type.elementary.address_schema import TypeElementaryAddress
+from ethdebug.format.type.elementary.bool_schema import TypeElementaryBool
+from ethdebug.format.type.elementary.uint_schema import TypeElementaryUint
+from ethdebug.program.contexts import ContextTable, ProgramContexts
+from ethdebug.synthetic import Generator
+
+TYPE_MODELS = {
+    "uint": TypeElementaryUint,
+    "bool": TypeElementaryBool,
+    "address": TypeElementaryAddress,
+    "struct": TypeComplexStruct,
+    "array": TypeComplexArray,
+}
+
+def validate_type(type_: dict) -> None:
+    TYPE_MODELS[type_["kind"]].model_validate(type_)
+    contains = type_.get("contains", [])
+    for member in contains if isinstance(contains, list) else [contains]:
+        validate_type(member["type"])
+
+def leaves(value) -> list:
+    return [leaf for item in value for leaf in leaves(item)] if isinstance(value, list) else [value]
+
+def test_is_deterministic():
+    a, b = Generator(seed=7).program(200), Generator(seed=7).program(200)
+    assert a.program == b.program
+    assert a.state.memory.data == b.state.memory.data
+    assert a.state.stack.words == b.state.stack.words
+    assert Generator(seed=8).program(200).program != a.program
+
+@pytest.mark.parametrize("seed", range(5))
+def test_validates(seed):
+    generator = Generator(seed=seed, depth=4, fan_out=3, conditionals=0.5, scopes=0.5, templates=0.5)
+    variables, _ = generator.variables(8)
+    for variable in variables:
+        TypeBase.model_validate(variable.type)
+        validate_type(variable.type)
+        Pointer.model_validate(variable.pointer)
+    ProgramContextVariables.model_validate({"variables": [
+        {"identifier": variable.identifier, "type": variable.type, "pointer": variable.pointer} for variable in variables
+    ]})
+    Program.model_validate(generator.program(500).program)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("seed", range(5))
+async def test_pointers_point_to_values(seed):
+    variables, state = Generator(seed=seed, depth=4, fan_out=3, conditionals=0.5, scopes=0.5, templates=0.5).variables(8)
+    for variable in variables:
+        cursor = await dereference(Pointer.model_validate(variable.pointer), DereferenceOptions(state=state, templates={}))
+        view = await cursor.view(state)
+        values = [(await view.read(region)).as_uint() for region in view.regions().all() if region.name.startswith("value-")]
+        assert values == leaves(variable.value)
+
+def test_program_contexts_repeat():
+    program = Generator(seed=0).program(2_000, block_length=8).program
+    contexts = ProgramContexts.build(program, ContextTable())
+    assert len(contexts) == 2_000
+    assert len(contexts.table) < 2_000 / 8